@@ -0,0 +1,228 @@
+"""
+Admission Control
+Per-endpoint concurrency limits for the calculation routes. Requests beyond a
+route's limit wait in a bounded queue; they are shed with 503 when the queue
+is full, when the expected wait already exceeds the route's deadline, or when
+the deadline passes while queued. Routes without a limit (health, reference
+tables) are never queued. A request that ends up waiting on a computation
+another request is already running hands its slot back early.
+
+Configuration:
+    ADMISSION_CONCURRENCY  requests computing at once per route (default: CPU count, at least 2)
+    ADMISSION_QUEUE        requests waiting per route (default 128)
+    ADMISSION_WAIT_MS      longest a request may wait for a slot (default 2000)
+    ADMISSION_LIMITS       per-route overrides, e.g. "muhurtham=1:8:5000,birth-chart=4"
+                           (concurrency[:queue[:wait_ms]])
+"""
+
+import asyncio
+import contextvars
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from app.cache import CacheStats
+
+CONCURRENCY = int(os.environ.get('ADMISSION_CONCURRENCY', str(max(2, os.cpu_count() or 1))))
+QUEUE_DEPTH = int(os.environ.get('ADMISSION_QUEUE', '128'))
+MAX_WAIT_SECONDS = float(os.environ.get('ADMISSION_WAIT_MS', '2000')) / 1000
+
+# Weight of each service-time sample in the moving average used for wait estimates
+SERVICE_SMOOTHING = 0.2
+
+# Routes under admission control: (concurrency, queue depth, max wait in seconds).
+# Compatibility computes two charts; a muhurtham search scans up to a year of days
+# and an ephemeris table streams up to MAX_API_ROWS days.
+DEFAULT_LIMITS: Dict[str, Tuple[int, int, float]] = {
+    'birth-chart': (CONCURRENCY, QUEUE_DEPTH, MAX_WAIT_SECONDS),
+    'incremental': (CONCURRENCY, QUEUE_DEPTH, MAX_WAIT_SECONDS),
+    'predictions': (CONCURRENCY, QUEUE_DEPTH, MAX_WAIT_SECONDS),
+    'dasha-periods': (CONCURRENCY, QUEUE_DEPTH, MAX_WAIT_SECONDS),
+    'compatibility': (max(1, CONCURRENCY // 2), QUEUE_DEPTH, MAX_WAIT_SECONDS),
+    'transit': (CONCURRENCY, QUEUE_DEPTH, MAX_WAIT_SECONDS),
+    'sade-sati': (CONCURRENCY, QUEUE_DEPTH, MAX_WAIT_SECONDS),
+    'muhurtham': (1, max(1, QUEUE_DEPTH // 16), MAX_WAIT_SECONDS * 2),
+    'chart-svg': (CONCURRENCY, QUEUE_DEPTH, MAX_WAIT_SECONDS),
+    'ephemeris': (1, max(1, QUEUE_DEPTH // 16), MAX_WAIT_SECONDS * 2),
+}
+
+
+class Overloaded(Exception):
+    """A request shed by admission control"""
+
+    def __init__(self, route: str, reason: str, retry_after: float):
+        super().__init__(f"Server busy ({route}: {reason}); retry in {math.ceil(retry_after)} s")
+        self.route = route
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class AdmissionLimit:
+    """
+    Concurrency slots of one route with a FIFO queue. A released slot passes
+    straight to the oldest waiter. Used from the event loop only.
+    """
+
+    def __init__(self, route: str, concurrency: int, max_queue: int, max_wait: float):
+        self.route = route
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.peak_waiting = 0
+        self.service_seconds: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.counters = CacheStats('admitted', 'queued', 'handed_back', 'shed_queue_full', 'shed_deadline',
+                                   'shed_timeout')
+
+    def expected_wait(self, position: int) -> float:
+        """Seconds until the request at this queue position (1 = next) gets a slot"""
+        return position * (self.service_seconds or 0.0) / self.concurrency
+
+    async def acquire(self):
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self.counters.incr('admitted')
+            return
+        position = len(self._waiters) + 1
+        if position > self.max_queue:
+            self.counters.incr('shed_queue_full')
+            raise Overloaded(self.route, 'queue full', self.expected_wait(position) or self.max_wait)
+        if self.expected_wait(position) > self.max_wait:
+            self.counters.incr('shed_deadline')
+            raise Overloaded(self.route, 'expected wait exceeds deadline', self.expected_wait(position))
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.counters.incr('queued')
+        self.peak_waiting = max(self.peak_waiting, len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.counters.incr('shed_timeout')
+            raise Overloaded(self.route, 'deadline passed while queued', self.expected_wait(len(self._waiters) + 1))
+        except asyncio.CancelledError:
+            # The client went away; hand on a slot it may have been given meanwhile
+            self._discard(waiter)
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        self.counters.incr('admitted')
+
+    async def enter(self) -> 'AdmissionSlot':
+        """Wait for a slot and make it the current request's; raises Overloaded when shed"""
+        await self.acquire()
+        slot = AdmissionSlot(self)
+        _current_slot.set(slot)
+        return slot
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, service_seconds: Optional[float] = None):
+        if service_seconds is not None:
+            self.service_seconds = service_seconds if self.service_seconds is None else (
+                (1 - SERVICE_SMOOTHING) * self.service_seconds + SERVICE_SMOOTHING * service_seconds)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict:
+        counts = self.counters.snapshot()
+        return {
+            'concurrency': self.concurrency,
+            'max_queue': self.max_queue,
+            'max_wait_ms': round(self.max_wait * 1000),
+            'active': self.active,
+            'waiting': len(self._waiters),
+            'peak_waiting': self.peak_waiting,
+            'service_ms': round(self.service_seconds * 1000, 2) if self.service_seconds is not None else None,
+            **counts,
+            'rejected': counts['shed_queue_full'] + counts['shed_deadline'] + counts['shed_timeout'],
+        }
+
+
+class AdmissionSlot:
+    """One admitted request's hold on a slot; releasing twice is harmless"""
+
+    def __init__(self, limit: AdmissionLimit):
+        self.limit = limit
+        self.started = time.perf_counter()
+        self.held = True
+
+    def release(self, record: bool = True):
+        """Free the slot; `record` feeds the request's duration into the wait estimates"""
+        if self.held:
+            self.held = False
+            self.limit.release(time.perf_counter() - self.started if record else None)
+
+
+_current_slot: contextvars.ContextVar = contextvars.ContextVar('admission_slot', default=None)
+
+
+def hand_back_slot():
+    """
+    Release the current request's slot early because it only waits on a
+    computation another request is running (no-op outside admitted requests)
+    """
+    slot = _current_slot.get()
+    if slot is not None and slot.held:
+        slot.limit.counters.incr('handed_back')
+        slot.release(record=False)
+
+
+def parse_limits(spec: Optional[str]) -> Dict[str, Tuple[int, int, float]]:
+    """'route=concurrency[:queue[:wait_ms]],...' applied over DEFAULT_LIMITS"""
+    limits = dict(DEFAULT_LIMITS)
+    for item in (spec or '').split(','):
+        if not item.strip():
+            continue
+        route, _, values = item.partition('=')
+        route = route.strip()
+        if route not in limits:
+            raise ValueError(f"Unknown admission route '{route}'. Choose from: {', '.join(limits)}")
+        parts = values.split(':')
+        concurrency, queue, wait = limits[route]
+        try:
+            concurrency = int(parts[0])
+            if len(parts) > 1:
+                queue = int(parts[1])
+            if len(parts) > 2:
+                wait = float(parts[2]) / 1000
+        except ValueError:
+            raise ValueError(f"Invalid admission limit '{item}'. Use route=concurrency[:queue[:wait_ms]]")
+        if concurrency < 1 or queue < 0 or wait <= 0:
+            raise ValueError(f"Invalid admission limit '{item}'")
+        limits[route] = (concurrency, queue, wait)
+    return limits
+
+
+class AdmissionController:
+    """The limits of every controlled route"""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, int, float]]] = None):
+        limits = DEFAULT_LIMITS if limits is None else limits
+        self.limits = {route: AdmissionLimit(route, *values) for route, values in limits.items()}
+
+    def limit(self, route: str) -> AdmissionLimit:
+        return self.limits[route]
+
+    def stats(self) -> Dict:
+        routes = {route: limit.stats() for route, limit in self.limits.items()}
+        return {
+            'rejected': sum(r['rejected'] for r in routes.values()),
+            'admitted': sum(r['admitted'] for r in routes.values()),
+            'routes': routes,
+        }
+
+
+admission_controller = AdmissionController(parse_limits(os.environ.get('ADMISSION_LIMITS')))
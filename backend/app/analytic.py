@@ -0,0 +1,198 @@
+"""
+Analytic Ephemeris
+Low-precision positions of the Sun, Moon and planets from truncated analytical
+series, vectorized over arrays of instants and independent of the JPL file
+
+Planets use the Keplerian elements and rates of Standish (JPL, "Approximate
+Positions of the Planets") plus Jupiter-Saturn perturbation terms; the
+Moon uses the main terms of the lunar theory in Meeus, Astronomical Algorithms,
+ch. 47. Longitudes are referred to the J2000 ecliptic and include light time
+and aberration, like the skyfield path they stand in for.
+"""
+
+from typing import Dict, List, Union
+
+import numpy as np
+
+J2000 = 2451545.0
+
+ENGINES = ('skyfield', 'analytic')
+DEFAULT_ENGINE = 'skyfield'
+
+# Largest differences from the skyfield/DE421 path (degrees of longitude),
+# measured every 7 hours over 1900-2053 and rounded up by half for margin:
+# Sun 0.008, Moon 0.005, Mercury 0.014, Venus 0.027, Mars 0.057,
+# Jupiter 0.025, Saturn 0.044. Rahu/Ketu use the same node series as the
+# skyfield path and have no error.
+ERROR_BOUNDS = {
+    'Sun': 0.012, 'Moon': 0.008, 'Mercury': 0.022, 'Venus': 0.04, 'Mars': 0.085,
+    'Jupiter': 0.04, 'Saturn': 0.066, 'Rahu': 0.0, 'Ketu': 0.0,
+}
+
+# Span the bounds were measured over (DE421 coverage, Julian days TT);
+# outside it every position is treated as uncertain
+VERIFIED_START_JD = 2415020.5  # 1900-01-01
+VERIFIED_END_JD = 2471183.5    # 2053-10-01
+
+# Rasi and nakshatra boundaries are all pada boundaries
+PADA_SPAN = 360 / 108
+
+# Days per AU of light travel
+LIGHT_DAYS_PER_AU = 0.0057755183
+
+# Elements at J2000 and rates per Julian century, J2000 ecliptic and equinox:
+# a (AU), e, I, L, longitude of perihelion, longitude of ascending node (degrees)
+ELEMENTS = {
+    'Mercury': ((0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593),
+                (0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081)),
+    'Venus': ((0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255),
+              (0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418)),
+    'EMB': ((1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0),
+            (0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0)),
+    'Mars': ((1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891),
+             (0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343)),
+    'Jupiter': ((5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909),
+                (-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106)),
+    'Saturn': ((9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448),
+               (-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794)),
+}
+
+# Periodic corrections to the heliocentric longitudes of Jupiter and Saturn:
+# multiples of their mean anomalies and the sine and cosine coefficients
+# (degrees), fitted to DE421 over 1900-2050 on top of the elements above
+PERTURBATION_TERMS = {
+    'Jupiter': ((2, -5, -0.0163, 0.0626), (2, -2, -0.0515, -0.0202), (3, -5, 0.0009, 0.0035),
+                (1, -2, -0.0338, 0.0008), (1, -1, -0.0042, 0.0222), (2, -3, 0.0122, 0.0191),
+                (1, -5, 0.0021, 0.0003)),
+    'Saturn': ((2, -5, 0.0281, -0.1802), (2, -4, -0.0360, -0.0154), (1, -2, 0.1022, 0.0017),
+               (2, -6, 0.0283, -0.0248), (1, -3, 0.0120, -0.0067)),
+}
+
+# Periodic terms of the Moon's longitude: multiples of D, M, M', F and the
+# coefficient in 1e-6 degrees (terms in M are scaled by the eccentricity factor E)
+MOON_LONGITUDE_TERMS = np.array([
+    (0, 0, 1, 0, 6288774), (2, 0, -1, 0, 1274027), (2, 0, 0, 0, 658314), (0, 0, 2, 0, 213618),
+    (0, 1, 0, 0, -185116), (0, 0, 0, 2, -114332), (2, 0, -2, 0, 58793), (2, -1, -1, 0, 57066),
+    (2, 0, 1, 0, 53322), (2, -1, 0, 0, 45758), (0, 1, -1, 0, -40923), (1, 0, 0, 0, -34720),
+    (0, 1, 1, 0, -30383), (2, 0, 0, -2, 15327), (0, 0, 1, 2, -12528), (0, 0, 1, -2, 10980),
+    (4, 0, -1, 0, 10675), (0, 0, 3, 0, 10034), (4, 0, -2, 0, 8548), (2, 1, -1, 0, -7888),
+    (2, 1, 0, 0, -6766), (1, 0, -1, 0, -5163), (1, 1, 0, 0, 4987), (2, -1, 1, 0, 4036),
+    (2, 0, 2, 0, 3994), (4, 0, 0, 0, 3861), (2, 0, -3, 0, 3665), (0, 1, -2, 0, -2689),
+    (2, 0, -1, 2, -2602), (2, -1, -2, 0, 2390), (1, 0, 1, 0, -2348), (2, -2, 0, 0, 2236),
+    (0, 1, 2, 0, -2120), (0, 2, 0, 0, -2069), (2, -2, -1, 0, 2048), (2, 0, 1, -2, -1773),
+    (2, 0, 0, 2, -1595), (4, -1, -1, 0, 1215), (0, 0, 2, 2, -1110), (3, 0, -1, 0, -892),
+    (2, 1, 1, 0, -810), (4, -1, -2, 0, 759), (0, 2, -1, 0, -713), (2, 2, -1, 0, -700),
+    (2, 1, -2, 0, 691), (2, -1, 0, -2, 596), (4, 0, 1, 0, 549), (0, 0, 4, 0, 537),
+    (4, -1, 0, 0, 520), (1, 0, -2, 0, -487), (2, 1, 0, -2, -399), (0, 0, 2, -2, -381),
+    (1, 1, 1, 0, 351), (3, 0, -2, 0, -340), (4, 0, -3, 0, 330), (2, -1, 2, 0, 327),
+    (0, 2, 1, 0, -323), (1, 1, -1, 0, 299), (2, 0, 3, 0, 294),
+], dtype=float)
+
+BODIES = ('Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn')
+
+
+def _centuries(jd_tt: Union[float, np.ndarray]) -> np.ndarray:
+    return (np.asarray(jd_tt, dtype=float) - J2000) / 36525.0
+
+
+def _perturbation(name: str, T: np.ndarray) -> Union[float, np.ndarray]:
+    """Correction to the heliocentric longitude (degrees) from Jupiter-Saturn interaction"""
+    terms = PERTURBATION_TERMS.get(name)
+    if terms is None:
+        return 0.0
+    mean_anomaly = {}
+    for planet in ('Jupiter', 'Saturn'):
+        base, rate = ELEMENTS[planet]
+        mean_anomaly[planet] = np.radians(base[3] - base[4] + (rate[3] - rate[4]) * T)
+    correction = 0.0
+    for j, s, sin_coefficient, cos_coefficient in terms:
+        argument = j * mean_anomaly['Jupiter'] + s * mean_anomaly['Saturn']
+        correction = correction + sin_coefficient * np.sin(argument) + cos_coefficient * np.cos(argument)
+    return correction
+
+
+def heliocentric(name: str, jd_tt: Union[float, np.ndarray]) -> np.ndarray:
+    """Heliocentric J2000 ecliptic position (AU), shape (3, ...)"""
+    T = _centuries(jd_tt)
+    base, rate = ELEMENTS[name]
+    a, e, inc, mean_long, perihelion, node = (b + r * T for b, r in zip(base, rate))
+    anomaly = np.radians((mean_long - perihelion + 180) % 360 - 180)
+    # Kepler's equation by Newton iteration
+    ecc = anomaly + e * np.sin(anomaly)
+    for _ in range(6):
+        ecc = ecc - (ecc - e * np.sin(ecc) - anomaly) / (1 - e * np.cos(ecc))
+    x_orb = a * (np.cos(ecc) - e)
+    y_orb = a * np.sqrt(1 - e * e) * np.sin(ecc)
+
+    w = np.radians(perihelion - node)
+    om = np.radians(node)
+    i = np.radians(inc)
+    cw, sw, co, so, ci, si = np.cos(w), np.sin(w), np.cos(om), np.sin(om), np.cos(i), np.sin(i)
+    x = (cw * co - sw * so * ci) * x_orb + (-sw * co - cw * so * ci) * y_orb
+    y = (cw * so + sw * co * ci) * x_orb + (-sw * so + cw * co * ci) * y_orb
+    z = (sw * si) * x_orb + (cw * si) * y_orb
+
+    # Perturbations turn the position about the ecliptic pole
+    turn = np.radians(_perturbation(name, T))
+    return np.array([x * np.cos(turn) - y * np.sin(turn), x * np.sin(turn) + y * np.cos(turn), z])
+
+
+def _geocentric_longitude(name: str, jd_tt: np.ndarray) -> np.ndarray:
+    """Apparent longitude; evaluating both bodies at t - light time also applies aberration"""
+    planet = np.zeros((3,) + np.shape(jd_tt)) if name == 'Sun' else heliocentric(name, jd_tt)
+    delta = planet - heliocentric('EMB', jd_tt)
+    light_time = LIGHT_DAYS_PER_AU * np.sqrt((delta ** 2).sum(axis=0))
+    retarded = jd_tt - light_time
+    planet = np.zeros_like(delta) if name == 'Sun' else heliocentric(name, retarded)
+    delta = planet - heliocentric('EMB', retarded)
+    return np.degrees(np.arctan2(delta[1], delta[0])) % 360
+
+
+def moon_longitude(jd_tt: Union[float, np.ndarray]) -> np.ndarray:
+    """Geocentric longitude of the Moon on the J2000 ecliptic (degrees)"""
+    T = _centuries(jd_tt)
+    L = 218.3164477 + 481267.88123421 * T - 0.0015786 * T**2 + T**3 / 538841.0 - T**4 / 65194000.0
+    D = 297.8501921 + 445267.1114034 * T - 0.0018819 * T**2 + T**3 / 545868.0 - T**4 / 113065000.0
+    M = 357.5291092 + 35999.0502909 * T - 0.0001536 * T**2 + T**3 / 24490000.0
+    Mp = 134.9633964 + 477198.8675055 * T + 0.0087414 * T**2 + T**3 / 69699.0 - T**4 / 14712000.0
+    F = 93.2720950 + 483202.0175233 * T - 0.0036539 * T**2 - T**3 / 3526000.0 + T**4 / 863310000.0
+    E = 1 - 0.002516 * T - 0.0000074 * T**2
+
+    d, m, mp, f, coefficient = MOON_LONGITUDE_TERMS.T
+    args = np.radians(np.multiply.outer(D, d) + np.multiply.outer(M, m)
+                      + np.multiply.outer(Mp, mp) + np.multiply.outer(F, f))
+    scale = np.power.outer(E, np.abs(m))
+    total = (coefficient * scale * np.sin(args)).sum(axis=-1)
+
+    A1 = np.radians(119.75 + 131.849 * T)
+    A2 = np.radians(53.09 + 479264.290 * T)
+    total = total + 3958 * np.sin(A1) + 1962 * np.sin(np.radians(L - F)) + 318 * np.sin(A2)
+
+    # The series gives the mean equinox of date; remove precession since J2000
+    precession = (5028.796195 * T + 1.1054348 * T**2) / 3600.0
+    return (L + total / 1e6 - precession) % 360
+
+
+def tropical_longitudes(jd_tt: Union[float, np.ndarray], bodies: List[str]) -> Dict[str, np.ndarray]:
+    """Apparent J2000-ecliptic longitudes (degrees) of the given bodies"""
+    jd_tt = np.asarray(jd_tt, dtype=float)
+    longitudes = {}
+    for name in bodies:
+        if name not in BODIES:
+            raise ValueError(f"No analytic series for '{name}'. Choose from: {', '.join(BODIES)}")
+        longitudes[name] = moon_longitude(jd_tt) if name == 'Moon' else _geocentric_longitude(name, jd_tt)
+    return longitudes
+
+
+def boundary_risk(sidereal_longitude: Union[float, np.ndarray], body: str,
+                  jd_tt: Union[float, np.ndarray]) -> np.ndarray:
+    """
+    True where the analytic error bound of `body` reaches a pada (and so
+    possibly a nakshatra or rasi) boundary, or the instant is outside the
+    verified span; such positions should be recomputed with skyfield
+    """
+    offset = np.mod(sidereal_longitude, PADA_SPAN)
+    distance = np.minimum(offset, PADA_SPAN - offset)
+    jd_tt = np.asarray(jd_tt, dtype=float)
+    outside = (jd_tt < VERIFIED_START_JD) | (jd_tt > VERIFIED_END_JD)
+    return (distance <= ERROR_BOUNDS[body]) | outside
@@ -4,15 +4,22 @@ Implements full Jathagam (Birth Chart) calculations with Tamil support
 """
 
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Set, Tuple, Optional
 import math
+import numpy as np
 from skyfield.api import load, wgs84, N, E, W, S
 from skyfield.almanac import find_discrete
 import pytz
 
-# Lahiri Ayanamsa (most common in Indian astrology)
-LAHIRI_AYANAMSA_2000 = 23.85  # degrees at J2000
-AYANAMSA_RATE = 0.01397  # degrees per year
+from app.analytic import DEFAULT_ENGINE, ENGINES, boundary_risk, tropical_longitudes
+from app.ayanamsa import (
+    AYANAMSA_MODELS, AYANAMSA_RATE, DEFAULT_AYANAMSA, LAHIRI_AYANAMSA_2000, ayanamsa_tables
+)
+from app.nodes import DEFAULT_NODE, NODE_TYPES, lunar_node_longitude
+from app.profiling import record_inputs, stage
+from app.strength import ashtakavarga, contributor_signs, format_ashtakavarga, shadbala
+from app.timezones import timezone_resolver
+from app.vargas import chart_longitudes, format_vargas, parse_vargas, varga_table
 
 
 class VedicAstrology:
@@ -99,17 +106,27 @@ class VedicAstrology:
     # Dasha order starting from birth nakshatra lord
     DASHA_ORDER = ['Ketu', 'Venus', 'Sun', 'Moon', 'Mars', 'Rahu', 'Jupiter', 'Saturn', 'Mercury']
     
+    # Ephemeris segment for each graha (Rahu/Ketu come from the node model)
+    EPHEMERIS_TARGETS = {
+        'Sun': 'sun', 'Moon': 'moon', 'Mercury': 'mercury', 'Venus': 'venus', 'Mars': 'mars',
+        'Jupiter': 'jupiter barycenter', 'Saturn': 'saturn barycenter'
+    }
+    
     def __init__(self):
         """Initialize ephemeris data"""
         self.ts = load.timescale()
         self.eph = load('de421.bsp')  # JPL planetary ephemeris
         
-    def calculate_ayanamsa(self, jd: float) -> float:
-        """Calculate Lahiri ayanamsa for given Julian Day"""
-        # J2000 is JD 2451545.0
-        years_from_2000 = (jd - 2451545.0) / 365.25
-        ayanamsa = LAHIRI_AYANAMSA_2000 + (AYANAMSA_RATE * years_from_2000)
-        return ayanamsa
+    def calculate_ayanamsa(self, jd: float, model: str = DEFAULT_AYANAMSA) -> float:
+        """Calculate ayanamsa for given Julian Day (Lahiri linear approximation by default)"""
+        if model == 'lahiri_linear':
+            # J2000 is JD 2451545.0
+            years_from_2000 = (jd - 2451545.0) / 365.25
+            ayanamsa = LAHIRI_AYANAMSA_2000 + (AYANAMSA_RATE * years_from_2000)
+            return ayanamsa
+        
+        # Precession-based models are interpolated from precomputed tables
+        return ayanamsa_tables.value(jd, model)
     
     def tropical_to_sidereal(self, tropical_long: float, ayanamsa: float) -> float:
         """Convert tropical longitude to sidereal"""
@@ -138,27 +155,24 @@ class VedicAstrology:
             'degrees_in_nakshatra': degrees_in_nakshatra
         }
     
-    def calculate_planetary_positions(self, dt: datetime, lat: float, lon: float) -> Dict:
+    def calculate_planetary_positions(self, dt: datetime, lat: float, lon: float,
+                                      ayanamsa: str = DEFAULT_AYANAMSA,
+                                      node: str = DEFAULT_NODE,
+                                      engine: str = DEFAULT_ENGINE) -> Dict:
         """Calculate positions of all 9 grahas (planets + nodes)"""
         # Convert to skyfield time
         t = self.ts.from_datetime(dt.replace(tzinfo=timezone.utc))
+        if engine == 'analytic':
+            return self.analytic_positions(np.array([t.tt]), ayanamsa, node)[0]
         
         # Create observer location
         location = wgs84.latlon(lat, lon)
         
         # Calculate ayanamsa
-        ayanamsa = self.calculate_ayanamsa(t.tt)
+        ayanamsa_deg = self.calculate_ayanamsa(t.tt, ayanamsa)
         
         # Get planetary positions
-        planets = {
-            'Sun': self.eph['sun'],
-            'Moon': self.eph['moon'],
-            'Mercury': self.eph['mercury'],
-            'Venus': self.eph['venus'],
-            'Mars': self.eph['mars'],
-            'Jupiter': self.eph['jupiter barycenter'],
-            'Saturn': self.eph['saturn barycenter']
-        }
+        planets = {name: self.eph[target] for name, target in self.EPHEMERIS_TARGETS.items()}
         
         positions = {}
         earth = self.eph['earth']
@@ -173,11 +187,7 @@ class VedicAstrology:
             tropical_long = ecliptic_pos[1].degrees
             
             # Convert to sidereal
-            sidereal_long = self.tropical_to_sidereal(tropical_long, ayanamsa)
-            
-            # Get rasi and nakshatra
-            rasi_num = self.get_rasi(sidereal_long)
-            nakshatra = self.get_nakshatra(sidereal_long)
+            sidereal_long = self.tropical_to_sidereal(tropical_long, ayanamsa_deg)
             
             # Check for retrograde motion by comparing positions 1 day apart
             is_retrograde = False
@@ -188,98 +198,117 @@ class VedicAstrology:
                     astrometric_next = earth.at(t_next).observe(planet)
                     ecliptic_next = astrometric_next.apparent().ecliptic_latlon()
                     tropical_next = ecliptic_next[1].degrees
-                    sidereal_next = self.tropical_to_sidereal(tropical_next, ayanamsa)
+                    sidereal_next = self.tropical_to_sidereal(tropical_next, ayanamsa_deg)
                     
                     # If tomorrow's longitude is less than today's, planet is retrograde
                     # Account for 360-degree wrap-around
                     diff = (sidereal_next - sidereal_long + 360) % 360
-                    is_retrograde = diff > 180
+                    is_retrograde = bool(diff > 180)
                 except:
                     is_retrograde = False
             
-            positions[name] = {
-                'longitude': sidereal_long,
-                'rasi': rasi_num,
-                'rasi_name': self.RASI_NAMES[rasi_num],
-                'degrees_in_rasi': sidereal_long % 30,
-                'nakshatra': nakshatra['name'],
-                'nakshatra_tamil': nakshatra['tamil'],
-                'nakshatra_lord': nakshatra['lord'],
-                'pada': nakshatra['pada'],
-                'nakshatra_id': nakshatra['id'],
-                'is_retrograde': is_retrograde
-            }
+            positions[name] = self.position_entry(sidereal_long, is_retrograde)
         
-        # Calculate Rahu and Ketu (lunar nodes) - using Skyfield's true node
-        # Get Moon's orbital elements to find the ascending node
-        try:
-            # Skyfield provides the Moon's mean ascending node
-            # Calculate using the Moon's position relative to ecliptic
-            moon_astrometric = earth.at(t).observe(self.eph['moon'])
-            moon_ecliptic = moon_astrometric.apparent().ecliptic_latlon()
-            
-            # For a more accurate calculation, we use the moon's orbital elements
-            # The ascending node (Rahu) is approximately 180 degrees from the mean anomaly
-            # This is a simplified but more accurate approach than just moon_long + 180
-            
-            # Mean longitude of ascending node (Rahu) - traditional Vedic calculation
-            # Using the formula from astronomical texts
-            jd = t.tt
-            T = (jd - 2451545.0) / 36525.0  # Julian centuries from J2000
-            
-            # Mean longitude of Moon's ascending node (in degrees)
-            omega = 125.04452 - 1934.136261 * T + 0.0020708 * T**2 + T**3 / 450000.0
-            omega = omega % 360
-            
-            # Apply ayanamsa to convert to sidereal
-            rahu_long = self.tropical_to_sidereal(omega, ayanamsa)
-            ketu_long = (rahu_long + 180) % 360
-            
-        except Exception as e:
-            # Fallback to simplified calculation if detailed calculation fails
-            moon_long = positions['Moon']['longitude']
-            rahu_long = (moon_long + 180) % 360
-            ketu_long = (rahu_long + 180) % 360
-        
-        # Rahu
-        rasi_num = self.get_rasi(rahu_long)
-        nakshatra = self.get_nakshatra(rahu_long)
-        positions['Rahu'] = {
-            'longitude': rahu_long,
-            'rasi': rasi_num,
-            'rasi_name': self.RASI_NAMES[rasi_num],
-            'degrees_in_rasi': rahu_long % 30,
-            'nakshatra': nakshatra['name'],
-            'nakshatra_tamil': nakshatra['tamil'],
-            'nakshatra_lord': nakshatra['lord'],
-            'pada': nakshatra['pada'],
-            'is_retrograde': True  # Always retrograde
-        }
+        # Calculate Rahu and Ketu (lunar nodes) from the node series/tables;
+        # no extra ephemeris evaluation is needed
+        rahu_long = self.tropical_to_sidereal(lunar_node_longitude(t.tt, node), ayanamsa_deg)
+        ketu_long = (rahu_long + 180) % 360
+        
+        # Rahu and Ketu are always retrograde
+        positions['Rahu'] = self.position_entry(rahu_long, True, with_nakshatra_id=False)
+        positions['Ketu'] = self.position_entry(ketu_long, True, with_nakshatra_id=False)
         
-        # Ketu
-        rasi_num = self.get_rasi(ketu_long)
-        nakshatra = self.get_nakshatra(ketu_long)
-        positions['Ketu'] = {
-            'longitude': ketu_long,
+        return positions
+    
+    def analytic_positions(self, jd_tt: np.ndarray, ayanamsa: str = DEFAULT_AYANAMSA,
+                           node: str = DEFAULT_NODE) -> List[Dict]:
+        """
+        Positions for an array of instants from the analytic series, one
+        vectorized pass per graha. Each entry has `boundary_risk`, set when the
+        series error could move it across a rasi, nakshatra or pada boundary.
+        """
+        jd_tt = np.asarray(jd_tt, dtype=float)
+        bodies = list(self.EPHEMERIS_TARGETS)
+        ayanamsa_deg = self.calculate_ayanamsa(jd_tt, ayanamsa)
+        tropical = tropical_longitudes(jd_tt, bodies)
+        tropical_next = tropical_longitudes(jd_tt + 1, [b for b in bodies if b not in ('Sun', 'Moon')])
+        
+        columns = {}
+        for name in bodies:
+            sidereal = np.mod(tropical[name] - ayanamsa_deg, 360)
+            if name in tropical_next:
+                retrograde = np.mod(tropical_next[name] - tropical[name] + 360, 360) > 180
+            else:
+                retrograde = np.zeros(len(jd_tt), dtype=bool)
+            columns[name] = (sidereal, retrograde)
+        rahu = np.mod(lunar_node_longitude(jd_tt, node) - ayanamsa_deg, 360)
+        columns['Rahu'] = (rahu, np.ones(len(jd_tt), dtype=bool))
+        columns['Ketu'] = (np.mod(rahu + 180, 360), np.ones(len(jd_tt), dtype=bool))
+        risk = {name: boundary_risk(lon, name, jd_tt) for name, (lon, _) in columns.items()}
+        
+        charts = []
+        for row in range(len(jd_tt)):
+            positions = {}
+            for name, (longitudes, retrograde) in columns.items():
+                entry = self.position_entry(float(longitudes[row]), bool(retrograde[row]),
+                                            with_nakshatra_id=name not in ('Rahu', 'Ketu'))
+                entry['boundary_risk'] = bool(risk[name][row])
+                positions[name] = entry
+            charts.append(positions)
+        return charts
+    
+    def position_entry(self, sidereal_long: float, is_retrograde: bool,
+                       with_nakshatra_id: bool = True) -> Dict:
+        """Position record of one graha as returned by calculate_planetary_positions"""
+        rasi_num = self.get_rasi(sidereal_long)
+        nakshatra = self.get_nakshatra(sidereal_long)
+        entry = {
+            'longitude': sidereal_long,
             'rasi': rasi_num,
             'rasi_name': self.RASI_NAMES[rasi_num],
-            'degrees_in_rasi': ketu_long % 30,
+            'degrees_in_rasi': sidereal_long % 30,
             'nakshatra': nakshatra['name'],
             'nakshatra_tamil': nakshatra['tamil'],
             'nakshatra_lord': nakshatra['lord'],
             'pada': nakshatra['pada'],
-            'is_retrograde': True  # Always retrograde
         }
-        
-        return positions
+        if with_nakshatra_id:
+            entry['nakshatra_id'] = nakshatra['id']
+        entry['is_retrograde'] = is_retrograde
+        return entry
     
-    def calculate_ascendant(self, dt: datetime, lat: float, lon: float) -> Dict:
-        """Calculate Lagna (Ascendant) - Rising sign at birth time and location"""
-        t = self.ts.from_datetime(dt.replace(tzinfo=timezone.utc))
+    def sidereal_longitudes(self, jd_tt: np.ndarray, bodies: List[str],
+                            ayanamsa: str = DEFAULT_AYANAMSA,
+                            node: str = DEFAULT_NODE,
+                            engine: str = DEFAULT_ENGINE) -> Dict[str, np.ndarray]:
+        """Sidereal longitudes of the given grahas for an array of Julian days (TT), one ephemeris (or analytic series) call per body"""
+        jd_tt = np.asarray(jd_tt, dtype=float)
+        t = self.ts.tt_jd(jd_tt)
+        ayanamsa_deg = self.calculate_ayanamsa(jd_tt, ayanamsa)
+        earth = self.eph['earth']
         
+        longitudes = {}
+        for name in bodies:
+            if name in ('Rahu', 'Ketu'):
+                tropical = lunar_node_longitude(jd_tt, node) + (180 if name == 'Ketu' else 0)
+            elif engine == 'analytic':
+                tropical = tropical_longitudes(jd_tt, [name])[name]
+            else:
+                apparent = earth.at(t).observe(self.eph[self.EPHEMERIS_TARGETS[name]]).apparent()
+                tropical = apparent.ecliptic_latlon()[1].degrees
+            longitudes[name] = np.mod(tropical - ayanamsa_deg, 360)
+        return longitudes
+    
+    def ascendant_longitudes(self, t, lat: float, lon: float, ayanamsa: str = DEFAULT_AYANAMSA,
+                             gast_hours: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Sidereal ascendant longitudes for a skyfield Time (scalar or array) at one place.
+        Callers sampling many instants may pass GAST they already derived more cheaply.
+        """
         # Calculate Local Sidereal Time (LST)
         # GAST = Greenwich Apparent Sidereal Time
-        gast_hours = t.gast
+        if gast_hours is None:
+            gast_hours = t.gast
         
         # Convert longitude to hours (15 degrees = 1 hour)
         longitude_hours = lon / 15.0
@@ -292,26 +321,32 @@ class VedicAstrology:
         jd = t.tt
         T = (jd - 2451545.0) / 36525.0  # Julian centuries from J2000
         epsilon = 23.439291 - 0.0130042 * T - 0.00000164 * T**2 + 0.000000504 * T**3
-        epsilon_rad = math.radians(epsilon)
+        epsilon_rad = np.radians(epsilon)
         
         # Convert latitude to radians
         lat_rad = math.radians(lat)
         
         # Calculate Right Ascension of Meridian (RAMC)
         ramc = lst_degrees
-        ramc_rad = math.radians(ramc)
+        ramc_rad = np.radians(ramc)
         
         # Calculate Ascendant using the formula:
         # tan(ASC) = cos(RAMC) / (-sin(RAMC) * cos(epsilon) - tan(lat) * sin(epsilon))
-        numerator = math.cos(ramc_rad)
-        denominator = -math.sin(ramc_rad) * math.cos(epsilon_rad) - math.tan(lat_rad) * math.sin(epsilon_rad)
+        numerator = np.cos(ramc_rad)
+        denominator = -np.sin(ramc_rad) * np.cos(epsilon_rad) - math.tan(lat_rad) * np.sin(epsilon_rad)
         
-        asc_rad = math.atan2(numerator, denominator)
-        asc_tropical = math.degrees(asc_rad) % 360
+        asc_rad = np.arctan2(numerator, denominator)
+        asc_tropical = np.degrees(asc_rad) % 360
         
         # Apply ayanamsa to get sidereal ascendant
-        ayanamsa = self.calculate_ayanamsa(jd)
-        asc_sidereal = self.tropical_to_sidereal(asc_tropical, ayanamsa)
+        ayanamsa_deg = self.calculate_ayanamsa(jd, ayanamsa)
+        return np.mod(asc_tropical - ayanamsa_deg, 360)
+    
+    def calculate_ascendant(self, dt: datetime, lat: float, lon: float,
+                            ayanamsa: str = DEFAULT_AYANAMSA) -> Dict:
+        """Calculate Lagna (Ascendant) - Rising sign at birth time and location"""
+        t = self.ts.from_datetime(dt.replace(tzinfo=timezone.utc))
+        asc_sidereal = float(self.ascendant_longitudes(t, lat, lon, ayanamsa))
         rasi_num = self.get_rasi(asc_sidereal)
         nakshatra = self.get_nakshatra(asc_sidereal)
         
@@ -343,6 +378,21 @@ class VedicAstrology:
         
         return houses
     
+    def calculate_vargas(self, positions: Dict, ascendant: Dict, vargas) -> Dict:
+        """Divisional chart signs of the lagna and all grahas for the selected vargas"""
+        table = varga_table(chart_longitudes(positions, ascendant)[None, :], parse_vargas(vargas))
+        return format_vargas(table, self.RASI_NAMES)
+    
+    def calculate_ashtakavarga(self, positions: Dict, ascendant: Dict) -> Dict:
+        """Bhinna and Sarva Ashtakavarga bindus for each sign"""
+        return format_ashtakavarga(ashtakavarga(contributor_signs(positions, ascendant)))
+    
+    def calculate_shadbala(self, positions: Dict, ascendant: Dict, utc_dt: datetime,
+                           longitude: float) -> Dict:
+        """Shadbala of the seven grahas; day/night strength uses local mean time"""
+        local_hours = (utc_dt.hour + utc_dt.minute / 60 + utc_dt.second / 3600 + longitude / 15) % 24
+        return shadbala(positions, ascendant, local_hours, self.RASI_LORDS, self.PLANET_FRIENDS)
+    
     def calculate_vimshottari_dasha(self, birth_moon_longitude: float, birth_date: datetime) -> List[Dict]:
         """Calculate Vimshottari Dasha periods"""
         # Find birth nakshatra
@@ -979,22 +1029,119 @@ class VedicAstrology:
         return predictions
     
     def generate_birth_chart(self, birth_datetime: datetime, latitude: float, 
-                            longitude: float, timezone_str: str) -> Dict:
-        """Generate complete birth chart (Jathagam)"""
+                            longitude: float, timezone_str: str,
+                            ayanamsa: str = DEFAULT_AYANAMSA, node: str = DEFAULT_NODE,
+                            vargas: Optional[List[str]] = None,
+                            engine: str = DEFAULT_ENGINE,
+                            sections: Optional[Set[str]] = None) -> Dict:
+        """
+        Generate complete birth chart (Jathagam); divisional charts only when requested.
+        `sections` limits the chart to those top-level sections (see app.fields.required_sections).
+        """
+        vargas = parse_vargas(vargas)
+        if ayanamsa not in AYANAMSA_MODELS:
+            raise ValueError(f"Unknown ayanamsa '{ayanamsa}'. Choose from: {', '.join(AYANAMSA_MODELS)}")
+        if node not in NODE_TYPES:
+            raise ValueError(f"Unknown node type '{node}'. Choose from: {', '.join(NODE_TYPES)}")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Choose from: {', '.join(ENGINES)}")
+        
+        record_inputs(datetime=birth_datetime, latitude=latitude, longitude=longitude,
+                      timezone=timezone_str, ayanamsa=ayanamsa, node=node)
         
         # Convert to UTC
-        tz = pytz.timezone(timezone_str)
-        local_dt = tz.localize(birth_datetime)
-        utc_dt = local_dt.astimezone(pytz.UTC)
-        
-        # Calculate all components
-        positions = self.calculate_planetary_positions(utc_dt, latitude, longitude)
-        ascendant = self.calculate_ascendant(utc_dt, latitude, longitude)
-        houses = self.calculate_houses(ascendant['longitude'])
-        dashas = self.calculate_vimshottari_dasha(positions['Moon']['longitude'], birth_datetime)
-        yogas = self.calculate_yogas(positions, ascendant)
-        doshas = self.calculate_doshas(positions, ascendant)
-        predictions = self.generate_predictions(positions, ascendant, dashas, yogas, doshas)
+        with stage('timezone'):
+            utc_dt = timezone_resolver.localize(birth_datetime, timezone_str)
+        
+        chart = self._build_birth_chart(birth_datetime, utc_dt, latitude, longitude, timezone_str,
+                                        ayanamsa, node, engine, sections=sections)
+        if sections is None or 'ashtakavarga' in sections:
+            with stage('strength'):
+                chart['ashtakavarga'] = self.calculate_ashtakavarga(chart['planetary_positions'],
+                                                                    chart['ascendant'])
+        if vargas and (sections is None or 'vargas' in sections):
+            with stage('vargas'):
+                chart['vargas'] = self.calculate_vargas(chart['planetary_positions'],
+                                                        chart['ascendant'], vargas)
+        return chart
+    
+    def generate_birth_charts(self, birth_datetimes: List[datetime], latitudes: List[float],
+                              longitudes: List[float], timezones: List[str],
+                              ayanamsa: str = DEFAULT_AYANAMSA,
+                              node: str = DEFAULT_NODE,
+                              vargas: Optional[List[str]] = None,
+                              engine: str = DEFAULT_ENGINE) -> List[Dict]:
+        """
+        Generate many birth charts, converting all birth times to UTC in one pass
+        (and, with the analytic engine, computing all positions in one pass)
+        """
+        vargas = parse_vargas(vargas)
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Choose from: {', '.join(ENGINES)}")
+        utc_times = timezone_resolver.to_utc(birth_datetimes, timezones)
+        utc_dts = [utc_time.item().replace(tzinfo=pytz.UTC) for utc_time in utc_times]
+        
+        batch_positions = [None] * len(utc_dts)
+        if engine == 'analytic' and utc_dts:
+            with stage('planetary_positions'):
+                batch_positions = self.analytic_positions(self.ts.from_datetimes(utc_dts).tt, ayanamsa, node)
+        
+        charts = []
+        for birth_dt, utc_dt, lat, lon, tz, positions in zip(birth_datetimes, utc_dts, latitudes,
+                                                             longitudes, timezones, batch_positions):
+            charts.append(self._build_birth_chart(birth_dt, utc_dt, lat, lon, tz, ayanamsa, node,
+                                                  engine, positions))
+        
+        if charts:
+            # Ashtakavarga for the whole batch from one (charts, 8) sign matrix
+            table = ashtakavarga(np.stack([contributor_signs(c['planetary_positions'], c['ascendant'])
+                                           for c in charts]))
+            for row, chart in enumerate(charts):
+                chart['ashtakavarga'] = format_ashtakavarga(table, row)
+        
+        if vargas and charts:
+            # One varga pass over the whole (charts, bodies) longitude matrix
+            longitudes = np.stack([chart_longitudes(c['planetary_positions'], c['ascendant'])
+                                   for c in charts])
+            table = varga_table(longitudes, vargas)
+            for row, chart in enumerate(charts):
+                chart['vargas'] = format_vargas(table, self.RASI_NAMES, row)
+        return charts
+    
+    def _build_birth_chart(self, birth_datetime: datetime, utc_dt: datetime, latitude: float,
+                           longitude: float, timezone_str: str,
+                           ayanamsa: str = DEFAULT_AYANAMSA, node: str = DEFAULT_NODE,
+                           engine: str = DEFAULT_ENGINE, positions: Optional[Dict] = None,
+                           sections: Optional[Set[str]] = None) -> Dict:
+        """Assemble the chart (or only `sections` of it) for a birth whose UTC instant is already known"""
+        def wanted(name: str) -> bool:
+            return sections is None or name in sections
+        
+        ascendant = houses = dashas = yogas = doshas = strengths = predictions = None
+        
+        # Calculate the components
+        if positions is None and wanted('planetary_positions'):
+            with stage('planetary_positions'):
+                positions = self.calculate_planetary_positions(utc_dt, latitude, longitude, ayanamsa,
+                                                               node, engine)
+        if wanted('ascendant'):
+            with stage('ascendant'):
+                ascendant = self.calculate_ascendant(utc_dt, latitude, longitude, ayanamsa)
+                if wanted('houses'):
+                    houses = self.calculate_houses(ascendant['longitude'])
+        if wanted('vimshottari_dasha'):
+            with stage('dasha'):
+                dashas = self.calculate_vimshottari_dasha(positions['Moon']['longitude'], birth_datetime)
+        if wanted('yogas') or wanted('doshas'):
+            with stage('yogas_doshas'):
+                yogas = self.calculate_yogas(positions, ascendant) if wanted('yogas') else None
+                doshas = self.calculate_doshas(positions, ascendant) if wanted('doshas') else None
+        if wanted('shadbala'):
+            with stage('strength'):
+                strengths = self.calculate_shadbala(positions, ascendant, utc_dt, longitude)
+        if wanted('predictions'):
+            with stage('predictions'):
+                predictions = self.generate_predictions(positions, ascendant, dashas, yogas, doshas)
         
         # Organize chart data
         chart = {
@@ -1002,7 +1149,12 @@ class VedicAstrology:
                 'datetime': birth_datetime.isoformat(),
                 'timezone': timezone_str,
                 'latitude': latitude,
-                'longitude': longitude
+                'longitude': longitude,
+                'ayanamsa': ayanamsa,
+                'ayanamsa_degrees': self.calculate_ayanamsa(
+                    self.ts.from_datetime(utc_dt).tt, ayanamsa
+                ),
+                'node': node
             },
             'ascendant': ascendant,
             'planetary_positions': positions,
@@ -1010,9 +1162,17 @@ class VedicAstrology:
             'vimshottari_dasha': dashas,
             'yogas': yogas,
             'doshas': doshas,
+            'shadbala': strengths,
             'predictions': predictions,
             'chart_type': 'South Indian Style'
         }
+        if sections is not None:
+            chart = {name: value for name, value in chart.items() if name in sections}
+        if engine == 'analytic' and positions is not None:
+            # Grahas whose rasi, nakshatra or pada may differ from an exact chart
+            if 'birth_info' in chart:
+                chart['birth_info']['engine'] = engine
+            chart['boundary_risk'] = [name for name, p in positions.items() if p['boundary_risk']]
         
         return chart
 
@@ -0,0 +1,114 @@
+"""
+Ayanamsa Models
+Precession-based sidereal offsets served from precomputed interpolation tables
+"""
+
+import threading
+from typing import Dict, Union
+
+import numpy as np
+
+J2000 = 2451545.0
+J1900 = 2415020.0
+
+# Legacy linear approximation (the engine's original Lahiri formula)
+LAHIRI_AYANAMSA_2000 = 23.85  # degrees at J2000
+AYANAMSA_RATE = 0.01397  # degrees per year
+
+# Each precise model is fixed by its value at a reference epoch and then
+# carried forward by the IAU 2006 general precession in longitude.
+AYANAMSA_MODELS: Dict[str, Dict] = {
+    'lahiri_linear': {
+        'name': 'Lahiri (linear approximation)',
+        'description': 'Legacy 23.85° at J2000 plus 50.29"/year; the default for backward compatibility',
+    },
+    'lahiri': {
+        'name': 'Lahiri (Chitrapaksha)',
+        'description': 'Indian Calendar Reform Committee definition, 23°15\'00.658" on 1956-03-21',
+        'epoch_jd': 2435553.5,
+        # The Committee's 23°15'00.658" (23.250182778°) is a true ayanamsa, nutation included;
+        # less that day's nutation in longitude, 16.77" (0.004658035°), it is the mean value
+        # these models carry, as in the Swiss Ephemeris definition of Lahiri
+        'epoch_value': 23.250182778 - 0.004658035,
+    },
+    'raman': {
+        'name': 'B. V. Raman',
+        'description': 'Raman ayanamsa, 21°00\'52" at J1900',
+        'epoch_jd': J1900,
+        'epoch_value': 360 - 338.98556,
+    },
+    'kp': {
+        'name': 'Krishnamurti (KP)',
+        'description': 'Krishnamurti Paddhati ayanamsa, 22°21\'50" at J1900',
+        'epoch_jd': J1900,
+        'epoch_value': 360 - 337.636111,
+    },
+}
+
+DEFAULT_AYANAMSA = 'lahiri_linear'
+
+# Table coverage and resolution (Julian days TT)
+TABLE_START_JD = 2378496.5  # 1800-01-01
+TABLE_END_JD = 2524958.5    # 2201-01-01
+TABLE_STEP_DAYS = 1.0
+
+
+def general_precession(jd_tt: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """IAU 2006 general precession in longitude since J2000, in degrees"""
+    T = (np.asarray(jd_tt, dtype=float) - J2000) / 36525.0
+    arcsec = T * (5028.796195 + T * (1.1054348 + T * (0.00007964 + T * (-0.000023857 + T * -0.0000000383))))
+    return arcsec / 3600.0
+
+
+def precise_ayanamsa(jd_tt: Union[float, np.ndarray], model: str) -> Union[float, np.ndarray]:
+    """Evaluate a model directly from the precession series (no table)"""
+    if model == 'lahiri_linear':
+        years_from_2000 = (np.asarray(jd_tt, dtype=float) - J2000) / 365.25
+        return LAHIRI_AYANAMSA_2000 + AYANAMSA_RATE * years_from_2000
+    params = AYANAMSA_MODELS[model]
+    return params['epoch_value'] + general_precession(jd_tt) - general_precession(params['epoch_jd'])
+
+
+class AyanamsaTables:
+    """Dense per-model ayanamsa tables, built on first use and interpolated"""
+
+    def __init__(self, start_jd: float = TABLE_START_JD, end_jd: float = TABLE_END_JD,
+                 step_days: float = TABLE_STEP_DAYS):
+        self.start_jd = start_jd
+        self.end_jd = end_jd
+        self.step_days = step_days
+        self._tables: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def table(self, model: str) -> np.ndarray:
+        if model not in AYANAMSA_MODELS:
+            raise ValueError(f"Unknown ayanamsa '{model}'. Choose from: {', '.join(AYANAMSA_MODELS)}")
+        table = self._tables.get(model)
+        if table is None:
+            with self._lock:
+                table = self._tables.get(model)
+                if table is None:
+                    n = int(round((self.end_jd - self.start_jd) / self.step_days)) + 1
+                    grid = self.start_jd + self.step_days * np.arange(n)
+                    table = np.asarray(precise_ayanamsa(grid, model), dtype=float)
+                    self._tables[model] = table
+        return table
+
+    def value(self, jd_tt: Union[float, np.ndarray], model: str = DEFAULT_AYANAMSA) -> Union[float, np.ndarray]:
+        """Ayanamsa in degrees for one Julian day (TT) or an array of them"""
+        table = self.table(model)
+        jd = np.asarray(jd_tt, dtype=float)
+
+        pos = (jd - self.start_jd) / self.step_days
+        idx = np.clip(np.floor(pos).astype(np.int64), 0, len(table) - 2)
+        frac = pos - idx
+        result = table[idx] + (table[idx + 1] - table[idx]) * frac
+
+        outside = (jd < self.start_jd) | (jd > self.end_jd)
+        if np.any(outside):
+            result = np.where(outside, precise_ayanamsa(jd, model), result)
+
+        return float(result) if result.ndim == 0 else result
+
+
+ayanamsa_tables = AyanamsaTables()
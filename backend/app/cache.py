@@ -0,0 +1,403 @@
+"""
+Result Cache
+Two-tier cache for charts and porutham results: an in-process LRU in front of a
+shared backend (SQLite file or a Redis-protocol server) visible to every worker
+
+Configuration:
+    CHART_CACHE_SIZE   local LRU entries per worker (0 disables the local tier)
+    CHART_CACHE_URL    shared tier, e.g. sqlite:///var/cache/jathagam.db or redis://127.0.0.1:6379/0
+    CHART_CACHE_TTL    seconds a shared entry lives (default 30 days)
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from app.chart_store import decode_chart, encode_chart
+
+LOCAL_SIZE = int(os.environ.get('CHART_CACHE_SIZE', '1024'))
+SHARED_URL = os.environ.get('CHART_CACHE_URL')
+SHARED_TTL = float(os.environ.get('CHART_CACHE_TTL', str(30 * 86400)))
+
+# Bump when the engine's output changes so old entries are never served
+KEY_PREFIX = 'jathagam:v1:'
+
+# Stampede protection across workers: one worker computes under a short
+# lease while the others poll the shared tier for its result
+LOCK_SECONDS = 30.0
+WAIT_SECONDS = 10.0
+
+# Writes to the SQLite tier between deletions of expired rows
+PURGE_EVERY = 1000
+
+
+class CacheStats:
+    """Thread-safe counters for one tier"""
+
+    def __init__(self, *names: str):
+        self._counts = dict.fromkeys(names, 0)
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+class LocalCache:
+    """In-process LRU of encoded values"""
+
+    def __init__(self, max_entries: int = LOCAL_SIZE):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    Shared tier in a SQLite file; safe for several worker processes on one host.
+    Expired rows are deleted on open and every `purge_every` writes.
+    """
+
+    def __init__(self, path: str, purge_every: int = PURGE_EVERY):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                           'expires REAL NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)')
+        self._lock = threading.Lock()
+        self.purge_every = purge_every
+        self._writes = 0
+        self.purge()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM cache WHERE key = ? AND expires > ?',
+                                     (key, time.time())).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                               (key, sqlite3.Binary(value), time.time() + ttl))
+            self._count_write()
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Set only if absent or expired; True when this call set it"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires '
+                'WHERE cache.expires <= ?',
+                (key, sqlite3.Binary(value), now + ttl, now)
+            )
+            self._count_write()
+            return cursor.rowcount == 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def release(self, key: str, token: bytes) -> bool:
+        """Delete only if the stored value is still `token`; True when this call deleted it"""
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM cache WHERE key = ? AND value = ?',
+                                        (key, sqlite3.Binary(token)))
+            return cursor.rowcount == 1
+
+    def purge(self) -> int:
+        """Delete expired rows; returns how many"""
+        with self._lock:
+            return self._purge_locked()
+
+    def _purge_locked(self) -> int:
+        self._writes = 0
+        return self._conn.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),)).rowcount
+
+    def _count_write(self):
+        # Keys are unbounded birth inputs, so expired rows must not pile up
+        self._writes += 1
+        if self._writes >= self.purge_every:
+            self._purge_locked()
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+class RespBackend:
+    """
+    Shared tier on any server speaking the Redis protocol (RESP2). Uses only
+    GET, SET (NX/PX), DEL, SELECT and EVAL (lease release, with a GET then
+    DEL fallback for servers without scripting); one connection per thread.
+    """
+
+    # Delete the key only while it still holds this worker's lease token
+    RELEASE_SCRIPT = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 6379, db: int = 0, timeout: float = 1.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = (sock, sock.makefile('rb'))
+            self._local.conn = conn
+            if self.db:
+                self._command('SELECT', str(self.db))
+        return conn
+
+    def _command(self, *args) -> Any:
+        sock, reader = self._connection()
+        parts = [f'*{len(args)}\r\n'.encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        try:
+            sock.sendall(b''.join(parts))
+            return self._read_reply(reader)
+        except (OSError, ValueError):
+            self.close()
+            raise
+
+    def _read_reply(self, reader) -> Any:
+        line = reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('Connection closed by cache server')
+        kind, body = line[:1], line[1:-2]
+        if kind == b'+':
+            return body.decode()
+        if kind == b'-':
+            raise RespError(body.decode())
+        if kind == b':':
+            return int(body)
+        if kind == b'$':
+            length = int(body)
+            return None if length < 0 else reader.read(length + 2)[:-2]
+        if kind == b'*':
+            length = int(body)
+            return None if length < 0 else [self._read_reply(reader) for _ in range(length)]
+        raise ValueError(f'Unexpected reply {line!r}')
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command('GET', key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._command('SET', key, value, 'PX', int(ttl * 1000))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return self._command('SET', key, value, 'NX', 'PX', int(ttl * 1000)) == 'OK'
+
+    def delete(self, key: str):
+        self._command('DEL', key)
+
+    def release(self, key: str, token: bytes) -> bool:
+        try:
+            return self._command('EVAL', self.RELEASE_SCRIPT, 1, key, token) == 1
+        except RespError:
+            if self._command('GET', key) != token:
+                return False
+            return self._command('DEL', key) == 1
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            conn[1].close()
+            conn[0].close()
+
+
+def backend_from_url(url: str):
+    """sqlite:///path/to/file.db or redis://host:port/db"""
+    parsed = urlparse(url)
+    if parsed.scheme == 'sqlite':
+        return SQLiteBackend(parsed.netloc + parsed.path)
+    if parsed.scheme == 'redis':
+        db = int(parsed.path.lstrip('/') or 0)
+        return RespBackend(parsed.hostname or '127.0.0.1', parsed.port or 6379, db)
+    raise ValueError(f"Unsupported cache URL '{url}'. Use sqlite:///path or redis://host:port/db")
+
+
+class _Flight:
+    """A computation other threads of this worker are waiting on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Optional[bytes] = None
+
+
+class TwoTierCache:
+    """
+    Local LRU, then the shared backend, then compute. Concurrent misses for
+    one key compute once: threads of a worker wait on the first thread, and
+    workers wait on whoever holds the key's lease in the shared tier.
+    Shared-tier failures count as misses; the cache never fails a request.
+    """
+
+    def __init__(self, local: Optional[LocalCache] = None, shared=None, ttl: float = SHARED_TTL,
+                 lock_seconds: float = LOCK_SECONDS, wait_seconds: float = WAIT_SECONDS):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.local_stats = CacheStats('hits', 'misses')
+        self.shared_stats = CacheStats('hits', 'misses', 'sets', 'errors', 'lock_waits', 'lock_timeouts')
+        self.compute_stats = CacheStats('computes', 'coalesced')
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict],
+                       encode: Callable[[Dict], bytes] = encode_chart,
+                       decode: Callable[[bytes], Dict] = decode_chart) -> Dict:
+        key = KEY_PREFIX + key
+        value = self._lookup(key)
+        if value is not None:
+            return decode(value)
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            self.compute_stats.incr('coalesced')
+            flight.done.wait(self.lock_seconds)
+            if flight.value is not None:
+                return decode(flight.value)
+            return compute()
+
+        try:
+            result, flight.value = self._compute_shared(key, compute, encode)
+            return result if result is not None else decode(flight.value)
+        finally:
+            flight.done.set()
+            with self._flights_lock:
+                self._flights.pop(key, None)
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        if self.local is not None:
+            value = self.local.get(key)
+            self.local_stats.incr('hits' if value is not None else 'misses')
+            if value is not None:
+                return value
+        value = self._shared_call('get', key)
+        if self.shared is not None:
+            self.shared_stats.incr('hits' if value is not None else 'misses')
+        if value is not None and self.local is not None:
+            self.local.set(key, value)
+        return value
+
+    def _compute_shared(self, key: str, compute: Callable[[], Dict], encode):
+        """(computed result or None, encoded value), holding the shared lease when possible"""
+        lock_key = key + ':lock'
+        token = uuid.uuid4().hex.encode()
+        # An unreachable shared tier grants the lease rather than making everyone wait
+        leased = self.shared is None or self._shared_call('add', lock_key, token, self.lock_seconds, default=True)
+        if not leased:
+            self.shared_stats.incr('lock_waits')
+            value = self._wait_for(key)
+            if value is not None:
+                if self.local is not None:
+                    self.local.set(key, value)
+                return None, value
+            self.shared_stats.incr('lock_timeouts')
+
+        self.compute_stats.incr('computes')
+        try:
+            result = compute()
+            value = encode(result)
+            if self.local is not None:
+                self.local.set(key, value)
+            if self.shared is not None:
+                if self._shared_call('set', key, value, self.ttl, default=False) is not False:
+                    self.shared_stats.incr('sets')
+        finally:
+            # Release on failure too, so others stop waiting; never another worker's lease
+            if leased and self.shared is not None:
+                self._shared_call('release', lock_key, token)
+        return result, value
+
+    def _wait_for(self, key: str) -> Optional[bytes]:
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.02
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            value = self._shared_call('get', key)
+            if value is not None:
+                return value
+            delay = min(delay * 2, 0.25)
+        return None
+
+    def _shared_call(self, method: str, *args, default: Any = None):
+        """Call the shared backend, returning `default` when it fails"""
+        if self.shared is None:
+            return default
+        try:
+            return getattr(self.shared, method)(*args)
+        except (OSError, sqlite3.Error, RespError, ValueError):
+            self.shared_stats.incr('errors')
+            return default
+
+    def stats(self) -> Dict:
+        return {
+            'local': {**self.local_stats.snapshot(),
+                      'entries': len(self.local) if self.local is not None else 0,
+                      'max_entries': self.local.max_entries if self.local is not None else 0},
+            'shared': {**self.shared_stats.snapshot(),
+                       'backend': type(self.shared).__name__ if self.shared is not None else None},
+            **self.compute_stats.snapshot(),
+        }
+
+
+_cache: Optional[TwoTierCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> TwoTierCache:
+    """Shared cache configured from CHART_CACHE_SIZE / CHART_CACHE_URL"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TwoTierCache(
+                    LocalCache(LOCAL_SIZE) if LOCAL_SIZE > 0 else None,
+                    backend_from_url(SHARED_URL) if SHARED_URL else None
+                )
+    return _cache
@@ -0,0 +1,257 @@
+"""
+Chart Store
+Optional SQLite persistence of computed charts under a content hash of the birth input,
+with indexed attributes for analytics and matchmaking queries
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Disabled unless a database path is configured
+STORE_PATH = os.environ.get('CHART_STORE_PATH')
+
+# Pending writes are committed together once this many accumulate or the
+# oldest has waited FLUSH_SECONDS
+BATCH_SIZE = 256
+FLUSH_SECONDS = 1.0
+
+# First byte of every stored blob: 1 = zlib-compressed compact JSON
+ENCODING_VERSION = 1
+
+# Indexed dosha flags, matched on the engine's dosha names
+DOSHA_FLAGS = {
+    'mangal_dosha': 'Mangal Dosha',
+    'kala_sarpa_dosha': 'Kala Sarpa Dosha',
+    'pitra_dosha': 'Pitra Dosha',
+}
+
+# Columns that can be filtered and grouped on
+INDEXED_COLUMNS = ('lagna_rasi', 'moon_rasi', 'moon_nakshatra', 'moon_pada',
+                   'first_dasha_lord') + tuple(DOSHA_FLAGS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS charts (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    birth_datetime TEXT NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    timezone TEXT NOT NULL,
+    ayanamsa TEXT NOT NULL,
+    node TEXT NOT NULL,
+    lagna_rasi INTEGER NOT NULL,
+    moon_rasi INTEGER NOT NULL,
+    moon_nakshatra INTEGER NOT NULL,
+    moon_pada INTEGER NOT NULL,
+    first_dasha_lord TEXT NOT NULL,
+    {', '.join(f'{flag} INTEGER NOT NULL' for flag in DOSHA_FLAGS)},
+    chart BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_charts_lagna ON charts (lagna_rasi);
+CREATE INDEX IF NOT EXISTS idx_charts_moon ON charts (moon_rasi);
+CREATE INDEX IF NOT EXISTS idx_charts_nakshatra ON charts (moon_nakshatra, moon_pada);
+CREATE INDEX IF NOT EXISTS idx_charts_dasha ON charts (first_dasha_lord);
+{''.join(f'CREATE INDEX IF NOT EXISTS idx_charts_{flag} ON charts ({flag}) WHERE {flag} = 1;' for flag in DOSHA_FLAGS)}
+"""
+
+ROW_COLUMNS = ('id', 'created_at', 'birth_datetime', 'latitude', 'longitude', 'timezone', 'ayanamsa',
+               'node') + INDEXED_COLUMNS + ('chart',)
+
+
+def normalized_input(date: str, time_str: str, latitude: float, longitude: float,
+                     timezone_str: str, ayanamsa: str, node: str) -> Dict:
+    """Birth input in canonical form; coordinates to 4 decimals (about 11 m)"""
+    return {
+        'datetime': f"{date}T{time_str}",
+        'latitude': round(float(latitude), 4),
+        'longitude': round(float(longitude), 4),
+        'timezone': timezone_str,
+        'ayanamsa': ayanamsa,
+        'node': node,
+    }
+
+
+def chart_id(birth_input: Dict) -> str:
+    """Content hash of a normalized birth input"""
+    canonical = json.dumps(birth_input, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+def encode_chart(chart: Dict) -> bytes:
+    body = json.dumps(chart, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return bytes([ENCODING_VERSION]) + zlib.compress(body, 6)
+
+
+def decode_chart(blob: bytes) -> Dict:
+    if blob[0] != ENCODING_VERSION:
+        raise ValueError(f"Unknown chart encoding {blob[0]}")
+    chart = json.loads(zlib.decompress(blob[1:]))
+    # JSON object keys are strings; house numbers are ints in the engine's charts
+    if 'houses' in chart:
+        chart['houses'] = {int(k): v for k, v in chart['houses'].items()}
+    return chart
+
+
+def chart_attributes(chart: Dict) -> Dict:
+    """Indexed column values of a chart"""
+    moon = chart['planetary_positions']['Moon']
+    dosha_names = [d['name'] for d in chart.get('doshas', [])]
+    attributes = {
+        'lagna_rasi': chart['ascendant']['rasi'],
+        'moon_rasi': moon['rasi'],
+        'moon_nakshatra': moon['nakshatra_id'],
+        'moon_pada': moon['pada'],
+        'first_dasha_lord': chart['vimshottari_dasha'][0]['planet'],
+    }
+    for flag, name in DOSHA_FLAGS.items():
+        attributes[flag] = int(any(d.startswith(name) for d in dosha_names))
+    return attributes
+
+
+class ChartStore:
+    """
+    Charts keyed by input hash in one SQLite table. Writes are buffered and
+    committed in batches; reads see buffered charts immediately.
+    Per-request options such as vargas are not stored.
+    """
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE, flush_seconds: float = FLUSH_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._pending: Dict[str, Tuple] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.close)
+
+    def put(self, birth_input: Dict, chart: Dict) -> str:
+        """Queue a chart for writing; returns its id"""
+        return self.put_many([(birth_input, chart)])[0]
+
+    def put_many(self, items: Iterable[Tuple[Dict, Dict]]) -> List[str]:
+        ids = []
+        rows = []
+        now = time.time()
+        for birth_input, chart in items:
+            stored = {k: v for k, v in chart.items() if k not in ('vargas', 'person')}
+            attributes = chart_attributes(stored)
+            cid = chart_id(birth_input)
+            ids.append(cid)
+            rows.append((cid, now, birth_input['datetime'], birth_input['latitude'], birth_input['longitude'],
+                         birth_input['timezone'], birth_input['ayanamsa'], birth_input['node'])
+                        + tuple(attributes[c] for c in INDEXED_COLUMNS)
+                        + (sqlite3.Binary(encode_chart(stored)),))
+
+        with self._lock:
+            for row in rows:
+                self._pending[row[0]] = row
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+            elif self._pending and self._timer is None:
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return ids
+
+    def flush(self):
+        """Commit all buffered charts in one transaction"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        placeholders = ', '.join('?' * len(ROW_COLUMNS))
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO charts ({', '.join(ROW_COLUMNS)}) VALUES ({placeholders})",
+                list(self._pending.values())
+            )
+        self._pending.clear()
+
+    def get(self, cid: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._pending.get(cid)
+            blob = row[-1] if row is not None else None
+            if blob is None:
+                found = self._conn.execute('SELECT chart FROM charts WHERE id = ?', (cid,)).fetchone()
+                blob = found[0] if found else None
+        return decode_chart(bytes(blob)) if blob is not None else None
+
+    def _where(self, filters: Dict) -> Tuple[str, List]:
+        unknown = set(filters) - set(INDEXED_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown chart attribute(s): {', '.join(sorted(unknown))}. "
+                             f"Choose from: {', '.join(INDEXED_COLUMNS)}")
+        clauses = [(f'{column} = ?', int(value) if isinstance(value, bool) else value)
+                   for column, value in filters.items() if value is not None]
+        where = ' AND '.join(c for c, _ in clauses)
+        return (f' WHERE {where}' if where else ''), [v for _, v in clauses]
+
+    def query(self, limit: int = 100, offset: int = 0, **filters) -> List[Dict]:
+        """Ids and indexed attributes of matching charts, without decoding them"""
+        self.flush()
+        where, params = self._where(filters)
+        columns = ('id', 'birth_datetime') + INDEXED_COLUMNS
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(columns)} FROM charts{where} ORDER BY id LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def count(self, **filters) -> int:
+        self.flush()
+        where, params = self._where(filters)
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM charts{where}', params).fetchone()[0]
+
+    def distribution(self, column: str, **filters) -> Dict:
+        """Chart counts per value of one indexed attribute"""
+        if column not in INDEXED_COLUMNS:
+            raise ValueError(f"Unknown chart attribute '{column}'. Choose from: {', '.join(INDEXED_COLUMNS)}")
+        self.flush()
+        where, params = self._where(filters)
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT {column}, COUNT(*) FROM charts{where} GROUP BY {column} ORDER BY {column}', params
+            ).fetchall()
+        return {value: n for value, n in rows}
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self._flush_locked()
+            self._conn.close()
+            self._conn = None
+
+
+_store: Optional[ChartStore] = None
+_store_lock = threading.Lock()
+
+
+def get_chart_store() -> Optional[ChartStore]:
+    """Shared store at CHART_STORE_PATH, or None when persistence is not configured"""
+    global _store
+    if _store is None and STORE_PATH:
+        with _store_lock:
+            if _store is None:
+                _store = ChartStore(STORE_PATH)
+    return _store
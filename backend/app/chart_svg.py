@@ -0,0 +1,192 @@
+"""
+Chart SVG
+South and North Indian rasi / varga charts as SVG. The frame, grid and fixed
+labels of each style and language are rendered once into a template; a chart
+only adds its placements (and, for North Indian charts, the house rasis).
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from app.vargas import VARGAS
+
+# Bump when the drawing changes, so cached SVGs and ETags are not reused
+SVG_VERSION = 1
+
+STYLES = ('south', 'north')
+LANGUAGES = ('ta', 'en')
+DEFAULT_STYLE = 'south'
+DEFAULT_LANGUAGE = 'ta'
+CHART_VARGAS = ('D1',) + tuple(VARGAS)
+
+SIZE = 400
+GRAHAS = ('Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Rahu', 'Ketu')
+LAGNA = 'Ascendant'
+
+LABELS = {
+    'ta': {'Sun': 'சூ', 'Moon': 'சந்', 'Mars': 'செ', 'Mercury': 'பு', 'Jupiter': 'கு', 'Venus': 'சு',
+           'Saturn': 'சனி', 'Rahu': 'ரா', 'Ketu': 'கே', LAGNA: 'ல'},
+    'en': {'Sun': 'Su', 'Moon': 'Mo', 'Mars': 'Ma', 'Mercury': 'Me', 'Jupiter': 'Ju', 'Venus': 'Ve',
+           'Saturn': 'Sa', 'Rahu': 'Ra', 'Ketu': 'Ke', LAGNA: 'Asc'},
+}
+RETROGRADE_MARK = {'ta': '(வ)', 'en': '(R)'}
+RASI_LABELS = {
+    'ta': ('மேஷம்', 'ரிஷபம்', 'மிதுனம்', 'கடகம்', 'சிம்மம்', 'கன்னி', 'துலாம்', 'விருச்சிகம்', 'தனுசு', 'மகரம்',
+           'கும்பம்', 'மீனம்'),
+    'en': ('Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo', 'Libra', 'Scorpio', 'Sagittarius',
+           'Capricorn', 'Aquarius', 'Pisces'),
+}
+CHART_TITLES = {'ta': {'D1': 'ராசி'}, 'en': {'D1': 'Rasi'}}
+for _key, _varga in VARGAS.items():
+    CHART_TITLES['ta'][_key] = _varga['tamil']
+    CHART_TITLES['en'][_key] = _varga['name']
+
+# South Indian: fixed rasi cells on a 4x4 grid, Pisces top left, running clockwise
+SOUTH_CELLS = {12: (0, 0), 1: (1, 0), 2: (2, 0), 3: (3, 0), 4: (3, 1), 5: (3, 2),
+               6: (3, 3), 7: (2, 3), 8: (1, 3), 9: (0, 3), 10: (0, 2), 11: (0, 1)}
+
+# North Indian: fixed houses (lagna at the top), each with the anchor of its
+# placements, the position of its rasi number and the labels that fit in a row
+NORTH_HOUSES = {
+    1: ((200, 95), (200, 180), 3), 2: ((100, 35), (100, 82), 3), 3: ((35, 100), (82, 104), 2),
+    4: ((95, 200), (180, 204), 3), 5: ((35, 300), (82, 304), 2), 6: ((100, 368), (100, 326), 3),
+    7: ((200, 305), (200, 228), 3), 8: ((300, 368), (300, 326), 3), 9: ((365, 300), (318, 304), 2),
+    10: ((305, 200), (220, 204), 3), 11: ((365, 100), (318, 104), 2), 12: ((300, 35), (300, 82), 3),
+}
+
+MAX_PLACEMENTS = len(GRAHAS) + 1
+LINE_HEIGHT = 15
+LABEL_SPACING = {'south': 30, 'north': 28}
+
+STYLE_SHEET = (
+    'text{font-family:"Noto Sans Tamil","Latha",sans-serif;text-anchor:middle}'
+    '.g{font-size:12px;fill:#1a237e}.l{font-size:12px;fill:#c62828;font-weight:bold}'
+    '.v{font-size:8px}.n{font-size:9px;fill:#888}.t{font-size:16px;fill:#333;font-weight:bold}'
+    '.c{font-size:11px;fill:#555}'
+)
+
+
+def _slots(anchor: Tuple[float, float], per_row: int, spacing: int) -> List[List[Tuple[float, float]]]:
+    """Text positions around an anchor for 1..MAX_PLACEMENTS labels, centred in rows"""
+    cx, cy = anchor
+    layouts = [[]]
+    for count in range(1, MAX_PLACEMENTS + 1):
+        width = max(per_row, math.ceil(count / 4))
+        rows = math.ceil(count / width)
+        positions = []
+        for row in range(rows):
+            in_row = min(width, count - row * width)
+            y = cy + (row - (rows - 1) / 2) * LINE_HEIGHT + 4
+            positions.extend((cx + (i - (in_row - 1) / 2) * spacing, y) for i in range(in_row))
+        layouts.append(positions)
+    return layouts
+
+
+def _south_grid(lang: str) -> str:
+    cell = SIZE // 4
+    parts = [f'<rect x="0" y="0" width="{SIZE}" height="{SIZE}" fill="#fffdf7" stroke="#333" stroke-width="2"/>']
+    for rasi, (col, row) in SOUTH_CELLS.items():
+        parts.append(f'<rect x="{col * cell}" y="{row * cell}" width="{cell}" height="{cell}" '
+                     'fill="none" stroke="#666"/>')
+        parts.append(f'<text class="n" x="{col * cell + cell // 2}" y="{row * cell + 12}">'
+                     f'{escape(RASI_LABELS[lang][rasi - 1])}</text>')
+    return ''.join(parts)
+
+
+def _north_grid(lang: str) -> str:
+    half = SIZE // 2
+    return (
+        f'<rect x="0" y="0" width="{SIZE}" height="{SIZE}" fill="#fffdf7" stroke="#333" stroke-width="2"/>'
+        f'<path d="M0 0L{SIZE} {SIZE}M{SIZE} 0L0 {SIZE}M{half} 0L{SIZE} {half}L{half} {SIZE}L0 {half}Z" '
+        'fill="none" stroke="#666"/>'
+    )
+
+
+def _compile_templates() -> Dict[Tuple[str, str], str]:
+    """Opening of each style and language's SVG, up to and including the grid"""
+    templates = {}
+    for style in STYLES:
+        for lang in LANGUAGES:
+            grid = (_south_grid if style == 'south' else _north_grid)(lang)
+            templates[(style, lang)] = (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {SIZE} {SIZE}" '
+                                        f'width="{SIZE}" height="{SIZE}"><style>{STYLE_SHEET}</style>{grid}')
+    return templates
+
+
+# Built once at import: the static part of every chart and the label positions of every cell
+TEMPLATES = _compile_templates()
+SOUTH_SLOTS = {
+    rasi: _slots(((col + 0.5) * SIZE / 4, (row + 0.5) * SIZE / 4 + 6), 2, LABEL_SPACING['south'])
+    for rasi, (col, row) in SOUTH_CELLS.items()
+}
+NORTH_SLOTS = {house: _slots(anchor, per_row, LABEL_SPACING['north'])
+               for house, (anchor, _, per_row) in NORTH_HOUSES.items()}
+
+
+def chart_placements(chart: Dict, varga: str = 'D1') -> Tuple[int, Dict[int, List[Tuple[str, bool]]]]:
+    """
+    Lagna rasi and the bodies in each rasi (lagna first, then grahas in their
+    usual order) with their retrograde flag; varga placements from chart['vargas']
+    """
+    if varga not in CHART_VARGAS:
+        raise ValueError(f"Unknown chart '{varga}'. Choose from: {', '.join(CHART_VARGAS)}")
+    if varga == 'D1':
+        lagna = chart['ascendant']['rasi']
+        signs = {name: chart['planetary_positions'][name]['rasi'] for name in GRAHAS}
+    else:
+        positions = chart['vargas'][varga]['positions']
+        lagna = positions[LAGNA]['rasi']
+        signs = {name: positions[name]['rasi'] for name in GRAHAS}
+
+    placements: Dict[int, List[Tuple[str, bool]]] = {rasi: [] for rasi in range(1, 13)}
+    placements[lagna].append((LAGNA, False))
+    for name in GRAHAS:
+        # Rahu and Ketu always move backwards; only mark the true planets
+        retrograde = (varga == 'D1' and name not in ('Rahu', 'Ketu')
+                      and bool(chart['planetary_positions'][name]['is_retrograde']))
+        placements[signs[name]].append((name, retrograde))
+    return lagna, placements
+
+
+def _labels(bodies: Sequence[Tuple[str, bool]], slots: List[List[Tuple[float, float]]], lang: str) -> str:
+    parts = []
+    for (name, retrograde), (x, y) in zip(bodies, slots[len(bodies)]):
+        mark = f'<tspan class="v">{RETROGRADE_MARK[lang]}</tspan>' if retrograde else ''
+        parts.append(f'<text class="{"l" if name == LAGNA else "g"}" x="{x:g}" y="{y:g}">'
+                     f'{LABELS[lang][name]}{mark}</text>')
+    return ''.join(parts)
+
+
+def render_chart_svg(chart: Dict, varga: str = 'D1', style: str = DEFAULT_STYLE, lang: str = DEFAULT_LANGUAGE,
+                     caption: Optional[Sequence[str]] = None) -> str:
+    """
+    SVG of one chart. `caption` lines (e.g. birth date and time) go under the
+    title in the centre of South Indian charts; North Indian charts have no
+    centre, so they only carry the title as the SVG <title>.
+    """
+    if style not in STYLES:
+        raise ValueError(f"Unknown chart style '{style}'. Choose from: {', '.join(STYLES)}")
+    if lang not in LANGUAGES:
+        raise ValueError(f"Unknown language '{lang}'. Choose from: {', '.join(LANGUAGES)}")
+    lagna, placements = chart_placements(chart, varga)
+    title = CHART_TITLES[lang][varga]
+    caption = list(caption or ())
+    parts = [TEMPLATES[(style, lang)], f'<title>{escape(" ".join([title] + caption))}</title>']
+
+    if style == 'south':
+        for rasi, bodies in placements.items():
+            if bodies:
+                parts.append(_labels(bodies, SOUTH_SLOTS[rasi], lang))
+        parts.append(f'<text class="t" x="{SIZE // 2}" y="{SIZE // 2 - 8 * len(caption)}">{escape(title)}</text>')
+        for i, line in enumerate(caption):
+            parts.append(f'<text class="c" x="{SIZE // 2}" y="{SIZE // 2 + 18 * (i + 1) - 8 * len(caption)}">'
+                         f'{escape(line)}</text>')
+    else:
+        for house, (_, (nx, ny), _) in NORTH_HOUSES.items():
+            rasi = (lagna + house - 2) % 12 + 1
+            parts.append(f'<text class="n" x="{nx}" y="{ny}">{rasi}</text>')
+            if placements[rasi]:
+                parts.append(_labels(placements[rasi], NORTH_SLOTS[house], lang))
+    parts.append('</svg>')
+    return ''.join(parts)
@@ -0,0 +1,53 @@
+"""
+Request Coalescing
+Single-flight for the API's blocking computations: the first request for a key
+runs the computation in a worker thread, and identical requests arriving while
+it runs await the same result instead of starting (or blocking a thread on)
+their own
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Tuple
+
+from app.admission import hand_back_slot
+from app.cache import CacheStats
+from app.profiling import record_inputs
+
+
+class SingleFlight:
+    """
+    In-flight computations of this worker by key. Waiters are shielded from
+    each other: a client that disconnects cancels only its own wait, never
+    the computation the others share. Exceptions reach every waiter.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+        self.stats_counters = CacheStats('executions', 'coalesced', 'errors')
+
+    async def run(self, key: str, fn: Callable[..., Any], *args) -> Any:
+        """fn(*args) in a thread, shared with concurrent calls for the same key"""
+        flight_key = (asyncio.get_running_loop(), key)
+        flight = self._flights.get(flight_key)
+        if flight is None:
+            self.stats_counters.incr('executions')
+            flight = self._flights[flight_key] = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+            flight.add_done_callback(lambda done: self._finish(flight_key, done))
+        else:
+            self.stats_counters.incr('coalesced')
+            record_inputs(coalesced=key)
+            # Waiting costs nothing, so free the admission slot for other work
+            hand_back_slot()
+        return await asyncio.shield(flight)
+
+    def _finish(self, flight_key, flight: asyncio.Future):
+        self._flights.pop(flight_key, None)
+        # Retrieve the exception even when every waiter went away
+        if not flight.cancelled() and flight.exception() is not None:
+            self.stats_counters.incr('errors')
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> Dict:
+        return {**self.stats_counters.snapshot(), 'in_flight': self.in_flight()}
@@ -0,0 +1,242 @@
+"""
+Compact Chart Encoding
+Columnar form of a chart for binary responses: grahas, rasis and nakshatras
+become small integer codes, longitudes packed float64 arrays, and the names
+behind the codes live in a versioned lookup table clients fetch once
+"""
+
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.vargas import VARGA_BODIES, VARGAS
+
+# Bump whenever a code's meaning changes; clients re-fetch the table when the
+# version in a payload differs from the one they hold
+CODES_VERSION = 1
+
+# Graha codes are indexes into this tuple
+GRAHA_CODES = ('Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Rahu', 'Ketu')
+NODES = ('Rahu', 'Ketu')
+
+# Dasha dates are sent as days since this date
+DATE_EPOCH = date(1970, 1, 1)
+
+POSITION_KEYS = ('longitude', 'rasi', 'rasi_name', 'degrees_in_rasi', 'nakshatra', 'nakshatra_tamil',
+                 'nakshatra_lord', 'pada', 'nakshatra_id', 'is_retrograde', 'boundary_risk')
+
+
+def code_table(engine) -> Dict:
+    """Lookup table behind the codes: rasi and nakshatra codes are their 1-based numbers"""
+    graha_code = {name: code for code, name in enumerate(GRAHA_CODES)}
+    return {
+        'version': CODES_VERSION,
+        'grahas': [{'en': name, 'ta': engine.GRAHA_NAMES_TAMIL[name]} for name in GRAHA_CODES],
+        'rasis': [{**engine.RASI_NAMES[number], 'lord': graha_code[engine.RASI_LORDS[number]]}
+                  for number in range(1, 13)],
+        'nakshatras': [{'en': n['name'], 'ta': n['tamil'], 'lord': graha_code[n['lord']]}
+                       for n in engine.NAKSHATRAS],
+        'vargas': {key: {'name': varga['name'], 'tamil': varga['tamil']} for key, varga in VARGAS.items()},
+        'varga_bodies': list(VARGA_BODIES),
+        'date_epoch': DATE_EPOCH.isoformat(),
+    }
+
+
+def _floats(values) -> bytes:
+    return np.asarray(values, dtype='<f8').tobytes()
+
+
+def _codes(values) -> bytes:
+    return np.asarray(values, dtype=np.uint8).tobytes()
+
+
+def _read_floats(data: bytes) -> List[float]:
+    return np.frombuffer(data, dtype='<f8').tolist()
+
+
+def _read_codes(data: bytes) -> List[int]:
+    return np.frombuffer(data, dtype=np.uint8).tolist()
+
+
+class _Codes:
+    """Code lookups in both directions for one table"""
+
+    def __init__(self, table: Dict):
+        self.table = table
+        self.graha = {g['en']: code for code, g in enumerate(table['grahas'])}
+        self.nakshatra = {n['en']: code for code, n in enumerate(table['nakshatras'], 1)}
+
+    def rasi_name(self, rasi: int) -> Dict:
+        return {'en': self.table['rasis'][rasi - 1]['en'], 'ta': self.table['rasis'][rasi - 1]['ta']}
+
+    def rasi_lord(self, rasi: int) -> str:
+        return self.table['grahas'][self.table['rasis'][rasi - 1]['lord']]['en']
+
+    def graha_name(self, code: int) -> str:
+        return self.table['grahas'][code]['en']
+
+    def nakshatra_fields(self, code: int) -> Dict:
+        nakshatra = self.table['nakshatras'][code - 1]
+        return {'nakshatra': nakshatra['en'], 'nakshatra_tamil': nakshatra['ta'],
+                'nakshatra_lord': self.graha_name(nakshatra['lord'])}
+
+
+def _compact_positions(positions: Dict, codes: _Codes) -> Dict:
+    entries = list(positions.values())
+    section = {
+        'graha': _codes([codes.graha[name] for name in positions]),
+        'longitude': _floats([p['longitude'] for p in entries]),
+        'rasi': _codes([p['rasi'] for p in entries]),
+        'nakshatra': _codes([codes.nakshatra[p['nakshatra']] for p in entries]),
+        'pada': _codes([p['pada'] for p in entries]),
+        'retrograde': _codes([p['is_retrograde'] for p in entries]),
+    }
+    if 'boundary_risk' in entries[0]:
+        section['boundary_risk'] = _codes([p['boundary_risk'] for p in entries])
+    return section
+
+
+def _expand_positions(section: Dict, codes: _Codes) -> Dict:
+    risks = _read_codes(section['boundary_risk']) if 'boundary_risk' in section else None
+    positions = {}
+    columns = zip(_read_codes(section['graha']), _read_floats(section['longitude']), _read_codes(section['rasi']),
+                  _read_codes(section['nakshatra']), _read_codes(section['pada']),
+                  _read_codes(section['retrograde']))
+    for row, (graha, longitude, rasi, nakshatra, pada, retrograde) in enumerate(columns):
+        name = codes.graha_name(graha)
+        entry = {
+            'longitude': longitude,
+            'rasi': rasi,
+            'rasi_name': codes.rasi_name(rasi),
+            'degrees_in_rasi': longitude % 30,
+            **codes.nakshatra_fields(nakshatra),
+            'pada': pada,
+        }
+        # Same layout as VedicAstrology.position_entry: nodes carry no nakshatra_id
+        if name not in NODES:
+            entry['nakshatra_id'] = nakshatra
+        entry['is_retrograde'] = bool(retrograde)
+        if risks is not None:
+            entry['boundary_risk'] = bool(risks[row])
+        positions[name] = entry
+    return positions
+
+
+def _compact_ascendant(ascendant: Dict, codes: _Codes) -> Dict:
+    return {'longitude': ascendant['longitude'], 'rasi': ascendant['rasi'],
+            'nakshatra': codes.nakshatra[ascendant['nakshatra']]}
+
+
+def _expand_ascendant(section: Dict, codes: _Codes) -> Dict:
+    nakshatra = codes.nakshatra_fields(section['nakshatra'])
+    return {
+        'longitude': section['longitude'],
+        'rasi': section['rasi'],
+        'rasi_name': codes.rasi_name(section['rasi']),
+        'degrees_in_rasi': section['longitude'] % 30,
+        'nakshatra': nakshatra['nakshatra'],
+        'nakshatra_tamil': nakshatra['nakshatra_tamil'],
+        'lord': codes.rasi_lord(section['rasi']),
+    }
+
+
+def _compact_houses(houses: Dict, codes: _Codes) -> Dict:
+    ordered = [houses[number] for number in sorted(houses)]
+    return {'cusp_longitude': _floats([h['cusp_longitude'] for h in ordered]),
+            'rasi': _codes([h['rasi'] for h in ordered])}
+
+
+def _expand_houses(section: Dict, codes: _Codes) -> Dict:
+    houses = {}
+    columns = zip(_read_floats(section['cusp_longitude']), _read_codes(section['rasi']))
+    for number, (cusp, rasi) in enumerate(columns, 1):
+        houses[number] = {'house_number': number, 'cusp_longitude': cusp, 'rasi': rasi,
+                          'rasi_name': codes.rasi_name(rasi), 'lord': codes.rasi_lord(rasi)}
+    return houses
+
+
+def _compact_dashas(dashas: List[Dict], codes: _Codes) -> Dict:
+    # Each period ends where the next begins, so n + 1 dates describe n periods
+    boundaries = [d['start_date'] for d in dashas] + [dashas[-1]['end_date']]
+    days = [(date.fromisoformat(d) - DATE_EPOCH).days for d in boundaries]
+    return {'graha': _codes([codes.graha[d['planet']] for d in dashas]),
+            'boundaries': np.asarray(days, dtype='<i4').tobytes(),
+            'years': _floats([d['years'] for d in dashas])}
+
+
+def _expand_dashas(section: Dict, codes: _Codes) -> List[Dict]:
+    days = np.frombuffer(section['boundaries'], dtype='<i4').tolist()
+    dates = [(DATE_EPOCH + timedelta(days=d)).isoformat() for d in days]
+    dashas = []
+    for i, (graha, years) in enumerate(zip(_read_codes(section['graha']), _read_floats(section['years']))):
+        dashas.append({'planet': codes.graha_name(graha), 'planet_tamil': codes.table['grahas'][graha]['ta'],
+                       'start_date': dates[i], 'end_date': dates[i + 1], 'years': years})
+    return dashas
+
+
+def _compact_vargas(vargas: Dict, codes: _Codes) -> Dict:
+    bodies = codes.table['varga_bodies']
+    return {key: _codes([varga['positions'][body]['rasi'] for body in bodies]) for key, varga in vargas.items()}
+
+
+def _expand_vargas(section: Dict, codes: _Codes) -> Dict:
+    vargas = {}
+    for key, signs in section.items():
+        vargas[key] = {
+            **codes.table['vargas'][key],
+            'positions': {body: {'rasi': rasi, 'rasi_name': codes.rasi_name(rasi)}
+                          for body, rasi in zip(codes.table['varga_bodies'], _read_codes(signs))}
+        }
+    return vargas
+
+
+# Sections with a columnar form: (compact, expand)
+SECTIONS: Dict[str, tuple] = {
+    'planetary_positions': (_compact_positions, _expand_positions),
+    'ascendant': (_compact_ascendant, _expand_ascendant),
+    'houses': (_compact_houses, _expand_houses),
+    'vimshottari_dasha': (_compact_dashas, _expand_dashas),
+    'vargas': (_compact_vargas, _expand_vargas),
+}
+
+
+def _try_compact(value: Any, compact: Callable, expand: Callable, codes: _Codes) -> Optional[Any]:
+    """Columnar form of a section, or None when it would not expand back to the same value"""
+    try:
+        section = compact(value, codes)
+        return section if expand(section, codes) == value else None
+    except (KeyError, TypeError, ValueError, AttributeError, IndexError):
+        return None
+
+
+def compact_chart(chart: Dict, table: Dict) -> Dict:
+    """
+    The chart with every section that has a columnar form replaced by it, plus
+    a 'codes' entry naming the table version and the replaced sections.
+    Sections that would not expand back exactly (e.g. sparse fieldsets that
+    select part of a graha) are kept as they are.
+    """
+    codes = _Codes(table)
+    result = dict(chart)
+    replaced = []
+    for name, (compact, expand) in SECTIONS.items():
+        if name in chart:
+            section = _try_compact(chart[name], compact, expand, codes)
+            if section is not None:
+                result[name] = section
+                replaced.append(name)
+    result['codes'] = {'version': table['version'], 'sections': replaced}
+    return result
+
+
+def expand_chart(payload: Dict, table: Dict) -> Dict:
+    """The chart a compact payload was made from"""
+    version = payload['codes']['version']
+    if version != table['version']:
+        raise ValueError(f"Chart uses codes version {version}, but the lookup table is version {table['version']}")
+    codes = _Codes(table)
+    chart = {k: v for k, v in payload.items() if k != 'codes'}
+    for name in payload['codes']['sections']:
+        chart[name] = SECTIONS[name][1](payload[name], codes)
+    return chart
@@ -0,0 +1,273 @@
+"""
+Daily Horoscope
+Gochara and tara bala forecasts materialized once per day for every Moon rasi and nakshatra
+
+Usage:
+    DAILY_HOROSCOPE_DIR=/var/cache/jathagam python -m app.daily_horoscope --days 3
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.ayanamsa import DEFAULT_AYANAMSA
+from app.timezones import timezone_resolver
+
+# Forecasts describe the sky at 06:00 Indian time, the start of the Tamil day
+FORECAST_TIMEZONE = 'Asia/Kolkata'
+FORECAST_HOUR = 6
+
+# Where materialized days are persisted; in-memory only when unset
+STORE_DIR = os.environ.get('DAILY_HOROSCOPE_DIR')
+
+# Days around today the API serves; the CLI can materialize any day
+FORECAST_PAST_DAYS = 31
+FORECAST_AHEAD_DAYS = 31
+
+# Favourable houses of each transiting graha counted from the natal Moon rasi
+GOCHARA_FAVOURABLE = {
+    'Sun': (3, 6, 10, 11),
+    'Moon': (1, 3, 6, 7, 10, 11),
+    'Mars': (3, 6, 11),
+    'Mercury': (2, 4, 6, 8, 10, 11),
+    'Jupiter': (2, 5, 7, 9, 11),
+    'Venus': (1, 2, 3, 4, 5, 8, 9, 11, 12),
+    'Saturn': (3, 6, 11),
+    'Rahu': (3, 6, 11),
+    'Ketu': (3, 6, 11),
+}
+
+GRAHA_THEMES = {
+    'Sun': 'authority, health and recognition',
+    'Moon': 'mind, mood and family',
+    'Mars': 'energy, courage and property',
+    'Mercury': 'communication, studies and trade',
+    'Jupiter': 'wisdom, prosperity and guidance',
+    'Venus': 'relationships, comforts and arts',
+    'Saturn': 'work, discipline and delays',
+    'Rahu': 'ambition and sudden events',
+    'Ketu': 'spirituality and detachment',
+}
+
+# Nine taras repeat through the 27 nakshatras counted from the birth star
+TARAS = [
+    {'name': 'Janma', 'tamil': 'ஜன்ம', 'favourable': False, 'description': 'Day of the birth star; keep plans modest and rest well.'},
+    {'name': 'Sampat', 'tamil': 'சம்பத்', 'favourable': True, 'description': 'Wealth star; good for money matters and purchases.'},
+    {'name': 'Vipat', 'tamil': 'விபத்', 'favourable': False, 'description': 'Danger star; avoid risks and new ventures.'},
+    {'name': 'Kshema', 'tamil': 'க்ஷேம', 'favourable': True, 'description': 'Well-being star; comfortable and secure day.'},
+    {'name': 'Pratyak', 'tamil': 'பிரத்யக்', 'favourable': False, 'description': 'Obstacle star; expect resistance and be patient.'},
+    {'name': 'Sadhana', 'tamil': 'சாதக', 'favourable': True, 'description': 'Achievement star; efforts succeed.'},
+    {'name': 'Naidhana', 'tamil': 'நைதன', 'favourable': False, 'description': 'Difficult star; postpone important decisions.'},
+    {'name': 'Mitra', 'tamil': 'மித்ர', 'favourable': True, 'description': 'Friendly star; helpful people and cordial meetings.'},
+    {'name': 'Parama Mitra', 'tamil': 'பரம மித்ர', 'favourable': True, 'description': 'Best friend star; very supportive day.'},
+]
+
+
+def forecast_today() -> date:
+    """Current date in the forecast timezone"""
+    return datetime.now(timezone_resolver.zone(FORECAST_TIMEZONE)).date()
+
+
+def forecast_window() -> Tuple[date, date]:
+    """First and last day the API serves forecasts for"""
+    today = forecast_today()
+    return today - timedelta(days=FORECAST_PAST_DAYS), today + timedelta(days=FORECAST_AHEAD_DAYS)
+
+
+def forecast_instant(day: date) -> datetime:
+    """UTC instant whose transits stand for the whole forecast day"""
+    local = datetime(day.year, day.month, day.day, FORECAST_HOUR)
+    return timezone_resolver.localize(local, FORECAST_TIMEZONE).replace(tzinfo=None)
+
+
+def rasi_forecast(engine, moon_rasi: int, transits: Dict) -> Dict:
+    """Gochara forecast for one natal Moon rasi"""
+    effects = []
+    for planet, favourable_houses in GOCHARA_FAVOURABLE.items():
+        house = (transits[planet]['rasi'] - moon_rasi) % 12 + 1
+        favourable = house in favourable_houses
+        effects.append({
+            'planet': planet,
+            'planet_tamil': engine.GRAHA_NAMES_TAMIL[planet],
+            'house': house,
+            'favourable': favourable,
+            'description': f"{planet} in the {house}{_suffix(house)} house from your Moon "
+                           f"{'supports' if favourable else 'strains'} {GRAHA_THEMES[planet]}."
+        })
+
+    score = sum(e['favourable'] for e in effects)
+    chandrashtama = effects[1]['house'] == 8
+    rating = max(1, min(5, round(score / len(effects) * 5) - (1 if chandrashtama else 0)))
+    summary = f"{score} of 9 grahas are favourable for {engine.RASI_NAMES[moon_rasi]['en']} Moon today."
+    if chandrashtama:
+        summary += " Chandrashtama: the Moon transits your 8th house, so avoid new beginnings."
+    return {
+        'rasi': moon_rasi,
+        'rasi_name': engine.RASI_NAMES[moon_rasi],
+        'rating': rating,
+        'favourable_grahas': score,
+        'chandrashtama': chandrashtama,
+        'summary': summary,
+        'transits': effects,
+    }
+
+
+def nakshatra_forecast(engine, nakshatra_id: int, transits: Dict) -> Dict:
+    """Tara bala of the day's Moon nakshatra counted from the birth nakshatra"""
+    moon_star = transits['Moon']['nakshatra_id']
+    count = (moon_star - nakshatra_id) % 27 + 1
+    tara = TARAS[(count - 1) % 9]
+    nakshatra = engine.NAKSHATRAS[nakshatra_id - 1]
+    return {
+        'nakshatra': nakshatra_id,
+        'name': nakshatra['name'],
+        'tamil': nakshatra['tamil'],
+        'moon_nakshatra': transits['Moon']['nakshatra'],
+        'tara': {'number': (count - 1) % 9 + 1, **tara},
+    }
+
+
+def _suffix(n: int) -> str:
+    return 'st' if n == 1 else 'nd' if n == 2 else 'rd' if n == 3 else 'th'
+
+
+def materialize(engine, day: date, ayanamsa: str = DEFAULT_AYANAMSA) -> Dict[str, Dict]:
+    """All 12 rasi and 27 nakshatra forecasts for a day from one transit computation"""
+    transits = engine.calculate_planetary_positions(forecast_instant(day), 13.0827, 80.2707, ayanamsa)
+    forecasts = {f'rasi-{r}': rasi_forecast(engine, r, transits) for r in range(1, 13)}
+    forecasts.update({f'nakshatra-{n}': nakshatra_forecast(engine, n, transits) for n in range(1, 28)})
+    return forecasts
+
+
+class DailyHoroscopeStore:
+    """
+    Serialized forecasts keyed by day, ayanamsa and rasi/nakshatra, so serving
+    a user is a dictionary lookup and a byte join. Recent days stay in memory;
+    with a directory configured every materialized day is also written to disk.
+    """
+
+    def __init__(self, engine, directory: Optional[str] = STORE_DIR, max_days: int = 8):
+        self.engine = engine
+        self.directory = directory
+        self.max_days = max_days
+        self._days: 'OrderedDict[Tuple[str, str], Dict]' = OrderedDict()
+        self._flights: Dict[Tuple[str, str], threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, day: str, ayanamsa: str) -> str:
+        return os.path.join(self.directory, f'daily-{day}-{ayanamsa}.json')
+
+    def day(self, day: date, ayanamsa: str = DEFAULT_AYANAMSA) -> Dict:
+        """{'payloads': {key: bytes}, 'digest': str} for a day, materializing it if needed"""
+        key = (day.isoformat(), ayanamsa)
+        while True:
+            with self._lock:
+                entry = self._days.get(key)
+                if entry is not None:
+                    self._days.move_to_end(key)
+                    return entry
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = threading.Event()
+            if leader:
+                break
+            # Another thread is building this day; other days are served meanwhile
+            flight.wait()
+
+        try:
+            entry = self._build(key, day, ayanamsa)
+            with self._lock:
+                self._days[key] = entry
+                while len(self._days) > self.max_days:
+                    self._days.popitem(last=False)
+            return entry
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.set()
+
+    def _build(self, key: Tuple[str, str], day: date, ayanamsa: str) -> Dict:
+        forecasts = None
+        if self.directory and os.path.exists(self._path(*key)):
+            with open(self._path(*key), encoding='utf-8') as f:
+                forecasts = json.load(f)
+        if forecasts is None:
+            forecasts = materialize(self.engine, day, ayanamsa)
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp = f'{self._path(*key)}.{os.getpid()}.{threading.get_ident()}.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(forecasts, f, ensure_ascii=False)
+                os.replace(tmp, self._path(*key))
+
+        payloads = {
+            name: json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            for name, value in forecasts.items()
+        }
+        digest = hashlib.sha1(b''.join(payloads[k] for k in sorted(payloads))).hexdigest()[:16]
+        return {'payloads': payloads, 'digest': digest}
+
+    def response(self, day: date, rasi: Optional[int] = None, nakshatra: Optional[int] = None,
+                 ayanamsa: str = DEFAULT_AYANAMSA) -> Tuple[bytes, str]:
+        """JSON body and ETag for a rasi and/or nakshatra forecast"""
+        entry = self.day(day, ayanamsa)
+        payloads = entry['payloads']
+        parts = [b'{"date":"' + day.isoformat().encode() + b'","ayanamsa":"' + ayanamsa.encode() + b'"']
+        if rasi is not None:
+            parts.append(b',"rasi":' + payloads[f'rasi-{rasi}'])
+        if nakshatra is not None:
+            parts.append(b',"nakshatra":' + payloads[f'nakshatra-{nakshatra}'])
+        parts.append(b'}')
+        etag = f'"{entry["digest"]}-{rasi or 0}-{nakshatra or 0}"'
+        return b''.join(parts), etag
+
+
+def seconds_until_next_day(now: datetime, day: date) -> int:
+    """Cache lifetime: until the forecast day ends in Indian time (at least a minute)"""
+    end = timezone_resolver.localize(datetime(day.year, day.month, day.day) + timedelta(days=1),
+                                     FORECAST_TIMEZONE)
+    return max(60, int((end - now).total_seconds()))
+
+
+_store: Optional[DailyHoroscopeStore] = None
+_store_lock = threading.Lock()
+
+
+def get_daily_store(engine) -> DailyHoroscopeStore:
+    """Shared forecast store, created on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DailyHoroscopeStore(engine)
+    return _store
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.astrology import get_astrology_engine
+
+    parser = argparse.ArgumentParser(description='Materialize daily horoscopes')
+    parser.add_argument('--date', default=None, help='First day (YYYY-MM-DD, default today in India)')
+    parser.add_argument('--days', type=int, default=1)
+    parser.add_argument('--ayanamsa', default=DEFAULT_AYANAMSA)
+    parser.add_argument('--directory', default=STORE_DIR, help='Store directory (default DAILY_HOROSCOPE_DIR)')
+    args = parser.parse_args(argv)
+    if not args.directory:
+        parser.error('a store directory is required (--directory or DAILY_HOROSCOPE_DIR)')
+
+    start = datetime.strptime(args.date, '%Y-%m-%d').date() if args.date else forecast_today()
+    store = DailyHoroscopeStore(get_astrology_engine(), args.directory)
+    for offset in range(args.days):
+        day = start + timedelta(days=offset)
+        store.day(day, args.ayanamsa)
+        print(f"materialized {day.isoformat()} ({args.ayanamsa})")
+
+
+if __name__ == '__main__':
+    main()
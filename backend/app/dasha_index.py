@@ -0,0 +1,222 @@
+"""
+Population Dasha Index
+Columnar mahadasha/bhukti boundaries for many users, queried by sorted-array searches
+"""
+
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.astrology import VedicAstrology
+
+DASHA_LEVELS = ('maha', 'bhukti')
+
+LORDS = VedicAstrology.DASHA_ORDER
+LORD_YEARS = np.array([VedicAstrology.DASHA_PERIODS[lord] for lord in LORDS], dtype=float)
+NAKSHATRA_SPAN = 360 / 27
+# The engine measures progress from the tabulated (rounded) nakshatra starts
+NAKSHATRA_STARTS = np.array([n['start'] for n in VedicAstrology.NAKSHATRAS])
+DAYS_PER_YEAR = 365.25
+
+# Users processed per vectorized pass; bounds the (users, 9, 9) temporaries
+ADD_CHUNK = 65536
+
+# Boundaries are whole days since 1970-01-01, like the engine's YYYY-MM-DD dates
+PERIOD_DTYPE = np.dtype([
+    ('start', '<i4'),
+    ('end', '<i4'),
+    ('user', '<i8'),
+    ('maha_lord', '<u1'),
+])
+
+DateLike = Union[date, datetime, str, np.datetime64]
+
+
+def to_day(value: DateLike) -> int:
+    """Days since the Unix epoch for a date, datetime or YYYY-MM-DD string"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+
+def to_days(values: Iterable[DateLike]) -> np.ndarray:
+    """Vectorized to_day for arrays or lists of dates, datetimes or ISO strings"""
+    values = np.asarray(values if isinstance(values, np.ndarray) else list(values))
+    return values.astype('datetime64[D]').astype(np.int64)
+
+
+# Bhukti sub-lords and their starting fraction of the mahadasha, per mahadasha lord
+BHUKTI_LORDS = (np.arange(9)[:, None] + np.arange(9)) % 9
+BHUKTI_FRACTIONS = np.cumsum(LORD_YEARS[BHUKTI_LORDS], axis=1) / 120 - LORD_YEARS[BHUKTI_LORDS] / 120
+
+
+def mahadasha_boundaries(moon_longitudes: np.ndarray, birth_days: np.ndarray):
+    """
+    Mahadashas for many births at once, matching calculate_vimshottari_dasha.
+
+    Returns (lords (N, 9), start, end, notional_start) in days since the
+    epoch; notional_start is where each mahadasha would begin if whole,
+    which for the first one lies before birth.
+    """
+    moon = np.asarray(moon_longitudes, dtype=float)
+    birth = np.asarray(birth_days, dtype=np.int64)
+
+    nakshatra = (moon / NAKSHATRA_SPAN).astype(np.int64)
+    first_lord = nakshatra % 9
+    fraction_passed = (moon - NAKSHATRA_STARTS[nakshatra]) / NAKSHATRA_SPAN
+
+    lords = (first_lord[:, None] + np.arange(9)) % 9
+    years = LORD_YEARS[lords]
+    days = (years * DAYS_PER_YEAR).astype(np.int64)
+    days[:, 0] = (years[:, 0] * (1 - fraction_passed) * DAYS_PER_YEAR).astype(np.int64)
+    end = birth[:, None] + np.cumsum(days, axis=1)
+    start = end - days
+
+    notional_start = start.astype(float)
+    notional_start[:, 0] = end[:, 0] - years[:, 0] * DAYS_PER_YEAR
+    return lords, start, end, notional_start
+
+
+def bhukti_boundaries(maha_lords: np.ndarray, maha_start: np.ndarray, maha_end: np.ndarray,
+                      notional_start: np.ndarray):
+    """
+    Bhuktis of the given mahadashas (any shape S): returns (lords, start, end)
+    of shape S + (9,). Each mahadasha is split in proportion to the sub-lords'
+    years starting from its own lord; the part before birth (before the
+    actual mahadasha start) collapses to start == end.
+    """
+    maha_lords = np.asarray(maha_lords)
+    length = LORD_YEARS[maha_lords] * DAYS_PER_YEAR
+    start = np.floor(notional_start[..., None] + length[..., None] * BHUKTI_FRACTIONS[maha_lords])
+    start = np.maximum(start.astype(np.int64), maha_start[..., None])
+    end = np.concatenate([start[..., 1:], maha_end[..., None]], axis=-1)
+    return BHUKTI_LORDS[maha_lords], np.minimum(start, end), end
+
+
+def dasha_boundaries(moon_longitudes: np.ndarray, birth_days: np.ndarray):
+    """Mahadashas (N, 9) and all their bhuktis (N, 9, 9) for many births"""
+    lords, start, end, notional_start = mahadasha_boundaries(moon_longitudes, birth_days)
+    return (lords, start, end) + bhukti_boundaries(lords, start, end, notional_start)
+
+
+class DashaIndex:
+    """
+    Per (level, lord) arrays of dasha periods sorted by start day. New users
+    are merged into the sorted arrays instead of rebuilding the whole index.
+    An optional since/until window keeps only periods overlapping it, which
+    is what campaign queries need and a fraction of each 120-year cycle.
+    """
+
+    def __init__(self, since: Optional[DateLike] = None, until: Optional[DateLike] = None):
+        self._periods: Dict[Tuple[str, int], np.ndarray] = {
+            (level, lord): np.empty(0, dtype=PERIOD_DTYPE) for level in DASHA_LEVELS for lord in range(9)
+        }
+        self.since = to_day(since) if since is not None else np.iinfo(np.int32).min
+        self.until = to_day(until) if until is not None else np.iinfo(np.int32).max
+        self.users = 0
+
+    def add(self, user_ids: Iterable[int], moon_longitudes: Iterable[float],
+            birth_dates: Iterable[DateLike]):
+        """Index users from their natal Moon longitude and (local) birth date"""
+        users = np.asarray(list(user_ids), dtype=np.int64)
+        days = to_days(birth_dates)
+        moon = np.asarray(list(moon_longitudes), dtype=float)
+        if not len(users) == len(days) == len(moon):
+            raise ValueError("user_ids, moon_longitudes and birth_dates must have the same length")
+
+        chunks = {key: [] for key in self._periods}
+        for lo in range(0, len(users), ADD_CHUNK):
+            chunk = slice(lo, lo + ADD_CHUNK)
+            lords, start, end, notional_start = mahadasha_boundaries(moon[chunk], days[chunk])
+            chunk_users = np.broadcast_to(users[chunk, None], lords.shape)
+            self._collect(chunks, 'maha', lords, start, end, chunk_users, lords)
+
+            # Bhuktis only for mahadashas that reach into the window
+            inside = (end > self.since) & (start < self.until)
+            lords, start, end = lords[inside], start[inside], end[inside]
+            sub_lords, sub_start, sub_end = bhukti_boundaries(lords, start, end, notional_start[inside])
+            self._collect(chunks, 'bhukti', sub_lords, sub_start, sub_end,
+                          np.broadcast_to(chunk_users[inside][:, None], sub_lords.shape),
+                          np.broadcast_to(lords[:, None], sub_lords.shape))
+
+        for key, parts in chunks.items():
+            if parts:
+                self._merge(key, parts)
+        self.users += len(users)
+
+    def add_charts(self, user_ids: Iterable[int], charts: Sequence[Dict]):
+        """Index users from stored birth charts"""
+        self.add(user_ids,
+                 [c['planetary_positions']['Moon']['longitude'] for c in charts],
+                 [c['birth_info']['datetime'] for c in charts])
+
+    def _collect(self, chunks: Dict, level: str, lords, starts, ends, users, maha_lords):
+        """Columns grouped by lord, skipping empty periods and those outside the window"""
+        keep = (ends > starts) & (ends > self.since) & (starts < self.until)
+        lords = lords[keep].astype(np.uint8)
+        order = np.argsort(lords, kind='stable')  # radix sort on small ints
+        lords = lords[order]
+        columns = [column[keep][order] for column in (starts, ends, users, maha_lords)]
+
+        bounds = np.searchsorted(lords, np.arange(10))
+        for lord in range(9):
+            part = slice(bounds[lord], bounds[lord + 1])
+            if part.stop > part.start:
+                chunks[(level, lord)].append([column[part] for column in columns])
+
+    def _merge(self, key: Tuple[str, int], parts: List[List[np.ndarray]]):
+        starts, ends, users, maha_lords = (np.concatenate(column) for column in zip(*parts))
+        order = np.argsort(starts)
+        new = np.empty(len(order), dtype=PERIOD_DTYPE)
+        new['start'] = starts[order]
+        new['end'] = ends[order]
+        new['user'] = users[order]
+        new['maha_lord'] = maha_lords[order]
+
+        old = self._periods[key]
+        # Linear-time merge of two start-sorted runs
+        positions = np.searchsorted(old['start'], new['start'], side='right')
+        self._periods[key] = np.insert(old, positions, new)
+
+    def periods(self, lord: str, level: str = 'maha') -> np.ndarray:
+        """All periods of one lord at one level, sorted by start day"""
+        if level not in DASHA_LEVELS:
+            raise ValueError(f"Unknown dasha level '{level}'. Choose from: {', '.join(DASHA_LEVELS)}")
+        if lord not in LORDS:
+            raise ValueError(f"Unknown dasha lord '{lord}'. Choose from: {', '.join(LORDS)}")
+        return self._periods[(level, LORDS.index(lord))]
+
+    def starting(self, lord: str, start: DateLike, end: DateLike, level: str = 'maha',
+                 maha_lord: Optional[str] = None) -> np.ndarray:
+        """Periods of `lord` beginning in [start, end), e.g. Rahu bhuktis next month"""
+        periods = self.periods(lord, level)
+        lo, hi = np.searchsorted(periods['start'], [to_day(start), to_day(end)], side='left')
+        found = periods[lo:hi]
+        if maha_lord is not None:
+            found = found[found['maha_lord'] == LORDS.index(maha_lord)]
+        return found
+
+    def active(self, lord: str, on: DateLike, level: str = 'maha') -> np.ndarray:
+        """Periods of `lord` running on a given day"""
+        periods = self.periods(lord, level)
+        day = to_day(on)
+        candidates = periods[:np.searchsorted(periods['start'], day, side='right')]
+        return candidates[candidates['end'] > day]
+
+
+def describe_periods(periods: np.ndarray, lord: str, level: str) -> List[Dict]:
+    """Readable rows with ISO dates"""
+    starts = periods['start'].astype('datetime64[D]').astype(str)
+    ends = periods['end'].astype('datetime64[D]').astype(str)
+    return [
+        {
+            'user': int(p['user']),
+            'level': level,
+            'lord': lord,
+            'maha_lord': LORDS[p['maha_lord']],
+            'start_date': s,
+            'end_date': e
+        }
+        for p, s, e in zip(periods, starts, ends)
+    ]
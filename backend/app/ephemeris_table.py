@@ -0,0 +1,237 @@
+"""
+Ephemeris Table
+Printed-ephemeris style tables: sidereal longitude, nakshatra, pada and
+retrograde status of every graha at a fixed local time on each day of a range.
+Rows are computed in chunks, each from one batched ephemeris evaluation per
+graha, and written out as soon as they are computed, so memory stays bounded
+however long the range.
+
+Formats:
+    csv      one row per day
+    msgpack  a header map followed by one map per chunk holding packed
+             little-endian columns (longitude <f8, nakshatra/pada/retrograde u1)
+
+Usage:
+    python -m app.ephemeris_table --from 2024-01-01 --to 2033-12-31 --output ephemeris.csv
+    python -m app.ephemeris_table --from 1950-01-01 --to 2049-12-31 --format msgpack --output ephemeris.msgpack
+"""
+
+import argparse
+import sys
+import time as timer
+from datetime import date, datetime, time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pytz
+
+from app.ayanamsa import AYANAMSA_MODELS, DEFAULT_AYANAMSA
+from app.compact import DATE_EPOCH
+from app.nodes import DEFAULT_NODE, NODE_TYPES, TABLE_END_JD, TABLE_START_JD
+from app.packing import packb, unpack_stream
+from app.timezones import timezone_resolver
+
+TABLE_VERSION = 1
+FORMATS = ('csv', 'msgpack')
+GRAHAS = ('Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Rahu', 'Ketu')
+
+# Rows computed (and held in memory) at a time
+CHUNK_ROWS = 512
+
+# Longest table the API streams; longer ones are for the CLI
+MAX_API_ROWS = 60000
+
+# Packed dtype of every column of the MessagePack format; dates are days since DATE_EPOCH
+COLUMN_DTYPES = {'date': '<i4', 'jd_tt': '<f8', **{
+    f'{graha}.{field}': dtype for graha in GRAHAS
+    for field, dtype in (('longitude', '<f8'), ('nakshatra', 'u1'), ('pada', 'u1'), ('retrograde', 'u1'))
+}}
+
+NAKSHATRA_SPAN = 360 / 27
+PADA_SPAN = NAKSHATRA_SPAN / 4
+
+
+def graha_columns(longitudes: np.ndarray, next_longitudes: np.ndarray, graha: str) -> Dict[str, np.ndarray]:
+    """Nakshatra index (0-26), pada and retrograde flag from sidereal longitudes a day apart"""
+    nakshatra = np.minimum(longitudes // NAKSHATRA_SPAN, 26).astype(np.uint8)
+    pada = np.minimum((longitudes - nakshatra * NAKSHATRA_SPAN) // PADA_SPAN + 1, 4).astype(np.uint8)
+    if graha in ('Sun', 'Moon'):
+        retrograde = np.zeros(len(longitudes), dtype=np.uint8)
+    elif graha in ('Rahu', 'Ketu'):
+        retrograde = np.ones(len(longitudes), dtype=np.uint8)
+    else:
+        retrograde = ((next_longitudes - longitudes + 360) % 360 > 180).astype(np.uint8)
+    return {
+        f'{graha}.longitude': longitudes,
+        f'{graha}.nakshatra': nakshatra,
+        f'{graha}.pada': pada,
+        f'{graha}.retrograde': retrograde,
+    }
+
+
+class EphemerisTable:
+    """One row every `step` days from `start` to `end` (inclusive) at local time `at` in `timezone`"""
+
+    def __init__(self, engine, start: date, end: date, step: int = 1, at: time = time(5, 30),
+                 timezone: str = 'Asia/Kolkata', ayanamsa: str = DEFAULT_AYANAMSA, node: str = DEFAULT_NODE,
+                 chunk_rows: int = CHUNK_ROWS):
+        if end < start:
+            raise ValueError('The end date must not be before the start date')
+        if step < 1:
+            raise ValueError('Step must be at least one day')
+        if ayanamsa not in AYANAMSA_MODELS:
+            raise ValueError(f"Ayanamsa must be one of: {', '.join(AYANAMSA_MODELS)}")
+        if node not in NODE_TYPES:
+            raise ValueError(f"Node must be one of: {', '.join(NODE_TYPES)}")
+        try:
+            timezone_resolver.table(timezone)
+        except pytz.UnknownTimeZoneError:
+            raise ValueError(f'Unknown timezone: {timezone}')
+
+        self.engine = engine
+        self.start, self.end, self.step, self.at = start, end, step, at
+        self.timezone, self.ayanamsa, self.node = timezone, ayanamsa, node
+        self.chunk_rows = chunk_rows
+        self.rows = (end - start).days // step + 1
+
+        # Retrograde status looks a day ahead, so keep a day clear of the ephemeris ends;
+        # the message quotes days safely inside the range in any timezone
+        first_jd, last_jd = self._coverage(engine)
+        if node == 'true':
+            first_jd, last_jd = max(first_jd, TABLE_START_JD), min(last_jd, TABLE_END_JD - 1)
+        jd = self.julian_days(np.array([0, self.rows - 1]))
+        if jd[0] < first_jd or jd[1] > last_jd:
+            first, last = engine.ts.tt_jd(np.array([first_jd + 2, last_jd - 2])).utc_strftime('%Y-%m-%d')
+            raise ValueError(f'Dates must be between {first} and {last}')
+
+    @staticmethod
+    def _coverage(engine):
+        segments = [seg.spk_segment for seg in engine.eph.segments]
+        return max(s.start_jd for s in segments) + 1, min(s.end_jd for s in segments) - 1
+
+    def local_dates(self, rows: np.ndarray) -> np.ndarray:
+        return np.datetime64(self.start, 'D') + rows * self.step
+
+    def julian_days(self, rows: np.ndarray) -> np.ndarray:
+        """JD (TT) of the given rows, converting all their local times to UTC in one pass"""
+        local = (self.local_dates(rows).astype('datetime64[s]')
+                 + np.timedelta64(self.at.hour * 3600 + self.at.minute * 60 + self.at.second, 's'))
+        utc_seconds = timezone_resolver.to_utc(local, self.timezone).astype(np.int64)
+        # Whole days and seconds of the day: POSIX seconds skip leap seconds, skyfield's do not
+        days, seconds = np.divmod(utc_seconds, 86400)
+        return self.engine.ts.utc(1970, 1, 1 + days, 0, 0, seconds.astype(float)).tt
+
+    def chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Columns of `chunk_rows` rows at a time: date (datetime64[D]), jd_tt and four per graha"""
+        for first in range(0, self.rows, self.chunk_rows):
+            rows = np.arange(first, min(first + self.chunk_rows, self.rows))
+            jd = self.julian_days(rows)
+            # Each graha's positions now and a day later come from a single evaluation
+            both = self.engine.sidereal_longitudes(np.concatenate([jd, jd + 1]), list(GRAHAS),
+                                                   self.ayanamsa, self.node)
+            columns = {'date': self.local_dates(rows), 'jd_tt': jd}
+            for graha in GRAHAS:
+                columns.update(graha_columns(both[graha][:len(rows)], both[graha][len(rows):], graha))
+            yield columns
+
+    def header(self) -> Dict:
+        return {
+            'version': TABLE_VERSION,
+            'from': self.start.isoformat(),
+            'to': self.end.isoformat(),
+            'step_days': self.step,
+            'time': self.at.strftime('%H:%M'),
+            'timezone': self.timezone,
+            'ayanamsa': self.ayanamsa,
+            'node': self.node,
+            'rows': self.rows,
+            'grahas': list(GRAHAS),
+            'nakshatras': [n['name'] for n in self.engine.NAKSHATRAS],
+            'date_epoch': DATE_EPOCH.isoformat(),
+            'columns': COLUMN_DTYPES,
+        }
+
+    def csv_lines(self, decimals: int = 4) -> Iterator[str]:
+        """The table as CSV text, one chunk of rows per string"""
+        names = np.array([n['name'] for n in self.engine.NAKSHATRAS])
+        yield ','.join(['date'] + [f'{g}_{field}' for g in GRAHAS
+                                   for field in ('longitude', 'nakshatra', 'pada', 'retrograde')]) + '\n'
+        for chunk in self.chunks():
+            columns = [chunk['date'].astype(str)]
+            for graha in GRAHAS:
+                columns += [
+                    np.char.mod(f'%.{decimals}f', chunk[f'{graha}.longitude']),
+                    names[chunk[f'{graha}.nakshatra']],
+                    chunk[f'{graha}.pada'].astype(str),
+                    chunk[f'{graha}.retrograde'].astype(str),
+                ]
+            yield '\n'.join(map(','.join, zip(*columns))) + '\n'
+
+    def msgpack_frames(self) -> Iterator[bytes]:
+        """The header and then one map of packed columns per chunk, as MessagePack values"""
+        yield packb(self.header())
+        for chunk in self.chunks():
+            chunk['date'] = chunk['date'] - np.datetime64(DATE_EPOCH, 'D')
+            packed = {name: chunk[name].astype(dtype).tobytes() for name, dtype in COLUMN_DTYPES.items()}
+            yield packb({'rows': len(chunk['jd_tt']), **packed})
+
+    def stream(self, fmt: str) -> Iterator:
+        if fmt not in FORMATS:
+            raise ValueError(f"Format must be one of: {', '.join(FORMATS)}")
+        return self.csv_lines() if fmt == 'csv' else self.msgpack_frames()
+
+
+def read_msgpack_table(data: bytes) -> Dict:
+    """Header and concatenated columns of a MessagePack ephemeris table"""
+    frames = unpack_stream(data)
+    header = next(frames)
+    parts: Dict[str, List[np.ndarray]] = {}
+    for frame in frames:
+        for name, dtype in header['columns'].items():
+            parts.setdefault(name, []).append(np.frombuffer(frame[name], dtype=dtype))
+    columns = {name: np.concatenate(values) for name, values in parts.items()}
+    columns['date'] = np.datetime64(date.fromisoformat(header['date_epoch']), 'D') + columns['date']
+    return {'header': header, 'columns': columns}
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.astrology import get_astrology_engine
+
+    parser = argparse.ArgumentParser(description='Export a daily sidereal ephemeris table')
+    parser.add_argument('--from', dest='start', required=True, help='First day (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='end', required=True, help='Last day (YYYY-MM-DD)')
+    parser.add_argument('--step', type=int, default=1, help='Days between rows')
+    parser.add_argument('--time', default='05:30', help='Local time of each row (HH:MM)')
+    parser.add_argument('--timezone', default='Asia/Kolkata')
+    parser.add_argument('--ayanamsa', default=DEFAULT_AYANAMSA)
+    parser.add_argument('--node', default=DEFAULT_NODE)
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--output', default=None, help='Output file (default stdout)')
+    args = parser.parse_args(argv)
+
+    try:
+        table = EphemerisTable(get_astrology_engine(), date.fromisoformat(args.start), date.fromisoformat(args.end),
+                               args.step, datetime.strptime(args.time, '%H:%M').time(), args.timezone,
+                               args.ayanamsa, args.node, args.chunk_rows)
+    except ValueError as e:
+        parser.error(str(e))
+
+    began = timer.perf_counter()
+    binary = args.format == 'msgpack'
+    if args.output:
+        out = open(args.output, 'wb') if binary else open(args.output, 'w', newline='')
+    else:
+        out = sys.stdout.buffer if binary else sys.stdout
+    try:
+        for piece in table.stream(args.format):
+            out.write(piece)
+    finally:
+        if args.output:
+            out.close()
+    elapsed = timer.perf_counter() - began
+    print(f"wrote {table.rows} rows in {elapsed:.2f} s ({table.rows / elapsed:.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Chart Fields
+Sparse fieldsets for chart responses: the chart sections a selection of
+(optionally dotted) fields needs computed, and the projection onto those fields
+"""
+
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Union
+
+# Computed chart sections and the sections each one is derived from
+SECTION_DEPENDENCIES = {
+    'birth_info': (),
+    'ascendant': (),
+    'planetary_positions': (),
+    'houses': ('ascendant',),
+    'vimshottari_dasha': ('planetary_positions',),
+    'yogas': ('planetary_positions', 'ascendant'),
+    'doshas': ('planetary_positions', 'ascendant'),
+    'shadbala': ('planetary_positions', 'ascendant'),
+    'predictions': ('planetary_positions', 'ascendant', 'vimshottari_dasha', 'yogas', 'doshas'),
+    'chart_type': (),
+    'ashtakavarga': ('planetary_positions', 'ascendant'),
+    'vargas': ('planetary_positions', 'ascendant'),
+}
+
+# Added around the computed chart by the API
+RESPONSE_FIELDS = ('person', 'chart_id')
+
+
+def parse_fields(fields: Union[None, str, Sequence[str]]) -> Optional[List[str]]:
+    """
+    'planetary_positions.Moon,ascendant' or a list of such paths; None or
+    empty selects the whole chart
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    paths = [f.strip() for f in fields if f.strip()]
+    if not paths:
+        return None
+    known = tuple(SECTION_DEPENDENCIES) + RESPONSE_FIELDS
+    unknown = sorted({p.split('.')[0] for p in paths} - set(known))
+    if unknown:
+        raise ValueError(f"Unknown chart field(s): {', '.join(unknown)}. Choose from: {', '.join(known)}")
+    return paths
+
+
+def required_sections(fields: Sequence[str]) -> FrozenSet[str]:
+    """Sections to compute for the selected fields, dependencies included"""
+    sections = set()
+    pending = [p.split('.')[0] for p in fields if p.split('.')[0] in SECTION_DEPENDENCIES]
+    while pending:
+        section = pending.pop()
+        if section not in sections:
+            sections.add(section)
+            pending.extend(SECTION_DEPENDENCIES[section])
+    return frozenset(sections)
+
+
+def _child(node: Any, key: str):
+    if not isinstance(node, dict):
+        return None
+    if key in node:
+        return key
+    # House numbers are int keys in computed charts
+    if key.isdigit() and int(key) in node:
+        return int(key)
+    return None
+
+
+def project(chart: Dict, fields: Sequence[str]) -> Dict:
+    """Copy of the chart holding only the selected paths; missing paths are left out"""
+    result: Dict = {}
+    for path in fields:
+        source, target = chart, result
+        keys = path.split('.')
+        for depth, key in enumerate(keys):
+            key = _child(source, key)
+            if key is None:
+                break
+            if depth == len(keys) - 1:
+                target[key] = source[key]
+            else:
+                source = source[key]
+                if not isinstance(target.get(key), dict):
+                    target[key] = {}
+                target = target[key]
+    return result
@@ -0,0 +1,288 @@
+"""
+Offline Place Gazetteer
+Resolves birth place names to latitude, longitude and timezone without a network geocoder
+"""
+
+import csv
+import difflib
+import hashlib
+import heapq
+import json
+import math
+import os
+import tempfile
+import threading
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), 'data', 'cities.csv')
+
+# Where the compiled binary table is written; the package directory may be read-only
+CACHE_DIR = os.environ.get('GAZETTEER_CACHE_DIR', tempfile.gettempdir())
+
+EARTH_RADIUS_KM = 6371.0
+
+# Bump when the compiled table layout changes so stale cache files are rebuilt
+TABLE_VERSION = 2
+
+
+def city_dtype(name_bytes: int, region_bytes: int) -> np.dtype:
+    """
+    One fixed-width record per place; timezones are indexes into a separate
+    name list. Text fields are sized to the longest UTF-8 value in the data,
+    so no name is ever cut short.
+    """
+    return np.dtype([
+        ('name', f'S{max(name_bytes, 1)}'),
+        ('country', 'S2'),
+        ('region', f'S{max(region_bytes, 1)}'),
+        ('latitude', '<f8'),
+        ('longitude', '<f8'),
+        ('timezone', '<u2'),
+        ('population_k', '<u4'),
+    ])
+
+
+def normalize_place(text: str) -> str:
+    """Lowercase ASCII form of a place name used for all index lookups"""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = ''.join(c if c.isalnum() else ' ' for c in text)
+    return ' '.join(text.split())
+
+
+def unit_vectors(latitudes, longitudes) -> np.ndarray:
+    """Points on the unit sphere, so Euclidean nearest equals great-circle nearest"""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+class KDTree:
+    """Static k-d tree for nearest-neighbour queries on a fixed point set"""
+
+    def __init__(self, points: np.ndarray):
+        self.points = np.asarray(points, dtype=float)
+        self.dims = self.points.shape[1]
+        self.node_point: List[int] = []
+        self.node_axis: List[int] = []
+        self.node_left: List[int] = []
+        self.node_right: List[int] = []
+        self.root = self._build(np.arange(len(self.points)), 0)
+
+    def _build(self, indices: np.ndarray, depth: int) -> int:
+        if len(indices) == 0:
+            return -1
+        axis = depth % self.dims
+        order = indices[np.argsort(self.points[indices, axis], kind='stable')]
+        mid = len(order) // 2
+
+        node = len(self.node_point)
+        self.node_point.append(int(order[mid]))
+        self.node_axis.append(axis)
+        self.node_left.append(-1)
+        self.node_right.append(-1)
+
+        self.node_left[node] = self._build(order[:mid], depth + 1)
+        self.node_right[node] = self._build(order[mid + 1:], depth + 1)
+        return node
+
+    def query(self, point, k: int = 1) -> List[tuple]:
+        """Return up to k (squared distance, point index) pairs, nearest first"""
+        point = np.asarray(point, dtype=float)
+        best: List[tuple] = []  # max-heap of (-distance, index)
+
+        def visit(node: int):
+            if node < 0:
+                return
+            idx = self.node_point[node]
+            axis = self.node_axis[node]
+            diff = self.points[idx] - point
+            dist = float(diff @ diff)
+            if len(best) < k:
+                heapq.heappush(best, (-dist, idx))
+            elif dist < -best[0][0]:
+                heapq.heapreplace(best, (-dist, idx))
+
+            delta = point[axis] - self.points[idx, axis]
+            near, far = (self.node_left[node], self.node_right[node]) if delta < 0 \
+                else (self.node_right[node], self.node_left[node])
+            visit(near)
+            if len(best) < k or delta * delta < -best[0][0]:
+                visit(far)
+
+        visit(self.root)
+        return sorted((-d, i) for d, i in best)
+
+
+class Gazetteer:
+    """Memory-mapped city table with name, prefix, fuzzy and reverse lookup"""
+
+    def __init__(self, csv_path: str = DATA_PATH, cache_dir: str = CACHE_DIR):
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir
+        self.table, self.zones = self._load_table()
+
+        # Name index: normalized names and aliases -> row ids
+        self.exact: Dict[str, List[int]] = {}
+        for row, aliases in enumerate(self._aliases):
+            for key in aliases:
+                self.exact.setdefault(key, []).append(row)
+        population = self.table['population_k']
+        for key, rows in self.exact.items():
+            rows.sort(key=lambda r: -int(population[r]))
+        self.keys = sorted(self.exact)
+
+        # Trigram index for typo-tolerant autocomplete
+        self.trigrams: Dict[str, List[int]] = {}
+        for i, key in enumerate(self.keys):
+            for gram in self._grams(key):
+                self.trigrams.setdefault(gram, []).append(i)
+
+        self.tree = KDTree(unit_vectors(self.table['latitude'], self.table['longitude']))
+
+    def _load_table(self):
+        """Compile the CSV into a binary table once, then memory-map it"""
+        with open(self.csv_path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:12]
+        table_path = os.path.join(self.cache_dir, f'gazetteer-v{TABLE_VERSION}-{digest}.npy')
+        meta_path = os.path.join(self.cache_dir, f'gazetteer-v{TABLE_VERSION}-{digest}.json')
+
+        if not (os.path.exists(table_path) and os.path.exists(meta_path)):
+            records, zones, aliases = self._read_csv()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_table = f'{table_path}.{os.getpid()}.tmp'
+            tmp_meta = f'{meta_path}.{os.getpid()}.tmp'
+            with open(tmp_table, 'wb') as f:
+                np.save(f, records)
+            with open(tmp_meta, 'w') as f:
+                json.dump({'zones': zones, 'aliases': aliases}, f)
+            os.replace(tmp_table, table_path)
+            os.replace(tmp_meta, meta_path)
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        self._aliases = meta['aliases']
+        return np.load(table_path, mmap_mode='r'), meta['zones']
+
+    def _read_csv(self):
+        with open(self.csv_path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        zones = sorted({r['timezone'] for r in rows})
+        zone_ids = {z: i for i, z in enumerate(zones)}
+        encoded_names = [r['name'].encode('utf-8') for r in rows]
+        encoded_regions = [r['region'].encode('utf-8') for r in rows]
+        records = np.zeros(len(rows), dtype=city_dtype(max(map(len, encoded_names), default=0),
+                                                       max(map(len, encoded_regions), default=0)))
+        aliases = []
+        for i, r in enumerate(rows):
+            country = r['country'].encode('ascii')
+            if len(country) != 2:
+                raise ValueError(f"Row {i + 2} of {self.csv_path}: country must be a two-letter code")
+            records[i] = (
+                encoded_names[i], country, encoded_regions[i], float(r['latitude']), float(r['longitude']),
+                zone_ids[r['timezone']], int(r['population_k'] or 0)
+            )
+            names = [r['name']] + [a for a in r['aliases'].split(';') if a]
+            aliases.append(sorted({normalize_place(n) for n in names}))
+        return records, zones, aliases
+
+    @staticmethod
+    def _grams(key: str) -> set:
+        padded = f'  {key} '
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def record(self, row: int) -> Dict:
+        """Place record as a plain dict"""
+        city = self.table[row]
+        return {
+            'name': city['name'].decode('utf-8'),
+            'country': city['country'].decode('ascii'),
+            'region': city['region'].decode('utf-8'),
+            'latitude': float(city['latitude']),
+            'longitude': float(city['longitude']),
+            'timezone': self.zones[int(city['timezone'])]
+        }
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Autocomplete: prefix matches by population, then close misspellings"""
+        q = normalize_place(query)
+        if not q:
+            return []
+
+        population = self.table['population_k']
+        rows: List[int] = []
+        i = bisect_left(self.keys, q)
+        prefix_rows = set()
+        while i < len(self.keys) and self.keys[i].startswith(q):
+            prefix_rows.update(self.exact[self.keys[i]])
+            i += 1
+        rows.extend(sorted(prefix_rows, key=lambda r: (-int(population[r]), r)))
+
+        if len(rows) < limit and len(q) >= 3:
+            scores = {}
+            grams = self._grams(q)
+            for gram in grams:
+                for key_idx in self.trigrams.get(gram, ()):
+                    scores[key_idx] = scores.get(key_idx, 0) + 1
+            candidates = heapq.nlargest(20, scores, key=scores.get)
+            fuzzy = []
+            for key_idx in candidates:
+                key = self.keys[key_idx]
+                ratio = difflib.SequenceMatcher(None, q, key[:len(q) + 2]).ratio()
+                if ratio >= 0.7:
+                    fuzzy.append((ratio, key))
+            for _, key in sorted(fuzzy, reverse=True):
+                rows.extend(r for r in self.exact[key] if r not in rows)
+
+        return [self.record(r) for r in rows[:limit]]
+
+    def resolve(self, place: str) -> Optional[Dict]:
+        """Best single match for a free-text place such as 'Madurai, Tamil Nadu, India'"""
+        parts = [normalize_place(p) for p in place.split(',')]
+        parts = [p for p in parts if p]
+        if not parts:
+            return None
+
+        rows = self.exact.get(parts[0])
+        if rows:
+            # 'Salem, Oregon' should not resolve to Salem, Tamil Nadu
+            qualifiers = set(parts[1:])
+            for row in rows:
+                city = self.record(row)
+                if qualifiers & {normalize_place(city['region']), city['country'].lower()}:
+                    return city
+            return self.record(rows[0])
+
+        matches = self.search(parts[0], limit=1)
+        if matches and difflib.SequenceMatcher(None, parts[0], normalize_place(matches[0]['name'])).ratio() >= 0.85:
+            return matches[0]
+        return None
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1) -> List[Dict]:
+        """Reverse lookup: the k places closest to a coordinate"""
+        point = unit_vectors([latitude], [longitude])[0]
+        results = []
+        for dist2, row in self.tree.query(point, k):
+            chord = math.sqrt(dist2)
+            distance_km = 2 * math.asin(min(1.0, chord / 2)) * EARTH_RADIUS_KM
+            results.append({**self.record(row), 'distance_km': round(distance_km, 2)})
+        return results
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """Shared gazetteer instance, built on first use"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer()
+    return _gazetteer
@@ -0,0 +1,236 @@
+"""
+Incremental Charts
+Re-derives a birth chart after a small change of birth time or place, recomputing
+only the components whose inputs changed and reporting which fields differ
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.ayanamsa import AYANAMSA_MODELS, DEFAULT_AYANAMSA
+from app.nodes import DEFAULT_NODE, NODE_TYPES, lunar_node_longitude
+from app.timezones import timezone_resolver
+from app.vargas import parse_vargas
+
+# Grahas taken from an interpolated ephemeris window instead of fresh ephemeris
+# calls. The Moon moves half a degree an hour and drives the dasha, so it is
+# always computed exactly; Rahu/Ketu come from the cheap node series.
+INTERPOLATED_GRAHAS = ('Sun', 'Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn')
+
+# Ephemeris window around the first instant: samples every 6 hours from one
+# day before to two days after (the extra day serves the retrograde check).
+# Cubic interpolation over it stays within 1e-6 degrees for these grahas.
+WINDOW_BEFORE_DAYS = 1.0
+WINDOW_AFTER_DAYS = 2.0
+WINDOW_STEP_DAYS = 0.25
+
+# How far an edited instant may move from the window's centre before re-sampling
+REANCHOR_DAYS = 1.0
+
+MAX_SESSIONS = 256
+
+
+def changed_fields(old: Any, new: Any, prefix: str = '') -> List[str]:
+    """Dotted paths of the values that differ between two charts"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        paths = []
+        for key in list(old) + [k for k in new if k not in old]:
+            path = f'{prefix}.{key}' if prefix else str(key)
+            if key not in old or key not in new:
+                paths.append(path)
+            else:
+                paths.extend(changed_fields(old[key], new[key], path))
+        return paths
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        paths = []
+        for i, (a, b) in enumerate(zip(old, new)):
+            paths.extend(changed_fields(a, b, f'{prefix}[{i}]'))
+        return paths
+    return [] if old == new else [prefix]
+
+
+class _EphemerisWindow:
+    """Sidereal longitudes of the interpolated grahas on a short regular grid"""
+
+    def __init__(self, engine, center_jd: float, ayanamsa: str):
+        self.center_jd = center_jd
+        self.ayanamsa = ayanamsa
+        self.jd = center_jd + np.arange(-WINDOW_BEFORE_DAYS, WINDOW_AFTER_DAYS + 1e-9, WINDOW_STEP_DAYS)
+        longitudes = engine.sidereal_longitudes(self.jd, list(INTERPOLATED_GRAHAS), ayanamsa)
+        self.longitudes = {
+            name: lon[0] + np.concatenate([[0.0], np.cumsum((np.diff(lon) + 180) % 360 - 180)])
+            for name, lon in longitudes.items()
+        }
+
+    def covers(self, jd: float, ayanamsa: str) -> bool:
+        return ayanamsa == self.ayanamsa and abs(jd - self.center_jd) <= REANCHOR_DAYS
+
+    def longitude(self, name: str, jd: float) -> float:
+        """Cubic Lagrange interpolation on the four samples around jd (unwrapped)"""
+        i = int(np.clip(np.searchsorted(self.jd, jd) - 2, 0, len(self.jd) - 4))
+        xs, ys = self.jd[i:i + 4], self.longitudes[name][i:i + 4]
+        total = 0.0
+        for j in range(4):
+            others = np.delete(xs, j)
+            total += ys[j] * np.prod((jd - others) / (xs[j] - others))
+        return float(total)
+
+
+class IncrementalChart:
+    """
+    One editing session's chart. Each component declares the inputs it reads;
+    on update a component is recomputed only when those inputs changed,
+    otherwise its previous value is reused.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.chart: Optional[Dict] = None
+        self._components: Dict[str, Tuple[Any, Any]] = {}
+        self._window: Optional[_EphemerisWindow] = None
+        self._lock = threading.Lock()
+
+    def _component(self, name: str, key: Any, compute: Callable[[], Any], recomputed: List[str],
+                   reused: List[str]) -> Any:
+        previous = self._components.get(name)
+        if previous is not None and previous[0] == key:
+            reused.append(name)
+            return previous[1]
+        value = compute()
+        self._components[name] = (key, value)
+        recomputed.append(name)
+        return value
+
+    def _positions(self, utc_dt: datetime, jd_tt: float, ayanamsa: str, node: str) -> Dict:
+        """Planetary positions equivalent to calculate_planetary_positions"""
+        engine = self.engine
+        if self._window is None or not self._window.covers(jd_tt, ayanamsa):
+            self._window = _EphemerisWindow(engine, jd_tt, ayanamsa)
+        window = self._window
+        ayanamsa_now = engine.calculate_ayanamsa(jd_tt, ayanamsa)
+        ayanamsa_drift = engine.calculate_ayanamsa(jd_tt + 1, ayanamsa) - ayanamsa_now
+
+        positions = {}
+        for name in engine.EPHEMERIS_TARGETS:
+            if name == 'Moon':
+                moon = engine.sidereal_longitudes(np.array([jd_tt]), ['Moon'], ayanamsa)['Moon'][0]
+                positions[name] = engine.position_entry(float(moon), False)
+                continue
+            longitude = window.longitude(name, jd_tt)
+            retrograde = False
+            if name != 'Sun':
+                # Same test as the engine: tropical motion over the next day
+                motion = window.longitude(name, jd_tt + 1) - longitude + ayanamsa_drift
+                retrograde = bool(motion < 0)
+            positions[name] = engine.position_entry(longitude % 360, retrograde)
+
+        rahu = engine.tropical_to_sidereal(lunar_node_longitude(jd_tt, node), ayanamsa_now)
+        positions['Rahu'] = engine.position_entry(rahu, True, with_nakshatra_id=False)
+        positions['Ketu'] = engine.position_entry((rahu + 180) % 360, True, with_nakshatra_id=False)
+        return positions
+
+    def update(self, birth_datetime: datetime, latitude: float, longitude: float, timezone_str: str,
+               ayanamsa: str = DEFAULT_AYANAMSA, node: str = DEFAULT_NODE,
+               vargas: Optional[Sequence[str]] = None) -> Dict:
+        """
+        Chart for new inputs: {'chart', 'changed' (dotted paths), 'recomputed' and
+        'reused' (component names)}. The first call computes every component.
+        """
+        vargas = parse_vargas(vargas)
+        if ayanamsa not in AYANAMSA_MODELS:
+            raise ValueError(f"Unknown ayanamsa '{ayanamsa}'. Choose from: {', '.join(AYANAMSA_MODELS)}")
+        if node not in NODE_TYPES:
+            raise ValueError(f"Unknown node type '{node}'. Choose from: {', '.join(NODE_TYPES)}")
+        with self._lock:
+            return self._update(birth_datetime, latitude, longitude, timezone_str, ayanamsa, node, vargas)
+
+    def _update(self, birth_datetime, latitude, longitude, timezone_str, ayanamsa, node, vargas) -> Dict:
+        engine = self.engine
+        recomputed: List[str] = []
+        reused: List[str] = []
+        component = partial(self._component, recomputed=recomputed, reused=reused)
+
+        utc_dt = component('timezone', (birth_datetime, timezone_str),
+                           lambda: timezone_resolver.localize(birth_datetime, timezone_str))
+        jd_tt = engine.ts.from_datetime(utc_dt).tt
+        positions = component('planetary_positions', (jd_tt, ayanamsa, node),
+                              lambda: self._positions(utc_dt, jd_tt, ayanamsa, node))
+        ascendant = component('ascendant', (jd_tt, latitude, longitude, ayanamsa),
+                              lambda: engine.calculate_ascendant(utc_dt, latitude, longitude, ayanamsa))
+        houses = component('houses', ascendant['longitude'],
+                           lambda: engine.calculate_houses(ascendant['longitude']))
+
+        # Signs are all most components read; they rarely change with a small nudge
+        signs = (ascendant['rasi'],) + tuple(p['rasi'] for p in positions.values())
+        longitudes = tuple(p['longitude'] for p in positions.values())
+        dashas = component('vimshottari_dasha', (positions['Moon']['longitude'], birth_datetime),
+                           lambda: engine.calculate_vimshottari_dasha(positions['Moon']['longitude'],
+                                                                      birth_datetime))
+        yogas = component('yogas', signs, lambda: engine.calculate_yogas(positions, ascendant))
+        doshas = component('doshas', (signs, longitudes), lambda: engine.calculate_doshas(positions, ascendant))
+        strengths = component('shadbala', (longitudes, ascendant['longitude'], jd_tt, longitude),
+                              lambda: engine.calculate_shadbala(positions, ascendant, utc_dt, longitude))
+        predictions = component(
+            'predictions',
+            (signs, positions['Moon']['nakshatra'], repr(dashas[0]), repr(yogas), repr(doshas)),
+            lambda: engine.generate_predictions(positions, ascendant, dashas, yogas, doshas)
+        )
+        ashtakavarga = component('ashtakavarga', signs,
+                                 lambda: engine.calculate_ashtakavarga(positions, ascendant))
+
+        chart = {
+            'birth_info': {
+                'datetime': birth_datetime.isoformat(),
+                'timezone': timezone_str,
+                'latitude': latitude,
+                'longitude': longitude,
+                'ayanamsa': ayanamsa,
+                'ayanamsa_degrees': engine.calculate_ayanamsa(jd_tt, ayanamsa),
+                'node': node
+            },
+            'ascendant': ascendant,
+            'planetary_positions': positions,
+            'houses': houses,
+            'vimshottari_dasha': dashas,
+            'yogas': yogas,
+            'doshas': doshas,
+            'shadbala': strengths,
+            'predictions': predictions,
+            'chart_type': 'South Indian Style',
+            'ashtakavarga': ashtakavarga,
+        }
+        if vargas:
+            chart['vargas'] = component('vargas', (longitudes, ascendant['longitude'], tuple(vargas)),
+                                        lambda: engine.calculate_vargas(positions, ascendant, vargas))
+
+        changed = changed_fields(self.chart, chart) if self.chart is not None else ['*']
+        self.chart = chart
+        return {'chart': chart, 'changed': changed, 'recomputed': recomputed, 'reused': reused}
+
+
+class IncrementalSessions:
+    """Most recently used editing sessions of this worker"""
+
+    def __init__(self, engine, max_sessions: int = MAX_SESSIONS):
+        self.engine = engine
+        self.max_sessions = max_sessions
+        self._sessions: 'OrderedDict[str, IncrementalChart]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: Optional[str] = None) -> Tuple[str, IncrementalChart]:
+        """Existing session, or a new one (with a generated id when none is given)"""
+        session_id = session_id or uuid.uuid4().hex
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = IncrementalChart(self.engine)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id, session
@@ -0,0 +1,258 @@
+"""
+Live Transits
+One computation per tick for every live subscriber: the current graha
+positions, and the lagna of each subscribed city, are computed once per tick,
+diffed against the previous tick, and the delta is encoded once per city and
+queued for each of its subscribers. Subscribers start with a full snapshot;
+one that falls too far behind has its backlog replaced by a fresh snapshot.
+
+Configuration:
+    TRANSIT_TICK_SECONDS      seconds between ticks (default 5)
+    TRANSIT_MAX_SUBSCRIBERS   live subscribers per worker (default 10000)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.admission import Overloaded
+from app.ayanamsa import DEFAULT_AYANAMSA
+from app.cache import CacheStats
+from app.nodes import DEFAULT_NODE
+from app.responses import render_json
+
+logger = logging.getLogger(__name__)
+
+TICK_SECONDS = float(os.environ.get('TRANSIT_TICK_SECONDS', '5'))
+MAX_SUBSCRIBERS = int(os.environ.get('TRANSIT_MAX_SUBSCRIBERS', '10000'))
+
+# Frames a subscriber may have queued before its backlog is replaced by a snapshot
+SUBSCRIBER_BACKLOG = 8
+
+# Rounding of streamed longitudes (about 0.4 arc seconds)
+LONGITUDE_DECIMALS = 4
+
+# Fields whose change is also reported as an event (rasi or nakshatra ingress, station)
+EVENT_FIELDS = ('rasi', 'nakshatra', 'pada', 'is_retrograde')
+
+
+def graha_state(position: Dict) -> Dict:
+    """Streamed fields of one graha from calculate_planetary_positions"""
+    return {
+        'longitude': round(float(position['longitude']), LONGITUDE_DECIMALS),
+        'rasi': int(position['rasi']),
+        'nakshatra': position['nakshatra'],
+        'pada': int(position['pada']),
+        'is_retrograde': bool(position['is_retrograde']),
+    }
+
+
+def lagna_state(engine, longitude: float) -> Dict:
+    nakshatra = engine.get_nakshatra(longitude)
+    return {
+        'longitude': round(longitude, LONGITUDE_DECIMALS),
+        'rasi': engine.get_rasi(longitude),
+        'nakshatra': nakshatra['name'],
+        'pada': int(nakshatra['pada']),
+    }
+
+
+def diff_state(name: str, before: Dict, after: Dict, events: List[Dict]) -> Dict:
+    """Changed fields of one body, appending its ingress/station events"""
+    changed = {}
+    for field, value in after.items():
+        if before.get(field) != value:
+            changed[field] = value
+            if field in EVENT_FIELDS and field in before:
+                events.append({'body': name, 'field': field, 'from': before[field], 'to': value})
+    return changed
+
+
+def apply_delta(snapshot: Dict, delta: Dict) -> Dict:
+    """The state a subscriber holds after applying a delta frame to its snapshot"""
+    state = {
+        **snapshot,
+        'time': delta['time'],
+        'planets': {name: {**fields, **delta['planets'].get(name, {})}
+                    for name, fields in snapshot['planets'].items()},
+        'lagna': {**snapshot['lagna'], **delta['lagna']},
+    }
+    return state
+
+
+class Subscriber:
+    """One live connection's queue of encoded frames"""
+
+    def __init__(self, city: 'City'):
+        self.city = city
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.synced = False
+        self.resyncs = 0
+
+    def offer(self, frame: str, snapshot) -> bool:
+        """Queue a delta frame, or a snapshot when new or too far behind; True on a resync"""
+        if self.synced and self.queue.qsize() < SUBSCRIBER_BACKLOG:
+            self.queue.put_nowait(frame)
+            return False
+        resync = self.synced
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(snapshot())
+        self.synced = True
+        self.resyncs += resync
+        return resync
+
+    async def next_frame(self) -> str:
+        return await self.queue.get()
+
+
+class City:
+    """A subscribed place; its lagna is computed once per tick for all its subscribers"""
+
+    def __init__(self, key: Tuple[float, float], name: str, latitude: float, longitude: float):
+        self.key = key
+        self.name = name
+        self.latitude = latitude
+        self.longitude = longitude
+        self.lagna: Optional[Dict] = None
+        self.subscribers: Set[Subscriber] = set()
+        self.snapshot_frame: Optional[str] = None
+
+
+class TransitHub:
+    """
+    Ticks while anyone is subscribed. Compute cost per tick is one
+    planetary position computation plus one lagna per distinct city,
+    independent of the number of subscribers.
+    """
+
+    def __init__(self, engine, ayanamsa: str = DEFAULT_AYANAMSA, node: str = DEFAULT_NODE,
+                 tick_seconds: float = TICK_SECONDS, max_subscribers: int = MAX_SUBSCRIBERS):
+        self.engine = engine
+        self.ayanamsa = ayanamsa
+        self.node = node
+        self.tick_seconds = tick_seconds
+        self.max_subscribers = max_subscribers
+        self.cities: Dict[Tuple[float, float], City] = {}
+        self.subscribers = 0
+        self.time: Optional[datetime] = None
+        self.planets: Optional[Dict[str, Dict]] = None
+        self._sky: Optional[Tuple] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop = None
+        self.compute_seconds = 0.0
+        self.fanout_seconds = 0.0
+        self.counters = CacheStats('ticks', 'frames', 'resyncs', 'rejected')
+
+    def subscribe(self, name: str, latitude: float, longitude: float) -> Subscriber:
+        """Register a subscriber for a place (raises Overloaded at the subscriber limit)"""
+        if self.subscribers >= self.max_subscribers:
+            self.counters.incr('rejected')
+            raise Overloaded('transit-stream', 'subscriber limit reached', self.tick_seconds)
+        key = (round(latitude, 4), round(longitude, 4))
+        city = self.cities.get(key)
+        if city is None:
+            city = self.cities[key] = City(key, name, latitude, longitude)
+        subscriber = Subscriber(city)
+        city.subscribers.add(subscriber)
+        self.subscribers += 1
+
+        if self._running():
+            if self.planets is not None:
+                if city.lagna is None:
+                    city.lagna = self.city_lagna(city)
+                subscriber.offer('', lambda: self.snapshot(city))
+        else:
+            self.time = self.planets = self._sky = None
+            self._loop = asyncio.get_running_loop()
+            self._task = self._loop.create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        city = subscriber.city
+        if subscriber in city.subscribers:
+            city.subscribers.discard(subscriber)
+            self.subscribers -= 1
+        if not city.subscribers and self.cities.get(city.key) is city:
+            del self.cities[city.key]
+
+    def _running(self) -> bool:
+        return (self._task is not None and not self._task.done()
+                and self._loop is asyncio.get_running_loop())
+
+    async def _run(self):
+        while self.subscribers:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Live transit tick failed")
+            await asyncio.sleep(self.tick_seconds)
+
+    def _compute(self, now: datetime):
+        planets = self.engine.calculate_planetary_positions(now, 0.0, 0.0, self.ayanamsa, self.node)
+        t = self.engine.ts.from_datetime(now)
+        return {name: graha_state(p) for name, p in planets.items()}, (t, t.gast)
+
+    def city_lagna(self, city: City) -> Dict:
+        t, gast = self._sky
+        longitude = float(self.engine.ascendant_longitudes(t, city.latitude, city.longitude, self.ayanamsa,
+                                                           gast_hours=gast))
+        return lagna_state(self.engine, longitude)
+
+    def snapshot(self, city: City) -> str:
+        """Full-state frame for a city at the current tick, encoded once per tick"""
+        if city.snapshot_frame is None:
+            city.snapshot_frame = render_json({
+                'type': 'snapshot',
+                'time': self.time.isoformat(),
+                'ayanamsa': self.ayanamsa,
+                'node': self.node,
+                'city': {'name': city.name, 'latitude': city.latitude, 'longitude': city.longitude},
+                'planets': self.planets,
+                'lagna': city.lagna,
+            }).decode()
+        return city.snapshot_frame
+
+    async def tick(self, now: Optional[datetime] = None):
+        """Compute the sky once and queue each city's delta for its subscribers"""
+        now = now or datetime.now(timezone.utc)
+        began = time.perf_counter()
+        planets, self._sky = await asyncio.to_thread(self._compute, now)
+        events: List[Dict] = []
+        previous = self.planets or {}
+        planet_delta = {name: changed for name, state in planets.items()
+                        if (changed := diff_state(name, previous.get(name, {}), state, events))}
+        self.time, self.planets = now, planets
+        lagnas = {key: self.city_lagna(city) for key, city in self.cities.items()}
+        computed = time.perf_counter()
+
+        frames = resyncs = 0
+        for key, city in list(self.cities.items()):
+            city_events = list(events)
+            lagna = lagnas.get(key) or self.city_lagna(city)
+            lagna_delta = diff_state('Lagna', city.lagna or {}, lagna, city_events)
+            city.lagna, city.snapshot_frame = lagna, None
+            frame = render_json({'type': 'delta', 'time': now.isoformat(), 'planets': planet_delta,
+                                 'lagna': lagna_delta, 'events': city_events}).decode()
+            for subscriber in list(city.subscribers):
+                resyncs += subscriber.offer(frame, lambda: self.snapshot(city))
+                frames += 1
+
+        self.counters.incr('ticks')
+        self.counters.incr('frames', frames)
+        self.counters.incr('resyncs', resyncs)
+        self.compute_seconds = computed - began
+        self.fanout_seconds = time.perf_counter() - computed
+
+    def stats(self) -> Dict:
+        return {
+            'subscribers': self.subscribers,
+            'cities': len(self.cities),
+            'tick_seconds': self.tick_seconds,
+            'last_compute_ms': round(self.compute_seconds * 1000, 3),
+            'last_fanout_ms': round(self.fanout_seconds * 1000, 3),
+            **self.counters.snapshot(),
+        }
@@ -3,14 +3,48 @@ FastAPI Backend for Vedic Astrology System
 Tamil Jathagam with Horoscope Predictions
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Header, Query, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
-from datetime import datetime
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, root_validator, validator
+from datetime import datetime, timezone
 from typing import Optional, Dict, List
+import asyncio
 import logging
+import os
+import secrets
+import time
 
+import pytz
+
+from app.admission import Overloaded, admission_controller
 from app.astrology import get_astrology_engine
+from app.ayanamsa import AYANAMSA_MODELS, DEFAULT_AYANAMSA
+from app.cache import get_result_cache
+from app.chart_svg import (
+    CHART_VARGAS, DEFAULT_LANGUAGE, DEFAULT_STYLE, LANGUAGES, STYLES, SVG_VERSION, render_chart_svg
+)
+from app.coalesce import SingleFlight
+from app.chart_store import INDEXED_COLUMNS, chart_id, get_chart_store, normalized_input
+from app.compact import code_table, compact_chart
+from app.daily_horoscope import forecast_today, forecast_window, get_daily_store, seconds_until_next_day
+from app.nodes import DEFAULT_NODE, NODE_TYPES
+from app.fields import RESPONSE_FIELDS, SECTION_DEPENDENCIES, parse_fields, project, required_sections
+from app.gazetteer import get_gazetteer
+from app.ephemeris_table import FORMATS as EPHEMERIS_FORMATS, MAX_API_ROWS, EphemerisTable
+from app.incremental import IncrementalSessions
+from app.live_transit import TransitHub
+from app.muhurtham import (
+    MAX_SEARCH_DAYS, MUHURTHAM_PRESETS, find_muhurthams, get_panchangam_tables, resolve_constraints
+)
+from app.sade_sati import get_saturn_index
+from app.strength import transit_bindus
+from app.timezones import timezone_resolver
+from app.vargas import VARGAS, parse_vargas
+from app.responses import MSGPACK_MEDIA_TYPE, ChartJSONResponse, ChartMsgPackResponse, prefers_msgpack
+from app.profiling import (
+    MAX_PROFILE_SECONDS, profiler, slow_request_log, start_request_timings
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,16 +65,79 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def slow_request_middleware(request: Request, call_next):
+    """Time every request and keep inputs/stage timings of slow ones"""
+    timings = start_request_timings()
+    start = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        slow_request_log.observe(request.method, request.url.path, duration_ms, timings)
+
+
+def require_admin(token: Optional[str]):
+    """Guard debug endpoints with the ADMIN_TOKEN environment variable"""
+    admin_token = os.environ.get('ADMIN_TOKEN')
+    if not admin_token:
+        # Debug endpoints are disabled unless a token is configured
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not secrets.compare_digest(token, admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def admitted(route: str):
+    """Dependency that holds one of the route's admission slots while the request runs"""
+    
+    async def hold_slot():
+        try:
+            slot = await admission_controller.limit(route).enter()
+        except Overloaded as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': str(e.retry_after)})
+        try:
+            yield
+        finally:
+            slot.release()
+    
+    return Depends(hold_slot)
+
+
+def resolve_place_values(values: Dict) -> Dict:
+    """Fill in coordinates (and timezone, unless given) from the place name"""
+    if values.get('latitude') is not None and values.get('longitude') is not None:
+        return values
+    place = values.get('place')
+    if not place:
+        raise ValueError('Either latitude and longitude or a known place is required')
+    city = get_gazetteer().resolve(place)
+    if city is None:
+        raise ValueError(f'Unknown place: {place}')
+    values = dict(values)
+    values['latitude'] = city['latitude']
+    values['longitude'] = city['longitude']
+    values.setdefault('timezone', city['timezone'])
+    return values
+
+
 # Request Models
 class BirthDetails(BaseModel):
     """Birth details for chart calculation"""
     date: str = Field(..., description="Birth date in YYYY-MM-DD format", example="1990-05-15")
     time: str = Field(..., description="Birth time in HH:MM format (24-hour)", example="14:30")
-    latitude: float = Field(..., description="Birth place latitude", example=13.0827, ge=-90, le=90)
-    longitude: float = Field(..., description="Birth place longitude", example=80.2707, ge=-180, le=180)
+    latitude: Optional[float] = Field(None, description="Birth place latitude (optional when place is given)", example=13.0827, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, description="Birth place longitude (optional when place is given)", example=80.2707, ge=-180, le=180)
     timezone: str = Field(default="Asia/Kolkata", description="Timezone", example="Asia/Kolkata")
     name: Optional[str] = Field(None, description="Person's name")
-    place: Optional[str] = Field(None, description="Birth place name")
+    place: Optional[str] = Field(None, description="Birth place name, resolved offline when coordinates are omitted", example="Chennai")
+    ayanamsa: str = Field(default=DEFAULT_AYANAMSA, description=f"Ayanamsa model: {', '.join(AYANAMSA_MODELS)}", example="lahiri")
+    node: str = Field(default=DEFAULT_NODE, description="Lunar node for Rahu/Ketu: mean or true", example="true")
+    vargas: Optional[List[str]] = Field(None, description=f"Divisional charts to include: {', '.join(VARGAS)} or all", example=["D9", "D10"])
+    
+    @root_validator(pre=True)
+    def resolve_place(cls, values):
+        return resolve_place_values(values)
     
     @validator('date')
     def validate_date(cls, v):
@@ -57,6 +154,61 @@ class BirthDetails(BaseModel):
             return v
         except ValueError:
             raise ValueError('Time must be in HH:MM format (24-hour)')
+    
+    @validator('ayanamsa')
+    def validate_ayanamsa(cls, v):
+        if v not in AYANAMSA_MODELS:
+            raise ValueError(f"Ayanamsa must be one of: {', '.join(AYANAMSA_MODELS)}")
+        return v
+    
+    @validator('node')
+    def validate_node(cls, v):
+        if v not in NODE_TYPES:
+            raise ValueError(f"Node must be one of: {', '.join(NODE_TYPES)}")
+        return v
+    
+    @validator('vargas')
+    def validate_vargas(cls, v):
+        return list(parse_vargas(v)) if v is not None else None
+
+
+class MuhurthamRequest(BaseModel):
+    """Place, date range and constraints for a muhurtham search"""
+    latitude: Optional[float] = Field(None, description="Latitude (optional when place is given)", ge=-90, le=90)
+    longitude: Optional[float] = Field(None, description="Longitude (optional when place is given)", ge=-180, le=180)
+    timezone: str = Field(default="Asia/Kolkata", description="Timezone")
+    place: Optional[str] = Field(None, description="Place name, resolved offline when coordinates are omitted", example="Madurai")
+    start_date: Optional[str] = Field(None, description="First day (YYYY-MM-DD, default today)", example="2024-06-01")
+    days: int = Field(default=90, description="Number of days to search", ge=1, le=MAX_SEARCH_DAYS)
+    purpose: Optional[str] = Field(None, description=f"Preset constraints: {', '.join(MUHURTHAM_PRESETS)}", example="marriage")
+    tithis: Optional[List[int]] = Field(None, description="Allowed tithis (1-30, 16-30 Krishna paksha)")
+    nakshatras: Optional[List[int]] = Field(None, description="Allowed nakshatras (1-27)")
+    varas: Optional[List[int]] = Field(None, description="Allowed weekdays (0 Sunday - 6 Saturday)")
+    lagnas: Optional[List[int]] = Field(None, description="Allowed lagna rasis (1-12)")
+    moon_rasi: Optional[int] = Field(None, description="Natal Moon rasi; excludes its Chandrashtama", ge=1, le=12)
+    avoid_rahu_kalam: bool = Field(default=True)
+    avoid_yamagandam: bool = Field(default=True)
+    min_minutes: int = Field(default=30, description="Shortest window to report", ge=0)
+    ayanamsa: str = Field(default=DEFAULT_AYANAMSA, description=f"Ayanamsa model: {', '.join(AYANAMSA_MODELS)}")
+    
+    @root_validator(pre=True)
+    def resolve_place(cls, values):
+        return resolve_place_values(values)
+    
+    @validator('start_date')
+    def validate_start_date(cls, v):
+        if v is not None:
+            try:
+                datetime.strptime(v, '%Y-%m-%d')
+            except ValueError:
+                raise ValueError('Date must be in YYYY-MM-DD format')
+        return v
+    
+    @validator('ayanamsa')
+    def validate_ayanamsa(cls, v):
+        if v not in AYANAMSA_MODELS:
+            raise ValueError(f"Ayanamsa must be one of: {', '.join(AYANAMSA_MODELS)}")
+        return v
 
 
 class CompatibilityRequest(BaseModel):
@@ -67,6 +219,90 @@ class CompatibilityRequest(BaseModel):
 
 # Initialize astrology engine
 astrology = get_astrology_engine()
+incremental_sessions = IncrementalSessions(astrology)
+single_flight = SingleFlight()
+transit_hub = TransitHub(astrology)
+chart_codes = code_table(astrology)
+CHART_CODES_ETAG = f'"chart-codes-{chart_codes["version"]}"'
+
+
+def compute_chart(details: BirthDetails, vargas: Optional[List[str]] = None,
+                  fields: Optional[List[str]] = None):
+    """
+    Birth chart for the request, and its chart store id when persistence is
+    enabled. Charts come from the result cache, then the chart store (unless
+    divisional charts are requested), and are computed only when both miss.
+    With `fields`, only the sections those fields need are computed; such
+    partial charts are cached separately and never stored.
+    """
+    sections = required_sections(fields) if fields else None
+    birth_input = birth_input_of(details)
+    cid = chart_id(birth_input)
+    store = get_chart_store()
+    
+    def build():
+        if store is not None and not vargas:
+            chart = store.get(cid)
+            if chart is not None:
+                return chart
+        birth_dt = datetime.strptime(f"{details.date} {details.time}", '%Y-%m-%d %H:%M')
+        chart = astrology.generate_birth_chart(
+            birth_dt,
+            details.latitude,
+            details.longitude,
+            details.timezone,
+            details.ayanamsa,
+            details.node,
+            vargas,
+            sections=sections
+        )
+        if store is not None and sections is None:
+            store.put(birth_input, chart)
+        return chart
+    
+    chart = get_result_cache().get_or_compute(chart_cache_key(cid, vargas, sections), build)
+    return chart, (cid if store is not None else None)
+
+
+def birth_input_of(details: BirthDetails) -> Dict:
+    return normalized_input(details.date, details.time, details.latitude, details.longitude,
+                            details.timezone, details.ayanamsa, details.node)
+
+
+def chart_cache_key(cid: str, vargas: Optional[List[str]], sections) -> str:
+    """Key of a chart request: equal keys always produce equal charts"""
+    key = f"chart:{cid}:{','.join(vargas or [])}"
+    if sections is not None:
+        key += f":{'+'.join(sorted(sections))}"
+    return key
+
+
+async def shared_chart(details: BirthDetails, vargas: Optional[List[str]] = None,
+                       fields: Optional[List[str]] = None):
+    """
+    compute_chart in a worker thread. Identical requests (by normalized birth
+    input, vargas and sections) arriving while it runs share its result; each
+    caller gets its own top-level copy to add response fields to.
+    """
+    sections = required_sections(fields) if fields else None
+    key = chart_cache_key(chart_id(birth_input_of(details)), vargas, sections)
+    chart, cid = await single_flight.run(key, compute_chart, details, vargas, fields)
+    return dict(chart), cid
+
+
+def chart_response(request: Request, content: Dict, chart_key: Optional[str] = None):
+    """
+    JSON, or MessagePack with the chart (the whole content, or content[chart_key])
+    in its compact columnar form when the Accept header asks for it
+    """
+    headers = {'Vary': 'Accept'}
+    if not prefers_msgpack(request.headers.get('accept')):
+        return ChartJSONResponse(content, headers=headers)
+    if chart_key is None:
+        content = compact_chart(content, chart_codes)
+    else:
+        content = {**content, chart_key: compact_chart(content[chart_key], chart_codes)}
+    return ChartMsgPackResponse(content, headers=headers)
 
 
 @app.get("/")
@@ -81,6 +317,10 @@ async def root():
             "dasha_periods": "/api/dasha-periods",
             "compatibility": "/api/compatibility",
             "current_transit": "/api/transit",
+            "transit_stream": "/api/transit/stream",
+            "transit_socket": "/ws/transit",
+            "ephemeris": "/api/ephemeris",
+            "places": "/api/places",
             "health": "/health"
         }
     }
@@ -92,8 +332,16 @@ async def health_check():
     return {"status": "healthy", "service": "vedic-astrology-api"}
 
 
-@app.post("/api/birth-chart")
-async def calculate_birth_chart(details: BirthDetails):
+CHART_FIELDS_HELP = ("Comma-separated fields to compute and return, e.g. planetary_positions,ascendant "
+                     f"or planetary_positions.Moon: {', '.join(tuple(SECTION_DEPENDENCIES) + RESPONSE_FIELDS)}")
+
+
+@app.post("/api/birth-chart", dependencies=[admitted('birth-chart')])
+async def calculate_birth_chart(
+    details: BirthDetails,
+    request: Request,
+    fields: Optional[str] = Query(None, description=CHART_FIELDS_HELP)
+):
     """
     Calculate complete birth chart (Jathagam)
     
@@ -105,35 +353,72 @@ async def calculate_birth_chart(details: BirthDetails):
     - Vimshottari Dasha periods
     - Yogas and Doshas
     - Detailed predictions
+    - Divisional charts (only those listed in `vargas`)
+    
+    `fields` limits the computation and the response to the selected subtrees.
+    With `Accept: application/msgpack` the chart comes back as compact
+    MessagePack (codes explained by /api/chart-codes).
     """
     try:
-        # Parse datetime
-        dt_str = f"{details.date} {details.time}"
-        birth_dt = datetime.strptime(dt_str, '%Y-%m-%d %H:%M')
-        
-        # Generate chart
-        chart = astrology.generate_birth_chart(
-            birth_dt,
-            details.latitude,
-            details.longitude,
-            details.timezone
-        )
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
+        # Generate chart (or load it from the chart store)
+        chart, stored_id = await shared_chart(details, details.vargas, selected)
+        if stored_id is not None:
+            chart['chart_id'] = stored_id
         
         # Add person details
         chart['person'] = {
             'name': details.name,
             'place': details.place
         }
+        if selected:
+            chart = project(chart, selected)
         
         logger.info(f"Birth chart calculated for {details.name or 'unknown'}")
-        return chart
+        return chart_response(request, chart)
         
     except Exception as e:
         logger.error(f"Error calculating birth chart: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error calculating chart: {str(e)}")
 
 
-@app.post("/api/predictions")
+@app.post("/api/birth-chart/incremental", dependencies=[admitted('incremental')])
+async def incremental_birth_chart(
+    details: BirthDetails,
+    request: Request,
+    session: Optional[str] = Query(None, max_length=64, description="Editing session returned by a previous call")
+):
+    """
+    Birth chart for an interactive editor. Within a session, a nudged birth
+    time or place recomputes only the components that depend on it; the
+    response lists the changed fields and the recomputed components.
+    """
+    try:
+        session_id, chart_session = incremental_sessions.get(session)
+        birth_dt = datetime.strptime(f"{details.date} {details.time}", '%Y-%m-%d %H:%M')
+        result = await asyncio.to_thread(chart_session.update, birth_dt, details.latitude, details.longitude,
+                                         details.timezone, details.ayanamsa, details.node, details.vargas)
+        chart = dict(result['chart'])
+        chart['person'] = {
+            'name': details.name,
+            'place': details.place
+        }
+        return chart_response(request, {
+            'session': session_id,
+            'changed': result['changed'],
+            'recomputed': result['recomputed'],
+            'chart': chart
+        }, chart_key='chart')
+        
+    except Exception as e:
+        logger.error(f"Error updating incremental chart: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error calculating chart: {str(e)}")
+
+
+@app.post("/api/predictions", dependencies=[admitted('predictions')])
 async def get_predictions(details: BirthDetails):
     """
     Get detailed horoscope predictions
@@ -147,17 +432,9 @@ async def get_predictions(details: BirthDetails):
     - Current planetary period effects
     """
     try:
-        dt_str = f"{details.date} {details.time}"
-        birth_dt = datetime.strptime(dt_str, '%Y-%m-%d %H:%M')
-        
-        chart = astrology.generate_birth_chart(
-            birth_dt,
-            details.latitude,
-            details.longitude,
-            details.timezone
-        )
+        chart, _ = await shared_chart(details)
         
-        return {
+        return ChartJSONResponse({
             'person': {
                 'name': details.name,
                 'birth_date': details.date,
@@ -167,14 +444,14 @@ async def get_predictions(details: BirthDetails):
             'current_dasha': chart['vimshottari_dasha'][0] if chart['vimshottari_dasha'] else None,
             'yogas': chart['yogas'],
             'doshas': chart['doshas']
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error generating predictions: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating predictions: {str(e)}")
 
 
-@app.post("/api/dasha-periods")
+@app.post("/api/dasha-periods", dependencies=[admitted('dasha-periods')])
 async def get_dasha_periods(details: BirthDetails):
     """
     Get Vimshottari Dasha periods (planetary periods)
@@ -186,15 +463,7 @@ async def get_dasha_periods(details: BirthDetails):
     - Tamil names
     """
     try:
-        dt_str = f"{details.date} {details.time}"
-        birth_dt = datetime.strptime(dt_str, '%Y-%m-%d %H:%M')
-        
-        chart = astrology.generate_birth_chart(
-            birth_dt,
-            details.latitude,
-            details.longitude,
-            details.timezone
-        )
+        chart, _ = await shared_chart(details)
         
         # Find current dasha
         now = datetime.now()
@@ -205,7 +474,7 @@ async def get_dasha_periods(details: BirthDetails):
                 current_dasha = dasha
                 break
         
-        return {
+        return ChartJSONResponse({
             'person': {
                 'name': details.name,
                 'birth_date': details.date
@@ -214,14 +483,14 @@ async def get_dasha_periods(details: BirthDetails):
             'birth_nakshatra_tamil': chart['planetary_positions']['Moon']['nakshatra_tamil'],
             'current_dasha': current_dasha,
             'all_dashas': chart['vimshottari_dasha']
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error calculating dasha periods: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error calculating dasha: {str(e)}")
 
 
-@app.post("/api/compatibility")
+@app.post("/api/compatibility", dependencies=[admitted('compatibility')])
 async def check_compatibility(request: CompatibilityRequest):
     """
     Check compatibility between two people for marriage/partnership
@@ -234,24 +503,12 @@ async def check_compatibility(request: CompatibilityRequest):
     - Dasha compatibility
     """
     try:
-        # Calculate both charts
-        dt1 = datetime.strptime(f"{request.person1.date} {request.person1.time}", '%Y-%m-%d %H:%M')
-        chart1 = astrology.generate_birth_chart(
-            dt1, request.person1.latitude, request.person1.longitude, request.person1.timezone
-        )
-        
-        dt2 = datetime.strptime(f"{request.person2.date} {request.person2.time}", '%Y-%m-%d %H:%M')
-        chart2 = astrology.generate_birth_chart(
-            dt2, request.person2.latitude, request.person2.longitude, request.person2.timezone
+        pair = [chart_id(birth_input_of(p)) for p in (request.person1, request.person2)]
+        chart1, chart2, porutham_result, basic_compatibility = await single_flight.run(
+            f"compatibility:{pair[0]}:{pair[1]}", compute_compatibility, request.person1, request.person2, pair
         )
         
-        # Calculate 10 Porutham (Tamil marriage compatibility)
-        porutham_result = astrology.calculate_10_porutham(chart1, chart2)
-        
-        # Also calculate basic compatibility for reference
-        basic_compatibility = calculate_compatibility_score(chart1, chart2)
-        
-        return {
+        return ChartJSONResponse({
             'person1': {
                 'name': request.person1.name,
                 'moon_sign': chart1['planetary_positions']['Moon']['rasi_name'],
@@ -266,38 +523,499 @@ async def check_compatibility(request: CompatibilityRequest):
             },
             'porutham': porutham_result,
             'basic_compatibility': basic_compatibility
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error calculating compatibility: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error calculating compatibility: {str(e)}")
 
 
-@app.get("/api/transit")
-async def current_transit():
+def compute_compatibility(person1: BirthDetails, person2: BirthDetails, pair: List[str]):
+    """Both charts, the 10 Porutham (cached by the pair's chart ids) and the basic score"""
+    # Calculate both charts
+    chart1, _ = compute_chart(person1)
+    chart2, _ = compute_chart(person2)
+    
+    # Calculate 10 Porutham (Tamil marriage compatibility)
+    porutham_result = get_result_cache().get_or_compute(
+        f"porutham:{pair[0]}:{pair[1]}", lambda: astrology.calculate_10_porutham(chart1, chart2)
+    )
+    
+    # Also calculate basic compatibility for reference
+    basic_compatibility = calculate_compatibility_score(chart1, chart2)
+    return chart1, chart2, porutham_result, basic_compatibility
+
+
+@app.get("/api/transit", dependencies=[admitted('transit')])
+async def current_transit(
+    ayanamsa: str = Query(DEFAULT_AYANAMSA, description="Ayanamsa model"),
+    node: str = Query(DEFAULT_NODE, description="Lunar node: mean or true"),
+    chart_id: Optional[str] = Query(None, description="Stored chart to score the transits against")
+):
     """
     Get current planetary transits
     
-    Returns current positions of all planets for transit predictions
+    Returns current positions of all planets for transit predictions. With
+    a stored chart's id, each graha's transit is also scored by the bindus
+    of its own Ashtakavarga in the sign it occupies.
     """
+    if ayanamsa not in AYANAMSA_MODELS:
+        raise HTTPException(status_code=422, detail=f"Ayanamsa must be one of: {', '.join(AYANAMSA_MODELS)}")
+    if node not in NODE_TYPES:
+        raise HTTPException(status_code=422, detail=f"Node must be one of: {', '.join(NODE_TYPES)}")
+    store = require_chart_store() if chart_id is not None else None
+    
     try:
         now = datetime.now()
         
-        # Calculate current positions
-        positions = astrology.calculate_planetary_positions(now, 13.0827, 80.2707)  # Chennai as default
+        def calculate():
+            # Chennai as default
+            positions = astrology.calculate_planetary_positions(now, 13.0827, 80.2707, ayanamsa, node)
+            if store is None:
+                return positions, None
+            chart = store.get(chart_id)
+            if chart is None:
+                raise HTTPException(status_code=404, detail="Chart not found")
+            section = chart.get('ashtakavarga') or astrology.calculate_ashtakavarga(
+                chart['planetary_positions'], chart['ascendant'])
+            return positions, transit_bindus(section, positions)
         
-        return {
+        positions, bindus = await asyncio.to_thread(calculate)
+        
+        result = {
             'date': now.strftime('%Y-%m-%d'),
             'time': now.strftime('%H:%M:%S'),
+            'ayanamsa': ayanamsa,
+            'node': node,
             'planetary_positions': positions,
             'note': 'Current transit positions (geocentric, sidereal zodiac)'
         }
+        if bindus is not None:
+            result['chart_id'] = chart_id
+            result['ashtakavarga_transits'] = bindus
+        return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error calculating transit: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error calculating transit: {str(e)}")
 
 
+def transit_city(place: Optional[str], latitude: Optional[float], longitude: Optional[float]):
+    """Name and coordinates of a live transit subscription (Chennai unless given)"""
+    if latitude is not None and longitude is not None:
+        return place or f'{latitude:.4f}, {longitude:.4f}', latitude, longitude
+    if place:
+        city = get_gazetteer().resolve(place)
+        if city is None:
+            raise ValueError(f'Unknown place: {place}')
+        return city['name'], city['latitude'], city['longitude']
+    return 'Chennai', 13.0827, 80.2707
+
+
+@app.websocket("/ws/transit")
+async def transit_socket(
+    websocket: WebSocket,
+    place: Optional[str] = Query(None, description="City whose lagna is streamed"),
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180)
+):
+    """
+    Live transits over a WebSocket
+    
+    The first message is a snapshot of the graha positions and the city's
+    lagna; every tick after that sends only what changed, plus rasi,
+    nakshatra, pada and retrograde events.
+    """
+    try:
+        subscriber = transit_hub.subscribe(*transit_city(place, latitude, longitude))
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    except Overloaded as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+    
+    async def forward():
+        while True:
+            await websocket.send_text(await subscriber.next_frame())
+    
+    sender = None
+    try:
+        await websocket.accept()
+        sender = asyncio.ensure_future(forward())
+        # Incoming messages are ignored; receiving notices the disconnect right away
+        while (await websocket.receive())['type'] != 'websocket.disconnect':
+            pass
+    finally:
+        if sender is not None:
+            sender.cancel()
+        transit_hub.unsubscribe(subscriber)
+
+
+@app.get("/api/transit/stream")
+async def transit_stream(
+    place: Optional[str] = Query(None, description="City whose lagna is streamed"),
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180)
+):
+    """
+    Live transits as Server-Sent Events
+    
+    Same frames as /ws/transit, one `data:` event per tick, for clients
+    that cannot open a WebSocket.
+    """
+    try:
+        subscriber = transit_hub.subscribe(*transit_city(place, latitude, longitude))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': str(e.retry_after)})
+    
+    async def events():
+        try:
+            while True:
+                yield f"data: {await subscriber.next_frame()}\n\n"
+        finally:
+            transit_hub.unsubscribe(subscriber)
+    
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.get("/api/ephemeris", dependencies=[admitted('ephemeris')])
+async def ephemeris_table(
+    start: str = Query(..., alias="from", description="First day (YYYY-MM-DD)"),
+    end: str = Query(..., alias="to", description="Last day (YYYY-MM-DD)"),
+    step: int = Query(1, ge=1, le=366, description="Days between rows"),
+    at: str = Query("05:30", alias="time", description="Local time of each row (HH:MM)"),
+    tz: str = Query("Asia/Kolkata", alias="timezone", description="Timezone of the dates and time"),
+    ayanamsa: str = Query(DEFAULT_AYANAMSA, description="Ayanamsa model"),
+    node: str = Query(DEFAULT_NODE, description="Lunar node: mean or true"),
+    fmt: str = Query("csv", alias="format", description=f"Output format: {', '.join(EPHEMERIS_FORMATS)}")
+):
+    """
+    Daily sidereal ephemeris table
+    
+    Longitude, nakshatra, pada and retrograde status of every graha at a
+    fixed local time on each day, streamed as CSV or MessagePack column
+    chunks while it is computed. Use `python -m app.ephemeris_table` for
+    tables longer than the API limit.
+    """
+    if fmt not in EPHEMERIS_FORMATS:
+        raise HTTPException(status_code=422, detail=f"Format must be one of: {', '.join(EPHEMERIS_FORMATS)}")
+    try:
+        first_day, last_day = datetime.strptime(start, '%Y-%m-%d').date(), datetime.strptime(end, '%Y-%m-%d').date()
+        local_time = datetime.strptime(at, '%H:%M').time()
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Dates must be YYYY-MM-DD and time HH:MM")
+    try:
+        table = EphemerisTable(astrology, first_day, last_day, step, local_time, tz, ayanamsa, node)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if table.rows > MAX_API_ROWS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_API_ROWS} rows per request; "
+                                                    "use a larger step or the ephemeris_table CLI")
+    
+    filename = f"ephemeris-{table.start.isoformat()}-{table.end.isoformat()}.{fmt}"
+    return StreamingResponse(
+        table.stream(fmt),
+        media_type='text/csv' if fmt == 'csv' else MSGPACK_MEDIA_TYPE,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"', 'X-Ephemeris-Rows': str(table.rows)}
+    )
+
+
+def saturn_window(index, start: Optional[str], end: Optional[str]):
+    """Parse an optional YYYY-MM-DD window into Julian days within the Saturn table"""
+    try:
+        start_jd = index.to_jd(start) if start else None
+        end_jd = index.to_jd(end) if end else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Dates must be in YYYY-MM-DD format")
+    return start_jd, end_jd
+
+
+@app.post("/api/sade-sati", dependencies=[admitted('sade-sati')])
+async def sade_sati_for_chart(
+    details: BirthDetails,
+    start: Optional[str] = Query(None, description="Only periods ending after this date (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="Only periods starting before this date (YYYY-MM-DD)")
+):
+    """
+    Sade Sati, Ashtama and Kantaka Shani periods for a birth chart
+    
+    Periods come from a precomputed Saturn rasi table keyed by the natal
+    Moon rasi; no ephemeris work is done beyond the birth chart itself.
+    """
+    index = get_saturn_index(astrology)
+    start_jd, end_jd = saturn_window(index, start or details.date, end)
+    try:
+        chart, _ = await shared_chart(details)
+        moon = chart['planetary_positions']['Moon']
+        
+        def lookup():
+            # The first lookup per ayanamsa builds its Saturn table (most of a second)
+            now_jd = index.to_jd(datetime.now(timezone.utc))
+            current = None
+            if index.start_jd <= now_jd <= index.end_jd:
+                current = str(index.status(moon['rasi'], now_jd, details.ayanamsa)) or None
+            return (current, index.coverage(details.ayanamsa),
+                    index.periods(moon['rasi'], details.ayanamsa, start_jd, end_jd))
+        
+        current, coverage, periods = await asyncio.to_thread(lookup)
+        return {
+            'person': {'name': details.name, 'birth_date': details.date},
+            'moon_rasi': moon['rasi'],
+            'moon_rasi_name': moon['rasi_name'],
+            'current': current,
+            'coverage': coverage,
+            'periods': periods
+        }
+    
+    except Exception as e:
+        logger.error(f"Error calculating Sade Sati: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error calculating Sade Sati: {str(e)}")
+
+
+@app.get("/api/sade-sati", dependencies=[admitted('sade-sati')])
+async def sade_sati_by_moon_rasi(
+    moon_rasi: List[int] = Query(..., description="Natal Moon rasi numbers (1-12); repeat for bulk lookups"),
+    ayanamsa: str = Query(DEFAULT_AYANAMSA, description="Ayanamsa model"),
+    start: Optional[str] = Query(None, description="Only periods ending after this date (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="Only periods starting before this date (YYYY-MM-DD)")
+):
+    """Sade Sati, Ashtama and Kantaka Shani periods for one or many natal Moon rasis"""
+    if ayanamsa not in AYANAMSA_MODELS:
+        raise HTTPException(status_code=422, detail=f"Ayanamsa must be one of: {', '.join(AYANAMSA_MODELS)}")
+    if any(not 1 <= r <= 12 for r in moon_rasi):
+        raise HTTPException(status_code=422, detail="Moon rasi must be between 1 and 12")
+    
+    index = get_saturn_index(astrology)
+    start_jd, end_jd = saturn_window(index, start, end)
+    
+    def lookup():
+        return {
+            'ayanamsa': ayanamsa,
+            'coverage': index.coverage(ayanamsa),
+            'results': [
+                {
+                    'moon_rasi': rasi,
+                    'moon_rasi_name': astrology.RASI_NAMES[rasi],
+                    'periods': index.periods(rasi, ayanamsa, start_jd, end_jd)
+                }
+                for rasi in dict.fromkeys(moon_rasi)
+            ]
+        }
+    
+    return await asyncio.to_thread(lookup)
+
+
+@app.post("/api/muhurtham", dependencies=[admitted('muhurtham')])
+async def muhurtham(request: MuhurthamRequest):
+    """
+    Auspicious windows for a place over the coming days
+    
+    Tithi, nakshatra, vara and lagna are precomputed as interval tables for
+    the place and span; constraints are applied as interval intersections,
+    with Rahu Kalam, Yamagandam and (given a Moon rasi) Chandrashtama removed.
+    """
+    try:
+        constraints = resolve_constraints(request.purpose, tithis=request.tithis, nakshatras=request.nakshatras,
+                                          varas=request.varas, lagnas=request.lagnas)
+        zone = timezone_resolver.zone(request.timezone)
+    except (ValueError, pytz.UnknownTimeZoneError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    start = (datetime.strptime(request.start_date, '%Y-%m-%d').date() if request.start_date
+             else datetime.now(zone).date())
+    
+    def search():
+        tables = get_panchangam_tables(astrology, request.latitude, request.longitude, request.timezone,
+                                       start, request.days, request.ayanamsa)
+        windows = find_muhurthams(
+            tables, request.purpose, request.tithis, request.nakshatras, request.varas, request.lagnas,
+            request.avoid_rahu_kalam, request.avoid_yamagandam, request.moon_rasi, request.min_minutes
+        )
+        return tables, windows
+    
+    try:
+        tables, windows = await asyncio.to_thread(search)
+    except ValueError as e:
+        # Inputs the tables cannot serve, e.g. a polar day or night in the span
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching muhurtham: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching muhurtham: {str(e)}")
+    
+    return {
+        'place': {'latitude': request.latitude, 'longitude': request.longitude, 'timezone': request.timezone},
+        'start_date': start.isoformat(),
+        'days': request.days,
+        'purpose': request.purpose,
+        'constraints': constraints,
+        'windows': windows,
+        'day_table': tables.day_table()
+    }
+
+
+@app.get("/api/daily-horoscope")
+async def daily_horoscope(
+    request: Request,
+    rasi: Optional[int] = Query(None, ge=1, le=12, description="Natal Moon rasi (1-12)"),
+    nakshatra: Optional[int] = Query(None, ge=1, le=27, description="Birth nakshatra (1-27)"),
+    date: Optional[str] = Query(None, description="Forecast day (YYYY-MM-DD, default today in India)"),
+    ayanamsa: str = Query(DEFAULT_AYANAMSA, description="Ayanamsa model")
+):
+    """
+    Daily horoscope for a Moon rasi and/or birth nakshatra
+    
+    Forecasts for all rasis and nakshatras are materialized once per day
+    from a single transit computation; responses carry ETag and
+    Cache-Control headers so clients and CDNs can reuse them.
+    """
+    if rasi is None and nakshatra is None:
+        raise HTTPException(status_code=422, detail="Give a rasi, a nakshatra or both")
+    if ayanamsa not in AYANAMSA_MODELS:
+        raise HTTPException(status_code=422, detail=f"Ayanamsa must be one of: {', '.join(AYANAMSA_MODELS)}")
+    try:
+        day = datetime.strptime(date, '%Y-%m-%d').date() if date else forecast_today()
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Date must be in YYYY-MM-DD format")
+    first, last = forecast_window()
+    if not first <= day <= last:
+        raise HTTPException(status_code=422, detail=f"Date must be between {first} and {last}")
+    
+    try:
+        body, etag = await asyncio.to_thread(
+            get_daily_store(astrology).response, day, rasi, nakshatra, ayanamsa
+        )
+    except Exception as e:
+        logger.error(f"Error building daily horoscope: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error building daily horoscope: {str(e)}")
+    
+    max_age = seconds_until_next_day(datetime.now(timezone.utc), day) if day >= forecast_today() else 86400
+    headers = {'ETag': etag, 'Cache-Control': f'public, max-age={max_age}'}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+def require_chart_store():
+    store = get_chart_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Chart store is not configured (set CHART_STORE_PATH)")
+    return store
+
+
+@app.get("/api/charts")
+async def search_charts(
+    lagna_rasi: Optional[int] = Query(None, ge=1, le=12),
+    moon_rasi: Optional[int] = Query(None, ge=1, le=12),
+    moon_nakshatra: Optional[int] = Query(None, ge=1, le=27),
+    moon_pada: Optional[int] = Query(None, ge=1, le=4),
+    first_dasha_lord: Optional[str] = Query(None, description="Dasha lord at birth, e.g. Venus"),
+    mangal_dosha: Optional[bool] = Query(None),
+    kala_sarpa_dosha: Optional[bool] = Query(None),
+    pitra_dosha: Optional[bool] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
+    """Stored charts matching indexed attributes (ids and attributes only)"""
+    store = require_chart_store()
+    filters = dict(lagna_rasi=lagna_rasi, moon_rasi=moon_rasi, moon_nakshatra=moon_nakshatra,
+                   moon_pada=moon_pada, first_dasha_lord=first_dasha_lord, mangal_dosha=mangal_dosha,
+                   kala_sarpa_dosha=kala_sarpa_dosha, pitra_dosha=pitra_dosha)
+    return {
+        'total': store.count(**filters),
+        'charts': store.query(limit=limit, offset=offset, **filters)
+    }
+
+
+@app.get("/api/charts/stats")
+async def chart_stats(by: str = Query(..., description=f"Attribute to group by: {', '.join(INDEXED_COLUMNS)}")):
+    """Number of stored charts per value of an indexed attribute"""
+    store = require_chart_store()
+    try:
+        counts = store.distribution(by)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {'by': by, 'total': sum(counts.values()), 'counts': counts}
+
+
+@app.get("/api/charts/{chart_id}")
+async def stored_chart(chart_id: str, request: Request):
+    """A stored chart by its content-hash id"""
+    chart = require_chart_store().get(chart_id)
+    if chart is None:
+        raise HTTPException(status_code=404, detail="Chart not found")
+    return chart_response(request, {**chart, 'chart_id': chart_id})
+
+
+@app.get("/api/chart-codes")
+async def get_chart_codes(request: Request):
+    """
+    Lookup table for the integer codes in MessagePack chart responses. It only
+    changes with its version, so clients can cache it and revalidate by ETag.
+    """
+    headers = {'ETag': CHART_CODES_ETAG, 'Cache-Control': 'public, max-age=86400', 'Vary': 'Accept'}
+    if request.headers.get('if-none-match') == CHART_CODES_ETAG:
+        return Response(status_code=304, headers=headers)
+    if prefers_msgpack(request.headers.get('accept')):
+        return ChartMsgPackResponse(chart_codes, headers=headers)
+    return ChartJSONResponse(chart_codes, headers=headers)
+
+
+@app.get("/api/chart.svg", dependencies=[admitted('chart-svg')])
+async def chart_svg(
+    request: Request,
+    date: str = Query(..., description="Birth date in YYYY-MM-DD format"),
+    time: str = Query(..., description="Birth time in HH:MM format (24-hour)"),
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    timezone: str = Query("Asia/Kolkata"),
+    place: Optional[str] = Query(None, description="Birth place name, instead of coordinates"),
+    ayanamsa: str = Query(DEFAULT_AYANAMSA),
+    node: str = Query(DEFAULT_NODE),
+    varga: str = Query('D1', description=f"Chart to draw: {', '.join(CHART_VARGAS)}"),
+    style: str = Query(DEFAULT_STYLE, description=f"Chart style: {', '.join(STYLES)}"),
+    lang: str = Query(DEFAULT_LANGUAGE, description=f"Label language: {', '.join(LANGUAGES)}")
+):
+    """
+    Rasi (or varga) chart as SVG, for sharing and PDFs. Renders are cached by
+    the birth input's content hash, and the ETag lets clients skip them entirely.
+    """
+    varga = varga.upper()
+    if varga not in CHART_VARGAS:
+        raise HTTPException(status_code=422, detail=f"Varga must be one of: {', '.join(CHART_VARGAS)}")
+    if style not in STYLES:
+        raise HTTPException(status_code=422, detail=f"Style must be one of: {', '.join(STYLES)}")
+    if lang not in LANGUAGES:
+        raise HTTPException(status_code=422, detail=f"Language must be one of: {', '.join(LANGUAGES)}")
+    try:
+        details = BirthDetails(date=date, time=time, latitude=latitude, longitude=longitude, timezone=timezone,
+                               place=place, ayanamsa=ayanamsa, node=node)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    cid = chart_id(birth_input_of(details))
+    key = f"svg:{SVG_VERSION}:{cid}:{varga}:{style}:{lang}"
+    headers = {'ETag': f'"{cid}-{varga}-{style}-{lang}-{SVG_VERSION}"', 'Cache-Control': 'public, max-age=86400'}
+    if request.headers.get('if-none-match') == headers['ETag']:
+        return Response(status_code=304, headers=headers)
+    
+    def build():
+        fields = ['ascendant', 'planetary_positions'] + (['vargas'] if varga != 'D1' else [])
+        chart, _ = compute_chart(details, [varga] if varga != 'D1' else None, fields)
+        return render_chart_svg(chart, varga, style, lang, caption=[f"{details.date} {details.time}"])
+    
+    try:
+        svg = await single_flight.run(key, get_result_cache().get_or_compute, key, build, str.encode, bytes.decode)
+    except Exception as e:
+        logger.error(f"Error rendering chart SVG: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error rendering chart: {str(e)}")
+    return Response(content=svg, media_type='image/svg+xml', headers=headers)
+
+
 @app.get("/api/nakshatras")
 async def get_nakshatra_info():
     """Get information about all 27 nakshatras"""
@@ -325,6 +1043,103 @@ async def get_zodiac_signs():
     }
 
 
+@app.get("/api/ayanamsa-models")
+async def get_ayanamsa_models():
+    """List the selectable ayanamsa models"""
+    return {
+        'default': DEFAULT_AYANAMSA,
+        'models': [
+            {'id': key, 'name': model['name'], 'description': model['description']}
+            for key, model in AYANAMSA_MODELS.items()
+        ]
+    }
+
+
+@app.get("/api/places")
+async def search_places(
+    q: str = Query(..., min_length=1, description="Place name or prefix"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """
+    Autocomplete birth places from the offline gazetteer
+    
+    Returns latitude, longitude and timezone for each match, ready to be
+    used in any birth details request.
+    """
+    places = get_gazetteer().search(q, limit=limit)
+    return {'query': q, 'count': len(places), 'places': places}
+
+
+@app.get("/api/places/nearest")
+async def nearest_places(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    limit: int = Query(1, ge=1, le=20)
+):
+    """Reverse lookup: the places closest to a coordinate"""
+    places = get_gazetteer().nearest(latitude, longitude, k=limit)
+    return {'latitude': latitude, 'longitude': longitude, 'places': places}
+
+
+@app.get("/debug/profile", response_class=PlainTextResponse)
+async def debug_profile(
+    seconds: float = Query(5.0, gt=0, le=MAX_PROFILE_SECONDS, description="Profiling window"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Sample the stacks of this worker for a window of time (admin only)
+    
+    Returns collapsed stacks (``frame;frame;frame count``) suitable for
+    flamegraph.pl or speedscope. Requests served during the window are
+    included in the profile.
+    """
+    require_admin(x_admin_token)
+    if profiler.busy:
+        raise HTTPException(status_code=409, detail="A profiling session is already running")
+    
+    try:
+        result = await asyncio.to_thread(profiler.sample, seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    logger.info(f"Profiled worker for {seconds}s ({result['samples']} samples)")
+    return PlainTextResponse(
+        profiler.to_collapsed(result),
+        headers={'X-Profile-Samples': str(result['samples'])}
+    )
+
+
+@app.get("/debug/cache")
+async def debug_cache(x_admin_token: Optional[str] = Header(None)):
+    """Hit, miss and stampede counters of the result cache tiers and request coalescing (admin only)"""
+    require_admin(x_admin_token)
+    return {**get_result_cache().stats(), 'single_flight': single_flight.stats()}
+
+
+@app.get("/debug/admission")
+async def debug_admission(x_admin_token: Optional[str] = Header(None)):
+    """Admitted, queued and shed request counts per calculation route (admin only)"""
+    require_admin(x_admin_token)
+    return admission_controller.stats()
+
+
+@app.get("/debug/transit-stream")
+async def debug_transit_stream(x_admin_token: Optional[str] = Header(None)):
+    """Subscribers, cities and per-tick compute and fan-out time of the live transit stream (admin only)"""
+    require_admin(x_admin_token)
+    return transit_hub.stats()
+
+
+@app.get("/debug/slow-requests")
+async def debug_slow_requests(x_admin_token: Optional[str] = Header(None)):
+    """Recent requests slower than the SLOW_REQUEST_MS threshold (admin only)"""
+    require_admin(x_admin_token)
+    return {
+        'threshold_ms': slow_request_log.threshold_ms,
+        'requests': slow_request_log.entries()
+    }
+
+
 def calculate_compatibility_score(chart1: Dict, chart2: Dict) -> Dict:
     """Calculate compatibility score between two charts"""
     
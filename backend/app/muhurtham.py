@@ -0,0 +1,332 @@
+"""
+Muhurtham Finder
+Auspicious windows as intersections of tithi, nakshatra, vara and lagna intervals
+with Rahu Kalam, Yamagandam and Chandrashtama removed
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from skyfield import almanac
+from skyfield.api import wgs84
+
+from app.ayanamsa import DEFAULT_AYANAMSA
+from app.timezones import timezone_resolver
+from app.transit_sweep import TransitTimeline
+
+MAX_SEARCH_DAYS = 180
+
+# Sampling steps (days); crossings are linearly interpolated between samples,
+# which keeps tithi/nakshatra edges within a minute and lagna edges within seconds
+LUNI_SOLAR_STEP = 2 / 24
+LAGNA_STEP = 2 / 1440
+
+TITHIS = [
+    ('Prathamai', 'பிரதமை'), ('Dvitiyai', 'துவிதியை'), ('Tritiyai', 'திருதியை'),
+    ('Chaturthi', 'சதுர்த்தி'), ('Panchami', 'பஞ்சமி'), ('Shashti', 'சஷ்டி'),
+    ('Saptami', 'சப்தமி'), ('Ashtami', 'அஷ்டமி'), ('Navami', 'நவமி'),
+    ('Dasami', 'தசமி'), ('Ekadasi', 'ஏகாதசி'), ('Dvadasi', 'துவாதசி'),
+    ('Trayodasi', 'திரயோதசி'), ('Chaturdasi', 'சதுர்த்தசி'),
+]
+PAURNAMI = ('Pournami', 'பௌர்ணமி')
+AMAVASAI = ('Amavasai', 'அமாவாசை')
+
+# Vara numbers run from Sunday (0) to Saturday (6)
+VARAS = [
+    ('Sunday', 'ஞாயிறு'), ('Monday', 'திங்கள்'), ('Tuesday', 'செவ்வாய்'),
+    ('Wednesday', 'புதன்'), ('Thursday', 'வியாழன்'), ('Friday', 'வெள்ளி'),
+    ('Saturday', 'சனி'),
+]
+
+# Which eighth of the daytime (1-8, from sunrise) is Rahu Kalam / Yamagandam, per vara
+RAHU_KALAM_PART = (8, 2, 7, 5, 6, 4, 3)
+YAMAGANDAM_PART = (5, 4, 3, 2, 1, 7, 6)
+
+# Common defaults per purpose; any constraint can be overridden per request.
+# Tithis are numbered 1-30 (16-30 Krishna paksha), nakshatras 1-27, lagnas by rasi.
+MUHURTHAM_PRESETS = {
+    'marriage': {
+        'tithis': (2, 3, 5, 7, 10, 11, 13, 17, 18, 20, 22, 25),
+        'nakshatras': (4, 5, 10, 12, 13, 15, 17, 19, 21, 26, 27),
+        'varas': (1, 3, 4, 5),
+        'lagnas': (2, 3, 6, 7, 9, 12),
+    },
+    'griha_pravesam': {
+        'tithis': (2, 3, 5, 7, 10, 11, 13),
+        'nakshatras': (4, 5, 12, 14, 17, 21, 23, 24, 26, 27),
+        'varas': (1, 3, 4, 5),
+        'lagnas': (2, 5, 8, 11),
+    },
+}
+
+CONSTRAINT_RANGES = {'tithis': 30, 'nakshatras': 27, 'varas': 7, 'lagnas': 12}
+
+
+class Track:
+    """Piecewise-constant label over time: labels[i] holds on [edges[i], edges[i + 1])"""
+
+    def __init__(self, edges: np.ndarray, labels: np.ndarray):
+        self.edges = np.asarray(edges, dtype=float)
+        self.labels = np.asarray(labels)
+
+    def intervals(self, allowed: Optional[Iterable[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(starts, ends) of the pieces whose label is allowed (all pieces when None)"""
+        keep = np.ones(len(self.labels), dtype=bool) if allowed is None else np.isin(self.labels, list(allowed))
+        return self.edges[:-1][keep], self.edges[1:][keep]
+
+    def at(self, jd: np.ndarray) -> np.ndarray:
+        idx = np.searchsorted(self.edges, jd, side='right') - 1
+        return self.labels[np.clip(idx, 0, len(self.labels) - 1)]
+
+
+def _unwrap(degrees: np.ndarray) -> np.ndarray:
+    return degrees[0] + np.concatenate([[0.0], np.cumsum((np.diff(degrees) + 180) % 360 - 180)])
+
+
+def _monotonic_track(jd: np.ndarray, unwrapped: np.ndarray, width: float, count: int,
+                     lo: float, hi: float) -> Track:
+    """Track of floor(value / width) for an increasing quantity, labelled 1..count"""
+    first, last = int(np.floor(unwrapped[0] / width)), int(np.floor(unwrapped[-1] / width))
+    crossings = np.interp(np.arange(first + 1, last + 1) * width, unwrapped, jd)
+    labels = np.arange(first, last + 1) % count + 1
+    # Keep only the pieces overlapping [lo, hi)
+    a = np.searchsorted(crossings, lo, side='right')
+    b = np.searchsorted(crossings, hi, side='left')
+    return Track(np.concatenate([[lo], crossings[a:b], [hi]]), labels[a:b + 1])
+
+
+def _complement(starts: np.ndarray, ends: np.ndarray, lo: float, hi: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Gaps between sorted disjoint intervals within [lo, hi)"""
+    gap_starts = np.concatenate([[lo], ends])
+    gap_ends = np.concatenate([starts, [hi]])
+    keep = gap_ends > gap_starts
+    return gap_starts[keep], gap_ends[keep]
+
+
+def intersect(interval_sets: Sequence[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Intersection of several lists of sorted disjoint intervals by one sweep
+    over their edges. Adjacent intervals of one list are not merged, so the
+    result is split wherever any list has an edge.
+    """
+    k = len(interval_sets)
+    times = np.concatenate([np.concatenate([s, e]) for s, e in interval_sets])
+    deltas = np.concatenate([np.r_[np.ones(len(s)), -np.ones(len(e))] for s, e in interval_sets])
+    # At equal times, closing edges come before opening ones
+    order = np.lexsort((deltas, times))
+    times, depth = times[order], np.cumsum(deltas[order])
+    inside = (depth[:-1] == k) & (times[1:] > times[:-1])
+    return times[:-1][inside], times[1:][inside]
+
+
+def tithi_info(number: int) -> Dict:
+    if number == 15:
+        name = PAURNAMI
+    elif number == 30:
+        name = AMAVASAI
+    else:
+        name = TITHIS[(number - 1) % 15]
+    return {
+        'number': number,
+        'name': name[0],
+        'tamil': name[1],
+        'paksha': 'Shukla' if number <= 15 else 'Krishna',
+    }
+
+
+class PanchangamTables:
+    """
+    Per-day sunrise, sunset, Rahu Kalam and Yamagandam for a place, plus
+    tithi, nakshatra, Moon rasi, vara and lagna tracks over the same span
+    """
+
+    def __init__(self, engine, latitude: float, longitude: float, timezone_str: str,
+                 start: date, days: int, ayanamsa: str = DEFAULT_AYANAMSA):
+        if not 1 <= days <= MAX_SEARCH_DAYS:
+            raise ValueError(f"Search span must be between 1 and {MAX_SEARCH_DAYS} days")
+        self.engine = engine
+        self.latitude = latitude
+        self.longitude = longitude
+        self.timezone = timezone_str
+        self.dates = [start + timedelta(days=i) for i in range(days)]
+        ts = engine.ts
+
+        # Local midnights bound each civil day; JD TT and UTC seconds for each
+        local = np.arange(np.datetime64(start), np.datetime64(start + timedelta(days=days + 1)))
+        utc = timezone_resolver.to_utc(local.astype('datetime64[s]'), timezone_str).astype(np.int64)
+        self.midnight_seconds = utc
+        self.midnights = ts.utc(1970, 1, 1, 0, 0, utc.astype(float)).tt
+        lo, hi = self.midnights[0], self.midnights[-1]
+        self.lo, self.hi = lo, hi
+
+        self._day_tables(engine, days)
+
+        timeline = TransitTimeline(engine, lo, hi, planets=('Sun', 'Moon'),
+                                   step_days=LUNI_SOLAR_STEP, ayanamsa=ayanamsa)
+        sun, moon = timeline.longitudes['Sun'], timeline.longitudes['Moon']
+        self.tracks = {
+            'tithi': _monotonic_track(timeline.jd, moon - sun, 12.0, 30, lo, hi),
+            'nakshatra': _monotonic_track(timeline.jd, moon, 360 / 27, 27, lo, hi),
+            'moon_rasi': _monotonic_track(timeline.jd, moon, 30.0, 12, lo, hi),
+            'lagna': self._lagna_track(engine, ayanamsa),
+            'vara': Track(np.concatenate([[lo], self.sunrise, [hi]]),
+                          np.concatenate([[(self.weekdays[0] - 1) % 7], self.weekdays])),
+        }
+
+    def _day_tables(self, engine, days: int):
+        observer = engine.eph['earth'] + wgs84.latlon(self.latitude, self.longitude)
+        ts = engine.ts
+        start, end = ts.tt_jd(self.lo), ts.tt_jd(self.hi)
+
+        rises, rose = almanac.find_risings(observer, engine.eph['sun'], start, end)
+        sets, did_set = almanac.find_settings(observer, engine.eph['sun'], start, end)
+        rise_day = np.searchsorted(self.midnights, rises.tt, side='right') - 1
+        set_day = np.searchsorted(self.midnights, sets.tt, side='right') - 1
+        if not (rose.all() and did_set.all()
+                and (np.bincount(rise_day, minlength=days) == 1).all()
+                and (np.bincount(set_day, minlength=days) == 1).all()):
+            raise ValueError("The Sun must rise and set every day at this latitude")
+
+        self.sunrise = rises.tt
+        self.sunset = sets.tt
+        self.weekdays = np.array([(d.weekday() + 1) % 7 for d in self.dates])
+        part = (self.sunset - self.sunrise) / 8
+        rahu = np.array(RAHU_KALAM_PART)[self.weekdays] - 1
+        yama = np.array(YAMAGANDAM_PART)[self.weekdays] - 1
+        self.rahu_kalam = (self.sunrise + rahu * part, self.sunrise + (rahu + 1) * part)
+        self.yamagandam = (self.sunrise + yama * part, self.sunrise + (yama + 1) * part)
+
+    def _lagna_track(self, engine, ayanamsa: str) -> Track:
+        ts = engine.ts
+        jd = np.append(np.arange(self.lo, self.hi, LAGNA_STEP), self.hi)
+        t = ts.tt_jd(jd)
+        # GAST = GMST + equation of the equinoxes; the latter changes by well
+        # under a second per day, so daily anchors avoid nutation per sample
+        anchors = ts.tt_jd(np.append(self.midnights, self.hi + 1))
+        equinoxes = (anchors.gast - anchors.gmst + 12) % 24 - 12
+        gast = t.gmst + np.interp(jd, anchors.tt, equinoxes)
+        ascendant = engine.ascendant_longitudes(t, self.latitude, self.longitude, ayanamsa, gast_hours=gast)
+        return _monotonic_track(jd, _unwrap(ascendant), 30.0, 12, self.lo, self.hi)
+
+    def to_local(self, jd_tt: np.ndarray) -> List[datetime]:
+        """Naive local datetimes (to the minute) for instants in the table span"""
+        seconds = np.interp(jd_tt, self.midnights, self.midnight_seconds.astype(float))
+        seconds = np.round(seconds / 60) * 60
+        offsets = timezone_resolver.table(self.timezone).utc_to_local_offsets(seconds)
+        local = (seconds + offsets).astype(np.int64).astype('datetime64[s]')
+        return local.astype(datetime).tolist()
+
+    def day_table(self) -> List[Dict]:
+        """Sunrise, sunset, Rahu Kalam and Yamagandam per civil day"""
+        fmt = lambda values: [d.strftime('%H:%M') for d in self.to_local(values)]
+        columns = [fmt(self.sunrise), fmt(self.sunset), fmt(self.rahu_kalam[0]), fmt(self.rahu_kalam[1]),
+                   fmt(self.yamagandam[0]), fmt(self.yamagandam[1])]
+        return [
+            {
+                'date': day.isoformat(),
+                'vara': VARAS[self.weekdays[i]][0],
+                'sunrise': columns[0][i],
+                'sunset': columns[1][i],
+                'rahu_kalam': f"{columns[2][i]}-{columns[3][i]}",
+                'yamagandam': f"{columns[4][i]}-{columns[5][i]}",
+            }
+            for i, day in enumerate(self.dates)
+        ]
+
+
+def resolve_constraints(purpose: Optional[str] = None, **overrides) -> Dict[str, Optional[Tuple[int, ...]]]:
+    """Preset constraints for a purpose with per-request overrides, validated"""
+    if purpose is not None and purpose not in MUHURTHAM_PRESETS:
+        raise ValueError(f"Unknown purpose '{purpose}'. Choose from: {', '.join(MUHURTHAM_PRESETS)}")
+    constraints = dict(MUHURTHAM_PRESETS.get(purpose, {}))
+    for name, size in CONSTRAINT_RANGES.items():
+        values = overrides.get(name)
+        if values is not None:
+            constraints[name] = tuple(values)
+        values = constraints.get(name)
+        low = 0 if name == 'varas' else 1
+        high = size - 1 if name == 'varas' else size
+        if values is not None and any(not low <= v <= high for v in values):
+            raise ValueError(f"{name} must be between {low} and {high}")
+        constraints[name] = values
+    return constraints
+
+
+def find_muhurthams(tables: PanchangamTables, purpose: Optional[str] = None,
+                    tithis: Optional[Sequence[int]] = None, nakshatras: Optional[Sequence[int]] = None,
+                    varas: Optional[Sequence[int]] = None, lagnas: Optional[Sequence[int]] = None,
+                    avoid_rahu_kalam: bool = True, avoid_yamagandam: bool = True,
+                    moon_rasi: Optional[int] = None, min_minutes: float = 30) -> List[Dict]:
+    """
+    Windows in which every constraint holds, split at each tithi, nakshatra,
+    vara and lagna change so each window has a single panchangam reading
+    """
+    constraints = resolve_constraints(purpose, tithis=tithis, nakshatras=nakshatras,
+                                      varas=varas, lagnas=lagnas)
+    tracks = tables.tracks
+    sets = [
+        tracks['tithi'].intervals(constraints['tithis']),
+        tracks['nakshatra'].intervals(constraints['nakshatras']),
+        tracks['vara'].intervals(constraints['varas']),
+        tracks['lagna'].intervals(constraints['lagnas']),
+    ]
+    if moon_rasi is not None:
+        if not 1 <= moon_rasi <= 12:
+            raise ValueError("Moon rasi must be between 1 and 12")
+        chandrashtama = (moon_rasi + 6) % 12 + 1
+        sets.append(tracks['moon_rasi'].intervals(set(range(1, 13)) - {chandrashtama}))
+    if avoid_rahu_kalam:
+        sets.append(_complement(*tables.rahu_kalam, tables.lo, tables.hi))
+    if avoid_yamagandam:
+        sets.append(_complement(*tables.yamagandam, tables.lo, tables.hi))
+
+    starts, ends = intersect(sets)
+    long_enough = (ends - starts) * 1440 >= min_minutes
+    starts, ends = starts[long_enough], ends[long_enough]
+    if not len(starts):
+        return []
+
+    middle = (starts + ends) / 2
+    local_start, local_end = tables.to_local(starts), tables.to_local(ends)
+    readings = {name: tracks[name].at(middle) for name in ('tithi', 'nakshatra', 'vara', 'lagna')}
+    engine = tables.engine
+    windows = []
+    for i in range(len(starts)):
+        nakshatra = engine.NAKSHATRAS[int(readings['nakshatra'][i]) - 1]
+        lagna = int(readings['lagna'][i])
+        vara = int(readings['vara'][i])
+        windows.append({
+            'start': local_start[i].strftime('%Y-%m-%d %H:%M'),
+            'end': local_end[i].strftime('%Y-%m-%d %H:%M'),
+            'duration_minutes': int(round((ends[i] - starts[i]) * 1440)),
+            'vara': {'number': vara, 'name': VARAS[vara][0], 'tamil': VARAS[vara][1]},
+            'tithi': tithi_info(int(readings['tithi'][i])),
+            'nakshatra': {'id': nakshatra['id'], 'name': nakshatra['name'], 'tamil': nakshatra['tamil']},
+            'lagna': {'rasi': lagna, 'rasi_name': engine.RASI_NAMES[lagna]},
+        })
+    return windows
+
+
+_tables: 'OrderedDict[Tuple, PanchangamTables]' = OrderedDict()
+_tables_lock = threading.Lock()
+MAX_CACHED_TABLES = 32
+
+
+def get_panchangam_tables(engine, latitude: float, longitude: float, timezone_str: str,
+                          start: date, days: int, ayanamsa: str = DEFAULT_AYANAMSA) -> PanchangamTables:
+    """Tables for a place and span, reused across searches with different constraints"""
+    key = (round(latitude, 3), round(longitude, 3), timezone_str, start, days, ayanamsa)
+    with _tables_lock:
+        tables = _tables.get(key)
+        if tables is not None:
+            _tables.move_to_end(key)
+            return tables
+    tables = PanchangamTables(engine, latitude, longitude, timezone_str, start, days, ayanamsa)
+    with _tables_lock:
+        _tables[key] = tables
+        while len(_tables) > MAX_CACHED_TABLES:
+            _tables.popitem(last=False)
+    return tables
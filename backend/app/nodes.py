@@ -0,0 +1,93 @@
+"""
+Lunar Nodes (Rahu/Ketu)
+Mean node polynomial and a tabulated true node, both usable on arrays
+"""
+
+import threading
+from typing import Optional, Union
+
+import numpy as np
+
+J2000 = 2451545.0
+
+NODE_TYPES = ('mean', 'true')
+DEFAULT_NODE = 'mean'
+
+# True-node table coverage and resolution (Julian days TT)
+TABLE_START_JD = 2415020.5  # 1900-01-01
+TABLE_END_JD = 2488434.5    # 2101-01-01
+TABLE_STEP_DAYS = 0.25
+
+
+def mean_node(jd_tt: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """Tropical longitude of the Moon's mean ascending node (degrees)"""
+    T = (jd_tt - J2000) / 36525.0  # Julian centuries from J2000
+    omega = 125.04452 - 1934.136261 * T + 0.0020708 * T**2 + T**3 / 450000.0
+    return omega % 360
+
+
+def true_node_correction(jd_tt: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """
+    True minus mean node (degrees) from the principal periodic terms of the
+    lunar theory (Meeus, Astronomical Algorithms, ch. 47). The remaining
+    short-period wobble of the osculating node is under ~0.3°.
+    """
+    T = (np.asarray(jd_tt, dtype=float) - J2000) / 36525.0
+    D = np.radians(297.8501921 + 445267.1114034 * T - 0.0018819 * T**2 + T**3 / 545868.0)
+    M = np.radians(357.5291092 + 35999.0502909 * T - 0.0001536 * T**2 + T**3 / 24490000.0)
+    Mp = np.radians(134.9633964 + 477198.8675055 * T + 0.0087414 * T**2 + T**3 / 69699.0)
+    F = np.radians(93.2720950 + 483202.0175233 * T - 0.0036539 * T**2 - T**3 / 3526000.0)
+    return (-1.4979 * np.sin(2 * (D - F))
+            - 0.1500 * np.sin(M)
+            - 0.1226 * np.sin(2 * D)
+            + 0.1176 * np.sin(2 * F)
+            - 0.0801 * np.sin(2 * (Mp - F)))
+
+
+class TrueNodeTable:
+    """Precomputed true-node correction, interpolated instead of re-evaluated"""
+
+    def __init__(self, start_jd: float = TABLE_START_JD, end_jd: float = TABLE_END_JD,
+                 step_days: float = TABLE_STEP_DAYS):
+        self.start_jd = start_jd
+        self.end_jd = end_jd
+        self.step_days = step_days
+        self._table: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @property
+    def table(self) -> np.ndarray:
+        if self._table is None:
+            with self._lock:
+                if self._table is None:
+                    n = int(round((self.end_jd - self.start_jd) / self.step_days)) + 1
+                    grid = self.start_jd + self.step_days * np.arange(n)
+                    self._table = true_node_correction(grid)
+        return self._table
+
+    def correction(self, jd_tt: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        table = self.table
+        jd = np.asarray(jd_tt, dtype=float)
+
+        pos = (jd - self.start_jd) / self.step_days
+        idx = np.clip(np.floor(pos).astype(np.int64), 0, len(table) - 2)
+        frac = pos - idx
+        result = table[idx] + (table[idx + 1] - table[idx]) * frac
+
+        outside = (jd < self.start_jd) | (jd > self.end_jd)
+        if np.any(outside):
+            result = np.where(outside, true_node_correction(jd), result)
+
+        return float(result) if result.ndim == 0 else result
+
+
+true_node_table = TrueNodeTable()
+
+
+def lunar_node_longitude(jd_tt: Union[float, np.ndarray], node: str = DEFAULT_NODE) -> Union[float, np.ndarray]:
+    """Tropical longitude of Rahu (ascending node) for a mean or true node"""
+    if node == 'mean':
+        return mean_node(jd_tt)
+    if node == 'true':
+        return (mean_node(jd_tt) + true_node_table.correction(jd_tt)) % 360
+    raise ValueError(f"Unknown node type '{node}'. Choose from: {', '.join(NODE_TYPES)}")
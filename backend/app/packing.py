@@ -0,0 +1,38 @@
+"""
+MessagePack Encoding
+Binary encoding for API payloads with the msgpack package, extended to the
+types charts hold
+"""
+
+import io
+from datetime import date, datetime
+from typing import Any, Iterator
+
+import msgpack
+import numpy as np
+
+
+def _default(value: Any):
+    """Types charts may hold that MessagePack does not encode natively"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+def packb(value: Any) -> bytes:
+    """MessagePack bytes; dict keys keep their type, so house numbers stay ints"""
+    return msgpack.packb(value, default=_default, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    """Decoded MessagePack value: str for str, bytes for bin, int keys as ints"""
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def unpack_stream(data: bytes) -> Iterator[Any]:
+    """Each value of a stream of concatenated MessagePack values"""
+    yield from msgpack.Unpacker(io.BytesIO(data), raw=False, strict_map_key=False)
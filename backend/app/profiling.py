@@ -0,0 +1,163 @@
+"""
+Profiling and Slow-Request Diagnostics
+Sampling profiler for live workers and per-stage timings of chart requests
+"""
+
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Requests slower than this (milliseconds) are recorded in the slow-request log
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '1000'))
+
+# Number of slow requests kept in memory for /debug/slow-requests
+SLOW_REQUEST_LOG_SIZE = int(os.environ.get('SLOW_REQUEST_LOG_SIZE', '100'))
+
+# Upper bound for a single profiling window (seconds)
+MAX_PROFILE_SECONDS = 60.0
+
+_current_timings: contextvars.ContextVar = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Inputs and per-stage timings collected while serving one request"""
+
+    def __init__(self):
+        self.inputs: Dict = {}
+        self.stages: List[Dict] = []
+
+    def add_stage(self, name: str, elapsed_ms: float):
+        self.stages.append({'stage': name, 'ms': round(elapsed_ms, 3)})
+
+    def to_dict(self) -> Dict:
+        return {'inputs': dict(self.inputs), 'stages': list(self.stages)}
+
+
+def start_request_timings() -> RequestTimings:
+    """Attach a fresh timings collector to the current request context"""
+    timings = RequestTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def record_inputs(**inputs):
+    """Record calculation inputs for the current request (no-op outside a request)"""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.inputs.update(
+            {k: (v.isoformat() if hasattr(v, 'isoformat') else v) for k, v in inputs.items()}
+        )
+
+
+@contextmanager
+def stage(name: str):
+    """Time a calculation stage and attach it to the current request, if any"""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_stage(name, (time.perf_counter() - start) * 1000)
+
+
+class SlowRequestLog:
+    """Bounded log of requests whose duration exceeded a threshold"""
+
+    def __init__(self, threshold_ms: float = SLOW_REQUEST_MS, maxlen: int = SLOW_REQUEST_LOG_SIZE):
+        self.threshold_ms = threshold_ms
+        self._entries = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, path: str, duration_ms: float,
+                timings: Optional[RequestTimings] = None) -> bool:
+        """Record the request if it was slow; returns True when it was logged"""
+        if duration_ms < self.threshold_ms:
+            return False
+
+        entry = {
+            'timestamp': time.time(),
+            'method': method,
+            'path': path,
+            'duration_ms': round(duration_ms, 3),
+            **(timings.to_dict() if timings else {'inputs': {}, 'stages': []})
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+        logger.warning(
+            f"Slow request {method} {path} took {duration_ms:.1f} ms "
+            f"inputs={entry['inputs']} stages={entry['stages']}"
+        )
+        return True
+
+    def entries(self) -> List[Dict]:
+        with self._lock:
+            return list(self._entries)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples the stacks of every thread in the worker.
+
+    Output is in collapsed-stack format (one ``frame;frame;frame count`` line per
+    unique stack) which flamegraph.pl and speedscope read directly.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(parts))
+
+    def sample(self, seconds: float) -> Dict:
+        """Sample all threads for ``seconds`` and return collapsed stacks"""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError('A profiling session is already running')
+
+        try:
+            own_ident = threading.get_ident()
+            stacks = Counter()
+            samples = 0
+            deadline = time.perf_counter() + seconds
+
+            while time.perf_counter() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident != own_ident:
+                        stacks[self._collapse(frame)] += 1
+                samples += 1
+                time.sleep(self.interval)
+
+            return {'samples': samples, 'interval': self.interval, 'stacks': stacks}
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def to_collapsed(result: Dict) -> str:
+        lines = [f"{stack} {count}" for stack, count in result['stacks'].most_common()]
+        return '\n'.join(lines) + '\n'
+
+
+slow_request_log = SlowRequestLog()
+profiler = SamplingProfiler()
@@ -0,0 +1,85 @@
+"""
+Chart Responses
+JSON rendering for chart payloads that skips FastAPI's jsonable_encoder pass
+and uses orjson when it is installed, and the MessagePack alternative for
+clients that ask for it
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Optional
+
+import numpy as np
+from fastapi.responses import JSONResponse, Response
+
+from app.packing import packb
+
+try:
+    import orjson
+except ImportError:  # the standard library encoder is the fallback
+    orjson = None
+
+
+def _default(value: Any):
+    """Types charts may hold that neither encoder handles natively"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def render_json(content: Any) -> bytes:
+    """Compact UTF-8 JSON; int dict keys (house numbers) become strings"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(',', ':'),
+                      default=_default).encode('utf-8')
+
+
+class ChartJSONResponse(JSONResponse):
+    """Response for chart payloads: return it from an endpoint to bypass jsonable_encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, 'application/x-msgpack', 'application/vnd.msgpack')
+
+
+def prefers_msgpack(accept: Optional[str]) -> bool:
+    """
+    Whether an Accept header asks for MessagePack: a MessagePack type with a
+    q-value no lower than any other named type (wildcards do not compete)
+    """
+    if not accept:
+        return False
+    best_msgpack, best_other = 0.0, 0.0
+    for item in accept.split(','):
+        media_type, *params = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type.lower() in MSGPACK_MEDIA_TYPES:
+            best_msgpack = max(best_msgpack, quality)
+        elif '*' not in media_type:
+            best_other = max(best_other, quality)
+    return best_msgpack > 0 and best_msgpack >= best_other
+
+
+class ChartMsgPackResponse(Response):
+    """MessagePack response; house numbers and other int keys stay ints"""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
@@ -0,0 +1,148 @@
+"""
+Sade Sati and Saturn Cycles
+Saturn rasi intervals precomputed once, queried per natal Moon rasi by interval lookups
+"""
+
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.ayanamsa import DEFAULT_AYANAMSA
+from app.transit_sweep import TransitTimeline
+
+# Requested table span (Julian days TT); clipped to the loaded ephemeris
+TABLE_START_JD = 2415020.5  # 1900-01-01
+TABLE_END_JD = 2488069.5    # 2100-01-01
+
+# Houses of transit Saturn counted from the natal Moon rasi
+SADE_SATI_PHASES = {12: 'rising', 1: 'peak', 2: 'setting'}
+ASHTAMA_HOUSE = 8
+KANTAKA_HOUSES = (4, 7, 10)
+
+
+class SaturnCycleIndex:
+    """Saturn's sidereal rasi as a sorted interval table, one per ayanamsa"""
+
+    def __init__(self, engine, start_jd: float = TABLE_START_JD, end_jd: float = TABLE_END_JD):
+        self.engine = engine
+        # de421 stops in 2053; never sample past the last ephemeris day
+        ephemeris_end = min(seg.spk_segment.end_jd for seg in engine.eph.segments) - 1
+        self.start_jd = start_jd
+        self.end_jd = min(end_jd, ephemeris_end)
+        self._tables: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def table(self, ayanamsa: str = DEFAULT_AYANAMSA) -> Dict:
+        """Interval table: start/end JD, Saturn's rasi and UTC dates for each stay"""
+        table = self._tables.get(ayanamsa)
+        if table is None:
+            with self._lock:
+                table = self._tables.get(ayanamsa)
+                if table is None:
+                    table = self._build(ayanamsa)
+                    self._tables[ayanamsa] = table
+        return table
+
+    def _build(self, ayanamsa: str) -> Dict:
+        timeline = TransitTimeline(self.engine, self.start_jd, self.end_jd,
+                                   planets=('Saturn',), ayanamsa=ayanamsa)
+        ingresses = timeline.ingresses('Saturn')
+        first_rasi = int(timeline.longitudes['Saturn'][0] % 360 // 30) + 1
+
+        starts = np.array([self.start_jd] + [i['jd'] for i in ingresses])
+        ends = np.append(starts[1:], self.end_jd)
+        rasis = np.array([first_rasi] + [i['rasi'] for i in ingresses], dtype=np.int8)
+        dates = self.engine.ts.tt_jd(np.append(starts, self.end_jd)).utc_strftime('%Y-%m-%d')
+        return {
+            'start': starts,
+            'end': ends,
+            'rasi': rasis,
+            'retrograde': np.array([False] + [i['retrograde'] for i in ingresses]),
+            'dates': list(dates),
+        }
+
+    def to_jd(self, when: Union[datetime, str]) -> float:
+        if isinstance(when, str):
+            when = datetime.strptime(when, '%Y-%m-%d')
+        return self.engine.ts.from_datetime(when.replace(tzinfo=timezone.utc)).tt
+
+    def saturn_rasi(self, jd_tt: Union[float, np.ndarray], ayanamsa: str = DEFAULT_AYANAMSA) -> np.ndarray:
+        """Saturn's rasi at the given instants (vectorized interval lookup)"""
+        table = self.table(ayanamsa)
+        jd = np.asarray(jd_tt, dtype=float)
+        if np.any((jd < self.start_jd) | (jd > self.end_jd)):
+            raise ValueError(f"Dates must fall between {table['dates'][0]} and {table['dates'][-1]}")
+        idx = np.searchsorted(table['start'], jd, side='right') - 1
+        return table['rasi'][idx]
+
+    def status(self, moon_rasis: Union[int, Sequence[int]], jd_tt: Union[float, np.ndarray],
+               ayanamsa: str = DEFAULT_AYANAMSA) -> np.ndarray:
+        """'sade_sati', 'ashtama', 'kantaka' or '' for each (moon rasi, instant) pair"""
+        house = (self.saturn_rasi(jd_tt, ayanamsa) - np.asarray(moon_rasis)) % 12 + 1
+        return np.select(
+            [np.isin(house, list(SADE_SATI_PHASES)), house == ASHTAMA_HOUSE, np.isin(house, KANTAKA_HOUSES)],
+            ['sade_sati', 'ashtama', 'kantaka'], ''
+        )
+
+    def periods(self, moon_rasi: int, ayanamsa: str = DEFAULT_AYANAMSA,
+                start_jd: Optional[float] = None, end_jd: Optional[float] = None) -> Dict[str, List[Dict]]:
+        """Sade Sati (with phases), Ashtama and Kantaka Shani periods for one natal Moon rasi"""
+        if not 1 <= int(moon_rasi) <= 12:
+            raise ValueError("Moon rasi must be between 1 and 12")
+        table = self.table(ayanamsa)
+        house = (table['rasi'].astype(int) - int(moon_rasi)) % 12 + 1
+        dates = table['dates']
+        start_jd = self.start_jd if start_jd is None else start_jd
+        end_jd = self.end_jd if end_jd is None else end_jd
+
+        def span(first: int, last: int) -> Dict:
+            return {
+                'start': dates[first],
+                'end': dates[last + 1],
+                'partial': bool(first == 0 or last == len(house) - 1),
+            }
+
+        def overlaps(first: int, last: int) -> bool:
+            return table['start'][first] < end_jd and table['end'][last] > start_jd
+
+        result = {'sade_sati': [], 'ashtama': [], 'kantaka': []}
+
+        # Consecutive stays in the 12th, 1st and 2nd form one Sade Sati, even
+        # when retrograde Saturn steps back and forth between those signs
+        in_sade_sati = np.isin(house, list(SADE_SATI_PHASES))
+        run_id = np.cumsum(np.diff(in_sade_sati.astype(int), prepend=0) != 0)
+        for run in np.unique(run_id[in_sade_sati]):
+            members = np.flatnonzero(run_id == run)
+            first, last = int(members[0]), int(members[-1])
+            if overlaps(first, last):
+                result['sade_sati'].append({
+                    **span(first, last),
+                    'phases': [{'phase': SADE_SATI_PHASES[int(house[i])], **span(i, i)} for i in members]
+                })
+
+        for i in np.flatnonzero(np.isin(house, (ASHTAMA_HOUSE,) + KANTAKA_HOUSES)):
+            i = int(i)
+            if overlaps(i, i):
+                kind = 'ashtama' if house[i] == ASHTAMA_HOUSE else 'kantaka'
+                result[kind].append({**span(i, i), 'house': int(house[i])})
+        return result
+
+    def coverage(self, ayanamsa: str = DEFAULT_AYANAMSA) -> Dict:
+        dates = self.table(ayanamsa)['dates']
+        return {'start': dates[0], 'end': dates[-1]}
+
+
+_index: Optional[SaturnCycleIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_saturn_index(engine) -> SaturnCycleIndex:
+    """Shared Saturn interval index, built on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SaturnCycleIndex(engine)
+    return _index
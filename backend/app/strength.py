@@ -0,0 +1,266 @@
+"""
+Planetary Strength
+Ashtakavarga on 12-bit sign masks and a chart-derived Shadbala
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from app.vargas import varga_signs
+
+SAPTA_GRAHAS = ('Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn')
+CONTRIBUTORS = SAPTA_GRAHAS + ('Ascendant',)
+
+# Benefic places (houses counted from each contributor) for every planet's
+# Bhinnashtakavarga, per Brihat Parashara Hora Shastra
+ASHTAKAVARGA_HOUSES = {
+    'Sun': {
+        'Sun': [1, 2, 4, 7, 8, 9, 10, 11], 'Moon': [3, 6, 10, 11],
+        'Mars': [1, 2, 4, 7, 8, 9, 10, 11], 'Mercury': [3, 5, 6, 9, 10, 11, 12],
+        'Jupiter': [5, 6, 9, 11], 'Venus': [6, 7, 12],
+        'Saturn': [1, 2, 4, 7, 8, 9, 10, 11], 'Ascendant': [3, 4, 6, 10, 11, 12],
+    },
+    'Moon': {
+        'Sun': [3, 6, 7, 8, 10, 11], 'Moon': [1, 3, 6, 7, 10, 11],
+        'Mars': [2, 3, 5, 6, 9, 10, 11], 'Mercury': [1, 3, 4, 5, 7, 8, 10, 11],
+        'Jupiter': [1, 4, 7, 8, 10, 11, 12], 'Venus': [3, 4, 5, 7, 9, 10, 11],
+        'Saturn': [3, 5, 6, 11], 'Ascendant': [3, 6, 10, 11],
+    },
+    'Mars': {
+        'Sun': [3, 5, 6, 10, 11], 'Moon': [3, 6, 11],
+        'Mars': [1, 2, 4, 7, 8, 10, 11], 'Mercury': [3, 5, 6, 11],
+        'Jupiter': [6, 10, 11, 12], 'Venus': [6, 8, 11, 12],
+        'Saturn': [1, 4, 7, 8, 9, 10, 11], 'Ascendant': [1, 3, 6, 10, 11],
+    },
+    'Mercury': {
+        'Sun': [5, 6, 9, 11, 12], 'Moon': [2, 4, 6, 8, 10, 11],
+        'Mars': [1, 2, 4, 7, 8, 9, 10, 11], 'Mercury': [1, 3, 5, 6, 9, 10, 11, 12],
+        'Jupiter': [6, 8, 11, 12], 'Venus': [1, 2, 3, 4, 5, 8, 9, 11],
+        'Saturn': [1, 2, 4, 7, 8, 9, 10, 11], 'Ascendant': [1, 2, 4, 6, 8, 10, 11],
+    },
+    'Jupiter': {
+        'Sun': [1, 2, 3, 4, 7, 8, 9, 10, 11], 'Moon': [2, 5, 7, 9, 11],
+        'Mars': [1, 2, 4, 7, 8, 10, 11], 'Mercury': [1, 2, 4, 5, 6, 9, 10, 11],
+        'Jupiter': [1, 2, 3, 4, 7, 8, 10, 11], 'Venus': [2, 5, 6, 9, 10, 11],
+        'Saturn': [3, 5, 6, 12], 'Ascendant': [1, 2, 4, 5, 6, 7, 9, 10, 11],
+    },
+    'Venus': {
+        'Sun': [8, 11, 12], 'Moon': [1, 2, 3, 4, 5, 8, 9, 11, 12],
+        'Mars': [3, 5, 6, 9, 11, 12], 'Mercury': [3, 5, 6, 9, 11],
+        'Jupiter': [5, 8, 9, 10, 11], 'Venus': [1, 2, 3, 4, 5, 8, 9, 10, 11],
+        'Saturn': [3, 4, 5, 8, 9, 10, 11], 'Ascendant': [1, 2, 3, 4, 5, 8, 9, 11],
+    },
+    'Saturn': {
+        'Sun': [1, 2, 4, 7, 8, 10, 11], 'Moon': [3, 6, 11],
+        'Mars': [3, 5, 6, 10, 11, 12], 'Mercury': [6, 8, 9, 10, 11, 12],
+        'Jupiter': [5, 6, 11, 12], 'Venus': [6, 11, 12],
+        'Saturn': [3, 5, 6, 11], 'Ascendant': [1, 3, 4, 6, 10, 11],
+    },
+}
+
+# BINDU_MASKS[planet, contributor]: bit h-1 set when house h is benefic
+BINDU_MASKS = np.array([
+    [sum(1 << (house - 1) for house in ASHTAKAVARGA_HOUSES[planet][contributor])
+     for contributor in CONTRIBUTORS]
+    for planet in SAPTA_GRAHAS
+], dtype=np.uint16)
+
+SIGN_MASK = 0xFFF
+SIGN_BITS = np.arange(12, dtype=np.uint16)
+
+# Shadbala constants (virupas; 60 virupas = 1 rupa)
+DEEP_EXALTATION = {'Sun': 10.0, 'Moon': 33.0, 'Mars': 298.0, 'Mercury': 165.0,
+                   'Jupiter': 95.0, 'Venus': 357.0, 'Saturn': 200.0}
+NAISARGIKA_BALA = {'Sun': 60.0, 'Moon': 51.43, 'Venus': 42.86, 'Jupiter': 34.29,
+                   'Mercury': 25.71, 'Mars': 17.14, 'Saturn': 8.57}
+# Moolatrikona sign and degree range
+MOOLATRIKONA = {'Sun': (5, 0, 20), 'Moon': (2, 3, 30), 'Mars': (1, 0, 12), 'Mercury': (6, 15, 20),
+                'Jupiter': (9, 0, 10), 'Venus': (7, 0, 15), 'Saturn': (11, 0, 20)}
+PLANET_ENEMIES = {'Sun': ['Venus', 'Saturn'], 'Moon': [], 'Mars': ['Mercury'], 'Mercury': ['Moon'],
+                  'Jupiter': ['Mercury', 'Venus'], 'Venus': ['Sun', 'Moon'], 'Saturn': ['Sun', 'Moon', 'Mars']}
+# Points of greatest directional strength, as houses from the lagna
+DIG_BALA_HOUSE = {'Sun': 10, 'Mars': 10, 'Jupiter': 1, 'Mercury': 1,
+                  'Saturn': 7, 'Moon': 4, 'Venus': 4}
+DREKKANA_GENDER = {'Sun': 0, 'Mars': 0, 'Jupiter': 0, 'Mercury': 1, 'Saturn': 1, 'Moon': 2, 'Venus': 2}
+DIURNAL = ('Sun', 'Jupiter', 'Venus')
+NOCTURNAL = ('Moon', 'Mars', 'Saturn')
+NATURAL_BENEFICS = ('Moon', 'Mercury', 'Jupiter', 'Venus')
+# Whole-sign aspects beyond the 7th
+SPECIAL_ASPECTS = {'Mars': (4, 8), 'Jupiter': (5, 9), 'Saturn': (3, 10)}
+SAPTAVARGAS = ('D1', 'D2', 'D3', 'D7', 'D9', 'D12', 'D30')
+DIGNITY_VIRUPAS = {'moolatrikona': 45.0, 'own': 30.0, 'great_friend': 22.5, 'friend': 15.0,
+                   'neutral': 7.5, 'enemy': 3.75, 'great_enemy': 1.875}
+
+
+def rotate_masks(masks: np.ndarray, signs: np.ndarray) -> np.ndarray:
+    """Rotate 12-bit house masks so bit i means sign i (0 = Aries)"""
+    masks = masks.astype(np.uint32)
+    shift = np.asarray(signs, dtype=np.uint32)
+    return ((masks << shift) | (masks >> ((12 - shift) % 12))) & SIGN_MASK
+
+
+def bhinna_masks(contributor_signs: np.ndarray) -> np.ndarray:
+    """
+    Bindu masks for a (charts, 8) matrix of contributor signs (1-12, in
+    CONTRIBUTORS order): shape (charts, 7 planets, 8 contributors)
+    """
+    signs = np.asarray(contributor_signs, dtype=np.int64) - 1
+    return rotate_masks(BINDU_MASKS[None, :, :], signs[:, None, :])
+
+
+def bindu_counts(masks: np.ndarray) -> np.ndarray:
+    """Bindus per sign: sum the mask bits over the contributor axis"""
+    bits = (masks[..., None] >> SIGN_BITS) & 1
+    return bits.sum(axis=-2).astype(np.int64)
+
+
+def ashtakavarga(contributor_signs: np.ndarray) -> Dict[str, np.ndarray]:
+    """Bhinna (charts, 7, 12) and sarva (charts, 12) Ashtakavarga for a batch"""
+    bhinna = bindu_counts(bhinna_masks(np.atleast_2d(contributor_signs)))
+    return {'bhinna': bhinna, 'sarva': bhinna.sum(axis=1)}
+
+
+def contributor_signs(positions: Dict, ascendant: Dict) -> np.ndarray:
+    """Rasi numbers of the seven grahas and the lagna in CONTRIBUTORS order"""
+    return np.array([positions[p]['rasi'] for p in SAPTA_GRAHAS] + [ascendant['rasi']])
+
+
+def format_ashtakavarga(table: Dict[str, np.ndarray], row: int = 0) -> Dict:
+    """Response section with bindus listed Aries to Pisces"""
+    bhinna = table['bhinna'][row]
+    return {
+        'bhinna': {
+            planet: {'bindus': bhinna[i].tolist(), 'total': int(bhinna[i].sum())}
+            for i, planet in enumerate(SAPTA_GRAHAS)
+        },
+        'sarva': table['sarva'][row].tolist(),
+        'sarva_total': int(table['sarva'][row].sum())
+    }
+
+
+def transit_bindus(ashtakavarga_section: Dict, transit_positions: Dict) -> Dict[str, Dict]:
+    """
+    Score current transits against a natal Ashtakavarga: a graha transiting
+    a sign with 4 or more of its own bindus is favourable
+    """
+    scores = {}
+    for planet in SAPTA_GRAHAS:
+        if planet not in transit_positions:
+            continue
+        rasi = transit_positions[planet]['rasi']
+        bindus = ashtakavarga_section['bhinna'][planet]['bindus'][rasi - 1]
+        scores[planet] = {
+            'rasi': rasi,
+            'bindus': bindus,
+            'sarva_bindus': ashtakavarga_section['sarva'][rasi - 1],
+            'favourable': bindus >= 4
+        }
+    return scores
+
+
+def _arc(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Shortest angular distance in degrees"""
+    d = np.abs(np.asarray(a) - np.asarray(b)) % 360
+    return np.minimum(d, 360 - d)
+
+
+def _dignity(planet: str, sign: int, temporal_friend: bool, rasi_lords: Dict[int, str],
+             planet_friends: Dict[str, List[str]]) -> str:
+    lord = rasi_lords[sign]
+    if lord == planet:
+        return 'own'
+    natural = 1 if lord in planet_friends[planet] else (-1 if lord in PLANET_ENEMIES[planet] else 0)
+    compound = natural + (1 if temporal_friend else -1)
+    return {2: 'great_friend', 1: 'friend', 0: 'neutral', -1: 'enemy', -2: 'great_enemy'}[compound]
+
+
+def shadbala(positions: Dict, ascendant: Dict, local_hours: float,
+             rasi_lords: Dict[int, str], planet_friends: Dict[str, List[str]]) -> Dict[str, Dict]:
+    """
+    Shadbala of the seven grahas from the chart alone: sthana (uchcha,
+    saptavargaja, ojhayugma, kendradi, drekkana), dig, kala (nathonnatha,
+    paksha), naisargika and drik bala. Chesta and the calendar-based kala
+    components need planetary speeds and weekday/year lords and are left out.
+    """
+    longitudes = np.array([positions[p]['longitude'] for p in SAPTA_GRAHAS])
+    rasis = np.array([positions[p]['rasi'] for p in SAPTA_GRAHAS])
+    houses = (rasis - ascendant['rasi']) % 12 + 1
+
+    uchcha = (180 - _arc(longitudes, np.array([DEEP_EXALTATION[p] for p in SAPTA_GRAHAS]))) / 3
+    dig = _arc(longitudes, (ascendant['longitude'] + np.array(
+        [(DIG_BALA_HOUSE[p] - 1) * 30 + 180 for p in SAPTA_GRAHAS])) % 360) / 3
+    kendradi = np.select([np.isin(houses, [1, 4, 7, 10]), np.isin(houses, [2, 5, 8, 11])], [60.0, 30.0], 15.0)
+    decanate = ((longitudes % 30) // 10).astype(int)
+
+    navamsa = varga_signs(longitudes, 'D9')
+    varga_rasis = {v: (rasis if v == 'D1' else varga_signs(longitudes, v)) for v in SAPTAVARGAS}
+
+    sun, moon = positions['Sun']['longitude'], positions['Moon']['longitude']
+    paksha = float(_arc(moon, sun)) / 3  # 0 at new moon, 60 at full moon
+    day_fraction = 1 - abs((local_hours % 24) - 12) / 12  # 1 at noon, 0 at midnight
+
+    result = {}
+    for i, planet in enumerate(SAPTA_GRAHAS):
+        # Saptavargaja: dignity of the planet in each of the seven vargas
+        saptavargaja = 0.0
+        for varga, signs in varga_rasis.items():
+            sign = int(signs[i])
+            mt_sign, mt_start, mt_end = MOOLATRIKONA[planet]
+            if varga == 'D1' and sign == mt_sign and mt_start <= longitudes[i] % 30 < mt_end:
+                saptavargaja += DIGNITY_VIRUPAS['moolatrikona']
+                continue
+            # Temporal friends occupy the 2nd-4th and 10th-12th signs from the planet
+            lord = rasi_lords[sign]
+            distance = (int(rasis[SAPTA_GRAHAS.index(lord)]) - int(rasis[i])) % 12 + 1
+            saptavargaja += DIGNITY_VIRUPAS[_dignity(planet, sign, distance in (2, 3, 4, 10, 11, 12),
+                                                     rasi_lords, planet_friends)]
+
+        odd_wanted = planet not in ('Moon', 'Venus')
+        ojhayugma = sum(15.0 for sign in (rasis[i], navamsa[i]) if (sign % 2 == 1) == odd_wanted)
+        drekkana = 15.0 if DREKKANA_GENDER[planet] == decanate[i] else 0.0
+
+        if planet in DIURNAL:
+            nathonnatha = 60 * day_fraction
+        elif planet in NOCTURNAL:
+            nathonnatha = 60 * (1 - day_fraction)
+        else:
+            nathonnatha = 60.0
+        paksha_bala = paksha if planet in NATURAL_BENEFICS else 60 - paksha
+        if planet == 'Moon':
+            paksha_bala *= 2
+
+        # Drik: a quarter of benefic minus malefic full (whole-sign) aspects received
+        drik = 0.0
+        for j, other in enumerate(SAPTA_GRAHAS):
+            if j == i:
+                continue
+            aspect = (int(rasis[i]) - int(rasis[j])) % 12 + 1
+            if aspect == 7 or aspect in SPECIAL_ASPECTS.get(other, ()):
+                drik += 15.0 if other in NATURAL_BENEFICS else -15.0
+
+        sthana = {
+            'uchcha': float(uchcha[i]),
+            'saptavargaja': saptavargaja,
+            'ojhayugma': ojhayugma,
+            'kendradi': float(kendradi[i]),
+            'drekkana': drekkana
+        }
+        components = {
+            'sthana': sum(sthana.values()),
+            'dig': float(dig[i]),
+            'kala': nathonnatha + paksha_bala,
+            'naisargika': NAISARGIKA_BALA[planet],
+            'drik': drik
+        }
+        total = sum(components.values())
+        result[planet] = {
+            'components': {k: round(v, 2) for k, v in components.items()},
+            'sthana': {k: round(v, 2) for k, v in sthana.items()},
+            'virupas': round(total, 2),
+            'rupas': round(total / 60, 2)
+        }
+
+    for rank, planet in enumerate(sorted(result, key=lambda p: -result[p]['virupas']), start=1):
+        result[planet]['rank'] = rank
+    return result
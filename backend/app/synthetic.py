@@ -0,0 +1,66 @@
+"""
+Synthetic Birth Data Generator
+Seeded, reproducible birth details for load tests, benchmarks and regression data
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+# Birth places weighted roughly by where our users come from
+BIRTH_PLACES = [
+    {'place': 'Chennai', 'latitude': 13.0827, 'longitude': 80.2707, 'timezone': 'Asia/Kolkata', 'weight': 20},
+    {'place': 'Madurai', 'latitude': 9.9252, 'longitude': 78.1198, 'timezone': 'Asia/Kolkata', 'weight': 8},
+    {'place': 'Coimbatore', 'latitude': 11.0168, 'longitude': 76.9558, 'timezone': 'Asia/Kolkata', 'weight': 8},
+    {'place': 'Tiruchirappalli', 'latitude': 10.7905, 'longitude': 78.7047, 'timezone': 'Asia/Kolkata', 'weight': 5},
+    {'place': 'Bengaluru', 'latitude': 12.9716, 'longitude': 77.5946, 'timezone': 'Asia/Kolkata', 'weight': 8},
+    {'place': 'Mumbai', 'latitude': 19.0760, 'longitude': 72.8777, 'timezone': 'Asia/Kolkata', 'weight': 5},
+    {'place': 'Delhi', 'latitude': 28.6139, 'longitude': 77.2090, 'timezone': 'Asia/Kolkata', 'weight': 4},
+    {'place': 'Jaffna', 'latitude': 9.6615, 'longitude': 80.0255, 'timezone': 'Asia/Colombo', 'weight': 4},
+    {'place': 'Colombo', 'latitude': 6.9271, 'longitude': 79.8612, 'timezone': 'Asia/Colombo', 'weight': 4},
+    {'place': 'Singapore', 'latitude': 1.3521, 'longitude': 103.8198, 'timezone': 'Asia/Singapore', 'weight': 4},
+    {'place': 'Kuala Lumpur', 'latitude': 3.1390, 'longitude': 101.6869, 'timezone': 'Asia/Kuala_Lumpur', 'weight': 4},
+    {'place': 'Dubai', 'latitude': 25.2048, 'longitude': 55.2708, 'timezone': 'Asia/Dubai', 'weight': 3},
+    {'place': 'London', 'latitude': 51.5074, 'longitude': -0.1278, 'timezone': 'Europe/London', 'weight': 3},
+    {'place': 'Toronto', 'latitude': 43.6532, 'longitude': -79.3832, 'timezone': 'America/Toronto', 'weight': 3},
+    {'place': 'New York', 'latitude': 40.7128, 'longitude': -74.0060, 'timezone': 'America/New_York', 'weight': 2},
+    {'place': 'Sydney', 'latitude': -33.8688, 'longitude': 151.2093, 'timezone': 'Australia/Sydney', 'weight': 2},
+    {'place': 'Tromsø', 'latitude': 69.6492, 'longitude': 18.9553, 'timezone': 'Europe/Oslo', 'weight': 1},
+]
+
+
+class BirthGenerator:
+    """Reproducible random birth details (same seed, same sequence)"""
+
+    def __init__(self, seed: int = 0, start_year: int = 1950, end_year: int = 2010,
+                 places: Optional[List[Dict]] = None):
+        self.rng = random.Random(seed)
+        self.places = places or BIRTH_PLACES
+        self.weights = [p.get('weight', 1) for p in self.places]
+        self.start = datetime(start_year, 1, 1)
+        self.span_minutes = int((datetime(end_year + 1, 1, 1) - self.start).total_seconds() // 60)
+
+    def birth_datetime(self) -> datetime:
+        """Random local birth time with minute resolution"""
+        return self.start + timedelta(minutes=self.rng.randrange(self.span_minutes))
+
+    def birth_details(self, name: Optional[str] = None) -> Dict:
+        """Random birth in the shape of the API's BirthDetails payload"""
+        place = self.rng.choices(self.places, weights=self.weights)[0]
+        dt = self.birth_datetime()
+        return {
+            'date': dt.strftime('%Y-%m-%d'),
+            'time': dt.strftime('%H:%M'),
+            'latitude': place['latitude'],
+            'longitude': place['longitude'],
+            'timezone': place['timezone'],
+            'name': name,
+            'place': place['place']
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        while True:
+            yield self.birth_details()
+
+    def take(self, n: int) -> List[Dict]:
+        return [self.birth_details() for _ in range(n)]
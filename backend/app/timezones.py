@@ -0,0 +1,175 @@
+"""
+Timezone Resolution Layer
+Cached zone transition tables and vectorized local time -> UTC conversion
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Sequence, Union
+
+import numpy as np
+import pytz
+
+EPOCH = datetime(1970, 1, 1)
+
+# Policies for wall-clock times that occur twice (end of DST)
+#   'standard' - the non-DST reading (pytz is_dst=False, the engine's historical behaviour)
+#   'dst'      - the DST reading (pytz is_dst=True)
+#   'raise'    - raise pytz.AmbiguousTimeError
+AMBIGUOUS_POLICIES = ('standard', 'dst', 'raise')
+
+# Policies for wall-clock times skipped by a forward jump (start of DST)
+#   'standard'      - read with the offset before the jump (pytz is_dst=False)
+#   'dst'           - read with the offset after the jump (pytz is_dst=True)
+#   'shift_forward' - move to the first instant after the jump
+#   'raise'         - raise pytz.NonExistentTimeError
+NONEXISTENT_POLICIES = ('standard', 'dst', 'shift_forward', 'raise')
+
+
+class ZoneTable:
+    """
+    Historical UTC offsets of one zone as int64 second arrays.
+
+    ``transitions[k]`` is the UTC instant from which ``offsets[k]`` applies;
+    entry 0 covers everything before the first real transition.
+    """
+
+    def __init__(self, zone: pytz.BaseTzInfo):
+        self.zone = zone
+        if hasattr(zone, '_utc_transition_times'):
+            transitions = [int((t - EPOCH).total_seconds()) for t in zone._utc_transition_times]
+            transitions[0] = np.iinfo(np.int64).min // 2
+            offsets = [int(info[0].total_seconds()) for info in zone._transition_info]
+            dst = [bool(info[1]) for info in zone._transition_info]
+        else:
+            # StaticTzInfo and UTC have a single fixed offset
+            offset = zone.utcoffset(datetime(2000, 1, 1)) or timedelta(0)
+            transitions = [np.iinfo(np.int64).min // 2]
+            offsets = [int(offset.total_seconds())]
+            dst = [False]
+
+        self.transitions = np.array(transitions, dtype=np.int64)
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.dst = np.array(dst, dtype=bool)
+
+        # Wall-clock window around each transition in which local times are
+        # skipped (offset increases) or repeated (offset decreases)
+        previous = np.concatenate([self.offsets[:1], self.offsets[:-1]])
+        self.previous_offsets = previous
+        self.window_start = self.transitions + np.minimum(previous, self.offsets)
+        self.window_end = self.transitions + np.maximum(previous, self.offsets)
+
+    def utc_offsets(self, local_seconds: np.ndarray, ambiguous: str = 'standard',
+                    nonexistent: str = 'standard') -> np.ndarray:
+        """UTC offsets (seconds) for wall-clock times given as seconds since 1970"""
+        if ambiguous not in AMBIGUOUS_POLICIES:
+            raise ValueError(f"ambiguous must be one of {AMBIGUOUS_POLICIES}")
+        if nonexistent not in NONEXISTENT_POLICIES:
+            raise ValueError(f"nonexistent must be one of {NONEXISTENT_POLICIES}")
+
+        local_seconds = np.asarray(local_seconds, dtype=np.int64)
+        k = np.searchsorted(self.window_start, local_seconds, side='right') - 1
+        k = np.clip(k, 0, len(self.offsets) - 1)
+
+        new = self.offsets[k]
+        old = self.previous_offsets[k]
+        in_window = (k > 0) & (local_seconds < self.window_end[k])
+
+        result = new.copy()
+
+        skipped = in_window & (new > old)
+        if skipped.any():
+            if nonexistent == 'raise':
+                idx = int(np.flatnonzero(skipped)[0])
+                raise pytz.NonExistentTimeError(self._as_datetime(local_seconds[idx]))
+            if nonexistent == 'standard':
+                result[skipped] = old[skipped]
+            elif nonexistent == 'shift_forward':
+                result[skipped] = local_seconds[skipped] - self.transitions[k[skipped]]
+
+        repeated = in_window & (new < old)
+        if repeated.any():
+            if ambiguous == 'raise':
+                idx = int(np.flatnonzero(repeated)[0])
+                raise pytz.AmbiguousTimeError(self._as_datetime(local_seconds[idx]))
+            new_dst = self.dst[k]
+            old_dst = self.dst[np.maximum(k - 1, 0)]
+            differ = new_dst != old_dst
+            if ambiguous == 'standard':
+                # Prefer the non-DST reading; otherwise the later UTC instant
+                use_old = differ & ~old_dst
+            else:
+                # Prefer the DST reading; otherwise the earlier UTC instant
+                use_old = ~differ | old_dst
+            pick = repeated & use_old
+            result[pick] = old[pick]
+
+        return result
+
+    def utc_to_local_offsets(self, utc_seconds: np.ndarray) -> np.ndarray:
+        """UTC offsets (seconds) in force at UTC instants given as seconds since 1970"""
+        k = np.searchsorted(self.transitions, np.asarray(utc_seconds, dtype=np.int64), side='right') - 1
+        return self.offsets[np.clip(k, 0, len(self.offsets) - 1)]
+
+    @staticmethod
+    def _as_datetime(seconds: int) -> datetime:
+        return EPOCH + timedelta(seconds=int(seconds))
+
+
+class TimezoneResolver:
+    """Caches zone objects and their transition tables across requests"""
+
+    def __init__(self):
+        self._tables: Dict[str, ZoneTable] = {}
+        self._lock = threading.Lock()
+
+    def zone(self, timezone_str: str) -> pytz.BaseTzInfo:
+        return self.table(timezone_str).zone
+
+    def table(self, timezone_str: str) -> ZoneTable:
+        """Transition table for a zone name (raises pytz.UnknownTimeZoneError)"""
+        table = self._tables.get(timezone_str)
+        if table is None:
+            table = ZoneTable(pytz.timezone(timezone_str))
+            with self._lock:
+                self._tables.setdefault(timezone_str, table)
+        return table
+
+    def localize(self, local_dt: datetime, timezone_str: str, ambiguous: str = 'standard',
+                 nonexistent: str = 'standard') -> datetime:
+        """Convert one naive local datetime to an aware UTC datetime"""
+        if local_dt.tzinfo is not None:
+            raise ValueError('Not naive datetime (tzinfo is already set)')
+        seconds = (local_dt - EPOCH) // timedelta(seconds=1)
+        offset = self.table(timezone_str).utc_offsets(
+            np.array([seconds], dtype=np.int64), ambiguous, nonexistent
+        )[0]
+        return (local_dt - timedelta(seconds=int(offset))).replace(tzinfo=pytz.UTC)
+
+    def to_utc(self, local_times: Union[Sequence[datetime], np.ndarray],
+               timezones: Union[str, Sequence[str]], ambiguous: str = 'standard',
+               nonexistent: str = 'standard') -> np.ndarray:
+        """
+        Convert an array of naive local datetimes to UTC ``datetime64[s]``.
+
+        ``timezones`` is a single zone name or one name per element; each
+        distinct zone is converted in a single vectorized pass.
+        """
+        local = np.asarray(local_times, dtype='datetime64[s]')
+        local_seconds = local.astype(np.int64)
+        offsets = np.empty_like(local_seconds)
+
+        if isinstance(timezones, str):
+            offsets[:] = self.table(timezones).utc_offsets(local_seconds, ambiguous, nonexistent)
+        else:
+            names, inverse = np.unique(np.asarray(timezones, dtype=object).astype(str), return_inverse=True)
+            for i, name in enumerate(names):
+                mask = inverse == i
+                offsets[mask] = self.table(str(name)).utc_offsets(
+                    local_seconds[mask], ambiguous, nonexistent
+                )
+
+        return (local_seconds - offsets).astype('datetime64[s]')
+
+
+timezone_resolver = TimezoneResolver()
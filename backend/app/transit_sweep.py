@@ -0,0 +1,192 @@
+"""
+Transit Sweep
+Joins a sampled transit timeline against sorted natal points of many users
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.ayanamsa import DEFAULT_AYANAMSA
+from app.nodes import DEFAULT_NODE
+
+SLOW_PLANETS = ('Jupiter', 'Saturn', 'Rahu', 'Ketu')
+NATAL_POINTS = ('moon', 'lagna', 'dasha_lord')
+
+# One row per (user, transiting planet, natal point) crossing
+EVENT_DTYPE = np.dtype([
+    ('user', '<i8'),
+    ('planet', '<u1'),
+    ('point', '<u1'),
+    ('jd', '<f8'),
+    ('direction', '<i1'),
+])
+
+
+class TransitTimeline:
+    """
+    Sidereal longitudes of transiting planets sampled on a regular grid and
+    unwrapped, so any degree crossing can be interpolated from one segment
+    """
+
+    def __init__(self, engine, start_jd: float, end_jd: float,
+                 planets: Sequence[str] = SLOW_PLANETS, step_days: float = 1.0,
+                 ayanamsa: str = DEFAULT_AYANAMSA, node: str = DEFAULT_NODE):
+        n = int(np.ceil((end_jd - start_jd) / step_days)) + 1
+        self.engine = engine
+        self.planets = tuple(planets)
+        self.jd = start_jd + step_days * np.arange(n)
+        longitudes = engine.sidereal_longitudes(self.jd, list(self.planets), ayanamsa, node)
+        # Unwrap so consecutive samples never jump across 0°/360°
+        self.longitudes = {
+            planet: lon[0] + np.concatenate([[0.0], np.cumsum((np.diff(lon) + 180) % 360 - 180)])
+            for planet, lon in longitudes.items()
+        }
+
+    @classmethod
+    def between(cls, engine, start: datetime, end: datetime, **kwargs) -> 'TransitTimeline':
+        """Timeline over a UTC date range"""
+        ts = engine.ts
+        start_jd = ts.from_datetime(start.replace(tzinfo=timezone.utc)).tt
+        end_jd = ts.from_datetime(end.replace(tzinfo=timezone.utc)).tt
+        return cls(engine, start_jd, end_jd, **kwargs)
+
+    def crossings(self, planet: str, sorted_points: np.ndarray):
+        """
+        Sweep the planet's segments over sorted longitudes in [0, 360).
+        Returns (point index, exact JD TT, direction) for every crossing;
+        each segment covers [low, high) so a crossing at a sample is counted once.
+        """
+        lon = self.longitudes[planet]
+        l0, l1 = lon[:-1], lon[1:]
+        low, high = np.minimum(l0, l1), np.maximum(l0, l1)
+        turns = np.floor(low / 360)
+        start = low - 360 * turns
+        stop = start + (high - low)
+
+        first = np.searchsorted(sorted_points, start, side='left')
+        last = np.searchsorted(sorted_points, np.minimum(stop, 360.0), side='left')
+        wrapped = np.where(stop > 360, np.searchsorted(sorted_points, stop - 360, side='left'), 0)
+
+        seg_main, idx_main = _expand(first, last - first)
+        seg_wrap, idx_wrap = _expand(np.zeros_like(wrapped), wrapped)
+        segments = np.concatenate([seg_main, seg_wrap])
+        points = np.concatenate([idx_main, idx_wrap])
+
+        # Place each natal longitude on the segment's unwrapped scale
+        target = sorted_points[points] + 360 * turns[segments]
+        target = np.where(target < low[segments], target + 360, target)
+        frac = (target - l0[segments]) / (l1[segments] - l0[segments])
+        jd = self.jd[segments] + frac * (self.jd[segments + 1] - self.jd[segments])
+        direction = np.sign(l1[segments] - l0[segments]).astype(np.int8)
+        return points, jd, direction
+
+    def ingresses(self, planet: str) -> List[Dict]:
+        """Rasi ingresses (crossings of multiples of 30°) within the timeline"""
+        boundaries = np.arange(0.0, 360.0, 30.0)
+        points, jd, direction = self.crossings(planet, boundaries)
+        order = np.argsort(jd)
+        result = []
+        for i in order:
+            entered = int(points[i]) + 1 if direction[i] > 0 else int(points[i]) or 12
+            result.append({'jd': float(jd[i]), 'rasi': entered, 'retrograde': bool(direction[i] < 0)})
+        return result
+
+
+def _expand(starts: np.ndarray, counts: np.ndarray):
+    """Segment id and point index for every (segment, point) pair in the given runs"""
+    counts = np.maximum(counts, 0)
+    total = int(counts.sum())
+    segments = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return segments, starts[segments] + offsets
+
+
+class NatalIndex:
+    """Natal longitudes of many users, kept sorted per point type"""
+
+    def __init__(self):
+        self._users: Dict[str, List[np.ndarray]] = {p: [] for p in NATAL_POINTS}
+        self._longitudes: Dict[str, List[np.ndarray]] = {p: [] for p in NATAL_POINTS}
+        self._sorted: Dict[str, Optional[tuple]] = {p: None for p in NATAL_POINTS}
+
+    def add(self, user_ids: Iterable[int], **points: Iterable[float]):
+        """Add users with any of moon=, lagna=, dasha_lord= longitude arrays"""
+        users = np.asarray(list(user_ids), dtype=np.int64)
+        for name, values in points.items():
+            if name not in NATAL_POINTS:
+                raise ValueError(f"Unknown natal point '{name}'. Choose from: {', '.join(NATAL_POINTS)}")
+            values = np.mod(np.asarray(list(values), dtype=float), 360)
+            if len(values) != len(users):
+                raise ValueError(f"Expected {len(users)} '{name}' longitudes, got {len(values)}")
+            self._users[name].append(users)
+            self._longitudes[name].append(values)
+            self._sorted[name] = None
+
+    def sorted_points(self, name: str):
+        """(sorted longitudes, user ids in the same order) for one point type"""
+        if self._sorted[name] is None:
+            if not self._longitudes[name]:
+                self._sorted[name] = (np.empty(0), np.empty(0, dtype=np.int64))
+            else:
+                longitudes = np.concatenate(self._longitudes[name])
+                users = np.concatenate(self._users[name])
+                order = np.argsort(longitudes, kind='stable')
+                self._sorted[name] = (longitudes[order], users[order])
+                self._longitudes[name] = [self._sorted[name][0]]
+                self._users[name] = [self._sorted[name][1]]
+        return self._sorted[name]
+
+    def __len__(self):
+        return max(sum(len(u) for u in users) for users in self._users.values())
+
+
+def natal_points(chart: Dict, as_of: datetime) -> Dict[str, float]:
+    """Moon, lagna and running mahadasha lord longitudes of a stored chart"""
+    day = as_of.strftime('%Y-%m-%d')
+    lord = next((d['planet'] for d in chart['vimshottari_dasha']
+                 if d['start_date'] <= day < d['end_date']), chart['vimshottari_dasha'][-1]['planet'])
+    return {
+        'moon': chart['planetary_positions']['Moon']['longitude'],
+        'lagna': chart['ascendant']['longitude'],
+        'dasha_lord': chart['planetary_positions'][lord]['longitude'],
+    }
+
+
+def sweep(timeline: TransitTimeline, index: NatalIndex,
+          points: Sequence[str] = NATAL_POINTS) -> np.ndarray:
+    """All (user, planet, point, exact JD TT, direction) events, sorted by time"""
+    chunks = []
+    for p, planet in enumerate(timeline.planets):
+        for q, name in enumerate(NATAL_POINTS):
+            if name not in points:
+                continue
+            longitudes, users = index.sorted_points(name)
+            if not len(longitudes):
+                continue
+            idx, jd, direction = timeline.crossings(planet, longitudes)
+            events = np.empty(len(idx), dtype=EVENT_DTYPE)
+            events['user'] = users[idx]
+            events['planet'] = p
+            events['point'] = q
+            events['jd'] = jd
+            events['direction'] = direction
+            chunks.append(events)
+    events = np.concatenate(chunks) if chunks else np.empty(0, dtype=EVENT_DTYPE)
+    return events[np.argsort(events['jd'], kind='stable')]
+
+
+def describe_events(timeline: TransitTimeline, events: np.ndarray) -> List[Dict]:
+    """Readable form of sweep results with UTC timestamps"""
+    times = timeline.engine.ts.tt_jd(events['jd']).utc_datetime() if len(events) else []
+    return [
+        {
+            'user': int(e['user']),
+            'planet': timeline.planets[e['planet']],
+            'point': NATAL_POINTS[e['point']],
+            'exact_utc': t.isoformat(),
+            'retrograde': bool(e['direction'] < 0)
+        }
+        for e, t in zip(events, times)
+    ]
@@ -0,0 +1,113 @@
+"""
+Divisional Charts (Vargas)
+Maps sidereal longitudes to varga signs with array operations, for one chart or many
+"""
+
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+VARGAS: Dict[str, Dict] = {
+    'D2': {'name': 'Hora', 'tamil': 'ஹோரை', 'division': 2},
+    'D3': {'name': 'Drekkana', 'tamil': 'திரேக்காணம்', 'division': 3},
+    'D7': {'name': 'Saptamsa', 'tamil': 'சப்தாம்சம்', 'division': 7},
+    'D9': {'name': 'Navamsa', 'tamil': 'நவாம்சம்', 'division': 9},
+    'D10': {'name': 'Dasamsa', 'tamil': 'தசாம்சம்', 'division': 10},
+    'D12': {'name': 'Dwadasamsa', 'tamil': 'துவாதசாம்சம்', 'division': 12},
+    'D30': {'name': 'Trimsamsa', 'tamil': 'திரிம்சாம்சம்', 'division': 30},
+    'D60': {'name': 'Shashtiamsa', 'tamil': 'சஷ்டியாம்சம்', 'division': 60},
+}
+
+# Order of the longitude columns passed around in batches
+VARGA_BODIES = ('Ascendant', 'Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Rahu', 'Ketu')
+
+# Trimsamsa: unequal portions ruled by Mars, Saturn, Jupiter, Mercury, Venus
+# (reversed in even signs), each mapped to that planet's odd/even sign
+TRIMSAMSA_ODD_BOUNDS = np.array([5.0, 10.0, 18.0, 25.0])
+TRIMSAMSA_ODD_SIGNS = np.array([1, 11, 9, 3, 7])
+TRIMSAMSA_EVEN_BOUNDS = np.array([5.0, 12.0, 20.0, 25.0])
+TRIMSAMSA_EVEN_SIGNS = np.array([2, 6, 12, 10, 8])
+
+
+def parse_vargas(vargas: Optional[Union[str, Iterable[str]]]) -> Tuple[str, ...]:
+    """Normalize a varga selection such as 'D9,D10', ['d9'] or 'all'"""
+    if vargas is None:
+        return ()
+    if isinstance(vargas, str):
+        vargas = vargas.split(',')
+    selected = []
+    for item in vargas:
+        key = item.strip().upper()
+        if not key:
+            continue
+        if key == 'ALL':
+            return tuple(VARGAS)
+        if key not in VARGAS:
+            raise ValueError(f"Unknown varga '{item}'. Choose from: {', '.join(VARGAS)}")
+        if key not in selected:
+            selected.append(key)
+    return tuple(selected)
+
+
+def varga_signs(longitudes: Union[float, np.ndarray], varga: str) -> np.ndarray:
+    """
+    Varga sign (1-12) of each sidereal longitude, following the Parashari
+    rules for each division. Accepts any array shape, e.g. (charts, bodies).
+    """
+    if varga not in VARGAS:
+        raise ValueError(f"Unknown varga '{varga}'. Choose from: {', '.join(VARGAS)}")
+    division = VARGAS[varga]['division']
+
+    lon = np.mod(np.asarray(longitudes, dtype=float), 360.0)
+    sign = (lon // 30).astype(np.int64) % 12          # 0 = Aries
+    degrees = lon - sign * 30.0
+    part = np.minimum((degrees * division // 30).astype(np.int64), division - 1)
+    odd = sign % 2 == 0                                # Aries, Gemini, ... are odd signs
+
+    if varga == 'D2':
+        # Odd signs: Sun's hora (Leo) then Moon's (Cancer); even signs reversed
+        return np.where(odd == (part == 0), 5, 4)
+    if varga == 'D3':
+        return (sign + 4 * part) % 12 + 1
+    if varga == 'D7':
+        return (sign + part + np.where(odd, 0, 6)) % 12 + 1
+    if varga == 'D9':
+        # Continuous from Aries: equivalent to the movable/fixed/dual rule
+        return (lon * 9 // 30).astype(np.int64) % 12 + 1
+    if varga == 'D10':
+        return (sign + part + np.where(odd, 0, 8)) % 12 + 1
+    if varga == 'D30':
+        return np.where(
+            odd,
+            TRIMSAMSA_ODD_SIGNS[np.searchsorted(TRIMSAMSA_ODD_BOUNDS, degrees, side='right')],
+            TRIMSAMSA_EVEN_SIGNS[np.searchsorted(TRIMSAMSA_EVEN_BOUNDS, degrees, side='right')]
+        )
+    # D12 and D60 count from the sign itself
+    return (sign + part) % 12 + 1
+
+
+def varga_table(longitudes: np.ndarray, vargas: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Varga signs for a (charts, bodies) longitude matrix, one array per varga"""
+    longitudes = np.asarray(longitudes, dtype=float)
+    return {varga: varga_signs(longitudes, varga) for varga in vargas}
+
+
+def chart_longitudes(positions: Dict, ascendant: Dict) -> np.ndarray:
+    """Longitudes of a chart in VARGA_BODIES order"""
+    return np.array([ascendant['longitude']] + [positions[body]['longitude'] for body in VARGA_BODIES[1:]])
+
+
+def format_vargas(table: Dict[str, np.ndarray], rasi_names: Dict[int, Dict], row: int = 0) -> Dict:
+    """Response section for one chart (row) of a varga table"""
+    result = {}
+    for varga, signs in table.items():
+        signs = np.atleast_2d(signs)[row]
+        result[varga] = {
+            'name': VARGAS[varga]['name'],
+            'tamil': VARGAS[varga]['tamil'],
+            'positions': {
+                body: {'rasi': int(sign), 'rasi_name': rasi_names[int(sign)]}
+                for body, sign in zip(VARGA_BODIES, signs)
+            }
+        }
+    return result
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Latency under overload with and without admission control
+Sends a burst of distinct birth-chart requests (none coalesce or hit the cache) while
+polling /api/nakshatras, once with the configured admission limits and once with limits
+too large to shed anything, and reports served/shed counts and latency percentiles
+
+Usage:
+    python benchmarks/admission.py
+    python benchmarks/admission.py --burst 64 --limits birth-chart=2:8:1000 --output admission.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+import app.cache as cache
+import app.main as api
+from app.admission import DEFAULT_LIMITS, AdmissionController, parse_limits
+from app.cache import TwoTierCache
+
+
+def percentiles(samples: List[float]) -> Dict:
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {'count': len(ordered), 'p50_ms': round(statistics.median(ordered), 2),
+            'p95_ms': round(pick(0.95), 2), 'max_ms': round(ordered[-1], 2)}
+
+
+async def burst(requests: int) -> Dict:
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test', timeout=600) as client:
+        async def chart(i):
+            body = {'date': '1990-05-15', 'time': '14:30', 'latitude': 8 + i * 0.01, 'longitude': 80.2707}
+            began = time.perf_counter()
+            response = await client.post('/api/birth-chart', json=body)
+            return response.status_code, (time.perf_counter() - began) * 1000
+
+        charts = [asyncio.ensure_future(chart(i)) for i in range(requests)]
+        cheap = []
+        while not all(c.done() for c in charts):
+            began = time.perf_counter()
+            (await client.get('/api/nakshatras')).raise_for_status()
+            cheap.append((time.perf_counter() - began) * 1000)
+            await asyncio.sleep(0.01)
+        results = [c.result() for c in charts]
+
+    return {
+        'served': percentiles([ms for status, ms in results if status == 200]),
+        'shed': percentiles([ms for status, ms in results if status == 503]),
+        'nakshatras': percentiles(cheap),
+    }
+
+
+def run(limits: Dict, requests: int) -> Dict:
+    previous = (cache._cache, api.admission_controller)
+    cache._cache = TwoTierCache()
+    api.admission_controller = AdmissionController(limits)
+    try:
+        began = time.perf_counter()
+        summary = asyncio.run(burst(requests))
+        summary['wall_ms'] = round((time.perf_counter() - began) * 1000, 1)
+        summary['admission'] = api.admission_controller.stats()['routes']['birth-chart']
+        return summary
+    finally:
+        cache._cache, api.admission_controller = previous
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--burst', type=int, default=48, help='Concurrent birth-chart requests')
+    parser.add_argument('--limits', default='birth-chart=2:8:1000',
+                        help='ADMISSION_LIMITS spec for the limited run')
+    parser.add_argument('--output', default=None, help='Write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    unlimited = {route: (10 ** 6, 10 ** 6, 3600.0) for route in DEFAULT_LIMITS}
+    summary = {
+        'burst': args.burst,
+        'limits': args.limits,
+        'limited': run(parse_limits(args.limits), args.burst),
+        'unlimited': run(unlimited, args.burst),
+    }
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    return summary
+
+
+if __name__ == '__main__':
+    main()
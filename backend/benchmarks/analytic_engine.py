@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Speed and accuracy of the analytic engine against the skyfield/DE421 engine
+Generates the same synthetic births with both, then reports the time per chart,
+the largest longitude differences and how many rasi/nakshatra/pada changes the
+boundary flags caught
+
+Usage:
+    python benchmarks/analytic_engine.py --charts 2000
+    python benchmarks/analytic_engine.py --charts 500 --start-year 1900 --end-year 2050 --output analytic.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.analytic import ERROR_BOUNDS
+from app.astrology import VedicAstrology
+from app.synthetic import BirthGenerator
+
+DISCRETE_FIELDS = ('rasi', 'nakshatra', 'pada')
+
+
+def run(charts: int, start_year: int, end_year: int, seed: int = 0) -> Dict:
+    engine = VedicAstrology()
+    births = BirthGenerator(seed, start_year, end_year).take(charts)
+    args = ([datetime.strptime(f"{b['date']} {b['time']}", '%Y-%m-%d %H:%M') for b in births],
+            [b['latitude'] for b in births], [b['longitude'] for b in births], [b['timezone'] for b in births])
+
+    timings = {}
+    results = {}
+    for name in ('skyfield', 'analytic'):
+        began = time.perf_counter()
+        results[name] = engine.generate_birth_charts(*args, engine=name)
+        timings[name] = time.perf_counter() - began
+
+    max_error = dict.fromkeys(ERROR_BOUNDS, 0.0)
+    changed = flagged = missed = 0
+    for exact, fast in zip(results['skyfield'], results['analytic']):
+        for graha, position in exact['planetary_positions'].items():
+            estimate = fast['planetary_positions'][graha]
+            error = abs((estimate['longitude'] - position['longitude'] + 180) % 360 - 180)
+            max_error[graha] = max(max_error[graha], error)
+            flagged += estimate['boundary_risk']
+            if any(estimate[field] != position[field] for field in DISCRETE_FIELDS):
+                changed += 1
+                missed += not estimate['boundary_risk']
+
+    return {
+        'charts': charts,
+        'years': [start_year, end_year],
+        'skyfield_ms_per_chart': round(timings['skyfield'] * 1000 / charts, 3),
+        'analytic_ms_per_chart': round(timings['analytic'] * 1000 / charts, 3),
+        'speedup': round(timings['skyfield'] / timings['analytic'], 1),
+        'max_error_degrees': {g: round(e, 4) for g, e in max_error.items()},
+        'error_bounds_degrees': ERROR_BOUNDS,
+        'flagged_positions': flagged,
+        'changed_positions': changed,
+        'unflagged_changes': missed,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--charts', type=int, default=2000)
+    parser.add_argument('--start-year', type=int, default=1900)
+    parser.add_argument('--end-year', type=int, default=2050)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='Write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    summary = run(args.charts, args.start_year, args.end_year, args.seed)
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    return summary
+
+
+if __name__ == '__main__':
+    main()
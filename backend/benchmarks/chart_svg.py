@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Render time of the chart SVGs
+Times render_chart_svg per style, language and varga against building the static grid
+templates each time (what rendering without precompiled templates costs), and the
+/api/chart.svg latency on a cache miss, a cache hit and an ETag revalidation
+
+Usage:
+    python benchmarks/chart_svg.py
+    python benchmarks/chart_svg.py --repeat 2000 --output chart_svg.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+import app.cache as cache
+import app.chart_svg as chart_svg
+from app.astrology import get_astrology_engine
+from app.cache import LocalCache, TwoTierCache
+from app.main import app
+
+BIRTH = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707}
+
+
+def per_call_ms(fn: Callable, repeat: int) -> float:
+    began = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - began) * 1000 / repeat
+
+
+def render_times(repeat: int) -> Dict:
+    chart = get_astrology_engine().generate_birth_chart(
+        datetime(1990, 5, 15, 14, 30), BIRTH['latitude'], BIRTH['longitude'], 'Asia/Kolkata', vargas=['D9'])
+    template_ms = per_call_ms(chart_svg._compile_templates, repeat) / len(chart_svg.TEMPLATES)
+    results = {}
+    for style in chart_svg.STYLES:
+        for lang in chart_svg.LANGUAGES:
+            for varga in ('D1', 'D9'):
+                svg = chart_svg.render_chart_svg(chart, varga, style, lang, caption=['1990-05-15 14:30'])
+                render_ms = per_call_ms(
+                    lambda: chart_svg.render_chart_svg(chart, varga, style, lang, caption=['1990-05-15 14:30']),
+                    repeat)
+                results[f'{style}/{lang}/{varga}'] = {
+                    'bytes': len(svg.encode('utf-8')),
+                    'render_ms': round(render_ms, 4),
+                    'render_with_template_build_ms': round(render_ms + template_ms, 4),
+                }
+    return {'template_build_ms': round(template_ms, 4), 'charts': results}
+
+
+def request_times(requests: int) -> Dict:
+    client = TestClient(app)
+    results = {}
+    previous = cache._cache
+    try:
+        for name, params in (('south/D1', {}), ('north/D9', {'style': 'north', 'varga': 'D9'})):
+            query = {**BIRTH, **params}
+            cache._cache = TwoTierCache(LocalCache())
+            began = time.perf_counter()
+            response = client.get('/api/chart.svg', params=query)
+            miss_ms = (time.perf_counter() - began) * 1000
+            response.raise_for_status()
+            etag = response.headers['etag']
+            hit_ms = per_call_ms(lambda: client.get('/api/chart.svg', params=query).raise_for_status(), requests)
+            revalidate_ms = per_call_ms(
+                lambda: client.get('/api/chart.svg', params=query, headers={'If-None-Match': etag}), requests)
+            results[name] = {'miss_ms': round(miss_ms, 2), 'hit_ms': round(hit_ms, 2),
+                             'not_modified_ms': round(revalidate_ms, 2)}
+    finally:
+        cache._cache = previous
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=500, help='Renders timed per chart')
+    parser.add_argument('--requests', type=int, default=50, help='Cached requests timed per endpoint variant')
+    parser.add_argument('--output', default=None, help='Write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    summary = {'render': render_times(args.repeat), 'endpoint': request_times(args.requests)}
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Size and decode time of compact MessagePack chart responses against JSON
+For each request: response bytes (raw and gzipped) as JSON, as plain MessagePack of the
+same payload and as the compact columnar MessagePack the API sends for
+`Accept: application/msgpack`, and the client-side time to decode each form (the compact
+form both as-is and expanded back to the JSON chart with the lookup table)
+
+Usage:
+    python benchmarks/compact_encoding.py
+    python benchmarks/compact_encoding.py --repeat 500 --output compact_encoding.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+from app.compact import expand_chart
+from app.main import app
+from app.packing import packb, unpackb
+from app.responses import MSGPACK_MEDIA_TYPE, orjson
+
+PERSON = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707, 'name': 'Test'}
+
+REQUESTS = [
+    ('birth-chart', '/api/birth-chart', PERSON),
+    ('birth-chart vargas=all', '/api/birth-chart', {**PERSON, 'vargas': ['all']}),
+    ('birth-chart?fields=planetary_positions,ascendant',
+     '/api/birth-chart?fields=planetary_positions,ascendant', PERSON),
+]
+
+
+def per_call_ms(fn: Callable, repeat: int) -> float:
+    began = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - began) * 1000 / repeat
+
+
+def run(repeat: int) -> Dict:
+    client = TestClient(app)
+    table = client.get('/api/chart-codes').json()
+    loads = orjson.loads if orjson is not None else json.loads
+    results = {}
+    for name, url, body in REQUESTS:
+        json_body = client.post(url, json=body).content
+        compact_body = client.post(url, json=body, headers={'Accept': MSGPACK_MEDIA_TYPE}).content
+        chart = loads(json_body)
+        plain_body = packb(chart)
+        assert json.loads(json.dumps(expand_chart(unpackb(compact_body), table))) == chart
+        results[name] = {
+            'json_bytes': len(json_body),
+            'json_gzip_bytes': len(gzip.compress(json_body)),
+            'msgpack_bytes': len(plain_body),
+            'msgpack_gzip_bytes': len(gzip.compress(plain_body)),
+            'compact_bytes': len(compact_body),
+            'compact_gzip_bytes': len(gzip.compress(compact_body)),
+            'json_decode_ms': round(per_call_ms(lambda: loads(json_body), repeat), 4),
+            'msgpack_decode_ms': round(per_call_ms(lambda: unpackb(plain_body), repeat), 4),
+            'compact_decode_ms': round(per_call_ms(lambda: unpackb(compact_body), repeat), 4),
+            'compact_expand_ms': round(per_call_ms(lambda: expand_chart(unpackb(compact_body), table), repeat), 4),
+        }
+        results[name]['size_ratio'] = round(results[name]['compact_bytes'] / results[name]['json_bytes'], 2)
+        results[name]['gzip_size_ratio'] = round(
+            results[name]['compact_gzip_bytes'] / results[name]['json_gzip_bytes'], 2)
+    return {
+        'json_decoder': 'orjson' if orjson is not None else 'json',
+        'codes_bytes': len(client.get('/api/chart-codes', headers={'Accept': MSGPACK_MEDIA_TYPE}).content),
+        'repeat': repeat,
+        'requests': results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200, help='Decodes timed per request')
+    parser.add_argument('--output', default=None, help='Write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    summary = run(args.repeat)
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    return summary
+
+
+if __name__ == '__main__':
+    main()
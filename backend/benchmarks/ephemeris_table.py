@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Throughput of the ephemeris table export
+Rows per second of the chunked CSV and MessagePack streams for several chunk sizes,
+against computing each row with calculate_planetary_positions, and the peak memory
+of streaming a short and a long range (the same when memory is bounded by the chunk)
+
+Usage:
+    python benchmarks/ephemeris_table.py
+    python benchmarks/ephemeris_table.py --years 100 --chunks 128 512 2048 --output ephemeris_table.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.astrology import get_astrology_engine
+from app.ephemeris_table import FORMATS, EphemerisTable
+
+START = date(1950, 1, 1)
+
+
+def drain(table: EphemerisTable, fmt: str) -> int:
+    """Stream the table, keeping nothing; returns the bytes produced"""
+    size = 0
+    for piece in table.stream(fmt):
+        size += len(piece)
+    return size
+
+
+def chunked(engine, years: int, chunk_sizes: List[int]) -> Dict:
+    end = date(START.year + years, 1, 1) - timedelta(days=1)
+    results = {}
+    for fmt in FORMATS:
+        for chunk_rows in chunk_sizes:
+            table = EphemerisTable(engine, START, end, chunk_rows=chunk_rows)
+            began = time.perf_counter()
+            size = drain(table, fmt)
+            elapsed = time.perf_counter() - began
+            results[f'{fmt}/{chunk_rows}'] = {
+                'rows': table.rows,
+                'bytes': size,
+                'seconds': round(elapsed, 3),
+                'rows_per_second': round(table.rows / elapsed),
+            }
+    return results
+
+
+def per_row(engine, rows: int) -> Dict:
+    """One calculate_planetary_positions call per row, as a loop over /api/transit-style calls would do"""
+    began = time.perf_counter()
+    for day in range(rows):
+        engine.calculate_planetary_positions(datetime(1950, 1, 1) + timedelta(days=day), 0.0, 0.0)
+    elapsed = time.perf_counter() - began
+    return {'rows': rows, 'seconds': round(elapsed, 3), 'rows_per_second': round(rows / elapsed)}
+
+
+def peak_memory(engine, years: int) -> Dict:
+    """Traced peak while streaming a short and a long range (ephemeris caches warmed first)"""
+    drain(EphemerisTable(engine, START, date(START.year + years, 1, 1) - timedelta(days=1)), 'csv')
+    results = {}
+    for span in sorted({5, years}):
+        table = EphemerisTable(engine, START, date(START.year + span, 1, 1) - timedelta(days=1))
+        gc.collect()
+        tracemalloc.start()
+        drain(table, 'csv')
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[f'{span}y'] = {'rows': table.rows, 'chunk_rows': table.chunk_rows, 'peak_kib': round(peak / 1024)}
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=50, help='Years of daily rows per run (from 1950)')
+    parser.add_argument('--chunks', type=int, nargs='+', default=[64, 512, 4096], help='Chunk sizes to time')
+    parser.add_argument('--baseline-rows', type=int, default=300, help='Rows computed one at a time')
+    parser.add_argument('--output', default=None, help='Write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    engine = get_astrology_engine()
+    summary = {
+        'chunked': chunked(engine, args.years, args.chunks),
+        'per_row': per_row(engine, args.baseline_rows),
+        'peak_memory': peak_memory(engine, args.years),
+    }
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    return summary
+
+
+if __name__ == '__main__':
+    main()
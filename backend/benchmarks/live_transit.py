@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+CPU cost of the live transit stream as subscribers grow
+Subscribes N in-process clients spread over a set of cities, runs hub ticks and
+reports CPU time per tick split into the sky computation and the fan-out, next to
+what the same clients polling /api/transit once per tick would cost (N position
+computations per tick)
+
+Usage:
+    python benchmarks/live_transit.py
+    python benchmarks/live_transit.py --subscribers 1 100 10000 --cities 50 --output live_transit.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.astrology import get_astrology_engine
+from app.live_transit import TransitHub
+
+
+def polling_ms(engine, repeat: int = 5) -> float:
+    """CPU time of one /api/transit computation"""
+    now = datetime.now(timezone.utc)
+    began = time.process_time()
+    for i in range(repeat):
+        engine.calculate_planetary_positions(now + timedelta(minutes=i), 13.0827, 80.2707)
+    return (time.process_time() - began) * 1000 / repeat
+
+
+async def measure(engine, subscribers: int, cities: int, ticks: int) -> Dict:
+    hub = TransitHub(engine, tick_seconds=3600, max_subscribers=subscribers)
+    clients = [hub.subscribe(f'City {i % cities}', 8 + (i % cities) * 0.25, 76 + (i % cities) * 0.1)
+               for i in range(subscribers)]
+    for client in clients:
+        await client.next_frame()
+
+    cpu = compute = fanout = 0.0
+    for _ in range(ticks):
+        began = time.process_time()
+        await hub.tick(hub.time + timedelta(seconds=5))
+        cpu += time.process_time() - began
+        compute += hub.compute_seconds
+        fanout += hub.fanout_seconds
+        for client in clients:
+            client.queue.get_nowait()
+
+    return {
+        'subscribers': subscribers,
+        'cities': len(hub.cities),
+        'cpu_ms_per_tick': round(cpu * 1000 / ticks, 3),
+        'compute_ms_per_tick': round(compute * 1000 / ticks, 3),
+        'fanout_ms_per_tick': round(fanout * 1000 / ticks, 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[1, 10, 100, 1000, 10000],
+                        help='Subscriber counts to measure')
+    parser.add_argument('--cities', type=int, default=20, help='Distinct cities the subscribers are spread over')
+    parser.add_argument('--ticks', type=int, default=10, help='Ticks timed per subscriber count')
+    parser.add_argument('--output', default=None, help='Write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    engine = get_astrology_engine()
+    per_poll_ms = polling_ms(engine)
+    runs = []
+    for count in args.subscribers:
+        run = asyncio.run(measure(engine, count, min(args.cities, count), args.ticks))
+        run['polling_cpu_ms_per_tick'] = round(per_poll_ms * count, 1)
+        runs.append(run)
+
+    summary = {'ticks': args.ticks, 'polling_ms_per_request': round(per_poll_ms, 3), 'runs': runs}
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Asyncio load generator for the Vedic Astrology API
+Replays a realistic endpoint mix and reports throughput and latency percentiles
+
+Usage:
+    python benchmarks/load_test.py --start-server --requests 500 --concurrency 16
+    python benchmarks/load_test.py --url http://localhost:8000 --duration 30 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.synthetic import BirthGenerator
+
+# Assumed share of traffic per endpoint (not measured); adjust to match real traffic
+ENDPOINT_MIX = {
+    'birth_chart': 0.45,
+    'compatibility': 0.15,
+    'transit': 0.20,
+    'dasha_periods': 0.20,
+}
+
+
+def build_request(endpoint: str, births: BirthGenerator) -> Tuple[str, str, Optional[Dict]]:
+    """Return (method, path, json body) for one request of the given kind"""
+    if endpoint == 'birth_chart':
+        return 'POST', '/api/birth-chart', births.birth_details()
+    if endpoint == 'compatibility':
+        return 'POST', '/api/compatibility', {
+            'person1': births.birth_details(),
+            'person2': births.birth_details()
+        }
+    if endpoint == 'transit':
+        return 'GET', '/api/transit', None
+    if endpoint == 'dasha_periods':
+        return 'POST', '/api/dasha-periods', births.birth_details()
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list (q in 0-100)"""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (pos - lower)
+
+
+async def run_load(client: httpx.AsyncClient, total_requests: Optional[int] = None,
+                   duration: Optional[float] = None, concurrency: int = 8, seed: int = 0,
+                   mix: Optional[Dict[str, float]] = None) -> Tuple[List[Dict], float]:
+    """
+    Fire requests from ``concurrency`` workers until ``total_requests`` have been
+    sent or ``duration`` seconds have elapsed. Returns (results, elapsed seconds).
+    """
+    if total_requests is None and duration is None:
+        raise ValueError('Either total_requests or duration is required')
+
+    mix = mix or ENDPOINT_MIX
+    rng = random.Random(seed)
+    births = BirthGenerator(seed=seed)
+    endpoints = list(mix)
+    weights = [mix[e] for e in endpoints]
+
+    results = []
+    issued = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    def next_request():
+        nonlocal issued
+        if total_requests is not None and issued >= total_requests:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        issued += 1
+        endpoint = rng.choices(endpoints, weights=weights)[0]
+        return (endpoint, *build_request(endpoint, births))
+
+    async def worker():
+        while True:
+            request = next_request()
+            if request is None:
+                return
+            endpoint, method, path, body = request
+            sent = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            results.append({
+                'endpoint': endpoint,
+                'status': status,
+                'latency_ms': (time.perf_counter() - sent) * 1000
+            })
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+def summarize(results: List[Dict], elapsed: float, concurrency: int, seed: int) -> Dict:
+    """Per-endpoint and overall throughput and latency percentiles"""
+
+    def stats(rows: List[Dict]) -> Dict:
+        latencies = sorted(r['latency_ms'] for r in rows)
+        errors = sum(1 for r in rows if not 200 <= r['status'] < 300)
+        return {
+            'requests': len(rows),
+            'errors': errors,
+            'throughput_rps': round(len(rows) / elapsed, 2) if elapsed else 0.0,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                'p50': round(percentile(latencies, 50), 3),
+                'p95': round(percentile(latencies, 95), 3),
+                'p99': round(percentile(latencies, 99), 3),
+                'max': round(latencies[-1], 3) if latencies else 0.0
+            }
+        }
+
+    by_endpoint = {}
+    for row in results:
+        by_endpoint.setdefault(row['endpoint'], []).append(row)
+
+    return {
+        'seed': seed,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'overall': stats(results),
+        'endpoints': {name: stats(rows) for name, rows in sorted(by_endpoint.items())}
+    }
+
+
+def start_server(port: int) -> subprocess.Popen:
+    """Start ``uvicorn app.main:app`` from the backend directory and wait for /health"""
+    backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1',
+         '--port', str(port), '--log-level', 'warning'],
+        cwd=backend_dir
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError('uvicorn exited before becoming healthy')
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError('uvicorn did not become healthy within 60s')
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=None, help='Base URL of a running API (default: http://127.0.0.1:PORT)')
+    parser.add_argument('--start-server', action='store_true', help='Start a local uvicorn instance of app.main')
+    parser.add_argument('--port', type=int, default=8765, help='Port for --start-server')
+    parser.add_argument('--requests', type=int, default=None, help='Total number of requests')
+    parser.add_argument('--duration', type=float, default=None, help='Run for this many seconds')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests sent first')
+    parser.add_argument('--output', default=None, help='Write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    if args.requests is None and args.duration is None:
+        args.requests = 200
+
+    server = start_server(args.port) if args.start_server else None
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+
+    async def run():
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+            if args.warmup:
+                await run_load(client, total_requests=args.warmup, concurrency=1, seed=args.seed + 1)
+            return await run_load(client, total_requests=args.requests, duration=args.duration,
+                                  concurrency=args.concurrency, seed=args.seed)
+
+    try:
+        results, elapsed = asyncio.run(run())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    summary = summarize(results, elapsed, args.concurrency, args.seed)
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    return summary
+
+
+if __name__ == '__main__':
+    main()
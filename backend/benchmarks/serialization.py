@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Payload size and serialization time of the chart endpoints
+For each endpoint: response bytes (raw and gzipped), time to serialize the payload with
+FastAPI's default path (jsonable_encoder + JSONResponse) and with ChartJSONResponse, and
+the request latency with the result cache disabled
+
+Usage:
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --repeat 200 --output serialization.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+import app.cache as cache
+import app.main as api
+from app.cache import TwoTierCache
+from app.responses import ChartJSONResponse, orjson
+
+PERSON = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707, 'name': 'Test'}
+PARTNER = {'date': '1992-08-20', 'time': '09:15', 'latitude': 9.9252, 'longitude': 78.1198, 'name': 'Partner'}
+
+ENDPOINTS = [
+    ('birth-chart', '/api/birth-chart', PERSON),
+    ('birth-chart?fields=planetary_positions,ascendant',
+     '/api/birth-chart?fields=planetary_positions,ascendant', PERSON),
+    ('predictions', '/api/predictions', PERSON),
+    ('dasha-periods', '/api/dasha-periods', PERSON),
+    ('compatibility', '/api/compatibility', {'person1': PERSON, 'person2': PARTNER}),
+]
+
+
+def per_call_ms(fn: Callable, repeat: int) -> float:
+    began = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - began) * 1000 / repeat
+
+
+def run(repeat: int) -> Dict:
+    captured = []
+
+    class CapturingResponse(ChartJSONResponse):
+        def render(self, content):
+            captured.append(content)
+            return super().render(content)
+
+    api.ChartJSONResponse = CapturingResponse
+    client = TestClient(api.app)
+    results = {}
+    try:
+        for name, url, body in ENDPOINTS:
+            # No cache: every request computes what the endpoint needs
+            cache._cache = TwoTierCache()
+            began = time.perf_counter()
+            for _ in range(3):
+                response = client.post(url, json=body)
+                response.raise_for_status()
+            request_ms = (time.perf_counter() - began) * 1000 / 3
+
+            payload = captured[-1]
+            default_body = JSONResponse(jsonable_encoder(payload)).body
+            fast_body = ChartJSONResponse(payload).body
+            assert json.loads(default_body) == json.loads(fast_body)
+            results[name] = {
+                'bytes': len(fast_body),
+                'gzip_bytes': len(gzip.compress(fast_body)),
+                'default_serialize_ms': round(per_call_ms(lambda: JSONResponse(jsonable_encoder(payload)), repeat), 4),
+                'fast_serialize_ms': round(per_call_ms(lambda: ChartJSONResponse(payload), repeat), 4),
+                'uncached_request_ms': round(request_ms, 2),
+            }
+            results[name]['serialize_speedup'] = round(
+                results[name]['default_serialize_ms'] / results[name]['fast_serialize_ms'], 1)
+    finally:
+        api.ChartJSONResponse = ChartJSONResponse
+        cache._cache = None
+    return {'encoder': 'orjson' if orjson is not None else 'json', 'repeat': repeat, 'endpoints': results}
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=100, help='Serializations timed per endpoint')
+    parser.add_argument('--output', default=None, help='Write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    summary = run(args.repeat)
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the transit-over-natal sweep
+Builds a year-long slow-planet timeline, indexes synthetic natal points and times the join
+
+Usage:
+    python benchmarks/transit_sweep.py --users 1000000 --days 365
+    python benchmarks/transit_sweep.py --users 100000 --output sweep.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.astrology import VedicAstrology
+from app.transit_sweep import NatalIndex, TransitTimeline, sweep
+
+
+def run(users: int, days: int, start: datetime, seed: int = 0) -> Dict:
+    engine = VedicAstrology()
+    rng = np.random.default_rng(seed)
+
+    began = time.perf_counter()
+    timeline = TransitTimeline.between(engine, start, start + timedelta(days=days))
+    timeline_s = time.perf_counter() - began
+
+    # Natal longitudes are uniform enough on the zodiac for a synthetic population
+    began = time.perf_counter()
+    index = NatalIndex()
+    index.add(np.arange(users), moon=rng.uniform(0, 360, users),
+              lagna=rng.uniform(0, 360, users), dasha_lord=rng.uniform(0, 360, users))
+    for name in ('moon', 'lagna', 'dasha_lord'):
+        index.sorted_points(name)
+    index_s = time.perf_counter() - began
+
+    began = time.perf_counter()
+    events = sweep(timeline, index)
+    sweep_s = time.perf_counter() - began
+
+    return {
+        'users': users,
+        'days': days,
+        'planets': list(timeline.planets),
+        'events': int(len(events)),
+        'timeline_seconds': round(timeline_s, 3),
+        'index_seconds': round(index_s, 3),
+        'sweep_seconds': round(sweep_s, 3),
+        'users_per_second': round(users / sweep_s),
+        'events_per_second': round(len(events) / sweep_s),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--start', default='2025-01-01', help='First day of the sweep (YYYY-MM-DD, UTC)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='Write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    summary = run(args.users, args.days, datetime.strptime(args.start, '%Y-%m-%d'), args.seed)
+    output = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    return summary
+
+
+if __name__ == '__main__':
+    main()
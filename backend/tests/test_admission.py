@@ -0,0 +1,199 @@
+"""
+Tests for admission control
+"""
+
+import pytest
+import asyncio
+import threading
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+import app.cache as cache
+import app.main as main
+from app.admission import (DEFAULT_LIMITS, AdmissionController, AdmissionLimit, Overloaded, hand_back_slot,
+                           parse_limits)
+from app.cache import TwoTierCache
+from app.coalesce import SingleFlight
+
+PERSON = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707}
+
+
+async def hold(limit: AdmissionLimit, seconds: float):
+    slot = await limit.enter()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        slot.release()
+
+
+class TestAdmissionLimit:
+    """Test suite for per-route slots and shedding"""
+
+    def test_queued_requests_get_released_slots_in_order(self):
+        limit, order = AdmissionLimit('test', 1, 10, 5.0), []
+
+        async def request(i):
+            await limit.acquire()
+            order.append(i)
+            await asyncio.sleep(0.01)
+            limit.release()
+
+        async def scenario():
+            await asyncio.gather(*[request(i) for i in range(5)])
+
+        asyncio.run(scenario())
+        assert order == [0, 1, 2, 3, 4]
+        stats = limit.stats()
+        assert stats['admitted'] == 5 and stats['queued'] == 4 and stats['peak_waiting'] == 4
+        assert stats['active'] == 0 and stats['rejected'] == 0
+
+    def test_full_queue_sheds(self):
+        limit = AdmissionLimit('test', 1, 2, 5.0)
+
+        async def scenario():
+            return await asyncio.gather(*[hold(limit, 0.05) for _ in range(5)], return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        shed = [r for r in results if isinstance(r, Overloaded)]
+        assert len(shed) == 2 and all(e.reason == 'queue full' for e in shed)
+        assert limit.stats()['shed_queue_full'] == 2 and limit.stats()['rejected'] == 2
+
+    def test_expected_wait_beyond_deadline_sheds_without_queueing(self):
+        limit = AdmissionLimit('test', 1, 100, 1.0)
+        limit.service_seconds = 0.4
+
+        async def scenario():
+            return await asyncio.gather(*[hold(limit, 0.01) for _ in range(5)], return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        # Positions 1 and 2 expect 0.4 s and 0.8 s; 3 and 4 would wait past the 1 s deadline
+        shed = [r for r in results if isinstance(r, Overloaded)]
+        assert [e.reason for e in shed] == ['expected wait exceeds deadline'] * 2
+        assert all(e.retry_after >= 1 for e in shed)
+        assert limit.stats()['queued'] == 2 and limit.stats()['shed_deadline'] == 2
+
+    def test_deadline_passing_while_queued_sheds(self):
+        limit = AdmissionLimit('test', 1, 10, 0.05)
+
+        async def scenario():
+            return await asyncio.gather(hold(limit, 0.3), hold(limit, 0.01), return_exceptions=True)
+
+        first, second = asyncio.run(scenario())
+        assert first is None and isinstance(second, Overloaded)
+        assert limit.stats()['shed_timeout'] == 1 and limit.stats()['active'] == 0
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        limit = AdmissionLimit('test', 1, 10, 5.0)
+
+        async def scenario():
+            holder = asyncio.ensure_future(hold(limit, 0.05))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(limit.acquire())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await holder
+            await hold(limit, 0)
+
+        asyncio.run(scenario())
+        assert limit.stats()['active'] == 0 and limit.stats()['waiting'] == 0
+
+    def test_service_time_average(self):
+        limit = AdmissionLimit('test', 2, 10, 5.0)
+        limit.active = 2
+        limit.release(1.0)
+        limit.release(0.5)
+        assert limit.service_seconds == pytest.approx(0.9)
+        assert limit.expected_wait(4) == pytest.approx(1.8)
+
+    def test_hand_back_frees_the_slot_once(self):
+        limit = AdmissionLimit('test', 1, 10, 5.0)
+
+        async def scenario():
+            slot = await limit.enter()
+            hand_back_slot()
+            hand_back_slot()
+            assert limit.active == 0
+            slot.release()
+
+        asyncio.run(scenario())
+        stats = limit.stats()
+        assert stats['active'] == 0 and stats['handed_back'] == 1 and stats['service_ms'] is None
+
+
+class TestParseLimits:
+    """Test suite for ADMISSION_LIMITS parsing"""
+
+    def test_overrides(self):
+        limits = parse_limits('muhurtham=2:8:5000, birth-chart=4')
+        assert limits['muhurtham'] == (2, 8, 5.0)
+        assert limits['birth-chart'] == (4,) + DEFAULT_LIMITS['birth-chart'][1:]
+        assert limits['transit'] == DEFAULT_LIMITS['transit']
+        assert parse_limits(None) == DEFAULT_LIMITS
+
+    @pytest.mark.parametrize('spec', ['nowhere=2', 'birth-chart=x', 'birth-chart=0', 'transit=2:4:0'])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_limits(spec)
+
+
+class TestAdmissionApi:
+    """API tests for shedding the calculation routes under load"""
+
+    @pytest.fixture
+    def saturated(self, monkeypatch):
+        """One birth-chart slot, a one-request queue and a slow chart engine"""
+        monkeypatch.setattr(cache, '_cache', TwoTierCache())
+        monkeypatch.setattr(main, 'single_flight', SingleFlight())
+        monkeypatch.setattr(main, 'admission_controller',
+                            AdmissionController(parse_limits('birth-chart=1:1:5000')))
+        monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+        generate = main.astrology.generate_birth_chart
+        lock = threading.Lock()
+
+        def slow(*args, **kwargs):
+            with lock:
+                time.sleep(0.3)
+            return generate(*args, **kwargs)
+
+        monkeypatch.setattr(main.astrology, 'generate_birth_chart', slow)
+
+    def test_overload_sheds_while_cheap_routes_respond(self, saturated):
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                # Distinct births, so none of them coalesce
+                charts = [asyncio.ensure_future(client.post('/api/birth-chart', json={**PERSON, 'latitude': 13 + i}))
+                          for i in range(4)]
+                await asyncio.sleep(0.1)
+                began = time.perf_counter()
+                cheap = [await client.get(url) for url in ('/health', '/api/nakshatras', '/api/zodiac-signs')]
+                cheap_seconds = time.perf_counter() - began
+                charts = await asyncio.gather(*charts)
+                stats = await client.get('/debug/admission', headers={'X-Admin-Token': 'secret'})
+                return charts, cheap, cheap_seconds, stats
+
+        charts, cheap, cheap_seconds, stats = asyncio.run(scenario())
+        assert [r.status_code for r in cheap] == [200] * 3 and cheap_seconds < 0.3
+        codes = sorted(r.status_code for r in charts)
+        assert codes == [200, 200, 503, 503]
+        shed = [r for r in charts if r.status_code == 503]
+        assert all(int(r.headers['retry-after']) >= 1 and 'queue full' in r.json()['detail'] for r in shed)
+
+        route = stats.json()['routes']['birth-chart']
+        assert stats.json()['rejected'] == 2 and route['shed_queue_full'] == 2 and route['admitted'] == 2
+
+    def test_debug_admission_requires_token(self, monkeypatch):
+        monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                return await client.get('/debug/admission')
+
+        assert asyncio.run(scenario()).status_code in (401, 403)
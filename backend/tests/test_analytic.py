@@ -0,0 +1,89 @@
+"""
+Tests for the analytic (no ephemeris file) engine
+"""
+
+import pytest
+from datetime import datetime
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.analytic import (
+    BODIES, ERROR_BOUNDS, PADA_SPAN, VERIFIED_END_JD, VERIFIED_START_JD, boundary_risk, tropical_longitudes
+)
+from app.astrology import VedicAstrology
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return VedicAstrology()
+
+
+@pytest.fixture(scope='module')
+def sample_jd():
+    """Instants spread over the whole verified span, off any regular rhythm"""
+    return np.arange(VERIFIED_START_JD, VERIFIED_END_JD, 2.917)
+
+
+class TestAnalyticSeries:
+    """Test suite for accuracy against the skyfield path"""
+
+    def test_error_within_bounds(self, engine, sample_jd):
+        analytic = engine.sidereal_longitudes(sample_jd, list(BODIES), engine='analytic')
+        exact = engine.sidereal_longitudes(sample_jd, list(BODIES))
+        for name in BODIES:
+            error = np.abs((analytic[name] - exact[name] + 180) % 360 - 180)
+            assert error.max() < ERROR_BOUNDS[name], name
+            assert error.max() > ERROR_BOUNDS[name] / 4, f'{name} bound is far looser than measured'
+
+    def test_boundary_changes_are_flagged(self, engine, sample_jd):
+        analytic = engine.sidereal_longitudes(sample_jd, list(BODIES), engine='analytic')
+        exact = engine.sidereal_longitudes(sample_jd, list(BODIES))
+        for name in BODIES:
+            differs = (analytic[name] // PADA_SPAN) != (exact[name] // PADA_SPAN)
+            flagged = boundary_risk(analytic[name], name, sample_jd)
+            assert differs.any()
+            assert not (differs & ~flagged).any(), name
+            assert flagged.mean() < 0.1
+
+    def test_outside_verified_span_is_flagged(self):
+        jd = np.array([VERIFIED_START_JD - 400, VERIFIED_END_JD + 400])
+        assert boundary_risk(np.array([1.5, 1.5]), 'Saturn', jd).all()
+        with pytest.raises(ValueError):
+            tropical_longitudes(jd, ['Pluto'])
+
+
+class TestAnalyticCharts:
+    """Test suite for charts built with the analytic engine"""
+
+    BIRTHS = [datetime(1990, 5, 15, 14, 30), datetime(1921, 2, 3, 6, 5), datetime(2044, 11, 30, 23, 50)]
+
+    def test_chart_matches_skyfield(self, engine):
+        for birth in self.BIRTHS:
+            fast = engine.generate_birth_chart(birth, 13.0827, 80.2707, 'Asia/Kolkata', engine='analytic')
+            exact = engine.generate_birth_chart(birth, 13.0827, 80.2707, 'Asia/Kolkata')
+            assert fast['birth_info']['engine'] == 'analytic'
+            for name, position in exact['planetary_positions'].items():
+                estimate = fast['planetary_positions'][name]
+                assert estimate['longitude'] == pytest.approx(position['longitude'], abs=ERROR_BOUNDS[name] + 1e-9)
+                assert estimate['is_retrograde'] == position['is_retrograde']
+                if name not in fast['boundary_risk']:
+                    assert (estimate['rasi'], estimate['nakshatra'], estimate['pada']) == \
+                        (position['rasi'], position['nakshatra'], position['pada'])
+            assert fast['ascendant'] == exact['ascendant']
+            assert 'boundary_risk' not in exact and 'engine' not in exact['birth_info']
+
+    def test_batch_matches_single(self, engine):
+        lats, lons, zones = [13.0827] * 3, [80.2707] * 3, ['Asia/Kolkata'] * 3
+        batch = engine.generate_birth_charts(self.BIRTHS, lats, lons, zones, engine='analytic')
+        for birth, chart in zip(self.BIRTHS, batch):
+            single = engine.generate_birth_chart(birth, 13.0827, 80.2707, 'Asia/Kolkata', engine='analytic')
+            assert chart['planetary_positions'] == single['planetary_positions']
+            assert chart['boundary_risk'] == single['boundary_risk']
+
+    def test_unknown_engine(self, engine):
+        with pytest.raises(ValueError):
+            engine.generate_birth_chart(self.BIRTHS[0], 13.0827, 80.2707, 'Asia/Kolkata', engine='vsop')
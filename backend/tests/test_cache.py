@@ -0,0 +1,261 @@
+"""
+Tests for the two-tier result cache
+"""
+
+import pytest
+import socket
+import socketserver
+import threading
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+import app.cache as cache
+from app.cache import LocalCache, RespBackend, SQLiteBackend, TwoTierCache, backend_from_url
+from app.main import app
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """In-memory server for the subset of the Redis protocol the cache uses"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', 0), RespHandler)
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        server = self.server
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            name, args = args[0].upper(), args[1:]
+            with server.lock:
+                now = time.monotonic()
+                if name == b'GET':
+                    value, expires = server.data.get(args[0], (None, 0))
+                    reply = b'$-1\r\n' if value is None or expires <= now else b'$%d\r\n%s\r\n' % (len(value), value)
+                elif name == b'SET':
+                    options = [a.upper() for a in args[2:]]
+                    ttl = int(args[2 + options.index(b'PX') + 1]) / 1000 if b'PX' in options else 1e9
+                    current = server.data.get(args[0])
+                    if b'NX' in options and current is not None and current[1] > now:
+                        reply = b'$-1\r\n'
+                    else:
+                        server.data[args[0]] = (args[1], now + ttl)
+                        reply = b'+OK\r\n'
+                elif name == b'DEL':
+                    reply = b':%d\r\n' % int(server.data.pop(args[0], None) is not None)
+                elif name == b'EVAL':
+                    # Only the cache's lease-release script: delete KEYS[1] if it holds ARGV[1]
+                    key, token = args[2], args[3]
+                    value, expires = server.data.get(key, (None, 0))
+                    released = value == token and expires > now
+                    if released:
+                        del server.data[key]
+                    reply = b':%d\r\n' % int(released)
+                elif name == b'SELECT':
+                    reply = b'+OK\r\n'
+                else:
+                    reply = b'-ERR unknown command\r\n'
+            self.wfile.write(reply)
+
+
+@pytest.fixture
+def resp_server():
+    server = RespStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def slow_chart(counter):
+    def compute():
+        counter.append(1)
+        time.sleep(0.2)
+        return {'houses': {1: {'rasi': 5}}, 'value': len(counter)}
+    return compute
+
+
+class TestBackends:
+    """Test suite for the local and shared tiers"""
+
+    def test_local_lru(self):
+        local = LocalCache(2)
+        local.set('a', b'1')
+        local.set('b', b'2')
+        local.get('a')
+        local.set('c', b'3')
+        assert local.get('b') is None and local.get('a') == b'1' and len(local) == 2
+
+    def test_sqlite_add_respects_expiry(self, tmp_path):
+        backend = backend_from_url(f'sqlite:///{tmp_path}/cache.db')
+        assert isinstance(backend, SQLiteBackend)
+        assert backend.add('lease', b'x', 0.05)
+        assert not backend.add('lease', b'y', 10)
+        time.sleep(0.06)
+        assert backend.add('lease', b'z', 10)
+        backend.set('k', b'v', 10)
+        assert backend.get('k') == b'v'
+        backend.delete('k')
+        assert backend.get('k') is None
+        assert not backend.release('lease', b'x') and backend.release('lease', b'z')
+        assert backend.add('lease', b'w', 10)
+
+    def test_sqlite_purges_expired_rows(self, tmp_path):
+        path = str(tmp_path / 'cache.db')
+        backend = SQLiteBackend(path, purge_every=5)
+
+        def rows():
+            return backend._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+        for i in range(4):
+            backend.set(f'old{i}', b'v', 0.01)
+        time.sleep(0.02)
+        assert rows() == 4
+        # The fifth write deletes the four expired rows
+        backend.set('fresh', b'v', 60)
+        assert rows() == 1
+        for i in range(3):
+            backend.set(f'old{i}', b'v', 0.01)
+        time.sleep(0.02)
+        assert rows() == 4
+        # Opening the file purges too
+        assert SQLiteBackend(path)._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0] == 1
+        assert backend.get('fresh') == b'v'
+
+    def test_resp_backend(self, resp_server):
+        backend = backend_from_url(f'redis://127.0.0.1:{resp_server.server_address[1]}/2')
+        assert isinstance(backend, RespBackend)
+        backend.set('k', b'\x00binary\r\n', 10)
+        assert backend.get('k') == b'\x00binary\r\n'
+        assert backend.add('lease', b'a', 10) and not backend.add('lease', b'b', 10)
+        backend.delete('k')
+        assert backend.get('missing') is None and backend.get('k') is None
+        assert not backend.release('lease', b'b') and backend.release('lease', b'a')
+        assert backend.add('lease', b'c', 10)
+
+
+class TestTwoTierCache:
+    """Test suite for lookups, stampede protection and metrics"""
+
+    def test_workers_share_results(self, resp_server):
+        url = f'redis://127.0.0.1:{resp_server.server_address[1]}/0'
+        worker_a = TwoTierCache(LocalCache(), backend_from_url(url))
+        worker_b = TwoTierCache(LocalCache(), backend_from_url(url))
+        calls = []
+        first = worker_a.get_or_compute('chart:x', slow_chart(calls))
+        second = worker_b.get_or_compute('chart:x', slow_chart(calls))
+        assert len(calls) == 1
+        assert second == first and second['houses'][1] == {'rasi': 5}
+        worker_b.get_or_compute('chart:x', slow_chart(calls))
+        stats = worker_b.stats()
+        assert stats['shared']['hits'] == 1 and stats['local']['hits'] == 1
+        assert stats['shared']['backend'] == 'RespBackend'
+
+    @pytest.mark.parametrize('threads_per_worker', [1, 4])
+    def test_stampede_computes_once(self, tmp_path, threads_per_worker):
+        """Concurrent misses across threads and workers compute a key once"""
+        path = str(tmp_path / 'cache.db')
+        workers = [TwoTierCache(LocalCache(), SQLiteBackend(path)) for _ in range(3)]
+        calls = []
+        results = []
+        threads = [threading.Thread(target=lambda w=w: results.append(w.get_or_compute('k', slow_chart(calls))))
+                   for w in workers for _ in range(threads_per_worker)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1
+        assert len(results) == len(threads) and all(r == results[0] for r in results)
+        assert sum(w.stats()['shared']['lock_waits'] for w in workers) == 2
+
+    @pytest.mark.parametrize('shared', ['sqlite', 'redis'])
+    def test_failed_compute_releases_lease(self, tmp_path, resp_server, shared):
+        """A compute that raises frees the key's lease, so the next call computes at once"""
+        if shared == 'sqlite':
+            url = f'sqlite:///{tmp_path}/cache.db'
+        else:
+            url = f'redis://127.0.0.1:{resp_server.server_address[1]}/0'
+        worker = TwoTierCache(LocalCache(), backend_from_url(url))
+
+        def failing():
+            raise RuntimeError('engine failure')
+
+        with pytest.raises(RuntimeError):
+            worker.get_or_compute('k', failing)
+        calls = []
+        began = time.monotonic()
+        assert worker.get_or_compute('k', slow_chart(calls))['value'] == 1
+        assert time.monotonic() - began < 1.0
+        assert worker.stats()['shared']['lock_waits'] == 0
+
+    def test_expired_lease_is_not_released_by_its_old_holder(self, tmp_path):
+        path = str(tmp_path / 'cache.db')
+        slow = TwoTierCache(LocalCache(), SQLiteBackend(path), lock_seconds=0.05)
+        other = SQLiteBackend(path)
+        lock_key = cache.KEY_PREFIX + 'k:lock'
+
+        def compute():
+            time.sleep(0.1)
+            # The first lease has expired and another worker has taken the key
+            assert other.add(lock_key, b'other', 10)
+            return {'value': 1}
+
+        slow.get_or_compute('k', compute)
+        assert not other.add(lock_key, b'third', 10)
+
+    def test_unreachable_shared_tier(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        worker = TwoTierCache(LocalCache(), RespBackend('127.0.0.1', port, timeout=0.2))
+        calls = []
+        assert worker.get_or_compute('k', slow_chart(calls))['value'] == 1
+        assert worker.stats()['shared']['errors'] >= 2
+        assert worker.get_or_compute('k', slow_chart(calls))['value'] == 1
+        assert len(calls) == 1
+
+
+class TestCacheApi:
+    """API tests for cached charts and porutham results"""
+
+    def test_compatibility_is_cached(self, monkeypatch):
+        from app import main
+        monkeypatch.setattr(cache, '_cache', TwoTierCache(LocalCache()))
+        monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+        client = TestClient(app)
+        body = {
+            'person1': {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707},
+            'person2': {'date': '1992-08-20', 'time': '09:15', 'latitude': 9.9252, 'longitude': 78.1198}
+        }
+        first = client.post('/api/compatibility', json=body).json()
+        monkeypatch.setattr(main.astrology, 'calculate_10_porutham', None)
+        assert client.post('/api/compatibility', json=body).json() == first
+
+        stats = client.get('/debug/cache', headers={'X-Admin-Token': 'secret'}).json()
+        assert stats['computes'] == 3
+        assert stats['local']['hits'] == 3
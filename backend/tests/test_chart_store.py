@@ -0,0 +1,145 @@
+"""
+Tests for the SQLite chart store
+"""
+
+import pytest
+from datetime import datetime
+import sqlite3
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+import app.cache as cache
+import app.chart_store as chart_store
+from app.astrology import VedicAstrology
+from app.cache import LocalCache, TwoTierCache
+from app.chart_store import ChartStore, chart_attributes, chart_id, normalized_input
+from app.main import app, astrology
+
+BIRTHS = [
+    ('1990-05-15', '14:30', 13.0827, 80.2707),
+    ('1985-11-02', '06:10', 9.9252, 78.1198),
+    ('2001-01-26', '23:45', 11.0168, 76.9558),
+]
+
+
+@pytest.fixture(scope='module')
+def charts():
+    engine = VedicAstrology()
+    result = []
+    for date, time, lat, lon in BIRTHS:
+        chart = engine.generate_birth_chart(datetime.strptime(f'{date} {time}', '%Y-%m-%d %H:%M'),
+                                            lat, lon, 'Asia/Kolkata')
+        result.append((normalized_input(date, time, lat, lon, 'Asia/Kolkata', 'lahiri_linear', 'mean'), chart))
+    return result
+
+
+class TestChartStore:
+    """Test suite for chart persistence and attribute queries"""
+
+    def test_ids_hash_normalized_input(self):
+        a = normalized_input('1990-05-15', '14:30', 13.08270001, 80.2707, 'Asia/Kolkata', 'lahiri', 'mean')
+        b = normalized_input('1990-05-15', '14:30', 13.0827, 80.27069999, 'Asia/Kolkata', 'lahiri', 'mean')
+        assert chart_id(a) == chart_id(b)
+        assert chart_id(a) != chart_id({**a, 'node': 'true'})
+
+    def test_round_trip(self, charts, tmp_path):
+        store = ChartStore(str(tmp_path / 'charts.db'))
+        birth_input, chart = charts[0]
+        cid = store.put(birth_input, {**chart, 'person': {'name': 'Test'}})
+        store.flush()
+        loaded = store.get(cid)
+        assert 'person' not in loaded
+        assert loaded['houses'][1] == chart['houses'][1]
+        assert loaded['planetary_positions']['Moon']['longitude'] == chart['planetary_positions']['Moon']['longitude']
+        assert store.get('missing') is None
+        store.close()
+
+    def test_writes_are_batched(self, charts, tmp_path):
+        path = str(tmp_path / 'charts.db')
+        store = ChartStore(path, batch_size=3, flush_seconds=60)
+        ids = store.put_many(charts[:2])
+        on_disk = lambda: sqlite3.connect(path).execute('SELECT COUNT(*) FROM charts').fetchone()[0]
+        assert on_disk() == 0
+        assert store.get(ids[0]) is not None  # buffered charts are readable
+        store.put(*charts[2])
+        assert on_disk() == 3
+        store.close()
+
+    def test_attribute_queries(self, charts, tmp_path):
+        store = ChartStore(str(tmp_path / 'charts.db'))
+        store.put_many(charts)
+        attributes = [chart_attributes(chart) for _, chart in charts]
+        moon_rasi = attributes[0]['moon_rasi']
+        expected = sum(a['moon_rasi'] == moon_rasi for a in attributes)
+        assert store.count(moon_rasi=moon_rasi) == expected
+        rows = store.query(moon_nakshatra=attributes[1]['moon_nakshatra'], moon_pada=attributes[1]['moon_pada'])
+        assert chart_id(charts[1][0]) in [r['id'] for r in rows]
+        assert sum(store.distribution('lagna_rasi').values()) == 3
+        assert store.count(mangal_dosha=True) == sum(a['mangal_dosha'] for a in attributes)
+        with pytest.raises(ValueError):
+            store.query(name='x')
+        store.close()
+
+
+class TestChartStoreApi:
+    """API tests with a configured chart store"""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        store = ChartStore(str(tmp_path / 'charts.db'))
+        monkeypatch.setattr(chart_store, '_store', store)
+        # Charts cached by earlier tests would never reach this store
+        monkeypatch.setattr(cache, '_cache', TwoTierCache(LocalCache()))
+        yield TestClient(app)
+        store.close()
+
+    def test_charts_are_stored_and_reused(self, client, monkeypatch):
+        details = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707}
+        first = client.post('/api/birth-chart', json=details).json()
+        cid = first['chart_id']
+
+        def fail(*args, **kwargs):
+            raise AssertionError('chart should come from the store')
+        monkeypatch.setattr(astrology, 'generate_birth_chart', fail)
+        again = client.post('/api/birth-chart', json=details).json()
+        assert again['chart_id'] == cid
+        assert again['planetary_positions'] == first['planetary_positions']
+        assert client.post('/api/dasha-periods', json=details).status_code == 200
+
+        assert client.get(f'/api/charts/{cid}').json()['chart_id'] == cid
+        assert client.get('/api/charts/unknown').status_code == 404
+        moon_rasi = first['planetary_positions']['Moon']['rasi']
+        found = client.get('/api/charts', params={'moon_rasi': moon_rasi}).json()
+        assert found['total'] == 1 and found['charts'][0]['id'] == cid
+        stats = client.get('/api/charts/stats', params={'by': 'moon_rasi'}).json()
+        assert stats['counts'] == {str(moon_rasi): 1}
+        assert client.get('/api/charts/stats', params={'by': 'name'}).status_code == 422
+
+    def test_transit_scored_against_stored_chart(self, client):
+        details = {'date': '1985-11-02', 'time': '06:10', 'latitude': 9.9252, 'longitude': 78.1198}
+        chart = client.post('/api/birth-chart', json=details).json()
+        response = client.get('/api/transit', params={'chart_id': chart['chart_id']})
+        assert response.status_code == 200
+        body = response.json()
+        scores = body['ashtakavarga_transits']
+        assert set(scores) == {'Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn'}
+        saturn = scores['Saturn']
+        assert saturn['rasi'] == body['planetary_positions']['Saturn']['rasi']
+        assert saturn['bindus'] == chart['ashtakavarga']['bhinna']['Saturn']['bindus'][saturn['rasi'] - 1]
+        assert saturn['favourable'] == (saturn['bindus'] >= 4)
+        assert 'ashtakavarga_transits' not in client.get('/api/transit').json()
+        assert client.get('/api/transit', params={'chart_id': 'unknown'}).status_code == 404
+
+    def test_store_disabled(self, monkeypatch):
+        monkeypatch.setattr(chart_store, '_store', None)
+        monkeypatch.setattr(chart_store, 'STORE_PATH', None)
+        client = TestClient(app)
+        assert client.get('/api/charts').status_code == 503
+        assert client.get('/api/transit', params={'chart_id': 'abc'}).status_code == 503
+        details = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707}
+        assert 'chart_id' not in client.post('/api/birth-chart', json=details).json()
@@ -0,0 +1,117 @@
+"""
+Tests for server-side chart SVGs
+"""
+
+import pytest
+import sys
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+import app.cache as cache
+import app.main as main
+from app.astrology import get_astrology_engine
+from app.cache import LocalCache, TwoTierCache
+from app.chart_svg import LABELS, NORTH_HOUSES, SOUTH_CELLS, chart_placements, render_chart_svg
+
+SVG = '{http://www.w3.org/2000/svg}'
+BIRTH = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707}
+
+
+@pytest.fixture(scope='module')
+def chart():
+    return get_astrology_engine().generate_birth_chart(datetime(1990, 5, 15, 14, 30), 13.0827, 80.2707,
+                                                       'Asia/Kolkata', vargas=['D9'])
+
+
+def labels(svg: str):
+    """(text, x, y) of the placement labels"""
+    root = ET.fromstring(svg)
+    return [(''.join(t.itertext()), float(t.get('x')), float(t.get('y')))
+            for t in root.iter(f'{SVG}text') if t.get('class') in ('g', 'l')]
+
+
+class TestRenderer:
+    """Test suite for the South and North Indian renderers"""
+
+    def test_placements(self, chart):
+        lagna, placements = chart_placements(chart)
+        assert lagna == chart['ascendant']['rasi'] and placements[lagna][0] == ('Ascendant', False)
+        assert sum(len(bodies) for bodies in placements.values()) == 10
+        _, navamsa = chart_placements(chart, 'D9')
+        for name, position in chart['vargas']['D9']['positions'].items():
+            assert name in [body for body, _ in navamsa[position['rasi']]]
+
+    def test_south_cells(self, chart):
+        svg = render_chart_svg(chart, lang='en')
+        found = {text.split('(')[0]: (x, y) for text, x, y in labels(svg)}
+        assert len(found) == 10
+        for name, label in LABELS['en'].items():
+            rasi = chart['ascendant']['rasi'] if name == 'Ascendant' else chart['planetary_positions'][name]['rasi']
+            col, row = SOUTH_CELLS[rasi]
+            x, y = found[label]
+            assert col * 100 < x < (col + 1) * 100 and row * 100 < y < (row + 1) * 100
+
+    def test_north_houses(self, chart):
+        svg = render_chart_svg(chart, 'D1', 'north')
+        root = ET.fromstring(svg)
+        numbers = {(float(t.get('x')), float(t.get('y'))): t.text for t in root.iter(f'{SVG}text')
+                   if t.get('class') == 'n'}
+        assert numbers[NORTH_HOUSES[1][1]] == str(chart['ascendant']['rasi'])
+        assert len(labels(svg)) == 10
+
+    def test_tamil_labels_and_retrograde(self, chart):
+        svg = render_chart_svg(chart, caption=['1990-05-15 14:30'])
+        texts = [text for text, _, _ in labels(svg)]
+        assert 'ல' in texts and 'சந்' in [t.replace('(வ)', '') for t in texts]
+        retrograde = [n for n in LABELS['ta'] if n not in ('Rahu', 'Ketu', 'Ascendant')
+                      and chart['planetary_positions'][n]['is_retrograde']]
+        assert sum(t.endswith('(வ)') for t in texts) == len(retrograde)
+        assert '1990-05-15 14:30' in svg
+
+    @pytest.mark.parametrize('style', ['south', 'north'])
+    def test_caption_escaped_once(self, chart, style):
+        svg = render_chart_svg(chart, style=style, caption=['Chennai & <Madras>'])
+        assert '&amp;amp;' not in svg and '&amp;lt;' not in svg
+        root = ET.fromstring(svg)
+        title = root.find('{http://www.w3.org/2000/svg}title')
+        assert title.text.endswith('Chennai & <Madras>')
+        if style == 'south':
+            assert 'Chennai & <Madras>' in [t.text for t in root.iter('{http://www.w3.org/2000/svg}text')]
+
+    def test_rejects_unknown_options(self, chart):
+        with pytest.raises(ValueError):
+            render_chart_svg(chart, style='east')
+        with pytest.raises(ValueError):
+            render_chart_svg(chart, 'D5')
+
+
+class TestChartSvgApi:
+    """API tests for /api/chart.svg"""
+
+    def test_cached_by_content_hash(self, monkeypatch):
+        monkeypatch.setattr(cache, '_cache', TwoTierCache(LocalCache()))
+        client = TestClient(main.app)
+        first = client.get('/api/chart.svg', params={**BIRTH, 'varga': 'd9', 'style': 'north'})
+        assert first.status_code == 200 and first.headers['content-type'] == 'image/svg+xml'
+        ET.fromstring(first.content)
+
+        monkeypatch.setattr(main, 'render_chart_svg', None)
+        again = client.get('/api/chart.svg', params={**BIRTH, 'varga': 'D9', 'style': 'north',
+                                                     'latitude': 13.08271})
+        assert again.content == first.content
+
+        etag = first.headers['etag']
+        revalidated = client.get('/api/chart.svg', params={**BIRTH, 'varga': 'D9', 'style': 'north'},
+                                 headers={'If-None-Match': etag})
+        assert revalidated.status_code == 304
+
+    @pytest.mark.parametrize('params', [{'style': 'east'}, {'varga': 'D5'}, {'lang': 'fr'}, {'time': '25:00'}])
+    def test_invalid_requests(self, params):
+        client = TestClient(main.app)
+        assert client.get('/api/chart.svg', params={**BIRTH, **params}).status_code == 422
@@ -0,0 +1,143 @@
+"""
+Tests for request coalescing
+"""
+
+import pytest
+import asyncio
+import threading
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+import app.cache as cache
+import app.main as main
+from app.admission import DEFAULT_LIMITS, AdmissionController
+from app.cache import TwoTierCache
+from app.coalesce import SingleFlight
+
+PERSON = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707}
+PARTNER = {'date': '1992-08-20', 'time': '09:15', 'latitude': 9.9252, 'longitude': 78.1198}
+
+
+def slow(calls, result='done', delay=0.2):
+    def compute(*args):
+        calls.append(args)
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return compute
+
+
+class TestSingleFlight:
+    """Test suite for the single-flight primitive"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight, calls = SingleFlight(), []
+
+        async def scenario():
+            same = [flight.run('a', slow(calls), 1) for _ in range(5)]
+            return await asyncio.gather(*same, flight.run('b', slow(calls), 2))
+
+        assert asyncio.run(scenario()) == ['done'] * 6
+        assert sorted(calls) == [(1,), (2,)]
+        assert flight.stats() == {'executions': 2, 'coalesced': 4, 'errors': 0, 'in_flight': 0}
+
+    def test_sequential_calls_execute_again(self):
+        flight, calls = SingleFlight(), []
+
+        async def scenario():
+            await flight.run('a', slow(calls, delay=0))
+            await flight.run('a', slow(calls, delay=0))
+
+        asyncio.run(scenario())
+        assert len(calls) == 2 and flight.stats()['coalesced'] == 0
+
+    def test_errors_reach_every_waiter(self):
+        flight, calls = SingleFlight(), []
+
+        async def scenario():
+            return await asyncio.gather(*[flight.run('a', slow(calls, ValueError('bad'))) for _ in range(3)],
+                                        return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        assert len(calls) == 1 and all(isinstance(r, ValueError) for r in results)
+        assert flight.stats()['errors'] == 1
+
+    def test_cancelled_waiter_does_not_cancel_the_others(self):
+        flight, calls = SingleFlight(), []
+
+        async def scenario():
+            first = asyncio.ensure_future(flight.run('a', slow(calls)))
+            second = asyncio.ensure_future(flight.run('a', slow(calls)))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            return await second, first.cancelled()
+
+        assert asyncio.run(scenario()) == ('done', True)
+        assert len(calls) == 1
+
+
+class TestCoalescedApi:
+    """API tests for identical concurrent requests"""
+
+    @pytest.fixture
+    def counted_charts(self, monkeypatch):
+        """generate_birth_chart slowed down and counted, with an empty result cache and roomy admission limits"""
+        monkeypatch.setattr(cache, '_cache', TwoTierCache())
+        monkeypatch.setattr(main, 'single_flight', SingleFlight())
+        monkeypatch.setattr(main, 'admission_controller',
+                            AdmissionController({route: (32, 128, 30.0) for route in DEFAULT_LIMITS}))
+        calls = []
+        generate = main.astrology.generate_birth_chart
+        lock = threading.Lock()
+
+        def counted(*args, **kwargs):
+            with lock:
+                calls.append(args)
+            time.sleep(0.2)
+            return generate(*args, **kwargs)
+
+        monkeypatch.setattr(main.astrology, 'generate_birth_chart', counted)
+        return calls
+
+    def send_concurrently(self, requests):
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                return await asyncio.gather(*[client.post(url, json=body) for url, body in requests])
+        return asyncio.run(scenario())
+
+    def test_birth_chart(self, counted_charts):
+        requests = [('/api/birth-chart', {**PERSON, 'name': f'Visitor {i}'}) for i in range(20)]
+        responses = self.send_concurrently(requests)
+        assert [r.status_code for r in responses] == [200] * 20
+        assert len(counted_charts) == 1
+        assert [r.json()['person']['name'] for r in responses] == [f'Visitor {i}' for i in range(20)]
+        assert {r.json()['ascendant']['longitude'] for r in responses} == {responses[0].json()['ascendant']['longitude']}
+        assert main.single_flight.stats()['coalesced'] == 19
+
+    def test_different_fields_are_separate(self, counted_charts):
+        self.send_concurrently([('/api/birth-chart', PERSON), ('/api/birth-chart?fields=houses', PERSON),
+                                ('/api/birth-chart?fields=houses.1', PERSON)])
+        # fields=houses and fields=houses.1 need the same sections
+        assert len(counted_charts) == 2
+        assert main.single_flight.stats()['coalesced'] == 1
+
+    def test_compatibility(self, counted_charts, monkeypatch):
+        monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+        requests = [('/api/compatibility', {'person1': PERSON, 'person2': PARTNER})] * 10
+        responses = self.send_concurrently(requests)
+        assert len({r.content for r in responses}) == 1
+        assert len(counted_charts) == 2
+
+        async def stats():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                return await client.get('/debug/cache', headers={'X-Admin-Token': 'secret'})
+        assert asyncio.run(stats()).json()['single_flight']['coalesced'] == 9
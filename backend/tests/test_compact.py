@@ -0,0 +1,134 @@
+"""
+Tests for compact MessagePack chart responses
+"""
+
+import pytest
+import math
+import sys
+import os
+from datetime import date, datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.astrology import get_astrology_engine
+from app.compact import CODES_VERSION, code_table, compact_chart, expand_chart
+from app.fields import project
+from app.main import app
+from app.packing import packb, unpackb
+from app.responses import prefers_msgpack
+
+PERSON = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707}
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return get_astrology_engine()
+
+
+@pytest.fixture(scope='module')
+def table(engine):
+    return code_table(engine)
+
+
+@pytest.fixture(scope='module')
+def client():
+    return TestClient(app)
+
+
+class TestPacking:
+    """Test suite for MessagePack encoding of chart values"""
+
+    @pytest.mark.parametrize('value', [
+        None, True, False, 0, 127, 128, 255, 65536, 2 ** 40, -1, -32, -33, -200, -40000, -2 ** 40,
+        0.5, -1e300, math.pi, '', 'Aries', 'மகரம்' * 20, 'x' * 300, 'y' * 70000, b'', b'\x00\xff' * 200,
+        list(range(20)), {'a': [1, {2: 'b'}]}, {i: i for i in range(20)},
+    ])
+    def test_round_trip(self, value):
+        assert unpackb(packb(value)) == value
+
+    def test_known_encodings(self):
+        assert packb({'a': [1, -1, None]}) == b'\x81\xa1a\x93\x01\xff\xc0'
+        assert packb(300) == b'\xcd\x01\x2c'
+        assert packb(b'ab') == b'\xc4\x02ab'
+
+    def test_numpy_and_dates(self):
+        value = {'jd': np.float64(2451545.0), 'rasi': np.int8(5), 'bindus': np.arange(3), 'on': date(2024, 6, 1)}
+        assert unpackb(packb(value)) == {'jd': 2451545.0, 'rasi': 5, 'bindus': [0, 1, 2], 'on': '2024-06-01'}
+        with pytest.raises(TypeError):
+            packb({'bad': object()})
+
+    def test_rejects_truncated_data(self):
+        with pytest.raises(ValueError):
+            unpackb(packb('Capricorn')[:-1])
+
+
+class TestCompactChart:
+    """Test suite for the columnar chart form"""
+
+    @pytest.mark.parametrize('options', [{}, {'vargas': ['all']}, {'engine': 'analytic'}])
+    def test_expands_to_same_chart(self, engine, table, options):
+        chart = engine.generate_birth_chart(datetime(1990, 5, 15, 14, 30), 13.0827, 80.2707, 'Asia/Kolkata',
+                                            **options)
+        payload = compact_chart(chart, table)
+        assert set(payload['codes']['sections']) >= {'planetary_positions', 'ascendant', 'houses',
+                                                     'vimshottari_dasha'}
+        assert expand_chart(unpackb(packb(payload)), table) == chart
+
+    def test_partial_sections_are_kept(self, engine, table):
+        chart = engine.generate_birth_chart(datetime(1990, 5, 15, 14, 30), 13.0827, 80.2707, 'Asia/Kolkata')
+        partial = project(chart, ['planetary_positions.Moon.pada', 'ascendant'])
+        payload = compact_chart(partial, table)
+        assert payload['codes']['sections'] == ['ascendant']
+        assert payload['planetary_positions'] == partial['planetary_positions']
+        assert expand_chart(payload, table) == partial
+
+    def test_version_mismatch(self, engine, table):
+        chart = engine.generate_birth_chart(datetime(1990, 5, 15, 14, 30), 13.0827, 80.2707, 'Asia/Kolkata')
+        with pytest.raises(ValueError):
+            expand_chart(compact_chart(chart, table), {**table, 'version': CODES_VERSION + 1})
+
+
+class TestNegotiation:
+    """API tests for Accept-based content negotiation"""
+
+    @pytest.mark.parametrize('accept, expected', [
+        (None, False),
+        ('application/json', False),
+        ('application/msgpack', True),
+        ('application/x-msgpack, */*', True),
+        ('application/json;q=0.9, application/msgpack', True),
+        ('application/json, application/msgpack;q=0.5', False),
+        ('application/msgpack;q=0', False),
+    ])
+    def test_prefers_msgpack(self, accept, expected):
+        assert prefers_msgpack(accept) is expected
+
+    def test_birth_chart(self, client, table):
+        as_json = client.post('/api/birth-chart', json=PERSON)
+        binary = client.post('/api/birth-chart', json=PERSON, headers={'Accept': 'application/msgpack'})
+        assert binary.headers['content-type'] == 'application/msgpack'
+        assert 'Accept' in binary.headers['vary'] and 'Accept' in as_json.headers['vary']
+        assert len(binary.content) < len(as_json.content) / 2
+        chart = expand_chart(unpackb(binary.content), client.get('/api/chart-codes').json())
+        houses = chart.pop('houses')
+        expected = as_json.json()
+        assert {str(k): v for k, v in houses.items()} == expected.pop('houses')
+        assert chart == expected
+
+    def test_incremental_chart(self, client):
+        response = client.post('/api/birth-chart/incremental', json=PERSON,
+                               headers={'Accept': 'application/msgpack'})
+        payload = unpackb(response.content)
+        assert payload['session'] and payload['changed'] == ['*']
+        assert 'planetary_positions' in payload['chart']['codes']['sections']
+
+    def test_codes_are_cacheable(self, client, table):
+        response = client.get('/api/chart-codes')
+        assert response.json() == table
+        assert 'max-age' in response.headers['cache-control']
+        etag = response.headers['etag']
+        assert client.get('/api/chart-codes', headers={'If-None-Match': etag}).status_code == 304
@@ -0,0 +1,148 @@
+"""
+Tests for materialized daily horoscopes
+"""
+
+import pytest
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+import app.daily_horoscope as daily_horoscope
+from app.astrology import VedicAstrology
+from app.daily_horoscope import (
+    FORECAST_AHEAD_DAYS, DailyHoroscopeStore, TARAS, forecast_instant, forecast_today, materialize,
+    nakshatra_forecast, seconds_until_next_day
+)
+from app.main import app
+
+DAY = date(2024, 6, 1)
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return VedicAstrology()
+
+
+@pytest.fixture(scope='module')
+def forecasts(engine):
+    return materialize(engine, DAY)
+
+
+class TestDailyHoroscope:
+    """Test suite for per-day forecast materialization"""
+
+    def test_every_rasi_and_nakshatra(self, forecasts):
+        assert len(forecasts) == 12 + 27
+        for r in range(1, 13):
+            forecast = forecasts[f'rasi-{r}']
+            assert 1 <= forecast['rating'] <= 5
+            assert len(forecast['transits']) == 9
+        assert forecasts['nakshatra-27']['name'] == 'Revati'
+
+    def test_forecast_instant_is_indian_morning(self):
+        assert forecast_instant(DAY) == datetime(2024, 6, 1, 0, 30)
+
+    def test_chandrashtama(self, engine, forecasts):
+        """Chandrashtama falls on the rasi for which the Moon transits the 8th house"""
+        moon = engine.calculate_planetary_positions(forecast_instant(DAY), 13.0827, 80.2707)['Moon']
+        flagged = [r for r in range(1, 13) if forecasts[f'rasi-{r}']['chandrashtama']]
+        assert flagged == [(moon['rasi'] - 8) % 12 + 1]
+
+    def test_tara_counting(self, engine):
+        transits = {'Moon': {'nakshatra_id': 3, 'nakshatra': 'Krittika'}}
+        assert nakshatra_forecast(engine, 3, transits)['tara']['name'] == 'Janma'
+        assert nakshatra_forecast(engine, 2, transits)['tara']['name'] == 'Sampat'
+        # Counted forward around the circle: Revati to Krittika is the 5th star
+        assert nakshatra_forecast(engine, 26, transits)['tara']['name'] == TARAS[4]['name']
+        assert nakshatra_forecast(engine, 21, transits)['tara']['number'] == 1
+
+    def test_store_persists_and_joins(self, engine, tmp_path):
+        store = DailyHoroscopeStore(engine, str(tmp_path))
+        body, etag = store.response(DAY, rasi=5, nakshatra=10)
+        assert (tmp_path / 'daily-2024-06-01-lahiri_linear.json').exists()
+        payload = json.loads(body)
+        assert payload['rasi']['rasi'] == 5 and payload['nakshatra']['nakshatra'] == 10
+
+        reloaded = DailyHoroscopeStore(engine, str(tmp_path))
+        assert reloaded.response(DAY, rasi=5, nakshatra=10) == (body, etag)
+        assert reloaded.response(DAY, rasi=6)[1] != etag
+
+    def test_building_a_day_does_not_block_other_days(self, engine, monkeypatch):
+        store = DailyHoroscopeStore(engine, None)
+        store.day(DAY)
+        calls = []
+
+        def slow(engine, day, ayanamsa):
+            calls.append(day)
+            time.sleep(0.3)
+            return materialize(engine, day, ayanamsa)
+
+        monkeypatch.setattr(daily_horoscope, 'materialize', slow)
+        later = DAY + timedelta(days=1)
+        builders = [threading.Thread(target=store.day, args=(later,)) for _ in range(3)]
+        for t in builders:
+            t.start()
+        time.sleep(0.05)
+        began = time.perf_counter()
+        store.response(DAY, rasi=1)
+        assert time.perf_counter() - began < 0.1
+        for t in builders:
+            t.join()
+        assert calls == [later]
+
+    def test_failed_build_is_retried(self, engine, monkeypatch):
+        store = DailyHoroscopeStore(engine, None)
+
+        def failing(engine, day, ayanamsa):
+            raise RuntimeError('ephemeris unavailable')
+
+        monkeypatch.setattr(daily_horoscope, 'materialize', failing)
+        with pytest.raises(RuntimeError):
+            store.day(DAY)
+        monkeypatch.setattr(daily_horoscope, 'materialize', materialize)
+        assert store.day(DAY)['payloads']['rasi-1']
+
+    def test_cache_lifetime(self):
+        # 2024-06-01 18:30 UTC is midnight in India
+        assert seconds_until_next_day(datetime(2024, 6, 1, 17, 30, tzinfo=timezone.utc), DAY) == 3600
+        assert seconds_until_next_day(datetime(2024, 6, 2, tzinfo=timezone.utc), DAY) == 60
+
+
+class TestDailyHoroscopeApi:
+    """API tests for the daily horoscope endpoint"""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_conditional_get(self, client):
+        today = forecast_today().isoformat()
+        params = {'rasi': 5, 'nakshatra': 10, 'date': today}
+        response = client.get('/api/daily-horoscope', params=params)
+        assert response.status_code == 200
+        assert response.json()['date'] == today
+        assert response.headers['cache-control'].startswith('public, max-age=')
+        etag = response.headers['etag']
+
+        cached = client.get('/api/daily-horoscope', params=params, headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.content == b''
+
+    def test_validation(self, client):
+        assert client.get('/api/daily-horoscope').status_code == 422
+        assert client.get('/api/daily-horoscope', params={'rasi': 13}).status_code == 422
+        assert client.get('/api/daily-horoscope', params={'rasi': 1, 'date': 'today'}).status_code == 422
+        assert client.get('/api/daily-horoscope', params={'nakshatra': 1, 'ayanamsa': 'x'}).status_code == 422
+        # Only days near today are materialized on request
+        too_late = forecast_today() + timedelta(days=FORECAST_AHEAD_DAYS + 1)
+        for day in ('1900-01-01', too_late.isoformat()):
+            response = client.get('/api/daily-horoscope', params={'rasi': 1, 'date': day})
+            assert response.status_code == 422 and 'between' in response.json()['detail']
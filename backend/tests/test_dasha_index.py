@@ -0,0 +1,98 @@
+"""
+Tests for the population dasha index
+"""
+
+import pytest
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from app.astrology import VedicAstrology
+from app.dasha_index import LORDS, DashaIndex, dasha_boundaries, describe_periods, to_day
+
+
+@pytest.fixture
+def population():
+    rng = np.random.default_rng(4)
+    n = 300
+    moons = rng.uniform(0, 360, n)
+    births = [datetime(1950, 1, 1) + timedelta(days=int(d), minutes=int(m))
+              for d, m in zip(rng.integers(0, 60 * 365, n), rng.integers(0, 1440, n))]
+    return moons, births
+
+
+class TestDashaIndex:
+    """Test suite for columnar dasha boundaries and range queries"""
+
+    def test_mahadashas_match_engine(self, population):
+        """Vectorized mahadasha dates equal calculate_vimshottari_dasha"""
+        astro = VedicAstrology()
+        moons, births = population
+        lords, start, end, *_ = dasha_boundaries(moons, [to_day(b) for b in births])
+        for i in range(0, len(moons), 7):
+            dashas = astro.calculate_vimshottari_dasha(moons[i], births[i])
+            assert [d['planet'] for d in dashas] == [LORDS[l] for l in lords[i]]
+            assert [d['start_date'] for d in dashas] == list(start[i].astype('datetime64[D]').astype(str))
+            assert [d['end_date'] for d in dashas] == list(end[i].astype('datetime64[D]').astype(str))
+
+    def test_bhuktis_partition_mahadashas(self, population):
+        moons, births = population
+        lords, start, end, sub_lords, sub_start, sub_end = dasha_boundaries(
+            moons, [to_day(b) for b in births])
+        assert (sub_start[:, :, 0][:, 1:] == start[:, 1:]).all()
+        assert (sub_end[:, :, -1] == end).all()
+        assert (sub_start[:, :, 1:] == sub_end[:, :, :-1]).all()
+        assert (sub_end >= sub_start).all()
+        assert (sub_lords[:, :, 0] == lords).all()
+        # Saturn mahadasha (19y) with Saturn bhukti: 19*19/120 years
+        saturn = np.argwhere(lords == LORDS.index('Saturn'))
+        i, j = saturn[-1]
+        assert sub_end[i, j, 0] - sub_start[i, j, 0] in (1098, 1099)
+
+    def test_starting_matches_brute_force(self, population):
+        moons, births = population
+        index = DashaIndex()
+        index.add(range(len(moons)), moons, births)
+
+        found = index.starting('Saturn', '2025-01-01', '2030-01-01')
+        lords, start, *_ = dasha_boundaries(moons, [to_day(b) for b in births])
+        lo, hi = to_day('2025-01-01'), to_day('2030-01-01')
+        expected = {u for u, j in zip(*np.nonzero(lords == LORDS.index('Saturn')))
+                    if lo <= start[u, j] < hi}
+        assert set(found['user'].tolist()) == expected
+        assert list(found['start']) == sorted(found['start'])
+
+        rahu_in_jupiter = index.starting('Rahu', '2025-01-01', '2026-01-01', level='bhukti',
+                                         maha_lord='Jupiter')
+        assert all(r['maha_lord'] == 'Jupiter' and r['lord'] == 'Rahu'
+                   for r in describe_periods(rahu_in_jupiter, 'Rahu', 'bhukti'))
+
+    def test_incremental_add(self, population):
+        """Adding users in batches gives the same index as one build"""
+        moons, births = population
+        whole = DashaIndex()
+        whole.add(range(300), moons, births)
+        parts = DashaIndex()
+        for lo in range(0, 300, 70):
+            parts.add(range(lo, min(lo + 70, 300)), moons[lo:lo + 70], births[lo:lo + 70])
+        assert parts.users == 300
+        for lord in LORDS:
+            for level in ('maha', 'bhukti'):
+                a, b = whole.periods(lord, level), parts.periods(lord, level)
+                assert list(a['start']) == list(b['start'])
+                assert sorted(a.tolist()) == sorted(b.tolist())
+
+    def test_active(self, population):
+        moons, births = population
+        index = DashaIndex()
+        index.add(range(300), moons, births)
+        day = '2024-06-01'
+        running = sum(len(index.active(lord, day)) for lord in LORDS)
+        assert running == 300
+        with pytest.raises(ValueError):
+            index.active('Pluto', day)
@@ -0,0 +1,141 @@
+"""
+Tests for the daily ephemeris table export
+"""
+
+import pytest
+import csv
+import io
+import sys
+import os
+from datetime import date, datetime, time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.astrology import get_astrology_engine
+from app.ephemeris_table import GRAHAS, EphemerisTable, main as export, read_msgpack_table
+from app.timezones import timezone_resolver
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return get_astrology_engine()
+
+
+def table_csv(table: EphemerisTable):
+    return list(csv.DictReader(io.StringIO(''.join(table.csv_lines()))))
+
+
+class TestEphemerisTable:
+    """Test suite for the chunked ephemeris table"""
+
+    @pytest.mark.parametrize('zone,at', [('Asia/Kolkata', time(5, 30)), ('America/New_York', time(12, 0))])
+    def test_rows_match_the_chart_engine(self, engine, zone, at):
+        table = EphemerisTable(engine, date(2024, 3, 1), date(2024, 4, 30), step=3, at=at, timezone=zone)
+        rows = table_csv(table)
+        assert len(rows) == table.rows == 21
+        for row in rows[::4]:
+            utc = timezone_resolver.localize(datetime.combine(date.fromisoformat(row['date']), at), zone)
+            positions = engine.calculate_planetary_positions(utc.replace(tzinfo=None), 0.0, 0.0)
+            for graha in GRAHAS:
+                expected = positions[graha]
+                assert float(row[f'{graha}_longitude']) == pytest.approx(expected['longitude'], abs=1e-4)
+                assert row[f'{graha}_nakshatra'] == expected['nakshatra']
+                assert int(row[f'{graha}_pada']) == expected['pada']
+                assert row[f'{graha}_retrograde'] == str(int(expected['is_retrograde']))
+
+    def test_chunk_size_does_not_change_the_table(self, engine):
+        args = (engine, date(2023, 12, 20), date(2024, 2, 10))
+        assert (''.join(EphemerisTable(*args, chunk_rows=7).csv_lines())
+                == ''.join(EphemerisTable(*args, chunk_rows=512).csv_lines()))
+
+    def test_mercury_station(self, engine):
+        table = EphemerisTable(engine, date(2024, 3, 25), date(2024, 5, 5), step=5)
+        rows = {r['date']: r['Mercury_retrograde'] for r in table_csv(table)}
+        assert rows['2024-03-25'] == '0' and rows['2024-04-09'] == '1' and rows['2024-05-04'] == '0'
+
+    def test_msgpack_matches_the_chunks(self, engine):
+        table = EphemerisTable(engine, date(2000, 1, 1), date(2001, 12, 31), step=2, chunk_rows=100)
+        decoded = read_msgpack_table(b''.join(table.msgpack_frames()))
+        assert decoded['header']['rows'] == table.rows == 366
+        assert decoded['header']['nakshatras'][0] == 'Ashwini'
+        chunks = list(table.chunks())
+        for name, values in decoded['columns'].items():
+            assert np.array_equal(values, np.concatenate([chunk[name] for chunk in chunks])), name
+        assert str(decoded['columns']['date'][-1]) == '2001-12-31'
+
+    def test_streaming_computes_one_chunk_at_a_time(self, engine, monkeypatch):
+        calls = []
+        sidereal = engine.sidereal_longitudes
+        monkeypatch.setattr(engine, 'sidereal_longitudes', lambda jd, *args: calls.append(len(jd)) or sidereal(jd, *args))
+        lines = EphemerisTable(engine, date(1901, 1, 1), date(2050, 12, 31), chunk_rows=64).csv_lines()
+        next(lines), next(lines)
+        # Each graha's positions now and a day later from a single evaluation of the chunk
+        assert calls == [128]
+
+    @pytest.mark.parametrize('kwargs', [
+        {'end': date(2023, 12, 31)},
+        {'step': 0},
+        {'timezone': 'Mars/Olympus_Mons'},
+        {'ayanamsa': 'fagan'},
+        {'node': 'osculating'},
+        {'start': date(1850, 1, 1)},
+        {'end': date(2060, 1, 1)},
+    ])
+    def test_invalid_tables(self, engine, kwargs):
+        with pytest.raises(ValueError):
+            EphemerisTable(engine, **{'start': date(2024, 1, 1), 'end': date(2024, 12, 31), **kwargs})
+
+
+class TestEphemerisExport:
+    """API and CLI tests for the ephemeris export"""
+
+    def test_csv_endpoint(self):
+        client = TestClient(main.app)
+        response = client.get('/api/ephemeris', params={'from': '2024-01-01', 'to': '2024-12-31', 'step': 7})
+        assert response.status_code == 200 and response.headers['content-type'].startswith('text/csv')
+        assert response.headers['x-ephemeris-rows'] == '53'
+        assert 'ephemeris-2024-01-01-2024-12-31.csv' in response.headers['content-disposition']
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 53 and rows[1]['date'] == '2024-01-08'
+
+    def test_msgpack_endpoint(self):
+        client = TestClient(main.app)
+        response = client.get('/api/ephemeris', params={'from': '2024-01-01', 'to': '2024-01-31', 'format': 'msgpack',
+                                                        'node': 'true', 'ayanamsa': 'raman'})
+        assert response.headers['content-type'] == 'application/msgpack'
+        decoded = read_msgpack_table(response.content)
+        assert decoded['header']['node'] == 'true' and decoded['header']['ayanamsa'] == 'raman'
+        assert len(decoded['columns']['Moon.longitude']) == 31
+
+    @pytest.mark.parametrize('params', [
+        {'from': '2024-02-01', 'to': '2024-01-01'},
+        {'from': '2024-01-01', 'to': '2024-01-02', 'format': 'xlsx'},
+        {'from': '2024-01-01', 'to': '2024-01-02', 'time': '25:00'},
+        {'from': '01/01/2024', 'to': '2024-01-02'},
+        {'from': '1700-01-01', 'to': '1700-01-02'},
+    ])
+    def test_invalid_requests(self, params):
+        client = TestClient(main.app)
+        assert client.get('/api/ephemeris', params=params).status_code == 422
+
+    def test_row_limit(self, monkeypatch):
+        monkeypatch.setattr(main, 'MAX_API_ROWS', 100)
+        client = TestClient(main.app)
+        response = client.get('/api/ephemeris', params={'from': '2024-01-01', 'to': '2024-12-31'})
+        assert response.status_code == 422 and 'ephemeris_table' in response.json()['detail']
+        response = client.get('/api/ephemeris', params={'from': '2024-01-01', 'to': '2024-12-31', 'step': 4})
+        assert response.status_code == 200
+
+    def test_cli(self, tmp_path):
+        csv_path, packed_path = tmp_path / 'ephemeris.csv', tmp_path / 'ephemeris.msgpack'
+        export(['--from', '2030-01-01', '--to', '2030-03-31', '--output', str(csv_path)])
+        export(['--from', '2030-01-01', '--to', '2030-03-31', '--format', 'msgpack', '--output', str(packed_path)])
+        rows = list(csv.DictReader(io.StringIO(csv_path.read_text())))
+        columns = read_msgpack_table(packed_path.read_bytes())['columns']
+        assert len(rows) == len(columns['Sun.longitude']) == 90
+        assert float(rows[-1]['Saturn_longitude']) == pytest.approx(columns['Saturn.longitude'][-1], abs=1e-4)
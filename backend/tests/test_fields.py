@@ -0,0 +1,92 @@
+"""
+Tests for sparse chart fieldsets and the chart JSON response
+"""
+
+import pytest
+from datetime import datetime
+import json
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+import app.cache as cache
+import app.responses as responses
+from app.astrology import VedicAstrology
+from app.cache import TwoTierCache
+from app.fields import parse_fields, project, required_sections
+from app.main import app, astrology
+
+DETAILS = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707}
+
+
+@pytest.fixture(scope='module')
+def chart():
+    return VedicAstrology().generate_birth_chart(datetime(1990, 5, 15, 14, 30), 13.0827, 80.2707, 'Asia/Kolkata')
+
+
+class TestFields:
+    """Test suite for field selection and projection"""
+
+    def test_parse_fields(self):
+        assert parse_fields(None) is None and parse_fields(' , ') is None
+        assert parse_fields('ascendant, planetary_positions.Moon') == ['ascendant', 'planetary_positions.Moon']
+        with pytest.raises(ValueError):
+            parse_fields(['ascendant', 'horoscope'])
+
+    def test_required_sections(self):
+        assert required_sections(['planetary_positions.Moon', 'person']) == {'planetary_positions'}
+        assert required_sections(['houses']) == {'houses', 'ascendant'}
+        assert required_sections(['predictions']) == {
+            'predictions', 'planetary_positions', 'ascendant', 'vimshottari_dasha', 'yogas', 'doshas'}
+
+    def test_project(self, chart):
+        selected = project(chart, ['ascendant.rasi', 'houses.1', 'planetary_positions.Moon.pada',
+                                   'planetary_positions.Moon.nakshatra', 'planetary_positions.Pluto'])
+        assert selected == {
+            'ascendant': {'rasi': chart['ascendant']['rasi']},
+            'houses': {1: chart['houses'][1]},
+            'planetary_positions': {'Moon': {'pada': chart['planetary_positions']['Moon']['pada'],
+                                             'nakshatra': chart['planetary_positions']['Moon']['nakshatra']}},
+        }
+
+    def test_engine_computes_only_sections(self, chart):
+        engine = VedicAstrology()
+        partial = engine.generate_birth_chart(datetime(1990, 5, 15, 14, 30), 13.0827, 80.2707, 'Asia/Kolkata',
+                                              sections=required_sections(['houses', 'vimshottari_dasha']))
+        assert set(partial) == {'ascendant', 'houses', 'planetary_positions', 'vimshottari_dasha'}
+        assert all(partial[k] == chart[k] for k in partial)
+
+
+class TestChartResponses:
+    """API tests for fieldsets and the chart JSON response class"""
+
+    def test_fields_limit_computation(self, monkeypatch):
+        monkeypatch.setattr(cache, '_cache', TwoTierCache())
+
+        def fail(*args, **kwargs):
+            raise AssertionError('predictions were not requested')
+        monkeypatch.setattr(astrology, 'generate_predictions', fail)
+        client = TestClient(app)
+        response = client.post('/api/birth-chart', params={'fields': 'planetary_positions,ascendant,person'},
+                               json=DETAILS)
+        assert response.status_code == 200
+        assert list(response.json()) == ['planetary_positions', 'ascendant', 'person']
+        assert client.post('/api/birth-chart', params={'fields': 'horoscope'}, json=DETAILS).status_code == 422
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_render_matches_default_encoder(self, chart, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(responses, 'orjson', None)
+        payload = {**chart, 'extra': {'flag': np.bool_(True), 'values': np.arange(3)}}
+        fast = responses.ChartJSONResponse(payload).body
+        assert json.loads(fast) == json.loads(JSONResponse(jsonable_encoder(chart)).body) | \
+            {'extra': {'flag': True, 'values': [0, 1, 2]}}
+        assert '"1":' in fast.decode('utf-8') and 'கன்னி' in fast.decode('utf-8')
@@ -0,0 +1,114 @@
+"""
+Tests for the offline place gazetteer
+"""
+
+import pytest
+import random
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.gazetteer import Gazetteer, KDTree, normalize_place, unit_vectors
+from app.main import app
+
+
+@pytest.fixture(scope='module')
+def gazetteer(tmp_path_factory):
+    return Gazetteer(cache_dir=str(tmp_path_factory.mktemp('gazetteer')))
+
+
+class TestGazetteer:
+    """Test suite for place lookup"""
+
+    def test_table_is_memory_mapped(self, gazetteer):
+        """The compiled city table is served from a memory map"""
+        assert isinstance(gazetteer.table, np.memmap)
+        assert len(gazetteer.table) > 500
+
+    def test_resolve_names_and_aliases(self, gazetteer):
+        """Names, old names and qualified names resolve to coordinates and timezone"""
+        chennai = gazetteer.resolve('Chennai')
+        assert chennai['timezone'] == 'Asia/Kolkata'
+        assert abs(chennai['latitude'] - 13.08) < 0.01
+
+        assert gazetteer.resolve('Madras')['name'] == 'Chennai'
+        assert gazetteer.resolve('TRICHY, Tamil Nadu')['name'] == 'Tiruchirappalli'
+        assert gazetteer.resolve('Jaffna')['timezone'] == 'Asia/Colombo'
+        assert gazetteer.resolve('Xyzzyville') is None
+
+    def test_prefix_and_fuzzy_search(self, gazetteer):
+        """Autocomplete returns prefix matches first and tolerates typos"""
+        names = [p['name'] for p in gazetteer.search('Madu')]
+        assert names[0] == 'Madurai'
+        assert 'Coimbatore' in [p['name'] for p in gazetteer.search('kovaii')]
+        assert gazetteer.search('   ') == []
+
+    def test_long_non_ascii_names_kept_whole(self, tmp_path):
+        """Text fields are sized to the data, so long UTF-8 names come back intact"""
+        name = 'ஸ்ரீ வில்லிபுத்தூர் ஆண்டாள் திருக்கோயில் நகரம்'
+        region = 'Région Provence-Alpes-Côte d’Azur Bouches-du-Rhône'
+        csv_path = tmp_path / 'cities.csv'
+        csv_path.write_text(
+            'name,aliases,country,region,latitude,longitude,timezone,population_k\n'
+            f'{name},Srivilliputhur,IN,Tamil Nadu,9.5121,77.6340,Asia/Kolkata,80\n'
+            f'Aix-en-Provence,,FR,{region},43.5297,5.4474,Europe/Paris,145\n',
+            encoding='utf-8'
+        )
+        assert len(name.encode('utf-8')) > 48 and len(region.encode('utf-8')) > 32
+        places = Gazetteer(str(csv_path), cache_dir=str(tmp_path / 'cache'))
+        assert places.resolve('Srivilliputhur')['name'] == name
+        assert places.search('Aix')[0]['region'] == region
+
+    def test_kdtree_matches_brute_force(self):
+        """k-d tree nearest neighbours agree with an exhaustive search"""
+        rng = random.Random(5)
+        points = unit_vectors([rng.uniform(-90, 90) for _ in range(300)],
+                              [rng.uniform(-180, 180) for _ in range(300)])
+        tree = KDTree(points)
+        for _ in range(50):
+            query = unit_vectors([rng.uniform(-90, 90)], [rng.uniform(-180, 180)])[0]
+            brute = np.argsort(((points - query) ** 2).sum(axis=1))[:3]
+            assert [i for _, i in tree.query(query, k=3)] == list(brute)
+
+    def test_nearest_place(self, gazetteer):
+        """Reverse lookup finds the closest city"""
+        nearest = gazetteer.nearest(9.93, 78.12)[0]
+        assert nearest['name'] == 'Madurai'
+        assert nearest['distance_km'] < 2
+
+    def test_normalize_place(self):
+        assert normalize_place('  Tiruchirāppalli, TAMIL-Nadu ') == 'tiruchirappalli tamil nadu'
+
+
+class TestPlacesApi:
+    """API tests for place lookup and place-only birth details"""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_places_endpoint(self, client):
+        response = client.get('/api/places', params={'q': 'coim'})
+        assert response.status_code == 200
+        assert response.json()['places'][0]['name'] == 'Coimbatore'
+
+    def test_birth_chart_with_place_only(self, client):
+        """A place name can stand in for coordinates and timezone"""
+        by_place = client.post('/api/birth-chart', json={
+            'date': '1990-05-15', 'time': '14:30', 'place': 'Singapore'
+        })
+        assert by_place.status_code == 200
+        info = by_place.json()['birth_info']
+        assert info['timezone'] == 'Asia/Singapore'
+        assert abs(info['latitude'] - 1.28) < 0.01
+
+    def test_birth_chart_unknown_place(self, client):
+        response = client.post('/api/birth-chart', json={
+            'date': '1990-05-15', 'time': '14:30', 'place': 'Xyzzyville'
+        })
+        assert response.status_code == 422
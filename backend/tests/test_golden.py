@@ -0,0 +1,57 @@
+"""
+Tests for the golden-dataset accuracy harness
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.ayanamsa import AYANAMSA_MODELS
+from app.nodes import NODE_TYPES
+from verify_golden import FAST_CHARTS, FIELDS, GOLDEN_YEARS, MODES, fast_subset, load_golden, verify
+
+
+@pytest.fixture(scope='module')
+def golden():
+    return load_golden()
+
+
+class TestGoldenDataset:
+    """Test suite for the reference charts and the harness"""
+
+    def test_dataset_covers_options(self, golden):
+        assert len(golden) >= 3000
+        assert set(golden[0]) == set(FIELDS)
+        assert {r['ayanamsa'] for r in golden} == set(AYANAMSA_MODELS)
+        assert {r['node'] for r in golden} == set(NODE_TYPES)
+        years = [int(r['date'][:4]) for r in golden]
+        assert min(years) == GOLDEN_YEARS[0] and max(years) == GOLDEN_YEARS[1]
+        assert len({r['timezone'] for r in golden}) > 5
+
+    def test_fast_subset_covers_options(self, golden):
+        subset = fast_subset(golden)
+        assert FAST_CHARTS <= len(subset) < FAST_CHARTS + 8
+        assert {(r['ayanamsa'], r['node']) for r in subset} == {(r['ayanamsa'], r['node']) for r in golden}
+        years = [int(r['date'][:4]) for r in subset]
+        assert min(years) == GOLDEN_YEARS[0] and max(years) == GOLDEN_YEARS[1]
+        assert len({r['id'] for r in subset}) == len(subset)
+
+    @pytest.mark.parametrize('mode, charts', [('chart', 48), ('batch', 24), ('cached', 24)])
+    def test_engine_matches_golden(self, golden, mode, charts):
+        assert mode in MODES
+        report = verify(fast_subset(golden, charts), mode, workers=2)
+        assert report['violations'] == 0, report['examples']
+
+    def test_reports_violations(self, golden):
+        row = dict(golden[0])
+        row['lagna'] += 0.01
+        row['Moon_pada'] = str(int(row['Moon_pada']) % 4 + 1)
+        report = verify([row], workers=1)
+        assert report['charts_with_violations'] == 1
+        assert report['by_field'] == {'lagna': 1, 'Moon_pada': 1}
+        assert report['examples'][0]['difference'] == pytest.approx(0.01, abs=1e-8)
+        with pytest.raises(ValueError):
+            verify([row], 'skip')
@@ -0,0 +1,103 @@
+"""
+Tests for incremental chart recomputation
+"""
+
+import pytest
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+from app.astrology import VedicAstrology
+from app.incremental import IncrementalChart, IncrementalSessions, changed_fields
+from app.main import app
+
+BIRTH = datetime(1990, 5, 15, 14, 30)
+CHENNAI = (13.0827, 80.2707)
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return VedicAstrology()
+
+
+def assert_same_chart(incremental, full):
+    """Equal to a full computation; interpolated longitudes within 1e-6 degrees"""
+    for name, expected in full['planetary_positions'].items():
+        actual = incremental['planetary_positions'][name]
+        assert actual['longitude'] == pytest.approx(expected['longitude'], abs=1e-6)
+        assert actual['degrees_in_rasi'] == pytest.approx(expected['degrees_in_rasi'], abs=1e-6)
+        assert {k: v for k, v in actual.items() if k not in ('longitude', 'degrees_in_rasi')} == \
+            {k: v for k, v in expected.items() if k not in ('longitude', 'degrees_in_rasi')}
+    for key in full:
+        if key not in ('planetary_positions', 'shadbala'):
+            assert incremental[key] == full[key], key
+    assert set(incremental) == set(full)
+
+
+class TestIncrementalChart:
+    """Test suite for incremental updates"""
+
+    @pytest.mark.parametrize('minutes', [1, 45, -300, 1400, 4000])
+    def test_matches_full_chart(self, engine, minutes):
+        chart = IncrementalChart(engine)
+        chart.update(BIRTH, *CHENNAI, 'Asia/Kolkata')
+        nudged = BIRTH + timedelta(minutes=minutes)
+        result = chart.update(nudged, *CHENNAI, 'Asia/Kolkata')
+        assert_same_chart(result['chart'], engine.generate_birth_chart(nudged, *CHENNAI, 'Asia/Kolkata'))
+
+    def test_place_change_reuses_positions(self, engine):
+        chart = IncrementalChart(engine)
+        first = chart.update(BIRTH, *CHENNAI, 'Asia/Kolkata')
+        assert first['changed'] == ['*'] and first['reused'] == []
+        result = chart.update(BIRTH, 13.09, CHENNAI[1], 'Asia/Kolkata')
+        assert 'planetary_positions' in result['reused'] and 'vimshottari_dasha' in result['reused']
+        assert 'ascendant' in result['recomputed']
+        assert 'birth_info.latitude' in result['changed'] and 'ascendant.longitude' in result['changed']
+        assert not any(path.startswith('planetary_positions') for path in result['changed'])
+        assert_same_chart(result['chart'], engine.generate_birth_chart(BIRTH, 13.09, CHENNAI[1], 'Asia/Kolkata'))
+
+        unchanged = chart.update(BIRTH, 13.09, CHENNAI[1], 'Asia/Kolkata')
+        assert unchanged['changed'] == [] and unchanged['recomputed'] == []
+
+    def test_options_and_validation(self, engine):
+        chart = IncrementalChart(engine)
+        chart.update(BIRTH, *CHENNAI, 'Asia/Kolkata')
+        result = chart.update(BIRTH, *CHENNAI, 'Asia/Kolkata', ayanamsa='raman', node='true', vargas=['D9'])
+        full = engine.generate_birth_chart(BIRTH, *CHENNAI, 'Asia/Kolkata', 'raman', 'true', ['D9'])
+        assert_same_chart(result['chart'], full)
+        with pytest.raises(ValueError):
+            chart.update(BIRTH, *CHENNAI, 'Asia/Kolkata', ayanamsa='unknown')
+
+    def test_changed_fields(self):
+        old = {'a': 1, 'b': {'c': [1, 2]}, 'd': 0}
+        new = {'a': 1, 'b': {'c': [1, 3]}, 'e': 0}
+        assert changed_fields(old, new) == ['b.c[1]', 'd', 'e']
+
+    def test_sessions_are_bounded(self, engine):
+        sessions = IncrementalSessions(engine, max_sessions=2)
+        first, _ = sessions.get()
+        sessions.get('b')
+        sessions.get('c')
+        assert list(sessions._sessions) == ['b', 'c']
+        assert sessions.get('c')[0] == 'c' and len(first) == 32
+
+
+class TestIncrementalApi:
+    """API tests for the incremental birth chart endpoint"""
+
+    def test_session_round_trip(self):
+        client = TestClient(app)
+        details = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707}
+        first = client.post('/api/birth-chart/incremental', json=details).json()
+        session = first['session']
+        assert first['changed'] == ['*'] and first['chart']['planetary_positions']
+        nudged = client.post('/api/birth-chart/incremental', params={'session': session},
+                             json={**details, 'time': '14:31'}).json()
+        assert nudged['session'] == session
+        assert 'birth_info.datetime' in nudged['changed']
+        assert 'yogas' not in nudged['recomputed']
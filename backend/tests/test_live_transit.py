@@ -0,0 +1,175 @@
+"""
+Tests for the live transit stream
+"""
+
+import pytest
+import asyncio
+import json
+import subprocess
+import sys
+import os
+from datetime import timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import app.main as main
+import app.responses as responses
+from app.admission import Overloaded
+from app.astrology import get_astrology_engine
+from app.live_transit import SUBSCRIBER_BACKLOG, TransitHub, apply_delta
+
+CITIES = [('Chennai', 13.0827, 80.2707), ('Madurai', 9.9252, 78.1198), ('Delhi', 28.6139, 77.2090)]
+
+
+def counted_hub(**kwargs):
+    """Hub that ticks once on the first subscription and then only when told to"""
+    hub = TransitHub(get_astrology_engine(), tick_seconds=3600, **kwargs)
+    hub.computations = 0
+    compute = hub._compute
+
+    def counting(now):
+        hub.computations += 1
+        return compute(now)
+
+    hub._compute = counting
+    return hub
+
+
+async def frame(subscriber):
+    return json.loads(await asyncio.wait_for(subscriber.next_frame(), 10))
+
+
+class TestTransitHub:
+    """Test suite for the tick-once, fan-out-to-all hub"""
+
+    def test_one_computation_per_tick_for_all_subscribers(self):
+        hub = counted_hub()
+
+        async def scenario():
+            subscribers = [hub.subscribe(*CITIES[i % 3]) for i in range(60)]
+            snapshots = [await frame(s) for s in subscribers]
+            await hub.tick(hub.time + timedelta(hours=1))
+            deltas = [s.queue.get_nowait() for s in subscribers]
+            return snapshots, deltas
+
+        snapshots, deltas = asyncio.run(scenario())
+        assert hub.computations == 2 and len(hub.cities) == 3
+        assert {s['type'] for s in snapshots} == {'snapshot'}
+        assert {s['city']['name'] for s in snapshots} == {'Chennai', 'Madurai', 'Delhi'}
+        # One encoded frame per city, shared by its subscribers
+        assert len({id(d) for d in deltas}) == 3
+        assert hub.stats()['frames'] == 120 and hub.stats()['subscribers'] == 60
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_deltas_rebuild_the_state(self, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(responses, 'orjson', None)
+        hub = counted_hub()
+
+        async def scenario():
+            subscriber = hub.subscribe(*CITIES[1])
+            snapshot = await frame(subscriber)
+            await hub.tick(hub.time + timedelta(days=3))
+            delta = await frame(subscriber)
+            fresh = await frame(hub.subscribe(*CITIES[1]))
+            return snapshot, delta, fresh
+
+        snapshot, delta, fresh = asyncio.run(scenario())
+        assert delta['type'] == 'delta' and 'Moon' in delta['planets']
+        assert apply_delta(snapshot, delta) == {**fresh, 'type': 'snapshot'}
+        # The Moon moves about 40 degrees in three days: at least one rasi ingress
+        moon = [e for e in delta['events'] if e['body'] == 'Moon']
+        assert any(e['field'] == 'rasi' for e in moon) and any(e['field'] == 'nakshatra' for e in moon)
+
+    def test_api_imports_without_orjson(self):
+        backend = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        code = "import sys; sys.modules['orjson'] = None; import app.main"
+        result = subprocess.run([sys.executable, '-c', code], cwd=backend, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+    def test_slow_subscriber_is_resynchronised(self):
+        hub = counted_hub()
+
+        async def scenario():
+            subscriber = hub.subscribe(*CITIES[0])
+            await frame(subscriber)
+            for hour in range(1, SUBSCRIBER_BACKLOG + 2):
+                await hub.tick(hub.time + timedelta(hours=1))
+            return subscriber.queue.qsize(), await frame(subscriber)
+
+        queued, latest = asyncio.run(scenario())
+        assert queued == 1 and latest['type'] == 'snapshot'
+        assert latest['time'] == hub.time.isoformat() and hub.stats()['resyncs'] == 1
+
+    def test_subscriber_limit_and_unsubscribe(self):
+        hub = counted_hub(max_subscribers=2)
+
+        async def scenario():
+            first, second = hub.subscribe(*CITIES[0]), hub.subscribe(*CITIES[1])
+            with pytest.raises(Overloaded):
+                hub.subscribe(*CITIES[2])
+            hub.unsubscribe(second)
+            hub.unsubscribe(second)
+            hub.subscribe(*CITIES[2])
+            hub.unsubscribe(first)
+
+        asyncio.run(scenario())
+        assert hub.subscribers == 1 and [c.name for c in hub.cities.values()] == ['Delhi']
+        assert hub.stats()['rejected'] == 1
+
+
+class TestTransitStreamApi:
+    """API tests for /ws/transit and /api/transit/stream"""
+
+    @pytest.fixture
+    def hub(self, monkeypatch):
+        hub = counted_hub()
+        hub.tick_seconds = 0.05
+        monkeypatch.setattr(main, 'transit_hub', hub)
+        return hub
+
+    def test_websocket(self, hub, monkeypatch):
+        monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+        with TestClient(main.app) as client:
+            with client.websocket_connect('/ws/transit?place=Madurai') as first, \
+                    client.websocket_connect('/ws/transit?place=Madurai') as second:
+                snapshots = [first.receive_json(), second.receive_json()]
+                deltas = [first.receive_json(), second.receive_json()]
+                stats = client.get('/debug/transit-stream', headers={'X-Admin-Token': 'secret'}).json()
+
+        assert [s['type'] for s in snapshots] == ['snapshot'] * 2 and snapshots[0]['city']['name'] == 'Madurai'
+        assert set(snapshots[0]['planets']) == {'Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn',
+                                                'Rahu', 'Ketu'}
+        assert [d['type'] for d in deltas] == ['delta'] * 2
+        assert stats['subscribers'] == 2 and stats['cities'] == 1
+        assert hub.computations == stats['ticks']
+
+    def test_websocket_rejects_unknown_place(self, hub):
+        with TestClient(main.app) as client:
+            with pytest.raises(WebSocketDisconnect) as closed:
+                with client.websocket_connect('/ws/transit?place=Nowhereville') as socket:
+                    socket.receive_json()
+        assert closed.value.code == 1008 and hub.subscribers == 0
+
+    def test_server_sent_events(self, hub):
+        async def scenario():
+            response = await main.transit_stream(place=None, latitude=11.0168, longitude=76.9558)
+            events = response.body_iterator
+            received = [await asyncio.wait_for(events.__anext__(), 10) for _ in range(2)]
+            subscribed = hub.subscribers
+            await events.aclose()
+            return response, received, subscribed
+
+        response, received, subscribed = asyncio.run(scenario())
+        assert response.media_type == 'text/event-stream' and subscribed == 1 and hub.subscribers == 0
+        assert all(event.startswith('data: ') and event.endswith('\n\n') for event in received)
+        snapshot = json.loads(received[0][len('data: '):])
+        assert snapshot['type'] == 'snapshot' and snapshot['city']['latitude'] == 11.0168
+
+    def test_server_sent_events_rejects_unknown_place(self, hub):
+        client = TestClient(main.app)
+        assert client.get('/api/transit/stream', params={'place': 'Nowhereville'}).status_code == 422
@@ -0,0 +1,51 @@
+"""
+Tests for the synthetic birth generator and the asyncio load generator
+"""
+
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+from app.main import app
+from app.synthetic import BirthGenerator
+from benchmarks.load_test import percentile, run_load, summarize
+
+
+class TestLoadGenerator:
+    """Test suite for the load-test tooling"""
+
+    def test_birth_generator_is_seeded(self):
+        """Same seed gives the same births, different seeds differ"""
+        assert BirthGenerator(seed=7).take(20) == BirthGenerator(seed=7).take(20)
+        assert BirthGenerator(seed=7).take(20) != BirthGenerator(seed=8).take(20)
+
+        for birth in BirthGenerator(seed=1).take(50):
+            assert 1950 <= int(birth['date'][:4]) <= 2010
+            assert -90 <= birth['latitude'] <= 90
+
+    def test_percentile(self):
+        """Percentiles interpolate between ranks"""
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.5
+        assert percentile(values, 99) == 99.01
+        assert percentile([], 95) == 0.0
+
+    def test_run_against_app(self):
+        """A short run against the in-process app produces a per-endpoint summary"""
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                return await run_load(client, total_requests=12, concurrency=3, seed=3)
+
+        results, elapsed = asyncio.run(run())
+        summary = summarize(results, elapsed, concurrency=3, seed=3)
+
+        assert summary['overall']['requests'] == 12
+        assert summary['overall']['errors'] == 0
+        for stats in summary['endpoints'].values():
+            assert set(stats['latency_ms']) == {'mean', 'p50', 'p95', 'p99', 'max'}
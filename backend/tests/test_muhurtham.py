@@ -0,0 +1,122 @@
+"""
+Tests for the muhurtham finder
+"""
+
+import pytest
+from datetime import date, datetime, timedelta
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.astrology import VedicAstrology
+from app.main import app
+from app.muhurtham import PanchangamTables, find_muhurthams, intersect, resolve_constraints
+
+IST = timedelta(hours=5, minutes=30)
+
+
+@pytest.fixture(scope='module')
+def tables():
+    return PanchangamTables(VedicAstrology(), 13.0827, 80.2707, 'Asia/Kolkata', date(2024, 6, 1), 30)
+
+
+def at_minute(text: str, minutes: int) -> datetime:
+    """UTC instant a few minutes into a local window start"""
+    return datetime.strptime(text, '%Y-%m-%d %H:%M') + timedelta(minutes=minutes) - IST
+
+
+class TestIntervals:
+    """Test suite for interval intersection"""
+
+    def test_intersection_splits_at_edges(self):
+        a = (np.array([0.0, 5.0]), np.array([5.0, 10.0]))
+        b = (np.array([3.0]), np.array([8.0]))
+        starts, ends = intersect([a, b])
+        assert list(zip(starts, ends)) == [(3.0, 5.0), (5.0, 8.0)]
+        assert len(intersect([a, (np.array([10.0]), np.array([12.0]))])[0]) == 0
+
+
+class TestMuhurtham:
+    """Test suite for panchangam tables and muhurtham search"""
+
+    def test_windows_match_engine(self, tables):
+        """Readings inside each window agree with the engine's own calculations"""
+        engine = tables.engine
+        windows = find_muhurthams(tables, 'marriage')
+        assert windows
+        constraints = resolve_constraints('marriage')
+        for window in windows[::3]:
+            utc = at_minute(window['start'], 2)
+            positions = engine.calculate_planetary_positions(utc, 13.0827, 80.2707)
+            tithi = int((positions['Moon']['longitude'] - positions['Sun']['longitude']) % 360 // 12) + 1
+            assert window['tithi']['number'] == tithi in constraints['tithis']
+            assert window['nakshatra']['name'] == positions['Moon']['nakshatra']
+            assert window['lagna']['rasi'] == engine.calculate_ascendant(utc, 13.0827, 80.2707)['rasi']
+            assert window['vara']['number'] in constraints['varas']
+            assert window['duration_minutes'] >= 30
+
+    def test_day_table(self, tables):
+        day = tables.day_table()[0]
+        # Chennai, Saturday 1 June 2024
+        assert day['vara'] == 'Saturday'
+        assert '05:40' <= day['sunrise'] <= '05:45'
+        assert '18:30' <= day['sunset'] <= '18:36'
+        assert day['rahu_kalam'].startswith('08:5')
+
+    def test_exclusions(self, tables):
+        """Rahu Kalam, Yamagandam and Chandrashtama never overlap a window"""
+        windows = find_muhurthams(tables, nakshatras=range(1, 28), moon_rasi=5, min_minutes=0)
+        chandrashtama = {r['date']: r for r in tables.day_table()}
+        engine = tables.engine
+        for window in windows[::5]:
+            day = chandrashtama[window['start'][:10]]
+            start, end = window['start'][11:], window['end'][11:]
+            for busy in (day['rahu_kalam'], day['yamagandam']):
+                begin, finish = busy.split('-')
+                assert end <= begin or start >= finish or window['end'][:10] != window['start'][:10]
+            moon = engine.calculate_planetary_positions(at_minute(window['start'], 1), 13.0827, 80.2707)['Moon']
+            assert (moon['rasi'] - 5) % 12 + 1 != 8
+
+    def test_constraint_validation(self):
+        with pytest.raises(ValueError):
+            resolve_constraints('naming')
+        with pytest.raises(ValueError):
+            resolve_constraints(lagnas=[13])
+        assert resolve_constraints('marriage', varas=[0])['varas'] == (0,)
+
+
+class TestMuhurthamApi:
+    """API tests for the muhurtham endpoint"""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_search(self, client):
+        response = client.post('/api/muhurtham', json={
+            'place': 'Chennai', 'start_date': '2024-06-01', 'days': 30, 'purpose': 'griha_pravesam'
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body['day_table']) == 30
+        assert all(w['lagna']['rasi'] in (2, 5, 8, 11) for w in body['windows'])
+
+    def test_validation(self, client):
+        base = {'latitude': 13.08, 'longitude': 80.27, 'start_date': '2024-06-01'}
+        assert client.post('/api/muhurtham', json={**base, 'days': 400}).status_code == 422
+        assert client.post('/api/muhurtham', json={**base, 'purpose': 'naming'}).status_code == 422
+        assert client.post('/api/muhurtham', json={**base, 'timezone': 'Mars/Olympus'}).status_code == 422
+
+    @pytest.mark.parametrize('start_date', ['2024-06-10', '2024-12-10'])
+    def test_polar_day_or_night(self, client, start_date):
+        """Tromsø in midsummer and midwinter has no sunrise to divide the day by"""
+        response = client.post('/api/muhurtham', json={
+            'latitude': 69.65, 'longitude': 18.96, 'timezone': 'Europe/Oslo', 'start_date': start_date, 'days': 7
+        })
+        assert response.status_code == 422
+        assert 'rise and set' in response.json()['detail']
@@ -0,0 +1,80 @@
+"""
+Tests for the mean and true lunar node
+"""
+
+import pytest
+from datetime import datetime
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from skyfield.framelib import ecliptic_frame
+
+from app.astrology import VedicAstrology
+from app.nodes import TrueNodeTable, lunar_node_longitude, mean_node, true_node_correction
+
+J2000 = 2451545.0
+
+
+def angular_difference(a, b):
+    return (np.asarray(a) - np.asarray(b) + 180) % 360 - 180
+
+
+class TestLunarNodes:
+    """Test suite for Rahu/Ketu node models"""
+
+    @pytest.fixture
+    def astro(self):
+        return VedicAstrology()
+
+    def test_mean_node_formula(self):
+        """Mean node keeps the engine's original polynomial"""
+        assert mean_node(J2000) == pytest.approx(125.04452)
+        T = 0.5
+        expected = (125.04452 - 1934.136261 * T + 0.0020708 * T**2 + T**3 / 450000.0) % 360
+        assert mean_node(J2000 + T * 36525) == pytest.approx(expected)
+
+    def test_table_matches_series(self):
+        """Interpolated corrections agree with the periodic terms"""
+        table = TrueNodeTable()
+        jd = np.linspace(2415100.0, 2488000.0, 20001) + 0.13
+        diff = np.abs(table.correction(jd) - true_node_correction(jd))
+        assert diff.max() < 0.002
+        assert table.correction(2300000.0) == pytest.approx(true_node_correction(2300000.0))
+
+    def test_true_node_tracks_osculating_node(self, astro):
+        """The true node follows the osculating node of the DE421 Moon"""
+        jd = np.linspace(2440000.5, 2470000.5, 2000)
+        t = astro.ts.tt_jd(jd)
+        r, v = (astro.eph['moon'] - astro.eph['earth']).at(t).frame_xyz_and_velocity(ecliptic_frame)
+        h = np.cross(r.au.T, v.au_per_d.T)
+        osculating = np.degrees(np.arctan2(h[:, 0], -h[:, 1])) % 360
+
+        true_error = np.abs(angular_difference(lunar_node_longitude(jd, 'true'), osculating))
+        mean_error = np.abs(angular_difference(lunar_node_longitude(jd, 'mean'), osculating))
+        assert true_error.max() < 0.35
+        assert mean_error.max() > 1.5
+        assert true_error.mean() < mean_error.mean() / 5
+
+    def test_chart_with_true_node(self, astro):
+        """Rahu moves with the node choice and Ketu stays opposite"""
+        birth = (datetime(1990, 5, 15, 14, 30), 13.0827, 80.2707, 'Asia/Kolkata')
+        mean = astro.generate_birth_chart(*birth)
+        true = astro.generate_birth_chart(*birth, node='true')
+
+        assert mean['birth_info']['node'] == 'mean'
+        assert true['birth_info']['node'] == 'true'
+        rahu = true['planetary_positions']['Rahu']['longitude']
+        ketu = true['planetary_positions']['Ketu']['longitude']
+        assert abs(angular_difference(ketu, rahu + 180)) < 1e-9
+        assert rahu != mean['planetary_positions']['Rahu']['longitude']
+        assert mean['planetary_positions']['Sun'] == true['planetary_positions']['Sun']
+
+    def test_unknown_node(self, astro):
+        with pytest.raises(ValueError):
+            lunar_node_longitude(J2000, 'osculating')
+        with pytest.raises(ValueError):
+            astro.generate_birth_chart(datetime(1990, 5, 15), 13.08, 80.27, 'Asia/Kolkata', node='apparent')
@@ -0,0 +1,104 @@
+"""
+Tests for the sampling profiler and slow-request diagnostics
+"""
+
+import pytest
+import threading
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.profiling import (
+    SamplingProfiler, SlowRequestLog, record_inputs, stage, start_request_timings
+)
+
+
+class TestProfiling:
+    """Test suite for profiling helpers and debug endpoints"""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_stage_timings_recorded(self):
+        """Stages and inputs are attached to the active request"""
+        timings = start_request_timings()
+        record_inputs(latitude=13.08, timezone='Asia/Kolkata')
+        with stage('planetary_positions'):
+            time.sleep(0.01)
+
+        assert timings.inputs == {'latitude': 13.08, 'timezone': 'Asia/Kolkata'}
+        assert timings.stages[0]['stage'] == 'planetary_positions'
+        assert timings.stages[0]['ms'] >= 10
+
+    def test_slow_request_threshold(self):
+        """Only requests above the threshold are logged"""
+        log = SlowRequestLog(threshold_ms=100, maxlen=2)
+        assert not log.observe('POST', '/api/birth-chart', 50)
+        assert log.observe('POST', '/api/birth-chart', 150)
+        assert log.observe('POST', '/api/birth-chart', 250)
+        assert log.observe('POST', '/api/birth-chart', 350)
+
+        entries = log.entries()
+        assert [e['duration_ms'] for e in entries] == [250, 350]
+
+    def test_sampler_captures_busy_thread(self):
+        """A function burning CPU in another thread shows up in the stacks"""
+        stop = threading.Event()
+
+        def busy_chart_loop():
+            while not stop.is_set():
+                sum(i * i for i in range(1000))
+
+        worker = threading.Thread(target=busy_chart_loop)
+        worker.start()
+        try:
+            result = SamplingProfiler(interval=0.001).sample(0.2)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert result['samples'] > 0
+        assert 'busy_chart_loop' in SamplingProfiler.to_collapsed(result)
+
+    def test_debug_endpoints_disabled_without_token(self, client, monkeypatch):
+        """Debug endpoints are hidden unless ADMIN_TOKEN is configured"""
+        monkeypatch.delenv('ADMIN_TOKEN', raising=False)
+        assert client.get('/debug/profile?seconds=0.1').status_code == 404
+        assert client.get('/debug/slow-requests').status_code == 404
+
+    def test_debug_profile_requires_admin(self, client, monkeypatch):
+        """Profiling returns collapsed stacks for the admin only"""
+        monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+        response = client.get('/debug/profile?seconds=0.1', headers={'X-Admin-Token': 'wrong'})
+        assert response.status_code == 403
+
+        response = client.get('/debug/profile?seconds=0.1', headers={'X-Admin-Token': 'secret'})
+        assert response.status_code == 200
+        assert int(response.headers['X-Profile-Samples']) > 0
+
+    def test_slow_birth_chart_logged_with_stages(self, client, monkeypatch):
+        """A slow birth chart request is logged with its inputs and stages"""
+        from app import cache, main
+        monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+        monkeypatch.setattr(main.slow_request_log, 'threshold_ms', 0)
+        # An empty result cache so the chart is really computed
+        monkeypatch.setattr(cache, '_cache', cache.TwoTierCache(cache.LocalCache()))
+
+        client.post('/api/birth-chart', json={
+            'date': '1990-05-15', 'time': '14:30',
+            'latitude': 13.0827, 'longitude': 80.2707
+        })
+
+        response = client.get('/debug/slow-requests', headers={'X-Admin-Token': 'secret'})
+        entry = [r for r in response.json()['requests'] if r['path'] == '/api/birth-chart'][-1]
+        stages = [s['stage'] for s in entry['stages']]
+        assert 'timezone' in stages
+        assert 'planetary_positions' in stages
+        assert entry['inputs']['timezone'] == 'Asia/Kolkata'
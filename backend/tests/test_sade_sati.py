@@ -0,0 +1,137 @@
+"""
+Tests for the Saturn interval index (Sade Sati, Ashtama, Kantaka Shani)
+"""
+
+import pytest
+import asyncio
+import threading
+from datetime import datetime
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+import numpy as np
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.astrology import VedicAstrology
+from app.main import app
+from app.sade_sati import SaturnCycleIndex
+
+
+@pytest.fixture(scope='module')
+def index():
+    return SaturnCycleIndex(VedicAstrology())
+
+
+class TestSaturnCycles:
+    """Test suite for Saturn period lookups"""
+
+    def test_table_matches_ephemeris(self, index):
+        """Interval lookups agree with Saturn's computed rasi away from ingress days"""
+        table = index.table()
+        jd = np.random.default_rng(1).uniform(index.start_jd, index.end_jd, 500)
+        near_ingress = np.min(np.abs(jd[:, None] - table['start'][None, 1:]), axis=1) < 1
+        lon = index.engine.sidereal_longitudes(jd, ['Saturn'])['Saturn']
+        expected = (lon // 30).astype(int) + 1
+        assert (index.saturn_rasi(jd)[~near_ingress] == expected[~near_ingress]).all()
+
+    def test_coverage_clipped_to_ephemeris(self, index):
+        coverage = index.coverage()
+        assert coverage['start'] <= '1900-01-01'
+        assert '2053-01-01' < coverage['end'] <= '2100-01-01'
+        with pytest.raises(ValueError):
+            index.saturn_rasi(index.end_jd + 10)
+
+    def test_aquarius_sade_sati(self, index):
+        """Moon in Kumbham: Sade Sati from Saturn's 2020 entry into Makaram until it leaves Meenam"""
+        periods = index.periods(11, start_jd=index.to_jd('2021-01-01'), end_jd=index.to_jd('2022-01-01'))
+        assert len(periods['sade_sati']) == 1
+        sade_sati = periods['sade_sati'][0]
+        assert sade_sati['start'].startswith('2020-01')
+        assert sade_sati['end'][:4] in ('2027', '2028')
+        assert [p['phase'] for p in sade_sati['phases']][:2] == ['rising', 'peak']
+        assert not sade_sati['partial']
+
+    def test_periods_are_disjoint_and_ordered(self, index):
+        for rasi in range(1, 13):
+            periods = index.periods(rasi)
+            spans = sorted(
+                [(p['start'], p['end']) for kind in periods.values() for p in kind]
+            )
+            for (_, end), (start, _) in zip(spans, spans[1:]):
+                assert end <= start
+            for kantaka in periods['kantaka']:
+                assert kantaka['house'] in (4, 7, 10)
+
+    def test_bulk_status(self, index):
+        """Status is vectorized over (moon rasi, instant) pairs"""
+        jd = index.to_jd('2024-06-01')  # Saturn in Kumbham
+        status = index.status(np.arange(1, 13), np.full(12, jd))
+        assert list(status[[9, 10, 11]]) == ['sade_sati'] * 3
+        assert status[3] == 'ashtama'
+        assert status[7] == 'kantaka'
+        with pytest.raises(ValueError):
+            index.periods(13)
+
+
+class TestSadeSatiApi:
+    """API tests for Saturn period endpoints"""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_bulk_moon_rasis(self, client):
+        response = client.get('/api/sade-sati', params={
+            'moon_rasi': [11, 5], 'start': '2024-01-01', 'end': '2030-01-01'
+        })
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [r['moon_rasi'] for r in results] == [11, 5]
+        assert results[0]['periods']['sade_sati']
+        assert client.get('/api/sade-sati', params={'moon_rasi': 0}).status_code == 422
+        assert client.get('/api/sade-sati', params={'moon_rasi': 1, 'start': 'soon'}).status_code == 422
+
+    def test_for_chart(self, client):
+        response = client.post('/api/sade-sati', json={
+            'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert 1 <= body['moon_rasi'] <= 12
+        assert all(p['end'] > '1990-05-15' for p in body['periods']['sade_sati'])
+
+    def test_table_builds_off_the_event_loop(self, monkeypatch):
+        """Other requests are answered while the first lookup builds a Saturn table"""
+        fresh = SaturnCycleIndex(main.astrology)
+        monkeypatch.setattr(main, 'get_saturn_index', lambda engine: fresh)
+        started, release = threading.Event(), threading.Event()
+        build = fresh._build
+
+        def held_build(ayanamsa):
+            started.set()
+            # Bounded, so a build run on the event loop fails the test instead of hanging it
+            release.wait(10)
+            return build(ayanamsa)
+
+        monkeypatch.setattr(fresh, '_build', held_build)
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                lookup = asyncio.ensure_future(client.get('/api/sade-sati', params={'moon_rasi': 11}))
+                try:
+                    assert await asyncio.to_thread(started.wait, 10)
+                    health = await client.get('/health')
+                    building = not lookup.done()
+                finally:
+                    release.set()
+                return await lookup, health, building
+
+        response, health, building = asyncio.run(scenario())
+        assert health.status_code == 200 and building
+        assert response.status_code == 200
@@ -0,0 +1,101 @@
+"""
+Tests for Ashtakavarga and Shadbala
+"""
+
+import pytest
+from datetime import datetime
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from app.astrology import VedicAstrology
+from app.strength import (
+    ASHTAKAVARGA_HOUSES, CONTRIBUTORS, SAPTA_GRAHAS, ashtakavarga, transit_bindus
+)
+
+PLANET_TOTALS = {'Sun': 48, 'Moon': 49, 'Mars': 39, 'Mercury': 54, 'Jupiter': 56, 'Venus': 52, 'Saturn': 39}
+
+
+def naive_bhinna(signs):
+    """Count bindus sign by sign straight from the house tables"""
+    bhinna = np.zeros((7, 12), dtype=int)
+    for p, planet in enumerate(SAPTA_GRAHAS):
+        for contributor, sign in zip(CONTRIBUTORS, signs):
+            for house in ASHTAKAVARGA_HOUSES[planet][contributor]:
+                bhinna[p, (sign - 1 + house - 1) % 12] += 1
+    return bhinna
+
+
+class TestStrength:
+    """Test suite for the strength engine"""
+
+    @pytest.fixture
+    def astro(self):
+        return VedicAstrology()
+
+    @pytest.fixture
+    def chart(self, astro):
+        return astro.generate_birth_chart(datetime(1990, 5, 15, 14, 30), 13.0827, 80.2707, 'Asia/Kolkata')
+
+    def test_bitboards_match_naive_count(self):
+        """Rotated masks give the same bindus as counting house by house"""
+        signs = np.random.default_rng(11).integers(1, 13, (200, 8))
+        table = ashtakavarga(signs)
+        for row in range(len(signs)):
+            assert (table['bhinna'][row] == naive_bhinna(signs[row])).all()
+        assert table['sarva'].shape == (200, 12)
+
+    def test_bindu_totals(self):
+        """Every chart has the classical per-planet totals and 337 sarva bindus"""
+        table = ashtakavarga(np.random.default_rng(2).integers(1, 13, (50, 8)))
+        totals = table['bhinna'].sum(axis=2)
+        assert (totals == np.array([PLANET_TOTALS[p] for p in SAPTA_GRAHAS])).all()
+        assert (table['sarva'].sum(axis=1) == 337).all()
+
+    def test_chart_sections(self, chart):
+        section = chart['ashtakavarga']
+        assert section['sarva_total'] == 337
+        assert section['bhinna']['Jupiter']['total'] == 56
+        assert len(section['sarva']) == 12
+
+        strengths = chart['shadbala']
+        assert set(strengths) == set(SAPTA_GRAHAS)
+        assert sorted(s['rank'] for s in strengths.values()) == list(range(1, 8))
+        for s in strengths.values():
+            assert 0 <= s['components']['dig'] <= 60
+            assert s['rupas'] == pytest.approx(s['virupas'] / 60, abs=0.01)
+
+    def test_batch_matches_single(self, astro, chart):
+        batch = astro.generate_birth_charts([datetime(1990, 5, 15, 14, 30)], [13.0827], [80.2707],
+                                            ['Asia/Kolkata'])
+        assert batch[0]['ashtakavarga'] == chart['ashtakavarga']
+        assert batch[0]['shadbala'] == chart['shadbala']
+
+    def test_uchcha_bala_peaks_at_exaltation(self, astro, chart):
+        """A graha at its deep exaltation point gets the full 60 virupas of uchcha bala"""
+        positions = {p: dict(v) for p, v in chart['planetary_positions'].items()}
+        baseline = astro.calculate_shadbala(positions, chart['ascendant'], datetime(1990, 5, 15, 9), 80.27)
+
+        positions['Sun'].update(longitude=10.0, rasi=1)
+        exalted = astro.calculate_shadbala(positions, chart['ascendant'], datetime(1990, 5, 15, 9), 80.27)
+        assert exalted['Sun']['sthana']['uchcha'] == 60.0
+        assert exalted['Sun']['components']['sthana'] > baseline['Sun']['components']['sthana']
+        assert exalted['Sun']['components']['sthana'] == pytest.approx(sum(exalted['Sun']['sthana'].values()),
+                                                                       abs=0.05)
+
+        # Deep debilitation, 10° Libra, is opposite: no uchcha bala at all
+        positions['Sun'].update(longitude=190.0, rasi=7)
+        debilitated = astro.calculate_shadbala(positions, chart['ascendant'], datetime(1990, 5, 15, 9), 80.27)
+        assert debilitated['Sun']['sthana']['uchcha'] == pytest.approx(0.0, abs=0.01)
+
+    def test_transit_bindus(self, chart):
+        transits = {'Saturn': {'rasi': 10}, 'Jupiter': {'rasi': 3}}
+        scores = transit_bindus(chart['ashtakavarga'], transits)
+        assert set(scores) == {'Saturn', 'Jupiter'}
+        saturn = chart['ashtakavarga']['bhinna']['Saturn']['bindus'][9]
+        assert scores['Saturn']['bindus'] == saturn
+        assert scores['Saturn']['favourable'] == (saturn >= 4)
@@ -0,0 +1,91 @@
+"""
+Tests for the cached timezone layer and vectorized local -> UTC conversion
+"""
+
+import pytest
+import random
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytz
+
+from app.astrology import VedicAstrology
+from app.timezones import TimezoneResolver
+
+
+ZONES = ['Asia/Kolkata', 'Asia/Colombo', 'Asia/Singapore', 'Europe/London',
+         'America/New_York', 'Australia/Sydney', 'Europe/Oslo', 'UTC', 'Etc/GMT+5']
+
+
+class TestTimezones:
+    """Test suite for timezone resolution"""
+
+    @pytest.fixture
+    def resolver(self):
+        return TimezoneResolver()
+
+    def test_matches_pytz_localize(self, resolver):
+        """Vectorized conversion agrees with pytz.localize(is_dst=False)"""
+        rng = random.Random(42)
+        start = datetime(1880, 1, 1)
+        for zone_name in ZONES:
+            zone = pytz.timezone(zone_name)
+            local = [start + timedelta(minutes=rng.randrange(200 * 365 * 1440)) for _ in range(500)]
+            expected = [zone.localize(dt).astimezone(pytz.UTC).replace(tzinfo=None) for dt in local]
+
+            utc = resolver.to_utc(local, zone_name)
+            assert [t.item() for t in utc] == expected, zone_name
+
+    def test_mixed_zones_in_one_call(self, resolver):
+        """Each element is converted with its own zone"""
+        local = [datetime(1990, 5, 15, 14, 30)] * 3
+        utc = resolver.to_utc(local, ['Asia/Kolkata', 'Europe/London', 'Asia/Kolkata'])
+        assert utc[0] == np.datetime64('1990-05-15T09:00:00')
+        assert utc[1] == np.datetime64('1990-05-15T13:30:00')
+        assert utc[2] == utc[0]
+
+    def test_ambiguous_times(self, resolver):
+        """Repeated wall-clock times follow the requested policy"""
+        dt = datetime(2004, 10, 31, 1, 30)  # clocks fall back at 02:00 BST
+        assert resolver.localize(dt, 'Europe/London').hour == 1  # GMT reading
+        assert resolver.localize(dt, 'Europe/London', ambiguous='dst').hour == 0
+        with pytest.raises(pytz.AmbiguousTimeError):
+            resolver.localize(dt, 'Europe/London', ambiguous='raise')
+
+        zone = pytz.timezone('Europe/London')
+        assert resolver.localize(dt, 'Europe/London', ambiguous='dst') == zone.localize(dt, is_dst=True)
+
+    def test_nonexistent_times(self, resolver):
+        """Skipped wall-clock times follow the requested policy"""
+        dt = datetime(2008, 3, 9, 2, 30)  # clocks jump from 02:00 to 03:00
+        zone = pytz.timezone('America/New_York')
+        assert resolver.localize(dt, 'America/New_York') == zone.localize(dt, is_dst=False)
+        assert resolver.localize(dt, 'America/New_York', nonexistent='dst') == zone.localize(dt, is_dst=True)
+
+        shifted = resolver.localize(dt, 'America/New_York', nonexistent='shift_forward')
+        assert shifted == datetime(2008, 3, 9, 7, 0, tzinfo=pytz.UTC)
+
+        with pytest.raises(pytz.NonExistentTimeError):
+            resolver.to_utc([datetime(2008, 1, 1), dt], 'America/New_York', nonexistent='raise')
+
+    def test_zone_tables_are_cached(self, resolver):
+        """A zone's transition table is built once"""
+        assert resolver.table('Asia/Kolkata') is resolver.table('Asia/Kolkata')
+        with pytest.raises(pytz.UnknownTimeZoneError):
+            resolver.table('Mars/Olympus_Mons')
+
+    def test_batch_charts_match_single(self):
+        """generate_birth_charts gives the same charts as generate_birth_chart"""
+        astro = VedicAstrology()
+        births = [datetime(1990, 5, 15, 14, 30), datetime(1985, 11, 3, 1, 15)]
+        lats, lons = [13.0827, 51.5074], [80.2707, -0.1278]
+        zones = ['Asia/Kolkata', 'Europe/London']
+
+        batch = astro.generate_birth_charts(births, lats, lons, zones)
+        for chart, args in zip(batch, zip(births, lats, lons, zones)):
+            assert chart == astro.generate_birth_chart(*args)
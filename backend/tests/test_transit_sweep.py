@@ -0,0 +1,93 @@
+"""
+Tests for the transit-over-natal sweep
+"""
+
+import pytest
+from datetime import datetime
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from app.astrology import VedicAstrology
+from app.transit_sweep import NatalIndex, TransitTimeline, describe_events, natal_points, sweep
+
+
+@pytest.fixture(scope='module')
+def timeline():
+    # Two years, including Saturn and Jupiter retrograde loops
+    return TransitTimeline.between(VedicAstrology(), datetime(2024, 1, 1), datetime(2026, 1, 1))
+
+
+class TestTransitSweep:
+    """Test suite for transit events over many natal charts"""
+
+    def test_events_match_brute_force(self, timeline):
+        """Every sign change of (transit - natal) between samples is one event"""
+        rng = np.random.default_rng(7)
+        moons = rng.uniform(0, 360, 400)
+        index = NatalIndex()
+        index.add(range(400), moon=moons)
+        events = sweep(timeline, index, points=('moon',))
+
+        for p, planet in enumerate(timeline.planets):
+            lon = timeline.longitudes[planet]
+            for user, moon in enumerate(moons):
+                rel = (lon - moon + 180) % 360 - 180
+                expected = int(np.sum(((rel[:-1] < 0) != (rel[1:] < 0)) & (np.abs(rel[:-1]) < 90)))
+                mine = events[(events['user'] == user) & (events['planet'] == p)]
+                assert len(mine) == expected
+                for e in mine:
+                    i = np.searchsorted(timeline.jd, e['jd']) - 1
+                    assert (rel[i] < 0) != (rel[i + 1] < 0)
+
+    def test_exact_time(self, timeline):
+        """Interpolated crossing times land on the natal degree"""
+        index = NatalIndex()
+        index.add([1, 2], moon=[10.0, 350.5])
+        events = sweep(timeline, index, points=('moon',))
+        assert len(events) > 0
+        engine = timeline.engine
+        for e in events:
+            planet = timeline.planets[e['planet']]
+            natal = 10.0 if e['user'] == 1 else 350.5
+            lon = engine.sidereal_longitudes(np.array([e['jd']]), [planet])[planet][0]
+            assert abs((lon - natal + 180) % 360 - 180) < 0.001
+        assert list(events['jd']) == sorted(events['jd'])
+
+    def test_incremental_index(self, timeline):
+        """Adding users later gives the same events as indexing them together"""
+        rng = np.random.default_rng(3)
+        lagnas = rng.uniform(0, 360, 60)
+        together = NatalIndex()
+        together.add(range(60), lagna=lagnas)
+        split = NatalIndex()
+        split.add(range(30), lagna=lagnas[:30])
+        split.sorted_points('lagna')
+        split.add(range(30, 60), lagna=lagnas[30:])
+        assert len(split) == 60
+
+        a, b = sweep(timeline, together), sweep(timeline, split)
+        key = lambda ev: sorted(zip(ev['user'], ev['planet'], np.round(ev['jd'], 6)))
+        assert key(a) == key(b)
+
+    def test_saturn_ingress(self, timeline):
+        """Saturn enters sidereal Pisces in 2025"""
+        ingresses = timeline.ingresses('Saturn')
+        pisces = [i for i in ingresses if i['rasi'] == 12 and not i['retrograde']]
+        assert pisces
+        when = timeline.engine.ts.tt_jd(pisces[0]['jd']).utc_datetime()
+        assert when.year == 2025 and when.month in (3, 4)
+
+    def test_from_chart(self, timeline):
+        engine = timeline.engine
+        chart = engine.generate_birth_chart(datetime(1990, 5, 15, 14, 30), 13.0827, 80.2707, 'Asia/Kolkata')
+        points = natal_points(chart, datetime(2024, 6, 1))
+        index = NatalIndex()
+        index.add([42], **{k: [v] for k, v in points.items()})
+        described = describe_events(timeline, sweep(timeline, index))
+        assert all(d['user'] == 42 for d in described)
+        assert {d['point'] for d in described} <= {'moon', 'lagna', 'dasha_lord'}
@@ -0,0 +1,102 @@
+"""
+Tests for divisional charts (vargas)
+"""
+
+import pytest
+from datetime import datetime
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.astrology import VedicAstrology
+from app.main import app
+from app.vargas import VARGA_BODIES, parse_vargas, varga_signs, varga_table
+
+
+def navamsa_by_sign_quality(longitude):
+    """Textbook rule: movable signs count from themselves, fixed from the 9th, dual from the 5th"""
+    sign = int(longitude // 30)
+    part = int((longitude % 30) // (30 / 9))
+    start = {0: sign, 1: sign + 8, 2: sign + 4}[sign % 3]
+    return (start + part) % 12 + 1
+
+
+class TestVargas:
+    """Test suite for the varga engine"""
+
+    @pytest.mark.parametrize('varga, longitude, expected', [
+        ('D2', 10.0, 5), ('D2', 20.0, 4), ('D2', 40.0, 4), ('D2', 55.0, 5),
+        ('D3', 15.0, 5), ('D3', 25.0, 9), ('D3', 35.0, 2),
+        ('D7', 30.0, 8), ('D7', 1.0, 1),
+        ('D9', 0.0, 1), ('D9', 30.0, 10), ('D9', 90.0, 4), ('D9', 359.9, 12),
+        ('D10', 30.0, 10), ('D10', 3.5, 2),
+        ('D12', 29.0, 12), ('D12', 32.6, 3),
+        ('D30', 3.0, 1), ('D30', 7.0, 11), ('D30', 15.0, 9), ('D30', 33.0, 2), ('D30', 57.0, 8),
+        ('D60', 29.9, 12), ('D60', 0.4, 1),
+    ])
+    def test_known_placements(self, varga, longitude, expected):
+        assert int(varga_signs(longitude, varga)) == expected
+
+    def test_navamsa_matches_sign_quality_rule(self):
+        longitudes = np.linspace(0, 359.99, 7201)
+        expected = [navamsa_by_sign_quality(lon) for lon in longitudes]
+        assert list(varga_signs(longitudes, 'D9')) == expected
+
+    def test_table_shape(self):
+        """A (charts, bodies) matrix maps to same-shaped sign arrays"""
+        longitudes = np.random.default_rng(3).uniform(0, 360, (50, len(VARGA_BODIES)))
+        table = varga_table(longitudes, ('D9', 'D60'))
+        assert set(table) == {'D9', 'D60'}
+        assert table['D9'].shape == longitudes.shape
+        assert table['D60'].min() >= 1 and table['D60'].max() <= 12
+
+    def test_parse_vargas(self):
+        assert parse_vargas(None) == ()
+        assert parse_vargas('d9, D10,D9') == ('D9', 'D10')
+        assert len(parse_vargas(['all'])) == 8
+        with pytest.raises(ValueError):
+            parse_vargas(['D11'])
+
+    def test_vargas_only_when_requested(self):
+        astro = VedicAstrology()
+        birth = (datetime(1990, 5, 15, 14, 30), 13.0827, 80.2707, 'Asia/Kolkata')
+        assert 'vargas' not in astro.generate_birth_chart(*birth)
+
+        chart = astro.generate_birth_chart(*birth, vargas=['D9'])
+        navamsa = chart['vargas']['D9']['positions']
+        assert set(navamsa) == set(VARGA_BODIES)
+        moon = chart['planetary_positions']['Moon']['longitude']
+        assert navamsa['Moon']['rasi'] == navamsa_by_sign_quality(moon)
+
+    def test_batch_matches_single(self):
+        """Batched charts get the same vargas as charts built one at a time"""
+        astro = VedicAstrology()
+        births = [datetime(1985, 1, 2, 6, 0), datetime(2001, 9, 30, 23, 45)]
+        batch = astro.generate_birth_charts(births, [13.08, 9.93], [80.27, 78.12],
+                                            ['Asia/Kolkata', 'Asia/Kolkata'], vargas=['D9', 'D30'])
+        for birth, lat, lon, chart in zip(births, [13.08, 9.93], [80.27, 78.12], batch):
+            single = astro.generate_birth_chart(birth, lat, lon, 'Asia/Kolkata', vargas=['D9', 'D30'])
+            assert chart['vargas'] == single['vargas']
+
+
+class TestVargasApi:
+    """API tests for the vargas field"""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_birth_chart_with_vargas(self, client):
+        payload = {'date': '1990-05-15', 'time': '14:30', 'latitude': 13.0827, 'longitude': 80.2707}
+        assert 'vargas' not in client.post('/api/birth-chart', json=payload).json()
+
+        response = client.post('/api/birth-chart', json={**payload, 'vargas': ['d9', 'D10']})
+        assert response.status_code == 200
+        assert list(response.json()['vargas']) == ['D9', 'D10']
+
+        assert client.post('/api/birth-chart', json={**payload, 'vargas': ['D5']}).status_code == 422
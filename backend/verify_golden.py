@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Golden-dataset accuracy regression
+Recomputes thousands of reference births across a process pool and reports every
+lagna/position difference beyond tolerance and every changed rasi, nakshatra,
+pada, retrograde flag or dasha boundary
+
+Usage:
+    python verify_golden.py                      # fast subset through generate_birth_chart (seconds)
+    python verify_golden.py --full               # all charts (about 110 CPU-seconds)
+    python verify_golden.py --mode batch         # through generate_birth_charts
+    python verify_golden.py --mode cached        # through the API's cached compute_chart
+    python verify_golden.py --full --workers 8 --output golden.json
+    python verify_golden.py generate --count 3000   # rewrite the dataset (only for intended changes)
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.astrology import VedicAstrology
+from app.ayanamsa import AYANAMSA_MODELS
+from app.nodes import NODE_TYPES
+from app.synthetic import BirthGenerator
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'golden', 'charts.csv.gz')
+
+# Inside the ephemeris and node-table coverage whatever the birth timezone
+GOLDEN_YEARS = (1901, 2049)
+
+# Degrees; the reference engine is deterministic, so any larger drift is a change
+DEFAULT_TOLERANCE = 1e-6
+
+MODES = ('chart', 'batch', 'cached')
+
+# Charts in the default run: every ayanamsa and node type, earliest to latest year
+FAST_CHARTS = 120
+
+GRAHAS = ('Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Rahu', 'Ketu')
+INPUT_FIELDS = ('id', 'date', 'time', 'latitude', 'longitude', 'timezone', 'ayanamsa', 'node')
+ANGLE_FIELDS = ('lagna',) + tuple(f'{g}_longitude' for g in GRAHAS)
+EXACT_FIELDS = ('lagna_rasi', 'lagna_nakshatra') + tuple(
+    f'{g}_{field}' for g in GRAHAS for field in ('rasi', 'nakshatra', 'pada', 'retrograde')
+) + ('dasha',)
+FIELDS = INPUT_FIELDS + ANGLE_FIELDS + EXACT_FIELDS
+
+
+def chart_row(chart: Dict, nakshatra_ids: Dict[str, int]) -> Dict:
+    """Compared values of a chart: floats for angles, strings for everything else"""
+    ascendant = chart['ascendant']
+    row = {
+        'lagna': float(ascendant['longitude']),
+        'lagna_rasi': str(ascendant['rasi']),
+        'lagna_nakshatra': str(nakshatra_ids[ascendant['nakshatra']]),
+    }
+    for graha in GRAHAS:
+        position = chart['planetary_positions'][graha]
+        row[f'{graha}_longitude'] = float(position['longitude'])
+        row[f'{graha}_rasi'] = str(position['rasi'])
+        row[f'{graha}_nakshatra'] = str(nakshatra_ids[position['nakshatra']])
+        row[f'{graha}_pada'] = str(position['pada'])
+        row[f'{graha}_retrograde'] = str(int(position['is_retrograde']))
+    dashas = chart['vimshottari_dasha']
+    row['dasha'] = ';'.join(f"{d['planet']}:{d['start_date']}" for d in dashas) + f";{dashas[-1]['end_date']}"
+    return row
+
+
+def load_golden(path: str = GOLDEN_PATH) -> List[Dict]:
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        for field in ('latitude', 'longitude') + ANGLE_FIELDS:
+            row[field] = float(row[field])
+    return rows
+
+
+def fast_subset(rows: List[Dict], count: int = FAST_CHARTS) -> List[Dict]:
+    """
+    About `count` rows spread evenly over the dates of each ayanamsa and node
+    combination. Rows cycle through the combinations, so a plain stride would
+    keep only some of them.
+    """
+    groups: Dict[tuple, List[Dict]] = {}
+    for row in rows:
+        groups.setdefault((row['ayanamsa'], row['node']), []).append(row)
+    per_group = max(1, -(-count // len(groups))) if groups else 0
+    subset = []
+    for group in groups.values():
+        group.sort(key=lambda r: (r['date'], r['time']))
+        if len(group) <= per_group:
+            subset.extend(group)
+        elif per_group == 1:
+            subset.append(group[0])
+        else:
+            step = (len(group) - 1) / (per_group - 1)
+            subset.extend(group[round(i * step)] for i in range(per_group))
+    return sorted(subset, key=lambda r: int(r['id']))
+
+
+def write_golden(rows: List[Dict], path: str = GOLDEN_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS, lineterminator='\n')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({k: (f'{v:.9f}' if k in ANGLE_FIELDS else v) for k, v in row.items()})
+    # mtime=0 keeps the file byte-identical when regenerated from the same engine
+    with open(path, 'wb') as f, gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as gz:
+        gz.write(buffer.getvalue().encode('utf-8'))
+
+
+def birth_datetime(row: Dict) -> datetime:
+    return datetime.strptime(f"{row['date']} {row['time']}", '%Y-%m-%d %H:%M')
+
+
+def compare(expected: Dict, actual: Dict, tolerance: float) -> List[Dict]:
+    violations = []
+    for field in ANGLE_FIELDS:
+        difference = abs((actual[field] - expected[field] + 180) % 360 - 180)
+        if difference > tolerance:
+            violations.append({'id': expected['id'], 'field': field, 'expected': expected[field],
+                               'actual': actual[field], 'difference': difference})
+    for field in EXACT_FIELDS:
+        if actual[field] != expected[field]:
+            violations.append({'id': expected['id'], 'field': field, 'expected': expected[field],
+                               'actual': actual[field]})
+    return violations
+
+
+_engine: Optional[VedicAstrology] = None
+
+
+def _init_worker():
+    global _engine
+    _engine = VedicAstrology()
+
+
+def _compute_charts(rows: List[Dict], mode: str) -> List[Dict]:
+    if mode == 'chart':
+        return [_engine.generate_birth_chart(birth_datetime(r), r['latitude'], r['longitude'], r['timezone'],
+                                             r['ayanamsa'], r['node']) for r in rows]
+    if mode == 'batch':
+        charts: List[Optional[Dict]] = [None] * len(rows)
+        groups: Dict[tuple, List[int]] = {}
+        for i, r in enumerate(rows):
+            groups.setdefault((r['ayanamsa'], r['node']), []).append(i)
+        for (ayanamsa, node), indexes in groups.items():
+            batch = _engine.generate_birth_charts([birth_datetime(rows[i]) for i in indexes],
+                                                  [rows[i]['latitude'] for i in indexes],
+                                                  [rows[i]['longitude'] for i in indexes],
+                                                  [rows[i]['timezone'] for i in indexes], ayanamsa, node)
+            for i, chart in zip(indexes, batch):
+                charts[i] = chart
+        return charts
+    # Through the API helper twice, so the second chart is decoded from the result cache
+    from app import main
+    charts = []
+    for r in rows:
+        details = main.BirthDetails(**{k: r[k] for k in INPUT_FIELDS if k != 'id'})
+        main.compute_chart(details)
+        charts.append(main.compute_chart(details)[0])
+    return charts
+
+
+def _verify_chunk(args) -> List[Dict]:
+    rows, mode, tolerance = args
+    ids = {n['name']: n['id'] for n in _engine.NAKSHATRAS}
+    violations = []
+    for expected, chart in zip(rows, _compute_charts(rows, mode)):
+        violations.extend(compare(expected, chart_row(chart, ids), tolerance))
+    return violations
+
+
+def verify(rows: List[Dict], mode: str = 'chart', workers: Optional[int] = None,
+           tolerance: float = DEFAULT_TOLERANCE, chunk_size: int = 50) -> Dict:
+    """Recompute the rows across a process pool and collect the violations"""
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}'. Choose from: {', '.join(MODES)}")
+    workers = workers or os.cpu_count() or 1
+    chunks = [(rows[i:i + chunk_size], mode, tolerance) for i in range(0, len(rows), chunk_size)]
+
+    began = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        violations = [v for chunk in pool.map(_verify_chunk, chunks) for v in chunk]
+    seconds = time.perf_counter() - began
+
+    return {
+        'charts': len(rows),
+        'mode': mode,
+        'workers': workers,
+        'tolerance_degrees': tolerance,
+        'seconds': round(seconds, 2),
+        'charts_per_second': round(len(rows) / seconds, 1) if seconds else None,
+        'violations': len(violations),
+        'charts_with_violations': len({v['id'] for v in violations}),
+        'by_field': dict(Counter(v['field'] for v in violations).most_common()),
+        'examples': violations[:20],
+    }
+
+
+def generate(count: int, seed: int = 0) -> List[Dict]:
+    """Reference rows from the current engine, cycling through ayanamsas and node types"""
+    engine = VedicAstrology()
+    ids = {n['name']: n['id'] for n in engine.NAKSHATRAS}
+    births = BirthGenerator(seed, *GOLDEN_YEARS).take(count)
+    ayanamsas = list(AYANAMSA_MODELS)
+    rows = []
+    for i, birth in enumerate(births):
+        row = {
+            'id': str(i),
+            'date': birth['date'],
+            'time': birth['time'],
+            'latitude': birth['latitude'],
+            'longitude': birth['longitude'],
+            'timezone': birth['timezone'],
+            'ayanamsa': ayanamsas[i % len(ayanamsas)],
+            'node': NODE_TYPES[(i // len(ayanamsas)) % len(NODE_TYPES)],
+        }
+        chart = engine.generate_birth_chart(birth_datetime(row), row['latitude'], row['longitude'],
+                                            row['timezone'], row['ayanamsa'], row['node'])
+        row.update(chart_row(chart, ids))
+        rows.append(row)
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', nargs='?', choices=('verify', 'generate'), default='verify')
+    parser.add_argument('--path', default=GOLDEN_PATH)
+    parser.add_argument('--mode', choices=MODES, default='chart', help='Engine entry point to verify')
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: all CPUs)')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='Degrees')
+    parser.add_argument('--full', action='store_true', help='Verify every chart')
+    parser.add_argument('--charts', type=int, default=FAST_CHARTS, help='Charts in the default fast run')
+    parser.add_argument('--sample', type=int, default=None, help='Verify every Nth chart instead')
+    parser.add_argument('--count', type=int, default=3000, help='Charts to generate')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='Write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        rows = generate(args.count, args.seed)
+        write_golden(rows, args.path)
+        summary = {'charts': len(rows), 'path': args.path}
+    else:
+        rows = load_golden(args.path)
+        if args.sample:
+            rows = rows[::args.sample]
+        elif not args.full:
+            rows = fast_subset(rows, args.charts)
+        summary = verify(rows, args.mode, args.workers, args.tolerance)
+
+    output = json.dumps(summary, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    if summary.get('violations'):
+        sys.exit(1)
+    return summary
+
+
+if __name__ == '__main__':
+    main()